@@ -37,3 +37,25 @@ class ExposureSuite:
     def time_gamma_adjust_u8(self):
         for i in range(10):
             _ = exposure.adjust_gamma(self.image_u8)
+
+
+class HistogramSuite:
+    """Benchmark for exposure.histogram on large images."""
+    param_names = ['dtype']
+    params = [[np.uint8, np.uint16, np.float32, np.float64]]
+
+    def setup(self, dtype):
+        rng = np.random.RandomState(0)
+        image = rng.random_sample((4000, 4000, 3))
+        if np.issubdtype(dtype, np.integer):
+            image *= np.iinfo(dtype).max
+        self.image = image.astype(dtype)
+
+    def time_histogram(self, dtype):
+        exposure.histogram(self.image[..., 0])
+
+    def time_histogram_multichannel(self, dtype):
+        exposure.histogram(self.image, multichannel=True)
+
+    def peakmem_histogram(self, dtype):
+        exposure.histogram(self.image[..., 0])
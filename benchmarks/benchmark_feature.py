@@ -2,7 +2,7 @@
 # https://asv.readthedocs.io/en/latest/writing_benchmarks.html
 import numpy as np
 from scipy import ndimage as ndi
-from skimage import feature, util
+from skimage import data, feature, transform, util
 
 
 class FeatureSuite:
@@ -20,7 +20,64 @@ class FeatureSuite:
     def time_canny(self):
         result = feature.canny(self.image)
 
+    def time_canny_float32(self):
+        result = feature.canny(self.image.astype(np.float32))
+
     def time_glcm(self):
         pi = np.pi
         result = feature.greycomatrix(self.image_ubyte, distances=[1, 2],
                                       angles=[0, pi/4, pi/2, 3*pi/4])
+
+    def time_glcm_sparse(self):
+        pi = np.pi
+        result = feature.greycomatrix(self.image_ubyte, distances=[1, 2],
+                                      angles=[0, pi/4, pi/2, 3*pi/4],
+                                      sparse=True)
+
+    def time_local_greycoprops(self):
+        result = feature.local_greycoprops(self.image_ubyte // 8, [1],
+                                           [0, np.pi / 2], (15, 15),
+                                           levels=32,
+                                           props=['contrast', 'energy'])
+
+    def time_hog(self):
+        result = feature.hog(self.image, visualize=True)
+
+    def time_hog_dense_windows(self):
+        result = feature.hog_dense(self.image, window_shape=(128, 64))
+
+    def time_local_binary_pattern(self):
+        result = feature.local_binary_pattern(self.image, 24, 3, 'uniform',
+                                              dtype=np.uint8)
+
+    def time_local_binary_pattern_histograms(self):
+        result = feature.local_binary_pattern_histograms(
+            self.image, 24, 3, (32, 32), 'uniform')
+
+    def time_orb_frames(self):
+        orb = feature.ORB(n_keypoints=100)
+        frames = np.stack([self.image_ubyte] * 4)
+        for _ in orb.detect_and_extract_frames(frames):
+            pass
+
+    def time_corner_harris(self):
+        result = feature.corner_harris(self.image)
+
+    def time_haar_like_feature_batch(self):
+        int_image = transform.integral_image(self.image)
+        rois = np.mgrid[:600:32, :600:32].reshape(2, -1).T
+        result = feature.haar_like_feature_batch(int_image, rois, 24, 24,
+                                                 'type-2-x', dtype=np.float32)
+
+
+class CascadeSuite:
+    """Benchmark for the cascade of classifiers in scikit-image."""
+    def setup(self):
+        trained_file = data.lbp_frontal_face_cascade_filename()
+        self.detector = feature.Cascade(trained_file)
+        self.image = data.astronaut()
+
+    def time_detect_multi_scale(self):
+        self.detector.detect_multi_scale(img=self.image, scale_factor=1.2,
+                                         step_ratio=1, min_size=(30, 30),
+                                         max_size=(300, 300))
@@ -28,10 +28,25 @@ class FiltersSobel3D:
         _ = filters.sobel(self.image3d)
 
 
+class RidgeFilters3D:
+    """Benchmark for 3d ridge filters."""
+    param_names = ['func']
+    params = ['meijering', 'sato', 'frangi']
+
+    def setup(self, *args):
+        self.image3d = data.binary_blobs(length=96, n_dim=3).astype(float)
+
+    def time_ridge_filter_3d(self, func):
+        getattr(filters, func)(self.image3d, mode='reflect')
+
+    def peakmem_ridge_filter_3d(self, func):
+        getattr(filters, func)(self.image3d, mode='reflect')
+
+
 class MultiOtsu(object):
     """Benchmarks for MultiOtsu threshold."""
     param_names = ['classes']
-    params = [3, 4, 5]
+    params = [3, 4, 5, 8]
     def setup(self, *args):
         try:
             from skimage.filters import threshold_multiotsu
@@ -82,4 +97,39 @@ class ThresholdSauvolaSuite:
         result = filters.threshold_sauvola(self.image, window_size=51)
 
     def time_sauvola_3d(self):
-        result = filters.threshold_sauvola(self.image3D, window_size=51)
\ No newline at end of file
+        result = filters.threshold_sauvola(self.image3D, window_size=51)
+
+    def time_sauvola_binary(self):
+        result = filters.threshold_sauvola(self.image, window_size=51,
+                                           binary=True)
+
+    def peakmem_sauvola(self):
+        result = filters.threshold_sauvola(self.image, window_size=51)
+
+
+class ThresholdLocalSuite:
+    """Benchmark for threshold_local in scikit-image."""
+
+    def setup(self):
+        self.image = np.tile(data.camera(), (4, 4))
+        self.image_float32 = self.image.astype(np.float32) / 255
+
+    def time_gaussian(self):
+        filters.threshold_local(self.image, 51)
+
+    def time_gaussian_float32(self):
+        filters.threshold_local(self.image_float32, 51)
+
+    def time_generic_batch(self):
+        filters.threshold_local(self.image[:512, :512], 15, "generic",
+                                param=lambda x: x.mean(axis=1), batch=True)
+
+
+class ThresholdLiSuite:
+    """Benchmark for threshold_li in scikit-image."""
+
+    def setup(self):
+        self.image = np.tile(data.camera(), (4, 4)).astype(np.uint16) * 200
+
+    def time_li_uint16(self):
+        filters.threshold_li(self.image)
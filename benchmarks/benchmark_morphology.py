@@ -76,3 +76,67 @@ class Skeletonize3d(object):
 
     def peakmem_skeletonize_3d(self):
         self.skeletonize(self.image)
+
+
+class Skeletonize3dThreads(object):
+
+    param_names = ["num_threads"]
+    params = [1, 2, 4]
+
+    def setup(self, num_threads):
+        try:
+            morphology.skeletonize_3d(np.zeros((3, 3, 3), dtype=np.uint8),
+                                      num_threads=num_threads)
+        except TypeError:
+            raise NotImplementedError("threaded skeletonize_3d unavailable")
+
+        # blobs touching the image borders, to exercise the unpadded path
+        self.image = data.binary_blobs(128, 0.1, n_dim=3, seed=0)
+
+    def time_skeletonize_3d(self, num_threads):
+        morphology.skeletonize_3d(self.image, num_threads=num_threads)
+
+    def peakmem_reference(self, *args):
+        """Provide reference for memory measurement with empty benchmark.
+
+        See ``Skeletonize3d.peakmem_reference``.
+        """
+        pass
+
+    def peakmem_skeletonize_3d(self, num_threads):
+        morphology.skeletonize_3d(self.image, num_threads=num_threads)
+
+
+class PackedBinaryMorphology(object):
+
+    param_names = ["radius"]
+    params = [1, 5, 10]
+
+    def setup(self, radius):
+        if not hasattr(morphology, 'pack_binary'):
+            raise NotImplementedError("packed binary morphology unavailable")
+        rng = np.random.RandomState(0)
+        self.image = rng.rand(4096, 4096) > 0.2
+        self.packed = morphology.pack_binary(self.image)
+        self.selem = morphology.disk(radius)
+
+    def time_binary_erosion(self, radius):
+        morphology.binary_erosion(self.image, self.selem)
+
+    def time_packed_binary_erosion(self, radius):
+        morphology.packed_binary_erosion(self.packed, self.selem,
+                                         width=self.image.shape[-1])
+
+    def peakmem_reference(self, *args):
+        """Provide reference for memory measurement with empty benchmark.
+
+        See ``Skeletonize3d.peakmem_reference``.
+        """
+        pass
+
+    def peakmem_binary_erosion(self, radius):
+        morphology.binary_erosion(self.image, self.selem)
+
+    def peakmem_packed_binary_erosion(self, radius):
+        morphology.packed_binary_erosion(self.packed, self.selem,
+                                         width=self.image.shape[-1])
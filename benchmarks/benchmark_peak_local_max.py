@@ -17,8 +17,14 @@ class PeakLocalMaxSuite(object):
         self.labels, num_objs = ndi.label(mask)
         # create distance image for peak searching
         self.dist = ndi.distance_transform_edt(mask)
+        # noisy volume, with many candidate peaks
+        rng = np.random.RandomState(0)
+        self.spots = ndi.gaussian_filter(rng.rand(100, 200, 200), 1)
 
     def time_peak_local_max(self):
         local_max = peak_local_max(
             self.dist, labels=self.labels,
             min_distance=20, indices=False, exclude_border=False)
+
+    def time_peak_local_max_3d(self):
+        peak_local_max(self.spots, min_distance=3)
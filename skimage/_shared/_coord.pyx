@@ -0,0 +1,132 @@
+#cython: cdivision=True
+#cython: boundscheck=False
+#cython: nonecheck=False
+#cython: wraparound=False
+# distutils: language = c++
+
+from libc.math cimport fabs, pow, sqrt, INFINITY
+from libcpp.unordered_map cimport unordered_map
+from cython.operator cimport dereference as deref
+
+import numpy as np
+
+cimport numpy as cnp
+cnp.import_array()
+
+
+cdef inline double _minkowski(double[:, ::1] coords, Py_ssize_t i,
+                              Py_ssize_t j, double p_norm) nogil:
+    """Minkowski distance between the points `i` and `j` of `coords`."""
+    cdef:
+        Py_ssize_t d
+        double diff, dist = 0
+
+    for d in range(coords.shape[1]):
+        diff = fabs(coords[i, d] - coords[j, d])
+        if p_norm == 1:
+            dist += diff
+        elif p_norm == 2:
+            dist += diff * diff
+        elif p_norm == INFINITY:
+            if diff > dist:
+                dist = diff
+        else:
+            dist += pow(diff, p_norm)
+
+    if p_norm == 2:
+        return sqrt(dist)
+    if p_norm == 1 or p_norm == INFINITY:
+        return dist
+    return pow(dist, 1 / p_norm)
+
+
+def _ensure_spacing_grid(double[:, ::1] coords, cnp.int64_t[::1] keys,
+                         cnp.int64_t[::1] neighbor_offsets, double spacing,
+                         double p_norm, bint inclusive,
+                         Py_ssize_t[::1] groups, Py_ssize_t max_per_group):
+    """Greedily select points that are far enough from the selected points.
+
+    The points are visited in order, and a point is selected if its
+    distance to every previously selected point of its group is at least
+    `spacing` (or larger than `spacing`, if `inclusive` is True), until
+    `max_per_group` points of the group are selected.
+
+    Parameters
+    ----------
+    coords : (n, ndim) ndarray of float64
+        The coordinates of the points.
+    keys : (n,) ndarray of int64
+        The linear index of the cell of a grid containing each point. Two
+        points closer than `spacing` must be in neighboring cells.
+    neighbor_offsets : (m,) ndarray of int64
+        The offsets between the linear index of a cell and the linear
+        indices of its neighbors (itself included).
+    spacing : float
+        The minimum distance between the selected points.
+    p_norm : float
+        Which Minkowski p-norm to use.
+    inclusive : bool
+        Whether points at exactly `spacing` from a selected point are
+        rejected too.
+    groups : (n,) ndarray of intp
+        The group of each point. The points of a group must be contiguous.
+    max_per_group : int
+        The maximum number of selected points in each group.
+
+    Returns
+    -------
+    selected : (n,) ndarray of bool
+        Whether each point is selected.
+    """
+    cdef:
+        Py_ssize_t n_points = coords.shape[0]
+        Py_ssize_t n_offsets = neighbor_offsets.shape[0]
+        Py_ssize_t i, j, o
+        Py_ssize_t n_selected = 0
+        double dist
+        bint keep
+        # The last selected point of each cell, and for each selected point,
+        # the previously selected point of its cell (or -1). The points of
+        # previous groups are ignored.
+        unordered_map[cnp.int64_t, Py_ssize_t] last_selected
+        unordered_map[cnp.int64_t, Py_ssize_t].iterator it
+        Py_ssize_t[::1] previous = np.empty(n_points, dtype=np.intp)
+        cnp.uint8_t[::1] selected = np.zeros(n_points, dtype=np.uint8)
+
+    with nogil:
+        for i in range(n_points):
+            if i > 0 and groups[i] != groups[i - 1]:
+                n_selected = 0
+            if n_selected >= max_per_group:
+                continue
+
+            keep = True
+            for o in range(n_offsets):
+                it = last_selected.find(keys[i] + neighbor_offsets[o])
+                if it == last_selected.end():
+                    continue
+                j = deref(it).second
+                if groups[j] != groups[i]:
+                    continue
+                while j >= 0:
+                    dist = _minkowski(coords, i, j, p_norm)
+                    if dist < spacing or (inclusive and dist == spacing):
+                        keep = False
+                        break
+                    j = previous[j]
+                if not keep:
+                    break
+            if not keep:
+                continue
+
+            selected[i] = 1
+            n_selected += 1
+            previous[i] = -1
+            it = last_selected.find(keys[i])
+            if it != last_selected.end():
+                j = deref(it).second
+                if groups[j] == groups[i]:
+                    previous[i] = j
+            last_selected[keys[i]] = i
+
+    return np.asarray(selected, dtype=bool)
@@ -1,57 +1,91 @@
+import itertools
+
 import numpy as np
-from scipy.spatial import cKDTree, distance
 
+from ._coord import _ensure_spacing_grid
 
-def _ensure_spacing(coord, spacing, p_norm):
-    """Returns a subset of coord where a minimum spacing is guaranteed.
+
+def _ensure_spacing(coord, spacing, p_norm, inclusive=False, groups=None,
+                    max_per_group=None):
+    """Returns a mask of the points of coord where a minimum spacing is
+    guaranteed.
+
+    The points are visited in order, and a point is kept unless it is closer
+    than `spacing` to a point kept before it. The points are sorted in the
+    cells of a grid, so that each point is only compared to the kept points
+    of the neighboring cells.
 
     Parameters
     ----------
-    coord : ndarray
+    coord : (n, ndim) ndarray
         The coordinates of the considered points.
     spacing : float
         the maximum allowed spacing between the points.
     p_norm : float
         Which Minkowski p-norm to use. Should be in the range [1, inf].
-        A finite large p may cause a ValueError if overflow can occur.
         ``inf`` corresponds to the Chebyshev distance and 2 to the
         Euclidean distance.
+    inclusive : bool, optional
+        If True, the points at exactly `spacing` from a kept point are
+        rejected as well.
+    groups : (n,) ndarray of ints, optional
+        If provided, the points are only compared to the points of the same
+        group. The points of each group must be contiguous.
+    max_per_group : int, optional
+        Maximum number of points kept in each group (or in total, if `groups`
+        is None).
 
     Returns
     -------
-    output : ndarray
-        A subset of coord where a minimum spacing is guaranteed.
+    kept : (n,) ndarray of bool
+        The points of coord where a minimum spacing is guaranteed.
 
     """
-
-    # Use KDtree to find the peaks that are too close to each other
-    tree = cKDTree(coord)
-
-    indices = tree.query_ball_point(coord, r=spacing, p=p_norm)
-    rejected_peaks_indices = set()
-    for idx, candidates in enumerate(indices):
-        if idx not in rejected_peaks_indices:
-            # keep current point and the points at exactly spacing from it
-            candidates.remove(idx)
-            dist = distance.cdist([coord[idx]],
-                                  coord[candidates],
-                                  distance.minkowski,
-                                  p=p_norm).reshape(-1)
-            candidates = [c for c, d in zip(candidates, dist)
-                          if d < spacing]
-
-            # candidates.remove(keep)
-            rejected_peaks_indices.update(candidates)
-
-    # Remove the peaks that are too close to each other
-    output = np.delete(coord, tuple(rejected_peaks_indices), axis=0)
-
-    return output
+    coord = np.ascontiguousarray(coord, dtype=np.float64)
+    n_points, ndim = coord.shape
+    if groups is None:
+        groups = np.zeros(n_points, dtype=np.intp)
+    else:
+        groups = np.ascontiguousarray(groups, dtype=np.intp)
+    if max_per_group is None or max_per_group > n_points:
+        max_per_group = n_points
+    if spacing <= 0 or n_points < 2:
+        # No point to compare: all the points are in the same cell, which
+        # has no neighbor
+        return _ensure_spacing_grid(coord, np.zeros(n_points, dtype=np.int64),
+                                    np.zeros(0, dtype=np.int64), spacing,
+                                    p_norm, inclusive, groups,
+                                    int(max_per_group))
+
+    # Two points closer than spacing are in neighboring cells. The cells are
+    # slightly larger than spacing, so that this holds despite the rounding
+    # errors of the cell indices, and there are less than 2 ** 62 cells.
+    low = coord.min(axis=0)
+    extent = coord.max(axis=0) - low
+    cell_size = max(spacing * (1 + 1e-6), extent.max() / 1e9)
+    while np.prod(extent // cell_size + 3, dtype=float) > 2 ** 62:
+        cell_size *= 2
+
+    # Neighboring cells are padded by one cell on each side
+    cells = np.floor((coord - low) / cell_size).astype(np.int64) + 1
+    grid_shape = cells.max(axis=0) + 2
+    strides = np.cumprod(np.concatenate([[1], grid_shape[:0:-1]]))[::-1]
+    keys = cells @ strides
+    neighbor_offsets = np.array(
+        list(itertools.product((-1, 0, 1), repeat=ndim)),
+        dtype=np.int64) @ strides
+
+    return _ensure_spacing_grid(coord, keys, neighbor_offsets,
+                                spacing, p_norm, inclusive, groups,
+                                int(max_per_group))
 
 
 def ensure_spacing(coords, spacing=1, p_norm=np.inf, min_split_size=50):
     """Returns a subset of coord where a minimum spacing is guaranteed.
 
+    The points are visited in order, and a point is kept unless it is closer
+    than `spacing` to a point kept before it.
+
     Parameters
     ----------
     coord : array_like
@@ -60,12 +94,12 @@ def ensure_spacing(coords, spacing=1, p_norm=np.inf, min_split_size=50):
         the maximum allowed spacing between the points.
     p_norm : float
         Which Minkowski p-norm to use. Should be in the range [1, inf].
-        A finite large p may cause a ValueError if overflow can occur.
         ``inf`` corresponds to the Chebyshev distance and 2 to the
         Euclidean distance.
     min_split_size : int
-        Minimum split size used to process ``coord`` by batch to save
-        memory. If None, the memory saving strategy is not applied.
+        Unused. The points used to be processed by batches of at least this
+        size to save memory, but the points are now processed in one pass
+        with a memory usage proportional to their number.
 
     Returns
     -------
@@ -76,20 +110,7 @@ def ensure_spacing(coords, spacing=1, p_norm=np.inf, min_split_size=50):
 
     output = coords
     if len(coords):
-
         coords = np.atleast_2d(coords)
-        if min_split_size is None:
-            batch_list = [coords]
-        else:
-            coord_count = len(coords)
-            split_count = int(np.log2(coord_count / min_split_size)) + 1
-            split_idx = np.cumsum(
-                [coord_count // (2 ** i) for i in range(1, split_count)])
-            batch_list = np.array_split(coords, split_idx)
-
-        output = np.zeros((0, coords.shape[1]), dtype=coords.dtype)
-        for batch in batch_list:
-            output = _ensure_spacing(np.vstack([output, batch]),
-                                     spacing, p_norm)
+        output = coords[_ensure_spacing(coords, spacing, p_norm)]
 
     return output
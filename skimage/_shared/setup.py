@@ -15,13 +15,17 @@ def configuration(parent_package='', top_path=None):
     cython(['geometry.pyx',
             'transform.pyx',
             'interpolation.pyx',
-            'fast_exp.pyx'], working_path=base_path)
+            'fast_exp.pyx',
+            '_coord.pyx'], working_path=base_path)
 
     config.add_extension('geometry', sources=['geometry.c'])
     config.add_extension('transform', sources=['transform.c'],
                          include_dirs=[get_numpy_include_dirs()])
     config.add_extension('interpolation', sources=['interpolation.c'])
     config.add_extension('fast_exp', sources=['fast_exp.c'])
+    config.add_extension('_coord', sources=['_coord.cpp'],
+                         include_dirs=[get_numpy_include_dirs()],
+                         language='c++')
     return config
 
 
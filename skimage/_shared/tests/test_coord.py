@@ -1,7 +1,8 @@
+import math
 import pytest
 import numpy as np
 from scipy.spatial.distance import pdist, minkowski
-from skimage._shared.coord import ensure_spacing
+from skimage._shared.coord import ensure_spacing, _ensure_spacing
 
 
 @pytest.mark.parametrize("p", [1, 2, np.inf])
@@ -67,3 +68,73 @@ def test_ensure_spacing_p_norm(p, size):
     out = ensure_spacing(coord, spacing=spacing, p_norm=p, min_split_size=size)
 
     assert pdist(out, metric=minkowski, p=p).min() > spacing
+
+
+def _minkowski(point, other, p):
+    # Same arithmetic as the C implementation, as the distances of
+    # scipy.spatial.distance.minkowski may differ in the last bits
+    diff = [abs(float(a) - float(b)) for a, b in zip(point, other)]
+    if p == 1:
+        return sum(diff)
+    if p == 2:
+        return math.sqrt(sum(d * d for d in diff))
+    if p == np.inf:
+        return max(diff)
+    return sum(d ** p for d in diff) ** (1 / p)
+
+
+def _brute_force_spacing(coord, spacing, p, inclusive=False):
+    kept = []
+    for point in coord:
+        dist = [_minkowski(point, other, p) for other in kept]
+        if all(d > spacing if inclusive else d >= spacing for d in dist):
+            kept.append(point)
+    return np.array(kept).reshape(-1, coord.shape[1])
+
+
+@pytest.mark.parametrize("p", [1, 1.5, 2, 3, np.inf])
+@pytest.mark.parametrize("ndim", [1, 2, 3])
+def test_ensure_spacing_brute_force(p, ndim):
+    rng = np.random.RandomState(0)
+    coord = rng.randint(0, 30, size=(500, ndim))
+    for spacing in (1, 2, 5, 100):
+        out = ensure_spacing(coord, spacing=spacing, p_norm=p)
+        assert out.dtype == coord.dtype
+        assert np.array_equal(out, _brute_force_spacing(coord, spacing, p))
+
+    coord = rng.rand(500, ndim) * 20
+    out = ensure_spacing(coord, spacing=2.5, p_norm=p)
+    assert np.array_equal(out, _brute_force_spacing(coord, 2.5, p))
+
+
+@pytest.mark.parametrize("p", [1, 2, np.inf])
+def test_ensure_spacing_inclusive(p):
+    rng = np.random.RandomState(0)
+    coord = rng.randint(0, 20, size=(300, 2))
+    kept = _ensure_spacing(coord, 3, p, inclusive=True)
+    assert np.array_equal(coord[kept],
+                          _brute_force_spacing(coord, 3, p, inclusive=True))
+
+
+def test_ensure_spacing_extent():
+    # Points far apart compared to the spacing
+    coord = np.array([[0, 0, 0], [1e12, 0, 1e12], [1e12, 1, 1e12],
+                      [5, -1e15, 0]])
+    assert np.array_equal(ensure_spacing(coord, spacing=2), coord[[0, 1, 3]])
+
+
+def test_ensure_spacing_groups():
+    rng = np.random.RandomState(0)
+    coord = rng.randint(0, 30, size=(400, 2))
+    groups = np.repeat([3, 1, 2, 7], 100)
+    kept = _ensure_spacing(coord, 4, 2, groups=groups, max_per_group=10)
+    for group in range(4):
+        group_coord = coord[100 * group:100 * (group + 1)]
+        group_kept = kept[100 * group:100 * (group + 1)]
+        assert np.array_equal(group_coord[group_kept],
+                              _brute_force_spacing(group_coord, 4, 2)[:10])
+
+    kept = _ensure_spacing(coord, 0, 2, groups=groups, max_per_group=3)
+    assert np.array_equal(np.flatnonzero(kept),
+                          [0, 1, 2, 100, 101, 102, 200, 201, 202,
+                           300, 301, 302])
@@ -1,9 +1,12 @@
 import inspect
+import os
 import warnings
 import functools
 import sys
 import numpy as np
 import numbers
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from ..util import img_as_float
 from ._warnings import all_warnings, warn
@@ -415,3 +418,21 @@ def _validate_interpolation_order(image_dtype, order):
              FutureWarning, stacklevel=2)
 
     return order
+
+
+def _map_in_threads(func, items, num_workers):
+    """Yield ``func(item)`` for each item, in order, computed in threads.
+
+    Only a few results ahead of the one being consumed are computed, so that
+    they don't all have to be held in memory at once. If `num_workers` is
+    ``None``, ``os.cpu_count()`` threads are used.
+    """
+    n_ahead = num_workers if num_workers is not None else os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=n_ahead) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) > n_ahead:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,88 @@
+#cython: cdivision=True
+#cython: boundscheck=False
+#cython: nonecheck=False
+#cython: wraparound=False
+
+cimport numpy as cnp
+from .._shared.fused_numerics cimport np_anyint, np_floats
+cnp.import_array()
+
+
+def _integer_histogram(np_anyint[:, :] values, np_anyint low,
+                       np_anyint high, Py_ssize_t[:, ::1] counts):
+    """Count the occurrences of each integer value, for each channel.
+
+    Parameters
+    ----------
+    values : (n_pixels, n_channels) ndarray of integers
+        The pixels of a chunk of the image, with any strides.
+    low, high : int
+        The values counted in the first and last bins. The values outside
+        of ``[low, high]`` are ignored.
+    counts : (n_channels, high - low + 1) ndarray of intp
+        The counts of each channel, incremented in place.
+    """
+    cdef:
+        Py_ssize_t n_pixels = values.shape[0]
+        Py_ssize_t n_channels = values.shape[1]
+        Py_ssize_t i, c
+        np_anyint x
+
+    with nogil:
+        for i in range(n_pixels):
+            for c in range(n_channels):
+                x = values[i, c]
+                if x >= low and x <= high:
+                    counts[c, <Py_ssize_t>(x - low)] += 1
+
+
+def _uniform_histogram(np_floats[:, :] values, double first_edge,
+                       double last_edge, double norm,
+                       np_floats[::1] bin_edges,
+                       Py_ssize_t[:, ::1] counts):
+    """Count the values falling in each of uniform bins, for each channel.
+
+    The index of the bin of each value is computed from its distance to the
+    first edge, with the same arithmetic as `numpy.histogram` (in the type
+    of the values), and corrected with the edges at the boundaries of the
+    bins, so that the counts are the same.
+
+    Parameters
+    ----------
+    values : (n_pixels, n_channels) ndarray of floats
+        The pixels of a chunk of the image, with any strides.
+    first_edge, last_edge : float
+        The range of the histogram. The values outside of it, and NaN, are
+        ignored.
+    norm : float
+        The number of bins divided by the width of the range.
+    bin_edges : (n_bins + 1,) ndarray
+        The edges of the bins, of the same type as `values`.
+    counts : (n_channels, n_bins) ndarray of intp
+        The counts of each channel, incremented in place.
+    """
+    cdef:
+        Py_ssize_t n_pixels = values.shape[0]
+        Py_ssize_t n_channels = values.shape[1]
+        Py_ssize_t n_bins = bin_edges.shape[0] - 1
+        Py_ssize_t i, c, idx
+        np_floats x, f
+        np_floats first = <np_floats>first_edge
+        np_floats last = <np_floats>last_edge
+        np_floats scale = <np_floats>norm
+
+    with nogil:
+        for i in range(n_pixels):
+            for c in range(n_channels):
+                x = values[i, c]
+                if not (x >= first and x <= last):
+                    continue
+                f = (x - first) * scale
+                idx = <Py_ssize_t>f
+                if idx == n_bins:
+                    idx -= 1
+                if x < bin_edges[idx]:
+                    idx -= 1
+                elif idx != n_bins - 1 and x >= bin_edges[idx + 1]:
+                    idx += 1
+                counts[c, idx] += 1
@@ -1,8 +1,12 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
 from ..color.colorconv import rgb2gray, rgba2rgb
 from ..util.dtype import dtype_range, dtype_limits
-from .._shared.utils import warn
+from .._shared.utils import warn, _map_in_threads
+from ._histogram_cy import _integer_histogram, _uniform_histogram
 
 
 __all__ = ['histogram', 'cumulative_distribution', 'equalize_hist',
@@ -17,64 +21,144 @@ DTYPE_RANGE.update({'uint10': (0, 2 ** 10 - 1),
                     'bool': dtype_range[bool],
                     'float': dtype_range[np.float64]})
 
+# Number of values of the chunks of an image whose histograms are computed
+# in parallel
+_HISTOGRAM_CHUNK_SIZE = 2 ** 20
 
-def _offset_array(arr, low_boundary, high_boundary):
-    """Offset the array to get the lowest value at 0 if negative."""
-    if low_boundary < 0:
-        offset = low_boundary
-        dyn_range = high_boundary - low_boundary
-        # get smallest dtype that can hold both minimum and offset maximum
-        offset_dtype = np.promote_types(np.min_scalar_type(dyn_range),
-                                        np.min_scalar_type(low_boundary))
-        if arr.dtype != offset_dtype:
-            # prevent overflow errors when offsetting
-            arr = arr.astype(offset_dtype)
-        arr = arr - offset
-    else:
-        offset = 0
-    return arr, offset
 
+def _pixel_chunks(image, n_channels):
+    """Split the pixels of an image into chunks of about
+    ``_HISTOGRAM_CHUNK_SIZE`` values.
 
-def _bincount_histogram(image, source_range):
+    The chunks are views of the image, of ``n_channels`` values per pixel
+    along their last axis.
     """
-    Efficient histogram calculation for an image of integers.
+    if n_channels == 1 and image.flags.f_contiguous:
+        image = image.T
+    if image.ndim <= 1 or image.flags.c_contiguous:
+        image = image.reshape(-1, n_channels)
+    n_rows = image.shape[0]
+    row_size = image.size // n_rows if n_rows else 1
+    step = max(_HISTOGRAM_CHUNK_SIZE // max(row_size, 1), 1)
+    return [image[start:start + step] for start in range(0, n_rows, step)]
 
-    This function is significantly more efficient than np.histogram but
-    works only on images of integers. It is based on np.bincount.
 
-    Parameters
-    ----------
-    image : array
-        Input image.
-    source_range : string
-        'image' determines the range from the input image.
-        'dtype' determines the range from the expected range of the images
-        of that data type.
+def _chunks_range(chunks, num_workers):
+    """Return the minimum and maximum values of the chunks of an image."""
+    def chunk_range(chunk):
+        return chunk.min(), chunk.max()
 
-    Returns
-    -------
-    hist : array
-        The values of the histogram.
-    bin_centers : array
-        The values at the center of the bins.
+    minima, maxima = zip(*_map_in_threads(chunk_range, chunks, num_workers))
+    return np.min(minima), np.max(maxima)
+
+
+def _chunks_histogram(count_chunk, chunks, n_channels, n_bins, num_workers):
+    """Sum the histograms of the chunks of an image, computed in threads.
+
+    `count_chunk(chunk, counts)` increments the ``(n_channels, n_bins)``
+    counts of a thread with the values of a chunk. Each thread counts its
+    share of the chunks in a single array of counts. If `num_workers` is
+    ``None``, ``os.cpu_count()`` threads are used.
+    """
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = max(min(num_workers, len(chunks)), 1)
+
+    def thread_histogram(thread_chunks):
+        counts = np.zeros((n_channels, n_bins), dtype=np.intp)
+        for chunk in thread_chunks:
+            # Only the chunks of non-contiguous images are copied, one at a
+            # time
+            chunk = chunk.reshape(-1, n_channels)
+            if not chunk.flags.writeable:
+                # The memoryviews of the kernels need writeable buffers
+                chunk = chunk.copy()
+            count_chunk(chunk, counts)
+        return counts
+
+    with ThreadPoolExecutor(max_workers=num_workers) as ex:
+        thread_counts = ex.map(
+            thread_histogram,
+            [chunks[i::num_workers] for i in range(num_workers)])
+        hist = next(thread_counts)
+        for counts in thread_counts:
+            hist += counts
+    return hist
+
+
+def _integer_image_histogram(image, chunks, source_range, n_channels,
+                             num_workers):
+    """Histogram of an image of integers, with one bin for each value.
+
+    The values are counted directly, without offsetting (and copying) the
+    image.
     """
-    if source_range not in ['image', 'dtype']:
-        raise ValueError('Incorrect value for `source_range` argument: {}'.format(source_range))
     if source_range == 'image':
-        image_min = int(image.min().astype(np.int64))
-        image_max = int(image.max().astype(np.int64))
-    elif source_range == 'dtype':
+        image_min, image_max = _chunks_range(chunks, num_workers)
+        image_min, image_max = int(image_min), int(image_max)
+    else:
         image_min, image_max = dtype_limits(image, clip_negative=False)
-    image, offset = _offset_array(image, image_min, image_max)
-    hist = np.bincount(image.ravel(), minlength=image_max - image_min + 1)
+
+    def count_chunk(chunk, counts):
+        _integer_histogram(chunk, image_min, image_max, counts)
+
+    hist = _chunks_histogram(count_chunk, chunks, n_channels,
+                             image_max - image_min + 1, num_workers)
     bin_centers = np.arange(image_min, image_max + 1)
-    if source_range == 'image':
-        idx = max(image_min, 0)
-        hist = hist[idx:]
     return hist, bin_centers
 
 
-def histogram(image, nbins=256, source_range='image', normalize=False):
+def _float_image_histogram(image, chunks, nbins, source_range, n_channels,
+                           num_workers):
+    """Histogram of an image of floats, with `nbins` uniform bins.
+
+    The counts are the same as the ones of `numpy.histogram`.
+    """
+    uniform_kernel = image.dtype in (np.float32, np.float64)
+    if source_range == 'dtype':
+        hist_range = dtype_limits(image, clip_negative=False)
+    elif image.size == 0:
+        hist_range = (0, 1)
+    elif uniform_kernel or n_channels > 1:
+        hist_range = _chunks_range(chunks, num_workers)
+    else:
+        hist_range = None
+
+    if not uniform_kernel:
+        # Other types, like float16, are left to numpy
+        channels = ([image] if n_channels == 1
+                    else [image[..., c] for c in range(n_channels)])
+        results = [np.histogram(channel, bins=nbins, range=hist_range)
+                   for channel in channels]
+        hist = np.stack([channel_hist for channel_hist, _ in results])
+        bin_edges = results[0][1]
+        return hist, (bin_edges[:-1] + bin_edges[1:]) / 2.
+
+    # The bin edges are validated and computed by numpy, and the bins of the
+    # values with the same arithmetic as its uniform bins
+    bin_edges = np.histogram_bin_edges(np.empty(0, dtype=image.dtype),
+                                       bins=nbins,
+                                       range=hist_range)
+    first_edge, last_edge = hist_range
+    if first_edge == last_edge:
+        first_edge = first_edge - 0.5
+        last_edge = last_edge + 0.5
+    width = np.subtract(last_edge, first_edge,
+                        dtype=np.result_type(last_edge, first_edge))
+    norm = nbins / width
+
+    def count_chunk(chunk, counts):
+        _uniform_histogram(chunk, first_edge, last_edge, norm, bin_edges,
+                           counts)
+
+    hist = _chunks_histogram(count_chunk, chunks, n_channels, nbins,
+                             num_workers)
+    bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2.
+    return hist, bin_centers
+
+
+def histogram(image, nbins=256, source_range='image', normalize=False, *,
+              multichannel=False, num_workers=None):
     """Return histogram of image.
 
     Unlike `numpy.histogram`, this function returns the centers of bins and
@@ -82,8 +166,7 @@ def histogram(image, nbins=256, source_range='image', normalize=False):
     its own bin, which improves speed and intensity-resolution.
 
     The histogram is computed on the flattened image: for color images, the
-    function should be used separately on each channel to obtain a histogram
-    for each color channel.
+    histogram of each color channel is obtained with ``multichannel=True``.
 
     Parameters
     ----------
@@ -98,11 +181,19 @@ def histogram(image, nbins=256, source_range='image', normalize=False):
         of that data type.
     normalize : bool, optional
         If True, normalize the histogram by the sum of its values.
+    multichannel : bool, optional
+        Whether the last axis of the image is to be interpreted as multiple
+        channels, with a histogram for each channel. The bins are the same
+        for all the channels.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``,
+        ``os.cpu_count()`` threads are used.
 
     Returns
     -------
     hist : array
-        The values of the histogram.
+        The values of the histogram. With ``multichannel=True``, the array
+        has the shape ``(n_channels, n_bins)``.
     bin_centers : array
         The values at the center of the bins.
 
@@ -110,6 +201,12 @@ def histogram(image, nbins=256, source_range='image', normalize=False):
     --------
     cumulative_distribution
 
+    Notes
+    -----
+    The image is split into chunks, whose histograms are computed in
+    parallel and summed. The counts are the same as the ones of
+    `numpy.histogram`.
+
     Examples
     --------
     >>> from skimage import data, exposure, img_as_float
@@ -118,33 +215,40 @@ def histogram(image, nbins=256, source_range='image', normalize=False):
     (array([ 93585, 168559]), array([0. , 0.5, 1. ]))
     >>> exposure.histogram(image, nbins=2)
     (array([ 93585, 168559]), array([0.25, 0.75]))
+    >>> hist, bin_centers = exposure.histogram(data.astronaut(),
+    ...                                        multichannel=True)
+    >>> hist.shape
+    (3, 256)
     """
     sh = image.shape
-    if len(sh) == 3 and sh[-1] < 4:
+    if len(sh) == 3 and sh[-1] < 4 and not multichannel:
         warn("This might be a color image. The histogram will be "
              "computed on the flattened image. You can instead "
-             "apply this function to each color channel.")
+             "apply this function to each color channel, or set "
+             "multichannel=True.")
+    if source_range not in ['image', 'dtype']:
+        raise ValueError('Incorrect value for `source_range` argument: '
+                         '{}'.format(source_range))
 
-    image = image.flatten()
-    # For integer types, histogramming with bincount is more efficient.
+    image = np.asarray(image)
+    n_channels = image.shape[-1] if multichannel else 1
+    chunks = _pixel_chunks(image, n_channels)
+    # For integer types, each value is counted in its own bin.
     if np.issubdtype(image.dtype, np.integer):
-        hist, bin_centers = _bincount_histogram(image, source_range)
+        hist, bin_centers = _integer_image_histogram(
+            image, chunks, source_range, n_channels, num_workers)
     else:
-        if source_range == 'image':
-            hist_range = None
-        elif source_range == 'dtype':
-            hist_range = dtype_limits(image, clip_negative=False)
-        else:
-            ValueError('Wrong value for the `source_range` argument')
-        hist, bin_edges = np.histogram(image, bins=nbins, range=hist_range)
-        bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2.
+        hist, bin_centers = _float_image_histogram(
+            image, chunks, nbins, source_range, n_channels, num_workers)
 
     if normalize:
-        hist = hist / np.sum(hist)
+        hist = hist / np.sum(hist, axis=-1, keepdims=True)
+    if not multichannel:
+        hist = hist[0]
     return hist, bin_centers
 
 
-def cumulative_distribution(image, nbins=256):
+def cumulative_distribution(image, nbins=256, *, num_workers=None):
     """Return cumulative distribution function (cdf) for the given image.
 
     Parameters
@@ -153,6 +257,9 @@ def cumulative_distribution(image, nbins=256):
         Image array.
     nbins : int, optional
         Number of bins for image histogram.
+    num_workers : int, optional
+        The number of parallel threads to use to compute the histogram. If set
+        to ``None``, ``os.cpu_count()`` threads are used.
 
     Returns
     -------
@@ -178,7 +285,7 @@ def cumulative_distribution(image, nbins=256):
     >>> np.alltrue(cdf[0] == np.cumsum(hi[0])/float(image.size))
     True
     """
-    hist, bin_centers = histogram(image, nbins)
+    hist, bin_centers = histogram(image, nbins, num_workers=num_workers)
     img_cdf = hist.cumsum()
     img_cdf = img_cdf / float(img_cdf[-1])
     return img_cdf, bin_centers
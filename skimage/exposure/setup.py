@@ -1,15 +1,21 @@
 #!/usr/bin/env python
 
 import os
+from skimage._build import cython
 
 base_path = os.path.abspath(os.path.dirname(__file__))
 
 
 def configuration(parent_package='', top_path=None):
-    from numpy.distutils.misc_util import Configuration
+    from numpy.distutils.misc_util import Configuration, get_numpy_include_dirs
 
     config = Configuration('exposure', parent_package, top_path)
 
+    cython(['_histogram_cy.pyx'], working_path=base_path)
+
+    config.add_extension('_histogram_cy', sources=['_histogram_cy.c'],
+                         include_dirs=[get_numpy_include_dirs(), '../_shared'])
+
     return config
 
 
@@ -116,6 +116,69 @@ def test_normalize():
     assert_equal(frequencies, expected)
 
 
+@pytest.mark.parametrize('dtype', [np.int16, np.float32, np.float64])
+@pytest.mark.parametrize('source_range', ['image', 'dtype'])
+def test_histogram_chunks(monkeypatch, dtype, source_range):
+    rng = np.random.RandomState(0)
+    image = (rng.random_sample((40, 30)) * 200 - 100).astype(dtype)
+    image = image[::2, 1::3]
+    expected = exposure.histogram(image, 20, source_range)
+    monkeypatch.setattr(exposure.exposure, '_HISTOGRAM_CHUNK_SIZE', 7)
+    read_only = np.ascontiguousarray(image)
+    read_only.setflags(write=False)
+    hist, bin_centers = exposure.histogram(read_only, 20, source_range)
+    assert_array_equal(hist, expected[0])
+    for num_workers in [1, 3]:
+        hist, bin_centers = exposure.histogram(image, 20, source_range,
+                                               num_workers=num_workers)
+        assert_array_equal(hist, expected[0])
+        assert_array_equal(bin_centers, expected[1])
+
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_histogram_float_bins(dtype):
+    rng = np.random.RandomState(0)
+    # Values on the edges of the bins, and outside of the dtype range
+    image = np.concatenate([rng.randint(-20, 20, 500) / 10,
+                            np.linspace(-1, 1, 301),
+                            [np.nan, np.inf, -np.inf]]).astype(dtype)
+    for nbins in [1, 7, 20, 256]:
+        hist, bin_centers = exposure.histogram(image, nbins,
+                                               source_range='dtype')
+        expected, bin_edges = np.histogram(image, nbins, range=(-1, 1))
+        assert_array_equal(hist, expected)
+        assert_array_equal(bin_centers, (bin_edges[:-1] + bin_edges[1:]) / 2)
+        image = image[np.isfinite(image)]
+        hist, bin_centers = exposure.histogram(image, nbins)
+        expected, bin_edges = np.histogram(image, nbins)
+        assert_array_equal(hist, expected)
+        assert_array_equal(bin_centers, (bin_edges[:-1] + bin_edges[1:]) / 2)
+
+
+@pytest.mark.parametrize('dtype', [np.uint8, np.int8, np.float64])
+def test_histogram_multichannel(dtype):
+    image = util.img_as_ubyte(data.astronaut()).astype(dtype)
+    image[..., 1] = image[..., 1] // 2
+    hist, bin_centers = exposure.histogram(image, nbins=10,
+                                           multichannel=True,
+                                           normalize=True)
+    assert_equal(hist.shape, (3, len(bin_centers)))
+    # The bins are shared by the channels, one per value for integers
+    hist_range = (image.min(), image.max())
+    if np.issubdtype(dtype, np.integer):
+        hist_range = (image.min(), image.max() + 1)
+    for c in range(3):
+        expected, _ = np.histogram(image[..., c], bins=len(bin_centers),
+                                   range=hist_range)
+        assert_almost_equal(hist[c], expected / expected.sum())
+
+    with expected_warnings(['color image']):
+        flat_hist, _ = exposure.histogram(image, nbins=10)
+    with expected_warnings([]):
+        hist, _ = exposure.histogram(image, nbins=10, multichannel=True)
+    assert_array_equal(hist.sum(axis=0), flat_hist)
+
+
 # Test histogram equalization
 # ===========================
 
@@ -3,9 +3,10 @@ from .._shared.utils import deprecated
 from ._canny import canny
 from ._cascade import Cascade
 from ._daisy import daisy
-from ._hog import hog
-from .texture import (greycomatrix, greycoprops,
+from ._hog import hog, hog_dense
+from .texture import (greycomatrix, greycoprops, local_greycoprops,
                       local_binary_pattern,
+                      local_binary_pattern_histograms,
                       multiblock_lbp,
                       draw_multiblock_lbp)
 
@@ -25,7 +26,8 @@ from .orb import ORB
 from .match import match_descriptors
 from .util import plot_matches
 from .blob import blob_dog, blob_log, blob_doh
-from .haar import (haar_like_feature, haar_like_feature_coord,
+from .haar import (haar_like_feature, haar_like_feature_batch,
+                   haar_like_feature_coord,
                    draw_haar_like_feature)
 from ._basic_features import multiscale_basic_features
 
@@ -55,9 +57,12 @@ __all__ = ['canny',
            'Cascade',
            'daisy',
            'hog',
+           'hog_dense',
            'greycomatrix',
            'greycoprops',
+           'local_greycoprops',
            'local_binary_pattern',
+           'local_binary_pattern_histograms',
            'multiblock_lbp',
            'draw_multiblock_lbp',
            'peak_local_max',
@@ -89,6 +94,7 @@ __all__ = ['canny',
            'blob_doh',
            'blob_log',
            'haar_like_feature',
+           'haar_like_feature_batch',
            'haar_like_feature_coord',
            'draw_haar_like_feature',
            'multiscale_basic_features',
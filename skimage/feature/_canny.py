@@ -12,12 +12,32 @@ All rights reserved.
 Original author: Lee Kamentsky
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import scipy.ndimage as ndi
-from scipy.ndimage import generate_binary_structure, binary_erosion, label
+from scipy.ndimage import generate_binary_structure, binary_erosion
 from ..filters import gaussian
 from .. import dtype_limits, img_as_float
 from .._shared.utils import check_nD
+from ._canny_cy import _nonmaximum_suppression, _hysteresis
+
+
+# Number of rows of the image that canny processes at a time in each thread
+_CANNY_ROWS = 64
+
+
+def _float_dtype(dtype):
+    """Return the floating point dtype of the computations of canny."""
+    return np.float32 if dtype == np.float32 else np.float64
+
+
+def _map_bands(func, bands, num_workers):
+    """Apply a function to bands of rows, in parallel threads."""
+    with ThreadPoolExecutor(max_workers=num_workers) as ex:
+        # Iterate over the results, to raise the exceptions of the threads
+        for _ in ex.map(func, bands):
+            pass
 
 
 def smooth_with_function_and_mask(image, function, mask):
@@ -42,7 +62,7 @@ def smooth_with_function_and_mask(image, function, mask):
     on the mask to recover the effect of smoothing from just the significant
     pixels.
     """
-    bleed_over = function(mask.astype(float))
+    bleed_over = function(mask.astype(_float_dtype(image.dtype)))
     masked_image = np.zeros(image.shape, image.dtype)
     masked_image[mask] = image[mask]
     smoothed_image = function(masked_image)
@@ -51,13 +71,14 @@ def smooth_with_function_and_mask(image, function, mask):
 
 
 def canny(image, sigma=1., low_threshold=None, high_threshold=None, mask=None,
-          use_quantiles=False):
+          use_quantiles=False, *, num_workers=None):
     """Edge filter an image using the Canny algorithm.
 
     Parameters
     -----------
     image : 2D array
         Grayscale input image to detect edges on; can be of any dtype.
+        Images of dtype float32 are processed in single precision.
     sigma : float, optional
         Standard deviation of the Gaussian filter.
     low_threshold : float, optional
@@ -72,6 +93,9 @@ def canny(image, sigma=1., low_threshold=None, high_threshold=None, mask=None,
         If True then treat low_threshold and high_threshold as quantiles of the
         edge magnitude image, rather than absolute edge magnitude values. If True
         then the thresholds must be in the range [0, 1].
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
@@ -179,119 +203,71 @@ def canny(image, sigma=1., low_threshold=None, high_threshold=None, mask=None,
     def fsmooth(x):
         return img_as_float(gaussian(x, sigma, mode='constant'))
 
-    smoothed = smooth_with_function_and_mask(image, fsmooth, mask)
-    jsobel = ndi.sobel(smoothed, axis=1)
-    isobel = ndi.sobel(smoothed, axis=0)
-    abs_isobel = np.abs(isobel)
-    abs_jsobel = np.abs(jsobel)
-    magnitude = np.hypot(isobel, jsobel)
-
-    #
-    # Make the eroded mask. Setting the border value to zero will wipe
-    # out the image edges for us.
-    #
-    s = generate_binary_structure(2, 2)
-    eroded_mask = binary_erosion(mask, s, border_value=0)
-    eroded_mask = eroded_mask & (magnitude > 0)
     #
-    #--------- Find local maxima --------------
+    # The image is processed by bands of rows, in parallel threads. Each
+    # band is extended by the radius of the Gaussian kernel, the Sobel
+    # operator, and the neighbors of the local maxima, so that its rows get
+    # exactly the same values as when the whole image is processed at once.
     #
-    # Assign each point to have a normal of 0-45 degrees, 45-90 degrees,
-    # 90-135 degrees and 135-180 degrees.
-    #
-    local_maxima = np.zeros(image.shape, bool)
-    #----- 0 to 45 degrees ------
-    pts_plus = (isobel >= 0) & (jsobel >= 0) & (abs_isobel >= abs_jsobel)
-    pts_minus = (isobel <= 0) & (jsobel <= 0) & (abs_isobel >= abs_jsobel)
-    pts = pts_plus | pts_minus
-    pts = eroded_mask & pts
-    # Get the magnitudes shifted left to make a matrix of the points to the
-    # right of pts. Similarly, shift left and down to get the points to the
-    # top right of pts.
-    c1 = magnitude[1:, :][pts[:-1, :]]
-    c2 = magnitude[1:, 1:][pts[:-1, :-1]]
-    m = magnitude[pts]
-    w = abs_jsobel[pts] / abs_isobel[pts]
-    c_plus = c2 * w + c1 * (1 - w) <= m
-    c1 = magnitude[:-1, :][pts[1:, :]]
-    c2 = magnitude[:-1, :-1][pts[1:, 1:]]
-    c_minus = c2 * w + c1 * (1 - w) <= m
-    local_maxima[pts] = c_plus & c_minus
-    #----- 45 to 90 degrees ------
-    # Mix diagonal and vertical
-    #
-    pts_plus = (isobel >= 0) & (jsobel >= 0) & (abs_isobel <= abs_jsobel)
-    pts_minus = (isobel <= 0) & (jsobel <= 0) & (abs_isobel <= abs_jsobel)
-    pts = pts_plus | pts_minus
-    pts = eroded_mask & pts
-    c1 = magnitude[:, 1:][pts[:, :-1]]
-    c2 = magnitude[1:, 1:][pts[:-1, :-1]]
-    m = magnitude[pts]
-    w = abs_isobel[pts] / abs_jsobel[pts]
-    c_plus = c2 * w + c1 * (1 - w) <= m
-    c1 = magnitude[:, :-1][pts[:, 1:]]
-    c2 = magnitude[:-1, :-1][pts[1:, 1:]]
-    c_minus = c2 * w + c1 * (1 - w) <= m
-    local_maxima[pts] = c_plus & c_minus
-    #----- 90 to 135 degrees ------
-    # Mix anti-diagonal and vertical
-    #
-    pts_plus = (isobel <= 0) & (jsobel >= 0) & (abs_isobel <= abs_jsobel)
-    pts_minus = (isobel >= 0) & (jsobel <= 0) & (abs_isobel <= abs_jsobel)
-    pts = pts_plus | pts_minus
-    pts = eroded_mask & pts
-    c1a = magnitude[:, 1:][pts[:, :-1]]
-    c2a = magnitude[:-1, 1:][pts[1:, :-1]]
-    m = magnitude[pts]
-    w = abs_isobel[pts] / abs_jsobel[pts]
-    c_plus = c2a * w + c1a * (1.0 - w) <= m
-    c1 = magnitude[:, :-1][pts[:, 1:]]
-    c2 = magnitude[1:, :-1][pts[:-1, 1:]]
-    c_minus = c2 * w + c1 * (1.0 - w) <= m
-    local_maxima[pts] = c_plus & c_minus
-    #----- 135 to 180 degrees ------
-    # Mix anti-diagonal and anti-horizontal
-    #
-    pts_plus = (isobel <= 0) & (jsobel >= 0) & (abs_isobel >= abs_jsobel)
-    pts_minus = (isobel >= 0) & (jsobel <= 0) & (abs_isobel >= abs_jsobel)
-    pts = pts_plus | pts_minus
-    pts = eroded_mask & pts
-    c1 = magnitude[:-1, :][pts[1:, :]]
-    c2 = magnitude[:-1, 1:][pts[1:, :-1]]
-    m = magnitude[pts]
-    w = abs_jsobel[pts] / abs_isobel[pts]
-    c_plus = c2 * w + c1 * (1 - w) <= m
-    c1 = magnitude[1:, :][pts[:-1, :]]
-    c2 = magnitude[1:, :-1][pts[:-1, 1:]]
-    c_minus = c2 * w + c1 * (1 - w) <= m
-    local_maxima[pts] = c_plus & c_minus
+    n_rows = image.shape[0]
+    halo = int(4 * sigma + 0.5) + 2
+    bands = [(start, min(start + _CANNY_ROWS, n_rows))
+             for start in range(0, n_rows, _CANNY_ROWS)]
+
+    def gradients(band):
+        start, stop = band
+        band_start = max(start - halo, 0)
+        band_stop = min(stop + halo, n_rows)
+        smoothed = smooth_with_function_and_mask(image[band_start:band_stop],
+                                                 fsmooth,
+                                                 mask[band_start:band_stop])
+        jsobel = ndi.sobel(smoothed, axis=1)
+        isobel = ndi.sobel(smoothed, axis=0)
+        magnitude = np.hypot(isobel, jsobel)
+        return band_start, band_stop, isobel, jsobel, magnitude
 
     #
     #---- If use_quantiles is set then calculate the thresholds to use
     #
     if use_quantiles:
+        magnitude = np.empty(image.shape,
+                             dtype=_float_dtype(image.dtype))
+
+        def store_magnitude(band):
+            start, stop = band
+            band_start, _, _, _, band_magnitude = gradients(band)
+            magnitude[start:stop] = band_magnitude[start - band_start:
+                                                   stop - band_start]
+
+        _map_bands(store_magnitude, bands, num_workers)
         high_threshold = np.percentile(magnitude, 100.0 * high_threshold)
         low_threshold = np.percentile(magnitude, 100.0 * low_threshold)
+        del magnitude
 
     #
-    #---- Create two masks at the two thresholds.
+    # Make the eroded mask. Setting the border value to zero will wipe
+    # out the image edges for us. Then find the local maxima, above the low
+    # and high thresholds.
     #
-    high_mask = local_maxima & (magnitude >= high_threshold)
-    low_mask = local_maxima & (magnitude >= low_threshold)
+    s = generate_binary_structure(2, 2)
+    edges = np.empty(image.shape, dtype=np.uint8)
+
+    def find_local_maxima(band):
+        start, stop = band
+        band_start, band_stop, isobel, jsobel, magnitude = gradients(band)
+        eroded_mask = binary_erosion(mask[band_start:band_stop], s,
+                                     border_value=0)
+        _nonmaximum_suppression(isobel, jsobel, magnitude,
+                                eroded_mask.view(np.uint8),
+                                start - band_start, stop - band_start,
+                                low_threshold, high_threshold,
+                                edges[start:stop])
+
+    _map_bands(find_local_maxima, bands, num_workers)
 
     #
-    # Segment the low-mask, then only keep low-segments that have
-    # some high_mask component in them
+    # Link the local maxima above the low threshold, then only keep the
+    # linked sets that have a local maximum above the high threshold
     #
-    strel = np.ones((3, 3), bool)
-    labels, count = label(low_mask, strel)
-    if count == 0:
-        return low_mask
-
-    sums = (np.array(ndi.sum(high_mask, labels,
-                             np.arange(count, dtype=np.int32) + 1),
-                     copy=False, ndmin=1))
-    good_label = np.zeros((count + 1,), bool)
-    good_label[1:] = sums > 0
-    output_mask = good_label[labels]
-    return output_mask
+    _hysteresis(edges)
+    return edges.view(bool)
@@ -0,0 +1,196 @@
+#cython: cdivision=True
+#cython: boundscheck=False
+#cython: nonecheck=False
+#cython: wraparound=False
+# distutils: language = c++
+
+from libcpp.vector cimport vector
+
+cimport numpy as cnp
+from .._shared.fused_numerics cimport np_floats
+cnp.import_array()
+
+
+def _nonmaximum_suppression(np_floats[:, ::1] isobel,
+                            np_floats[:, ::1] jsobel,
+                            np_floats[:, ::1] magnitude,
+                            cnp.uint8_t[:, ::1] eroded_mask,
+                            Py_ssize_t row_start, Py_ssize_t row_stop,
+                            double low_threshold, double high_threshold,
+                            cnp.uint8_t[:, ::1] out):
+    """Find the edge pixels that are local maxima of the gradient magnitude.
+
+    The normal to the edge at each pixel is sorted into one of four
+    sectors, by the signs and the relative magnitudes of the Sobel
+    gradients, and the magnitude is interpolated at the neighbors along the
+    normal, on both sides. The computations are the same as the vectorized
+    ones of `canny` they replace, including at the boundaries of the
+    sectors, where the last matching sector is used.
+
+    Parameters
+    ----------
+    isobel, jsobel : (M, N) ndarray
+        The Sobel gradients along the rows and the columns of a band of the
+        image.
+    magnitude : (M, N) ndarray
+        The magnitude of the gradient, ``np.hypot(isobel, jsobel)``.
+    eroded_mask : (M, N) ndarray of uint8
+        The pixels that may be edges.
+    row_start, row_stop : int
+        The rows of the band to process. `eroded_mask` must be zero on the
+        first and last rows and columns of the band.
+    low_threshold, high_threshold : float
+        The thresholds of the hysteresis.
+    out : (row_stop - row_start, N) ndarray of uint8
+        Output: 0 for the pixels that are not local maxima or below the low
+        threshold, 2 for the pixels above the high threshold, and 1 for the
+        other local maxima.
+    """
+    cdef:
+        Py_ssize_t n_cols = magnitude.shape[1]
+        Py_ssize_t r, c
+        np_floats i, j, abs_i, abs_j, m, w, c_plus, c_minus
+        np_floats low = <np_floats>low_threshold
+        np_floats high = <np_floats>high_threshold
+        bint same_signs, opposite_signs
+        int sector
+
+    with nogil:
+        for r in range(row_start, row_stop):
+            for c in range(n_cols):
+                out[r - row_start, c] = 0
+                m = magnitude[r, c]
+                if not eroded_mask[r, c] or not m > 0:
+                    continue
+                i = isobel[r, c]
+                j = jsobel[r, c]
+                abs_i = i if i >= 0 else -i
+                abs_j = j if j >= 0 else -j
+                same_signs = (i >= 0 and j >= 0) or (i <= 0 and j <= 0)
+                opposite_signs = (i <= 0 and j >= 0) or (i >= 0 and j <= 0)
+                if opposite_signs and abs_i >= abs_j:
+                    sector = 4
+                elif opposite_signs and abs_i <= abs_j:
+                    sector = 3
+                elif same_signs and abs_i <= abs_j:
+                    sector = 2
+                elif same_signs and abs_i >= abs_j:
+                    sector = 1
+                else:
+                    continue
+
+                if sector == 1:
+                    # 0 to 45 degrees
+                    w = abs_j / abs_i
+                    c_plus = (magnitude[r + 1, c + 1] * w
+                              + magnitude[r + 1, c] * (1 - w))
+                    c_minus = (magnitude[r - 1, c - 1] * w
+                               + magnitude[r - 1, c] * (1 - w))
+                elif sector == 2:
+                    # 45 to 90 degrees
+                    w = abs_i / abs_j
+                    c_plus = (magnitude[r + 1, c + 1] * w
+                              + magnitude[r, c + 1] * (1 - w))
+                    c_minus = (magnitude[r - 1, c - 1] * w
+                               + magnitude[r, c - 1] * (1 - w))
+                elif sector == 3:
+                    # 90 to 135 degrees
+                    w = abs_i / abs_j
+                    c_plus = (magnitude[r - 1, c + 1] * w
+                              + magnitude[r, c + 1] * (1 - w))
+                    c_minus = (magnitude[r + 1, c - 1] * w
+                               + magnitude[r, c - 1] * (1 - w))
+                else:
+                    # 135 to 180 degrees
+                    w = abs_j / abs_i
+                    c_plus = (magnitude[r - 1, c + 1] * w
+                              + magnitude[r - 1, c] * (1 - w))
+                    c_minus = (magnitude[r + 1, c - 1] * w
+                               + magnitude[r + 1, c] * (1 - w))
+
+                if c_plus <= m and c_minus <= m:
+                    if m >= high:
+                        out[r - row_start, c] = 2
+                    elif m >= low:
+                        out[r - row_start, c] = 1
+
+
+cdef inline Py_ssize_t _find_root(vector[Py_ssize_t]& parent,
+                                  Py_ssize_t i) nogil:
+    """Find the root of a tree of runs, halving the path to it."""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _hysteresis(cnp.uint8_t[:, ::1] edges):
+    """Keep the connected sets of edge pixels with a pixel above the high
+    threshold.
+
+    The horizontal runs of edge pixels of each row are linked to the
+    8-connected runs of the previous row with a union-find structure, so
+    that the memory used is proportional to the number of runs.
+
+    Parameters
+    ----------
+    edges : (M, N) ndarray of uint8
+        0 for the pixels that are not edges, 1 for the edge pixels between
+        the low and high thresholds and 2 for the edge pixels above the high
+        threshold. It is modified in place to 1 for the edge pixels that are
+        kept, and 0 elsewhere.
+    """
+    cdef:
+        Py_ssize_t n_rows = edges.shape[0]
+        Py_ssize_t n_cols = edges.shape[1]
+        Py_ssize_t r, c, k, p, start, root, other, other_root
+        Py_ssize_t previous_first = 0, previous_stop = 0
+        cnp.uint8_t strong, keep
+        vector[Py_ssize_t] run_start, run_stop, parent
+        vector[cnp.uint8_t] is_strong
+        vector[Py_ssize_t] row_first
+
+    with nogil:
+        for r in range(n_rows):
+            row_first.push_back(run_start.size())
+            p = previous_first
+            c = 0
+            while c < n_cols:
+                if edges[r, c] == 0:
+                    c += 1
+                    continue
+                start = c
+                strong = 0
+                while c < n_cols and edges[r, c] != 0:
+                    if edges[r, c] == 2:
+                        strong = 1
+                    c += 1
+                k = run_start.size()
+                run_start.push_back(start)
+                run_stop.push_back(c)
+                parent.push_back(k)
+                is_strong.push_back(strong)
+
+                # Link the run to the runs of the previous row that touch it,
+                # diagonally included
+                while p < previous_stop and run_stop[p] < start:
+                    p += 1
+                other = p
+                while other < previous_stop and run_start[other] <= c:
+                    root = _find_root(parent, k)
+                    other_root = _find_root(parent, other)
+                    if other_root < root:
+                        root, other_root = other_root, root
+                    if root != other_root:
+                        parent[other_root] = root
+                        is_strong[root] |= is_strong[other_root]
+                    other += 1
+            previous_first = row_first[r]
+            previous_stop = run_start.size()
+        row_first.push_back(run_start.size())
+
+        for r in range(n_rows):
+            for k in range(row_first[r], row_first[r + 1]):
+                keep = is_strong[_find_root(parent, k)]
+                for c in range(run_start[k], run_stop[k]):
+                    edges[r, c] = keep
@@ -7,8 +7,6 @@
 
 import numpy as np
 cimport numpy as cnp
-cimport safe_openmp as openmp
-from safe_openmp cimport have_openmp
 from libc.stdlib cimport malloc, free
 from libcpp.vector cimport vector
 from skimage._shared.transform cimport integrate
@@ -19,11 +17,13 @@ from cython.parallel import prange
 from ..color import rgb2gray
 from ..transform import integral_image
 import xml.etree.ElementTree as ET
-from ._texture cimport _multiblock_lbp
 import math
 
 cnp.import_array()
 
+# Number of rows of windows of a scale that a thread searches at a time
+_CASCADE_ROWS = 4
+
 # Struct for storing a single detection.
 cdef struct Detection:
 
@@ -48,6 +48,16 @@ cdef struct DetectionsCluster:
     int count
 
 
+# Struct for storing a box of cells of the grid that is used to find the
+# clusters that intersect a detection. The stops are excluded.
+cdef struct Cells:
+
+    Py_ssize_t r_start
+    Py_ssize_t r_stop
+    Py_ssize_t c_start
+    Py_ssize_t c_stop
+
+
 # Struct for storing multi-block binary pattern position.
 # Defines the parameters of multi-block binary pattern feature.
 # Read more in skimage.feature.texture.multiblock_lbp.
@@ -103,6 +113,14 @@ cdef vector[Detection] _group_detections(vector[Detection] detections,
     and height parameters of each rectangle in a cluster are used to compute
     values of average rectangle that will represent cluster.
 
+    Each detection joins the cluster whose mean rectangle has the highest
+    intersection score with it, if that score is above the threshold. To
+    avoid scoring every cluster, each cluster is registered in the cells of
+    a regular grid that its mean rectangles intersect, and only the clusters
+    of the cells of a detection are scored. The grid cells
+    have the size of the smallest detection. With a negative threshold,
+    non-intersecting clusters can also be merged, and a single cell is used.
+
     Parameters
     ----------
     detections : vector[Detection]
@@ -122,60 +140,148 @@ cdef vector[Detection] _group_detections(vector[Detection] detections,
     """
 
     cdef:
+        Detection detection
         Detection mean_detection
         vector[DetectionsCluster] clusters
-        vector[int] clusters_scores
-        Py_ssize_t nr_of_clusters
+        vector[vector[Py_ssize_t]] grid
+        vector[Cells] cluster_cells
+        vector[Py_ssize_t] last_visits
+        Cells cells
+        Cells old_cells
         Py_ssize_t current_detection_nr
         Py_ssize_t current_cluster_nr
         Py_ssize_t nr_of_detections = detections.size()
         Py_ssize_t best_cluster_nr
+        Py_ssize_t cell_size = 1
+        Py_ssize_t grid_rows = 1
+        Py_ssize_t grid_cols = 1
+        Py_ssize_t cell_r, cell_c, cell_nr, i
         bint new_cluster
         cnp.float32_t best_score
         cnp.float32_t intersection_score
 
-    # Check if detections array is not empty.
-    # Push first detection as first cluster.
-    if nr_of_detections:
-        clusters.push_back(cluster_from_detection(detections[0]))
-
-    for current_detection_nr in range(1, nr_of_detections):
-
+    if not nr_of_detections:
+        return get_mean_detections(clusters)
+
+    # Size the grid cells and the grid from the extent of the detections
+    cell_size = min(detections[0].height, detections[0].width)
+    for current_detection_nr in range(nr_of_detections):
+        detection = detections[current_detection_nr]
+        cell_size = min(cell_size, detection.height, detection.width)
+        grid_rows = max(grid_rows, detection.r + detection.height)
+        grid_cols = max(grid_cols, detection.c + detection.width)
+    if intersection_score_threshold < 0:
+        cell_size = max(grid_rows, grid_cols)
+    cell_size = max(cell_size, 1)
+    grid_rows = (grid_rows - 1) // cell_size + 1
+    grid_cols = (grid_cols - 1) // cell_size + 1
+    grid.resize(grid_rows * grid_cols)
+
+    for current_detection_nr in range(nr_of_detections):
+
+        detection = detections[current_detection_nr]
         best_score = intersection_score_threshold
         best_cluster_nr = 0
         new_cluster = True
 
-        nr_of_clusters = clusters.size()
+        # Score the clusters registered in the cells of the detection.
+        # Ties go to the oldest cluster.
+        cells = cells_from_detection(detection, cell_size)
+        for cell_r in range(cells.r_start, cells.r_stop):
+            for cell_c in range(cells.c_start, cells.c_stop):
 
-        for current_cluster_nr in range(nr_of_clusters):
+                cell_nr = cell_r * grid_cols + cell_c
 
-            mean_detection = mean_detection_from_cluster(
-                                    clusters[current_cluster_nr])
+                for i in range(grid[cell_nr].size()):
 
-            intersection_score = rect_intersection_score(
-                                        detections[current_detection_nr],
-                                        mean_detection)
+                    current_cluster_nr = grid[cell_nr][i]
 
-            if intersection_score > best_score:
+                    # Clusters are registered in several cells
+                    if last_visits[current_cluster_nr] == current_detection_nr:
+                        continue
+                    last_visits[current_cluster_nr] = current_detection_nr
 
-                new_cluster = False
-                best_cluster_nr = current_cluster_nr
-                best_score = intersection_score
+                    mean_detection = mean_detection_from_cluster(
+                                            clusters[current_cluster_nr])
+
+                    intersection_score = rect_intersection_score(
+                                                detection, mean_detection)
+
+                    if (intersection_score > best_score
+                            or (not new_cluster
+                                and intersection_score == best_score
+                                and current_cluster_nr < best_cluster_nr)):
+
+                        new_cluster = False
+                        best_cluster_nr = current_cluster_nr
+                        best_score = intersection_score
 
         if new_cluster:
 
-            clusters.push_back(cluster_from_detection(
-                                    detections[current_detection_nr]))
+            best_cluster_nr = clusters.size()
+            clusters.push_back(cluster_from_detection(detection))
+            last_visits.push_back(current_detection_nr)
         else:
 
             clusters[best_cluster_nr] = update_cluster(
                                             clusters[best_cluster_nr],
-                                            detections[current_detection_nr])
+                                            detection)
+
+        # Register the cluster in the cells of its (new) mean rectangle.
+        # A cluster stays registered in the cells of its previous means,
+        # which only costs a few extra scores: it is registered once in each
+        # cell of a box of cells, which grows to cover its mean rectangles.
+        mean_detection = mean_detection_from_cluster(clusters[best_cluster_nr])
+        cells = cells_from_detection(mean_detection, cell_size)
+        if new_cluster:
+            old_cells = cells
+            old_cells.r_stop = old_cells.r_start
+            cluster_cells.push_back(cells)
+        else:
+            old_cells = cluster_cells[best_cluster_nr]
+            cells.r_start = min(cells.r_start, old_cells.r_start)
+            cells.r_stop = max(cells.r_stop, old_cells.r_stop)
+            cells.c_start = min(cells.c_start, old_cells.c_start)
+            cells.c_stop = max(cells.c_stop, old_cells.c_stop)
+            cluster_cells[best_cluster_nr] = cells
+
+        for cell_r in range(cells.r_start, cells.r_stop):
+            for cell_c in range(cells.c_start, cells.c_stop):
+                if (old_cells.r_start <= cell_r < old_cells.r_stop
+                        and old_cells.c_start <= cell_c < old_cells.c_stop):
+                    continue
+                grid[cell_r * grid_cols + cell_c].push_back(best_cluster_nr)
 
     clusters = threshold_clusters(clusters, min_neighbour_number)
     return get_mean_detections(clusters)
 
 
+cdef Cells cells_from_detection(Detection detection, Py_ssize_t cell_size):
+    """Find the box of grid cells that a detection intersects.
+
+    Parameters
+    ----------
+    detection : Detection
+        A single detection.
+    cell_size : Py_ssize_t
+        The size of the square cells of the grid.
+
+    Returns
+    -------
+    cells : Cells
+        The box of cells of the grid that intersect the detection.
+    """
+
+    cdef Cells cells
+
+    cells.r_start = detection.r // cell_size
+    cells.r_stop = (detection.r + detection.height - 1) // cell_size + 1
+    cells.c_start = detection.c // cell_size
+    cells.c_stop = (detection.c + detection.width - 1) // cell_size + 1
+
+    return cells
+
+
 cdef DetectionsCluster update_cluster(DetectionsCluster cluster,
                                       Detection detection):
     """Updated the cluster by adding new detection.
@@ -394,6 +500,73 @@ cdef cnp.float32_t rect_intersection_score(Detection rect_a, Detection rect_b):
     return intersection_area / smaller_area
 
 
+cdef inline int _multiblock_lbp_code(cnp.float32_t[:, ::1] int_img,
+                                    Py_ssize_t r, Py_ssize_t c,
+                                    Py_ssize_t width,
+                                    Py_ssize_t height) nogil:
+    """Multi-block local binary pattern of a feature in an integral image.
+
+    Same as `skimage.feature._texture._multiblock_lbp`, with the same
+    results, but the 9 blocks share the 16 values of the integral image at
+    their corners, instead of reading 4 values each.
+
+    Parameters
+    ----------
+    int_img : cnp.float32_t[:, ::1]
+        Memory-view to integral image.
+    r : Py_ssize_t
+        Row-coordinate of top left corner of a rectangle containing feature.
+    c : Py_ssize_t
+        Column-coordinate of top left corner of a rectangle containing
+        feature.
+    width : Py_ssize_t
+        Width of one of 9 equal rectangles of the feature.
+    height : Py_ssize_t
+        Height of one of 9 equal rectangles of the feature.
+
+    Returns
+    -------
+    output : int
+        8-bit MB-LBP feature descriptor.
+    """
+
+    cdef:
+        # Values of the integral image before the top left corners of the
+        # blocks, zero outside of the image
+        cnp.float32_t corners[4][4]
+        # Sums over the blocks
+        cnp.float32_t sums[3][3]
+        cnp.float32_t central_sum
+        Py_ssize_t i, j, corner_r, corner_c
+
+    for i in range(4):
+        corner_r = r - 1 + i * height
+        for j in range(4):
+            corner_c = c - 1 + j * width
+            if corner_r >= 0 and corner_c >= 0:
+                corners[i][j] = int_img[corner_r, corner_c]
+            else:
+                corners[i][j] = 0
+
+    # Same operations, in the same order, as `integrate`
+    for i in range(3):
+        for j in range(3):
+            sums[i][j] = (((corners[i + 1][j + 1] + corners[i][j])
+                           - corners[i][j + 1]) - corners[i + 1][j])
+
+    # Neighbour blocks start from top left and go clockwise, from the most
+    # significant bit
+    central_sum = sums[1][1]
+    return ((sums[0][0] >= central_sum) << 7
+            | (sums[0][1] >= central_sum) << 6
+            | (sums[0][2] >= central_sum) << 5
+            | (sums[1][2] >= central_sum) << 4
+            | (sums[2][2] >= central_sum) << 3
+            | (sums[2][1] >= central_sum) << 2
+            | (sums[2][0] >= central_sum) << 1
+            | (sums[1][0] >= central_sum))
+
+
 cdef class Cascade:
     """Class for cascade of classifiers that is used for object detection.
 
@@ -538,8 +711,8 @@ cdef class Cascade:
                 height = <Py_ssize_t>(current_feature.height * scale)
 
 
-                lbp_code = _multiblock_lbp(int_img, row + r, col + c,
-                                           width, height)
+                lbp_code = _multiblock_lbp_code(int_img, row + r, col + c,
+                                                width, height)
 
                 lut_idx = current_stump.lut_idx
 
@@ -680,6 +853,10 @@ cdef class Cascade:
             Py_ssize_t img_height
             Py_ssize_t img_width
             Py_ssize_t scale_number
+            Py_ssize_t stop_row
+            Py_ssize_t band_rows
+            Py_ssize_t unit_number
+            Py_ssize_t number_of_units
             Py_ssize_t window_height = self.window_height
             Py_ssize_t window_width = self.window_width
             int result
@@ -687,6 +864,9 @@ cdef class Cascade:
             cnp.float32_t[:, ::1] int_img
             cnp.float32_t current_scale_factor
             vector[Detection] output
+            vector[Py_ssize_t] unit_scales
+            vector[Py_ssize_t] unit_rows
+            vector[vector[Detection]] unit_detections
             Detection new_detection
 
         int_img = self._get_contiguous_integral_image(img)
@@ -697,19 +877,11 @@ cdef class Cascade:
                                                       max_size, scale_factor)
         number_of_scales = scale_factors.shape[0]
 
-        # Initialize lock to enable thread-safe writes to the array
-        # in concurrent loop.
-        cdef openmp.omp_lock_t mylock
-
-        if have_openmp:
-            openmp.omp_init_lock(&mylock)
-
-
-        # As the amount of work between the threads is not equal we
-        # use `dynamic` schedule which enables them to use computing
-        # power on demand.
-        for scale_number in prange(0, number_of_scales,
-                                   schedule='dynamic', nogil=True):
+        # Split the search into units of work of a few rows of windows of
+        # a scale, so that the threads stay busy when the finest scale
+        # dominates.
+        band_rows = _CASCADE_ROWS
+        for scale_number in range(number_of_scales):
 
             current_scale_factor = scale_factors[scale_number]
             current_step = <Py_ssize_t>round(current_scale_factor * step_ratio)
@@ -723,14 +895,39 @@ cdef class Cascade:
                 continue
 
             current_row = 0
+            while current_row < max_row:
+                unit_scales.push_back(scale_number)
+                unit_rows.push_back(current_row)
+                current_row = current_row + band_rows * current_step
+
+        number_of_units = unit_scales.size()
+        unit_detections.resize(number_of_units)
+
+        # Each unit has its own detections, so that no lock is needed. As
+        # the amount of work between the units is not equal we use `dynamic`
+        # schedule which enables the threads to use computing power on
+        # demand.
+        for unit_number in prange(0, number_of_units,
+                                  schedule='dynamic', nogil=True):
+
+            scale_number = unit_scales[unit_number]
+            current_scale_factor = scale_factors[scale_number]
+            current_step = <Py_ssize_t>round(current_scale_factor * step_ratio)
+            current_height = <Py_ssize_t>(window_height * current_scale_factor)
+            current_width = <Py_ssize_t>(window_width * current_scale_factor)
+            max_row = img_height - current_height
+            max_col = img_width - current_width
+
+            current_row = unit_rows[unit_number]
+            stop_row = min(current_row + band_rows * current_step, max_row)
             current_col = 0
 
-            while current_row < max_row:
+            while current_row < stop_row:
                 while current_col < max_col:
 
                     result = self.classify(int_img, current_row,
                                            current_col,
-                                           scale_factors[scale_number])
+                                           current_scale_factor)
 
                     if result:
 
@@ -740,21 +937,18 @@ cdef class Cascade:
                         new_detection.width = current_width
                         new_detection.height = current_height
 
-                        if have_openmp:
-                            openmp.omp_set_lock(&mylock)
-
-                        output.push_back(new_detection)
-
-                        if have_openmp:
-                            openmp.omp_unset_lock(&mylock)
+                        unit_detections[unit_number].push_back(new_detection)
 
                     current_col = current_col + current_step
 
                 current_row = current_row + current_step
                 current_col = 0
 
-        if have_openmp:
-            openmp.omp_destroy_lock(&mylock)
+        # Gather the detections in the order of an exhaustive scan, scale by
+        # scale and row by row, which the grouping depends on.
+        for unit_number in range(number_of_units):
+            output.insert(output.end(), unit_detections[unit_number].begin(),
+                          unit_detections[unit_number].end())
 
         return list(_group_detections(output, intersection_score_threshold,
                                       min_neighbour_number))
@@ -312,3 +312,115 @@ cpdef haar_like_feature_wrapper(
     # with even indices
     return (np.sum(rect_feature_ndarray[1::2], axis=0) -
             np.sum(rect_feature_ndarray[::2], axis=0))
+
+
+def _haar_like_feature_rectangles(width, height, feature_type):
+    """Compute the rectangles of all Haar-like features of a type.
+
+    Parameters
+    ----------
+    width : int
+        Width of the detection window.
+    height : int
+        Height of the detection window.
+    feature_type : str
+        The type of feature to consider.
+
+    Returns
+    -------
+    rectangles : (n_features, 4, 4) ndarray of intp
+        Top left row and column, and bottom right row and column of the
+        rectangles of each feature. Only the first
+        ``N_RECTANGLE[feature_type]`` rectangles of each feature are set.
+    """
+    cdef:
+        vector[vector[Rectangle]] rect
+        Py_ssize_t n_rectangle, n_feature
+        Py_ssize_t i, j
+        Py_ssize_t[:, :, ::1] rectangles
+
+    rect = _haar_like_feature_coord(width, height,
+                                    FEATURE_TYPE[feature_type])
+    n_feature = rect[0].size()
+    n_rectangle = rect.size()
+
+    rectangles = np.zeros((n_feature, 4, 4), dtype=np.intp)
+    for i in range(n_rectangle):
+        for j in range(n_feature):
+            rectangles[j, i, 0] = rect[i][j].top_left.row
+            rectangles[j, i, 1] = rect[i][j].top_left.col
+            rectangles[j, i, 2] = rect[i][j].bottom_right.row
+            rectangles[j, i, 3] = rect[i][j].bottom_right.col
+
+    return np.asarray(rectangles)
+
+
+def _haar_like_feature_batch(np_real_numeric[:, :, ::1] int_images,
+                             Py_ssize_t[:, ::1] rois,
+                             Py_ssize_t[:, :, ::1] rectangles,
+                             Py_ssize_t[::1] n_rectangles,
+                             np_real_numeric[:, ::1] out):
+    """Compute Haar-like features for a batch of ROIs of integral images.
+
+    The rectangles are summed as by `integrate` on the ROI of the integral
+    image: the values before the first row or column of the ROI are taken
+    as zero, as in `haar_like_feature_wrapper`. The GIL is released.
+
+    Parameters
+    ----------
+    int_images : (K, M, N) ndarray
+        Integral images.
+    rois : (n_rois, 3) ndarray of intp
+        Index of the integral image, and row and column of the top left
+        corner of each ROI.
+    rectangles : (n_features, 4, 4) ndarray of intp
+        Top left row and column, and bottom right row and column of the
+        rectangles of each feature, relative to the ROI.
+    n_rectangles : (n_features,) ndarray of intp
+        Number of rectangles of each feature.
+    out : (n_rois, n_features) ndarray
+        Output array for the features.
+    """
+    cdef:
+        Py_ssize_t n_rois = rois.shape[0]
+        Py_ssize_t n_features = rectangles.shape[0]
+        Py_ssize_t idx_roi, idx_feature, idx_rect
+        Py_ssize_t k, r, c, r0, c0, r1, c1
+        np_real_numeric rect_sum, positive, negative
+
+    with nogil:
+        for idx_roi in range(n_rois):
+            k = rois[idx_roi, 0]
+            r = rois[idx_roi, 1]
+            c = rois[idx_roi, 2]
+            for idx_feature in range(n_features):
+                positive = 0
+                negative = 0
+                for idx_rect in range(n_rectangles[idx_feature]):
+                    r0 = rectangles[idx_feature, idx_rect, 0]
+                    c0 = rectangles[idx_feature, idx_rect, 1]
+                    r1 = rectangles[idx_feature, idx_rect, 2]
+                    c1 = rectangles[idx_feature, idx_rect, 3]
+
+                    # Same operations, in the same order, as `integrate`
+                    rect_sum = 0
+                    rect_sum += int_images[k, r + r1, c + c1]
+                    if r0 >= 1 and c0 >= 1:
+                        rect_sum += int_images[k, r + r0 - 1, c + c0 - 1]
+                    if r0 >= 1:
+                        rect_sum -= int_images[k, r + r0 - 1, c + c1]
+                    if c0 >= 1:
+                        rect_sum -= int_images[k, r + r1, c + c0 - 1]
+
+                    # The rectangles with odd indices are positive, and the
+                    # ones with even indices negative
+                    if idx_rect == 0:
+                        negative = rect_sum
+                    elif idx_rect == 1:
+                        positive = rect_sum
+                    elif idx_rect == 2:
+                        negative = negative + rect_sum
+                    else:
+                        positive = positive + rect_sum
+
+                out[idx_roi, idx_feature] = positive - negative
@@ -77,7 +77,9 @@ cdef inline cnp.double_t _integ(
     return ans
 
 
-def _hessian_matrix_det(cnp.double_t[:, ::1] img, double sigma):
+def _hessian_matrix_det(cnp.double_t[:, ::1] img, double sigma,
+                        cnp.double_t[:, ::1] out=None,
+                        Py_ssize_t row_start=0, Py_ssize_t row_stop=-1):
     """Computes the approximate Hessian Determinant over an image.
 
     This method uses box filters over integral images to compute the
@@ -90,6 +92,12 @@ def _hessian_matrix_det(cnp.double_t[:, ::1] img, double sigma):
     sigma : float
         Standard deviation used for the Gaussian kernel, used for the Hessian
         matrix
+    out : array, optional
+        Array with the shape of `img` in which to store the result. By
+        default, a new array is allocated.
+    row_start, row_stop : int, optional
+        Range of the rows of `out` to compute. By default, all the rows are
+        computed.
 
     Returns
     -------
@@ -121,7 +129,10 @@ def _hessian_matrix_det(cnp.double_t[:, ::1] img, double sigma):
     cdef Py_ssize_t w = size
     cdef Py_ssize_t b = (size - 1) / 2
     cdef cnp.double_t mid, side, tl, tr, bl, br
-    cdef cnp.double_t[:, ::1] out = np.zeros_like(img, dtype=np.double)
+    if out is None:
+        out = np.zeros_like(img, dtype=np.double)
+    if row_stop < 0:
+        row_stop = height
     cdef cnp.double_t w_i = 1.0 / size / size
 
     cdef float dxx, dyy, dxy
@@ -130,7 +141,7 @@ def _hessian_matrix_det(cnp.double_t[:, ::1] img, double sigma):
         if size % 2 == 0:
             size += 1
 
-        for r in range(height):
+        for r in range(row_start, row_stop):
             for c in range(width):
                 tl = _integ(img, r - s3, c - s3, s3, s3)  # top left
                 br = _integ(img, r + 1, c + 1, s3, s3)  # bottom right
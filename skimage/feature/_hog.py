@@ -1,21 +1,65 @@
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
 from . import _hoghistogram
 
 
-def _hog_normalize_block(block, method, eps=1e-5):
-    if method == 'L1':
-        out = block / (np.sum(np.abs(block)) + eps)
-    elif method == 'L1-sqrt':
-        out = np.sqrt(block / (np.sum(np.abs(block)) + eps))
-    elif method == 'L2':
-        out = block / np.sqrt(np.sum(block ** 2) + eps ** 2)
-    elif method == 'L2-Hys':
-        out = block / np.sqrt(np.sum(block ** 2) + eps ** 2)
-        out = np.minimum(out, 0.2)
-        out = out / np.sqrt(np.sum(out ** 2) + eps ** 2)
-    else:
+_BLOCK_NORMS = ('L1', 'L1-sqrt', 'L2', 'L2-Hys')
+
+
+def _hog_normalize_blocks(orientation_histogram, cells_per_block, method,
+                          eps=1e-5):
+    """Normalize all the blocks of a grid of cell histograms at once.
+
+    Parameters
+    ----------
+    orientation_histogram : (..., n_cells_row, n_cells_col, n_orient) ndarray
+        Cell histograms, optionally for a batch of images.
+    cells_per_block : 2-tuple (int, int)
+        Number of cells in each block.
+    method : str {'L1', 'L1-sqrt', 'L2', 'L2-Hys'}
+        Block normalization method, see `hog`.
+    eps : float, optional
+        Regularization of the block norms.
+
+    Returns
+    -------
+    normalized_blocks : (..., n_blocks_row, n_blocks_col, b_row, b_col, \
+n_orient) ndarray
+        The normalized blocks.
+    """
+    if method not in _BLOCK_NORMS:
         raise ValueError('Selected block normalization method is invalid.')
 
+    b_row, b_col = cells_per_block
+    n_cells_row, n_cells_col, n_orient = orientation_histogram.shape[-3:]
+    n_blocks_row = (n_cells_row - b_row) + 1
+    n_blocks_col = (n_cells_col - b_col) + 1
+    if n_blocks_row < 0 or n_blocks_col < 0:
+        raise ValueError('The image is smaller than a block of cells.')
+
+    # Overlapping blocks, as a view of the cell histograms
+    strides = orientation_histogram.strides
+    blocks = as_strided(
+        orientation_histogram,
+        shape=(orientation_histogram.shape[:-3]
+               + (n_blocks_row, n_blocks_col, b_row, b_col, n_orient)),
+        strides=strides[:-1] + strides[-3:],
+        writeable=False)
+
+    block_axes = (-3, -2, -1)
+    if method in ('L1', 'L1-sqrt'):
+        norm = np.sum(np.abs(blocks), axis=block_axes, keepdims=True)
+        out = blocks / (norm + eps)
+        if method == 'L1-sqrt':
+            np.sqrt(out, out=out)
+    else:
+        norm = np.sum(blocks ** 2, axis=block_axes, keepdims=True)
+        out = blocks / np.sqrt(norm + eps ** 2)
+        if method == 'L2-Hys':
+            np.minimum(out, 0.2, out=out)
+            norm = np.sum(out ** 2, axis=block_axes, keepdims=True)
+            out /= np.sqrt(norm + eps ** 2)
+
     return out
 
 
@@ -24,25 +68,174 @@ def _hog_channel_gradient(channel):
 
     Parameters
     ----------
-    channel : (M, N) ndarray
-        Grayscale image or one of image channel.
+    channel : (..., M, N) ndarray
+        Grayscale image or one of image channel, optionally for a batch of
+        images.
 
     Returns
     -------
     g_row, g_col : channel gradient along `row` and `col` axes correspondingly.
     """
     g_row = np.empty(channel.shape, dtype=np.double)
-    g_row[0, :] = 0
-    g_row[-1, :] = 0
-    g_row[1:-1, :] = channel[2:, :] - channel[:-2, :]
+    g_row[..., 0, :] = 0
+    g_row[..., -1, :] = 0
+    g_row[..., 1:-1, :] = channel[..., 2:, :] - channel[..., :-2, :]
     g_col = np.empty(channel.shape, dtype=np.double)
-    g_col[:, 0] = 0
-    g_col[:, -1] = 0
-    g_col[:, 1:-1] = channel[:, 2:] - channel[:, :-2]
+    g_col[..., :, 0] = 0
+    g_col[..., :, -1] = 0
+    g_col[..., :, 1:-1] = channel[..., :, 2:] - channel[..., :, :-2]
 
     return g_row, g_col
 
 
+def _hog_cell_histograms(image, orientations, pixels_per_cell,
+                         transform_sqrt, multichannel):
+    """Compute the gradient histograms of all the cells of an image.
+
+    Parameters
+    ----------
+    image : (..., M, N[, C]) ndarray
+        Input image, optionally with leading batch axes.
+    orientations : int
+        Number of orientation bins.
+    pixels_per_cell : 2-tuple (int, int)
+        Size (in pixels) of a cell.
+    transform_sqrt : bool
+        Apply power law compression to normalize the image before
+        processing.
+    multichannel : bool
+        If True, the last `image` dimension is considered as a color channel.
+
+    Returns
+    -------
+    orientation_histogram : (..., n_cells_row, n_cells_col, n_orient) ndarray
+        The histogram of each cell.
+    """
+
+    """
+    The first stage applies an optional global image normalization
+    equalisation that is designed to reduce the influence of illumination
+    effects. In practice we use gamma (power law) compression, either
+    computing the square root or the log of each color channel.
+    Image texture strength is typically proportional to the local surface
+    illumination so this compression helps to reduce the effects of local
+    shadowing and illumination variations.
+    """
+
+    if transform_sqrt:
+        image = np.sqrt(image)
+
+    """
+    The second stage computes first order image gradients. These capture
+    contour, silhouette and some texture information, while providing
+    further resistance to illumination variations. The locally dominant
+    color channel is used, which provides color invariance to a large
+    extent. Variant methods may also include second order image derivatives,
+    which act as primitive bar detectors - a useful feature for capturing,
+    e.g. bar like structures in bicycles and limbs in humans.
+    """
+
+    if image.dtype.kind == 'u':
+        # convert uint image to float
+        # to avoid problems with subtracting unsigned numbers
+        image = image.astype('float')
+
+    if multichannel:
+        g_row_by_ch, g_col_by_ch = _hog_channel_gradient(
+            np.moveaxis(image, -1, -3))
+        g_magn = np.hypot(g_row_by_ch, g_col_by_ch)
+
+        # For each pixel select the channel with the highest gradient magnitude
+        idcs_max = g_magn.argmax(axis=-3)[..., np.newaxis, :, :]
+        g_row = np.take_along_axis(g_row_by_ch, idcs_max, axis=-3)
+        g_col = np.take_along_axis(g_col_by_ch, idcs_max, axis=-3)
+        g_row, g_col = g_row[..., 0, :, :], g_col[..., 0, :, :]
+    else:
+        g_row, g_col = _hog_channel_gradient(image)
+
+    """
+    The third stage aims to produce an encoding that is sensitive to
+    local image content while remaining resistant to small changes in
+    pose or appearance. The adopted method pools gradient orientation
+    information locally in the same way as the SIFT [Lowe 2004]
+    feature. The image window is divided into small spatial regions,
+    called "cells". For each cell we accumulate a local 1-D histogram
+    of gradient or edge orientations over all the pixels in the
+    cell. This combined cell-level 1-D histogram forms the basic
+    "orientation histogram" representation. Each orientation histogram
+    divides the gradient angle range into a fixed number of
+    predetermined bins. The gradient magnitudes of the pixels in the
+    cell are used to vote into the orientation histogram.
+    """
+
+    s_row, s_col = g_row.shape[-2:]
+    c_row, c_col = pixels_per_cell
+
+    n_cells_row = int(s_row // c_row)  # number of cells along row-axis
+    n_cells_col = int(s_col // c_col)  # number of cells along col-axis
+
+    batch_shape = g_row.shape[:-2]
+    orientation_histogram = np.zeros(batch_shape + (n_cells_row, n_cells_col,
+                                                    orientations))
+
+    for idx in np.ndindex(*batch_shape):
+        _hoghistogram.hog_histograms(np.ascontiguousarray(g_col[idx]),
+                                     np.ascontiguousarray(g_row[idx]),
+                                     c_col, c_row, s_col, s_row,
+                                     n_cells_col, n_cells_row,
+                                     orientations, orientation_histogram[idx])
+
+    return orientation_histogram
+
+
+def _hog_visualize(orientation_histogram, pixels_per_cell, shape):
+    """Draw the cell histograms of an image as line segments.
+
+    For each cell and orientation bin, the image contains a line segment
+    that is centered at the cell center, is perpendicular to the midpoint of
+    the range of angles spanned by the orientation bin, and has intensity
+    proportional to the corresponding histogram value.
+    """
+    from .. import draw
+
+    n_cells_row, n_cells_col, orientations = orientation_histogram.shape
+    c_row, c_col = pixels_per_cell
+
+    radius = min(c_row, c_col) // 2 - 1
+    orientations_arr = np.arange(orientations)
+    # set dr_arr, dc_arr to correspond to midpoints of orientation bins
+    orientation_bin_midpoints = (
+        np.pi * (orientations_arr + .5) / orientations)
+    dr_arr = radius * np.sin(orientation_bin_midpoints)
+    dc_arr = radius * np.cos(orientation_bin_midpoints)
+
+    # The segments of all the cells are the same up to a shift, except for
+    # the rounding of their end points: draw each segment once per distinct
+    # rounding, and add it to all the cells sharing it at the same time
+    centre_row = np.arange(n_cells_row) * c_row + c_row // 2
+    centre_col = np.arange(n_cells_col) * c_col + c_col // 2
+    hog_image = np.zeros(shape, dtype=float)
+    for o, dr, dc in zip(orientations_arr, dr_arr, dc_arr):
+        ends_row = np.stack([(centre_row - dc).astype(int) - centre_row,
+                             (centre_row + dc).astype(int) - centre_row],
+                            axis=1)
+        ends_col = np.stack([(centre_col + dr).astype(int) - centre_col,
+                             (centre_col - dr).astype(int) - centre_col],
+                            axis=1)
+        for r0, r1 in np.unique(ends_row, axis=0):
+            rows = np.flatnonzero(np.all(ends_row == (r0, r1), axis=1))
+            for c0, c1 in np.unique(ends_col, axis=0):
+                cols = np.flatnonzero(np.all(ends_col == (c0, c1), axis=1))
+                hist = orientation_histogram[np.ix_(rows, cols, [o])][..., 0]
+                rr, cc = draw.line(r0, c0, r1, c1)
+                # The same offset hits a different pixel in each cell
+                for r, c in zip(rr, cc):
+                    hog_image[np.ix_(centre_row[rows] + r,
+                                     centre_col[cols] + c)] += hist
+
+    return hog_image
+
+
 def hog(image, orientations=9, pixels_per_cell=(8, 8), cells_per_block=(3, 3),
         block_norm='L2-Hys', visualize=False, transform_sqrt=False,
         feature_vector=True, multichannel=None):
@@ -150,109 +343,14 @@ def hog(image, orientations=9, pixels_per_cell=(8, 8), cells_per_block=(3, 3),
                          'supported. If using with color/multichannel '
                          'images, specify `multichannel=True`.')
 
-    """
-    The first stage applies an optional global image normalization
-    equalisation that is designed to reduce the influence of illumination
-    effects. In practice we use gamma (power law) compression, either
-    computing the square root or the log of each color channel.
-    Image texture strength is typically proportional to the local surface
-    illumination so this compression helps to reduce the effects of local
-    shadowing and illumination variations.
-    """
-
-    if transform_sqrt:
-        image = np.sqrt(image)
-
-    """
-    The second stage computes first order image gradients. These capture
-    contour, silhouette and some texture information, while providing
-    further resistance to illumination variations. The locally dominant
-    color channel is used, which provides color invariance to a large
-    extent. Variant methods may also include second order image derivatives,
-    which act as primitive bar detectors - a useful feature for capturing,
-    e.g. bar like structures in bicycles and limbs in humans.
-    """
-
-    if image.dtype.kind == 'u':
-        # convert uint image to float
-        # to avoid problems with subtracting unsigned numbers
-        image = image.astype('float')
-
-    if multichannel:
-        g_row_by_ch = np.empty_like(image, dtype=np.double)
-        g_col_by_ch = np.empty_like(image, dtype=np.double)
-        g_magn = np.empty_like(image, dtype=np.double)
-
-        for idx_ch in range(image.shape[2]):
-            g_row_by_ch[:, :, idx_ch], g_col_by_ch[:, :, idx_ch] = \
-                _hog_channel_gradient(image[:, :, idx_ch])
-            g_magn[:, :, idx_ch] = np.hypot(g_row_by_ch[:, :, idx_ch],
-                                            g_col_by_ch[:, :, idx_ch])
-
-        # For each pixel select the channel with the highest gradient magnitude
-        idcs_max = g_magn.argmax(axis=2)
-        rr, cc = np.meshgrid(np.arange(image.shape[0]),
-                             np.arange(image.shape[1]),
-                             indexing='ij',
-                             sparse=True)
-        g_row = g_row_by_ch[rr, cc, idcs_max]
-        g_col = g_col_by_ch[rr, cc, idcs_max]
-    else:
-        g_row, g_col = _hog_channel_gradient(image)
-
-    """
-    The third stage aims to produce an encoding that is sensitive to
-    local image content while remaining resistant to small changes in
-    pose or appearance. The adopted method pools gradient orientation
-    information locally in the same way as the SIFT [Lowe 2004]
-    feature. The image window is divided into small spatial regions,
-    called "cells". For each cell we accumulate a local 1-D histogram
-    of gradient or edge orientations over all the pixels in the
-    cell. This combined cell-level 1-D histogram forms the basic
-    "orientation histogram" representation. Each orientation histogram
-    divides the gradient angle range into a fixed number of
-    predetermined bins. The gradient magnitudes of the pixels in the
-    cell are used to vote into the orientation histogram.
-    """
-
-    s_row, s_col = image.shape[:2]
-    c_row, c_col = pixels_per_cell
-    b_row, b_col = cells_per_block
-
-    n_cells_row = int(s_row // c_row)  # number of cells along row-axis
-    n_cells_col = int(s_col // c_col)  # number of cells along col-axis
-
-    # compute orientations integral images
-    orientation_histogram = np.zeros((n_cells_row, n_cells_col, orientations))
-
-    _hoghistogram.hog_histograms(g_col, g_row, c_col, c_row, s_col, s_row,
-                                 n_cells_col, n_cells_row,
-                                 orientations, orientation_histogram)
+    orientation_histogram = _hog_cell_histograms(
+        image, orientations, pixels_per_cell, transform_sqrt, multichannel)
 
-    # now compute the histogram for each cell
     hog_image = None
 
     if visualize:
-        from .. import draw
-
-        radius = min(c_row, c_col) // 2 - 1
-        orientations_arr = np.arange(orientations)
-        # set dr_arr, dc_arr to correspond to midpoints of orientation bins
-        orientation_bin_midpoints = (
-            np.pi * (orientations_arr + .5) / orientations)
-        dr_arr = radius * np.sin(orientation_bin_midpoints)
-        dc_arr = radius * np.cos(orientation_bin_midpoints)
-        hog_image = np.zeros((s_row, s_col), dtype=float)
-        for r in range(n_cells_row):
-            for c in range(n_cells_col):
-                for o, dr, dc in zip(orientations_arr, dr_arr, dc_arr):
-                    centre = tuple([r * c_row + c_row // 2,
-                                    c * c_col + c_col // 2])
-                    rr, cc = draw.line(int(centre[0] - dc),
-                                       int(centre[1] + dr),
-                                       int(centre[0] + dc),
-                                       int(centre[1] - dr))
-                    hog_image[rr, cc] += orientation_histogram[r, c, o]
+        hog_image = _hog_visualize(orientation_histogram, pixels_per_cell,
+                                   image.shape[:2])
 
     """
     The fourth stage computes normalization, which takes local groups of
@@ -269,16 +367,8 @@ def hog(image, orientations=9, pixels_per_cell=(8, 8), cells_per_block=(3, 3),
     Gradient (HOG) descriptors.
     """
 
-    n_blocks_row = (n_cells_row - b_row) + 1
-    n_blocks_col = (n_cells_col - b_col) + 1
-    normalized_blocks = np.zeros((n_blocks_row, n_blocks_col,
-                                  b_row, b_col, orientations))
-
-    for r in range(n_blocks_row):
-        for c in range(n_blocks_col):
-            block = orientation_histogram[r:r + b_row, c:c + b_col, :]
-            normalized_blocks[r, c, :] = \
-                _hog_normalize_block(block, method=block_norm)
+    normalized_blocks = _hog_normalize_blocks(
+        orientation_histogram, cells_per_block, block_norm)
 
     """
     The final step collects the HOG descriptors from all blocks of a dense
@@ -293,3 +383,118 @@ def hog(image, orientations=9, pixels_per_cell=(8, 8), cells_per_block=(3, 3),
         return normalized_blocks, hog_image
     else:
         return normalized_blocks
+
+
+def hog_dense(image, orientations=9, pixels_per_cell=(8, 8),
+              cells_per_block=(3, 3), block_norm='L2-Hys',
+              transform_sqrt=False, window_shape=None, multichannel=None,
+              batch=False):
+    """Extract dense HOG descriptors, for sliding-window detection.
+
+    The cell histograms and normalized blocks are computed once for the whole
+    image, and the descriptors of all the detection windows are views of
+    them.
+
+    Parameters
+    ----------
+    image : ([K, ]M, N[, C]) ndarray
+        Input image, or batch of `K` images of the same size if `batch` is
+        True.
+    orientations : int, optional
+        Number of orientation bins.
+    pixels_per_cell : 2-tuple (int, int), optional
+        Size (in pixels) of a cell.
+    cells_per_block : 2-tuple (int, int), optional
+        Number of cells in each block.
+    block_norm : str {'L1', 'L1-sqrt', 'L2', 'L2-Hys'}, optional
+        Block normalization method, see `hog`.
+    transform_sqrt : bool, optional
+        Apply power law compression to normalize the image before
+        processing. DO NOT use this if the image contains negative
+        values.
+    window_shape : 2-tuple (int, int), optional
+        Size (in pixels) of the detection window. If given, the descriptors
+        of all the windows whose top-left corner is at the top-left corner of
+        a cell are returned, instead of the blocks of the whole image.
+    multichannel : boolean, optional
+        If True, the last `image` dimension is considered as a color channel,
+        otherwise as spatial. By default, images with 3 dimensions (4 for a
+        batch) are considered multichannel.
+    batch : bool, optional
+        If True, the first `image` dimension indexes the images of a batch.
+
+    Returns
+    -------
+    blocks : ([K, ]n_blocks_row, n_blocks_col, n_cells_row, n_cells_col, \
+n_orient) ndarray
+        HOG descriptor of the whole image, as returned by `hog` with
+        ``feature_vector=False``. Only provided if `window_shape` is None.
+    windows : ([K, ]n_windows_row, n_windows_col, n_blocks_row, \
+n_blocks_col, n_cells_row, n_cells_col, n_orient) ndarray
+        Read-only view of the blocks of the image, where
+        ``windows[i, j]`` is the HOG descriptor of the window whose top-left
+        corner is at pixel ``(i * pixels_per_cell[0], j * pixels_per_cell[1])``
+        and ``windows[i, j].ravel()`` its feature vector. Only provided if
+        `window_shape` is given.
+
+    See Also
+    --------
+    hog
+
+    Notes
+    -----
+    The gradients at the border of a window are computed with the pixels
+    outside of the window when they are in the image, while `hog` applied to
+    the crop of the window sets them to zero. The descriptors of a window
+    thus only differ from the `hog` of its crop in the cells on its border.
+
+    Examples
+    --------
+    >>> from skimage import data
+    >>> image = data.camera()[:128, :256]
+    >>> windows = hog_dense(image, window_shape=(64, 32))
+    >>> windows.shape
+    (9, 29, 6, 2, 3, 3, 9)
+    >>> windows[2, 5].ravel().shape
+    (972,)
+    """
+    image = np.asarray(image)
+    if image.ndim < 2:
+        image = image.reshape((1,) * (2 - image.ndim) + image.shape)
+    n_batch_axes = 1 if batch else 0
+
+    if multichannel is None:
+        multichannel = (image.ndim == 3 + n_batch_axes)
+
+    ndim_spatial = image.ndim - n_batch_axes - (1 if multichannel else 0)
+    if ndim_spatial != 2:
+        raise ValueError('Only images with 2 spatial dimensions are '
+                         'supported. If using with color/multichannel '
+                         'images, specify `multichannel=True`.')
+
+    orientation_histogram = _hog_cell_histograms(
+        image, orientations, pixels_per_cell, transform_sqrt, multichannel)
+    normalized_blocks = _hog_normalize_blocks(
+        orientation_histogram, cells_per_block, block_norm)
+
+    if window_shape is None:
+        return normalized_blocks
+
+    n_window_cells = [w // c for w, c in zip(window_shape, pixels_per_cell)]
+    n_window_blocks = [n - b + 1
+                       for n, b in zip(n_window_cells, cells_per_block)]
+    n_windows = [n - w + 1 for n, w in zip(normalized_blocks.shape[-5:-3],
+                                           n_window_blocks)]
+    if min(n_window_blocks) < 1 or min(n_windows) < 1:
+        raise ValueError('The window must hold at least a block of cells, '
+                         'and fit in the image.')
+
+    strides = normalized_blocks.strides
+    windows = as_strided(
+        normalized_blocks,
+        shape=(normalized_blocks.shape[:-5] + tuple(n_windows)
+               + tuple(n_window_blocks) + normalized_blocks.shape[-3:]),
+        strides=strides[:-3] + strides[-5:],
+        writeable=False)
+
+    return windows
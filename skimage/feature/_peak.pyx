@@ -0,0 +1,106 @@
+#cython: cdivision=True
+#cython: boundscheck=False
+#cython: nonecheck=False
+#cython: wraparound=False
+
+import numpy as np
+
+cimport numpy as cnp
+from .._shared.fused_numerics cimport np_real_numeric
+cnp.import_array()
+
+
+def _label_maxima(np_real_numeric[::1] image, np_real_numeric[::1] image_max,
+                  Py_ssize_t[::1] label_index, Py_ssize_t[::1] shape,
+                  Py_ssize_t[:, ::1] bbox_start, Py_ssize_t[:, ::1] bbox_stop,
+                  Py_ssize_t[:, ::1] offsets, Py_ssize_t[::1] flat_offsets,
+                  np_real_numeric background, bint has_center):
+    """Find the pixels equal to the maximum of their neighborhood, in the
+    bounding box of their label.
+
+    Each pixel is compared to its neighbors in the bounding box of its
+    label, the pixels of other labels being set to `background`, and to
+    zero outside of the bounding box. This is the maximum filter of
+    `peak_local_max` applied to the bounding box of each label.
+
+    Parameters
+    ----------
+    image : (n_pixels,) ndarray
+        The raveled image.
+    image_max : (n_pixels,) ndarray
+        The maximum filter of the whole image, with zero padding. The pixels
+        that are equal to it, and not negative, are local maxima without
+        looking at their neighbors.
+    label_index : (n_pixels,) ndarray of intp
+        The index of the label of each pixel, or -1 for the background.
+    shape : (ndim,) ndarray of intp
+        The shape of the image.
+    bbox_start, bbox_stop : (n_labels, ndim) ndarray of intp
+        The bounding box of each label.
+    offsets : (n_offsets, ndim) ndarray of intp
+        The offsets of the neighbors of a pixel. They are visited in order,
+        so that the nearest neighbors should come first.
+    flat_offsets : (n_offsets,) ndarray of intp
+        The same offsets, in the raveled image.
+    background : scalar
+        The value of the pixels of other labels.
+    has_center : bool
+        Whether the neighborhood of a pixel contains the pixel itself.
+
+    Returns
+    -------
+    is_max : (n_pixels,) ndarray of bool
+        Whether each pixel of a label is equal to the maximum of its
+        neighborhood.
+    """
+    cdef:
+        Py_ssize_t n_pixels = image.shape[0]
+        Py_ssize_t ndim = shape.shape[0]
+        Py_ssize_t n_offsets = offsets.shape[0]
+        Py_ssize_t i, d, o, q, lab
+        Py_ssize_t[::1] position = np.zeros(ndim, dtype=np.intp)
+        np_real_numeric value, neighbor
+        bint inside, reached
+        cnp.uint8_t[::1] is_max = np.zeros(n_pixels, dtype=np.uint8)
+
+    with nogil:
+        for i in range(n_pixels):
+            lab = label_index[i]
+            if lab >= 0:
+                value = image[i]
+                if has_center and value >= image_max[i] and value >= 0:
+                    is_max[i] = 1
+                else:
+                    # The nearest neighbors of a pixel that is not a
+                    # maximum are usually larger than it: stop at the first
+                    # larger neighbor
+                    reached = has_center
+                    for o in range(n_offsets):
+                        inside = True
+                        for d in range(ndim):
+                            q = position[d] + offsets[o, d]
+                            if (q < bbox_start[lab, d]
+                                    or q >= bbox_stop[lab, d]):
+                                inside = False
+                                break
+                        if not inside:
+                            neighbor = 0
+                        elif label_index[i + flat_offsets[o]] == lab:
+                            neighbor = image[i + flat_offsets[o]]
+                        else:
+                            neighbor = background
+                        if neighbor > value:
+                            break
+                        if neighbor == value:
+                            reached = True
+                    else:
+                        is_max[i] = reached
+
+            # Position of the next pixel
+            for d in range(ndim - 1, -1, -1):
+                position[d] += 1
+                if position[d] < shape[d]:
+                    break
+                position[d] = 0
+
+    return np.asarray(is_max, dtype=bool)
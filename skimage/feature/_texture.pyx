@@ -4,8 +4,8 @@
 #cython: wraparound=False
 import numpy as np
 cimport numpy as cnp
-from libc.math cimport sin, cos, abs
-from .._shared.interpolation cimport bilinear_interpolation, round
+from libc.math cimport sin, cos, abs, sqrt
+from .._shared.interpolation cimport round
 from .._shared.transform cimport integrate
 
 cdef extern from "numpy/npy_math.h":
@@ -16,80 +16,539 @@ from .._shared.fused_numerics cimport np_real_numeric
 
 cnp.import_array()
 
-def _glcm_loop(any_int[:, ::1] image, double[:] distances,
-               double[:] angles, Py_ssize_t levels,
-               cnp.uint32_t[:, :, :, ::1] out):
-    """Perform co-occurrence matrix accumulation.
+ctypedef fused glcm_t:
+    cnp.uint32_t
+    cnp.float64_t
+
+
+def _glcm_offsets(double[:] distances, double[:] angles):
+    """Compute the pixel offsets of co-occurrence matrices.
 
     Parameters
     ----------
-    image : ndarray
-        Integer typed input image. Only positive valued images are supported.
-        If type is other than uint8, the argument `levels` needs to be set.
     distances : ndarray
         List of pixel pair distance offsets.
     angles : ndarray
         List of pixel pair angles in radians.
+
+    Returns
+    -------
+    offsets : (n_distances, n_angles, 2) ndarray
+        The offset in rows and columns for each distance and angle.
+    """
+    cdef:
+        Py_ssize_t a_idx, d_idx
+        Py_ssize_t[:, :, ::1] offsets = np.empty(
+            (distances.shape[0], angles.shape[0], 2), dtype=np.intp)
+
+    for a_idx in range(angles.shape[0]):
+        for d_idx in range(distances.shape[0]):
+            offsets[d_idx, a_idx, 0] = round(sin(angles[a_idx])
+                                             * distances[d_idx])
+            offsets[d_idx, a_idx, 1] = round(cos(angles[a_idx])
+                                             * distances[d_idx])
+    return np.asarray(offsets)
+
+
+def _glcm_loop(any_int[:, ::1] image, Py_ssize_t offset_row,
+               Py_ssize_t offset_col, Py_ssize_t levels, glcm_t[:, :] out):
+    """Perform co-occurrence matrix accumulation for one offset.
+
+    The GIL is released, so that several offsets can be processed in
+    parallel threads.
+
+    Parameters
+    ----------
+    image : ndarray
+        Integer typed input image. Only positive valued images are supported.
+        If type is other than uint8, the argument `levels` needs to be set.
+    offset_row, offset_col : int
+        Offset of the pixel pairs, as computed by `_glcm_offsets`.
     levels : int
         The input image should contain integers in [0, `levels`-1],
         where levels indicate the number of gray-levels counted
         (typically 256 for an 8-bit image).
     out : ndarray
-        On input a 4D array of zeros, and on output it contains
+        On input a 2D array of zeros, and on output it contains
         the results of the GLCM computation.
 
     """
 
     cdef:
-        Py_ssize_t a_idx, d_idx, r, c, rows, cols, row, col, start_row,\
-                   end_row, start_col, end_col, offset_row, offset_col
+        Py_ssize_t r, c, rows, cols, row, col, start_row,\
+                   end_row, start_col, end_col
         any_int i, j
-        cnp.float64_t angle, distance
 
     with nogil:
         rows = image.shape[0]
         cols = image.shape[1]
 
-        for a_idx in range(angles.shape[0]):
-            angle = angles[a_idx]
-            for d_idx in range(distances.shape[0]):
-                distance = distances[d_idx]
-                offset_row = round(sin(angle) * distance)
-                offset_col = round(cos(angle) * distance)
-                start_row = max(0, -offset_row)
-                end_row = min(rows, rows - offset_row)
-                start_col = max(0, -offset_col)
-                end_col = min(cols, cols - offset_col)
-                for r in range(start_row, end_row):
-                    for c in range(start_col, end_col):
-                        i = image[r, c]
-                        # compute the location of the offset pixel
-                        row = r + offset_row
-                        col = c + offset_col
-                        j = image[row, col]
-                        if 0 <= i < levels and 0 <= j < levels:
-                            out[i, j, d_idx, a_idx] += 1
-
-
-cdef inline int _bit_rotate_right(int value, int length) nogil:
-    """Cyclic bit shift to the right.
+        start_row = max(0, -offset_row)
+        end_row = min(rows, rows - offset_row)
+        start_col = max(0, -offset_col)
+        end_col = min(cols, cols - offset_col)
+        for r in range(start_row, end_row):
+            for c in range(start_col, end_col):
+                i = image[r, c]
+                # compute the location of the offset pixel
+                row = r + offset_row
+                col = c + offset_col
+                j = image[row, col]
+                if 0 <= i < levels and 0 <= j < levels:
+                    out[i, j] += 1
+
+
+# Codes of the properties computed by `_glcm_local_rows`
+cdef enum:
+    CONTRAST = 0
+    DISSIMILARITY = 1
+    HOMOGENEITY = 2
+    ASM = 3
+    ENERGY = 4
+    CORRELATION = 5
+
+
+# Running sums over the co-occurrences of a window, from which the
+# properties of its normalized GLCM follow
+cdef struct GLCMSums:
+    Py_ssize_t n
+    Py_ssize_t sum_i, sum_j, sum_ii, sum_jj, sum_ij
+    Py_ssize_t contrast, dissimilarity, sum_sq_counts
+    double homogeneity
+
+
+cdef inline Py_ssize_t _glcm_sums_update(GLCMSums* sums, Py_ssize_t i,
+                                         Py_ssize_t j, Py_ssize_t sign,
+                                         cnp.uint32_t* counts,
+                                         Py_ssize_t levels) nogil:
+    """Add (``sign = 1``) or remove (``sign = -1``) a co-occurrence.
+
+    The counts of the co-occurrences are only kept if `counts` is not NULL,
+    as they are only needed for the angular second moment.
+    """
+    cdef Py_ssize_t diff = i - j, k
+    sums.n += sign
+    sums.sum_i += sign * i
+    sums.sum_j += sign * j
+    sums.sum_ii += sign * i * i
+    sums.sum_jj += sign * j * j
+    sums.sum_ij += sign * i * j
+    sums.contrast += sign * diff * diff
+    sums.dissimilarity += sign * (diff if diff > 0 else -diff)
+    sums.homogeneity += sign / (1. + diff * diff)
+    if counts:
+        # (n + 1) ** 2 - n ** 2 = 2 * n + 1
+        k = i * levels + j
+        if sign > 0:
+            sums.sum_sq_counts += 2 * counts[k] + 1
+            counts[k] += 1
+        else:
+            counts[k] -= 1
+            sums.sum_sq_counts -= 2 * counts[k] + 1
+    return sums.n
+
+
+cdef inline Py_ssize_t _glcm_sums_column(GLCMSums* sums,
+                                         any_int[:, ::1] image,
+                                         Py_ssize_t col, Py_ssize_t start_row,
+                                         Py_ssize_t end_row,
+                                         Py_ssize_t offset_row,
+                                         Py_ssize_t offset_col,
+                                         Py_ssize_t sign, bint symmetric,
+                                         cnp.uint32_t* counts,
+                                         Py_ssize_t levels) nogil:
+    """Add or remove the co-occurrences starting in a column of pixels."""
+    cdef Py_ssize_t r, i, j
+    for r in range(start_row, end_row):
+        i = image[r, col]
+        j = image[r + offset_row, col + offset_col]
+        _glcm_sums_update(sums, i, j, sign, counts, levels)
+        if symmetric:
+            _glcm_sums_update(sums, j, i, sign, counts, levels)
+    return sums.n
+
+
+cdef inline double _glcm_sums_property(GLCMSums* sums, Py_ssize_t prop) nogil:
+    """Compute a property of the normalized GLCM, as `greycoprops` does."""
+    cdef double n = sums.n, var_i, var_j
+    if prop == CORRELATION:
+        # The variances, up to a factor n ** 2, are integers computed
+        # exactly as long as the products hold in a double
+        var_i = n * sums.sum_ii - <double>sums.sum_i * sums.sum_i
+        var_j = n * sums.sum_jj - <double>sums.sum_j * sums.sum_j
+        if var_i <= 0 or var_j <= 0:
+            return 1
+        return ((n * sums.sum_ij - <double>sums.sum_i * sums.sum_j)
+                / sqrt(var_i * var_j))
+    if sums.n == 0:
+        return 0
+    if prop == CONTRAST:
+        return sums.contrast / n
+    elif prop == DISSIMILARITY:
+        return sums.dissimilarity / n
+    elif prop == HOMOGENEITY:
+        return sums.homogeneity / n
+    elif prop == ASM:
+        return sums.sum_sq_counts / (n * n)
+    else:
+        return sqrt(sums.sum_sq_counts / (n * n))
+
+
+def _glcm_local_rows(any_int[:, ::1] image, Py_ssize_t offset_row,
+                     Py_ssize_t offset_col, Py_ssize_t levels,
+                     Py_ssize_t window_rows, Py_ssize_t window_cols,
+                     bint symmetric, Py_ssize_t[::1] props,
+                     cnp.uint32_t[::1] counts,
+                     Py_ssize_t row_start, Py_ssize_t row_stop,
+                     double[:, :, :] out):
+    """Compute GLCM properties over a sliding window, for a band of rows.
+
+    The co-occurrences of the window are updated incrementally as it slides
+    along a row: only the columns of pixel pairs that enter or leave the
+    window are added or removed. The GIL is released, so that several bands
+    of rows can be processed in parallel threads.
 
     Parameters
     ----------
-    value : int
-        integer value to shift
-    length : int
-        number of bits of integer
-
+    image : ndarray
+        Integer typed input image, with values in [0, `levels`-1].
+    offset_row, offset_col : int
+        Offset of the pixel pairs, as computed by `_glcm_offsets`.
+    levels : int
+        Number of grey-levels.
+    window_rows, window_cols : int
+        Shape of the window, centered on each pixel.
+    symmetric : bool
+        Whether both (i, j) and (j, i) are counted for each pixel pair.
+    props : ndarray
+        Codes of the properties to compute.
+    counts : ndarray
+        Buffer of ``levels ** 2`` zeros to count the co-occurrences, or
+        None if the angular second moment is not needed. It is zeros again
+        on output.
+    row_start, row_stop : int
+        The band of rows to process.
+    out : (n_props, M, N) ndarray
+        The output property maps.
     """
-    return (value >> 1) | ((value & 1) << (length - 1))
+    cdef:
+        Py_ssize_t rows = image.shape[0]
+        Py_ssize_t cols = image.shape[1]
+        Py_ssize_t r, c, p, col, start_row, end_row, start_col, end_col
+        Py_ssize_t first_col, last_col
+        Py_ssize_t centre_r = window_rows // 2
+        Py_ssize_t centre_c = window_cols // 2
+        cnp.uint32_t* counts_ptr = NULL
+        GLCMSums sums
+
+    if counts is not None:
+        counts_ptr = &counts[0]
+
+    with nogil:
+        for r in range(row_start, row_stop):
+            sums.n = sums.sum_i = sums.sum_j = 0
+            sums.sum_ii = sums.sum_jj = sums.sum_ij = 0
+            sums.contrast = sums.dissimilarity = sums.sum_sq_counts = 0
+            sums.homogeneity = 0
+
+            # Rows of the pixel pairs starting in the window whose second
+            # pixel is in the window too
+            start_row = max(0, r - centre_r)
+            end_row = min(rows, r - centre_r + window_rows)
+            start_row = max(start_row, start_row - offset_row)
+            end_row = min(end_row, end_row - offset_row)
+
+            # Columns of the pixel pairs in the window, [first_col, last_col)
+            first_col = last_col = 0
+            for c in range(cols):
+                start_col = max(0, c - centre_c)
+                end_col = min(cols, c - centre_c + window_cols)
+                start_col = max(start_col, start_col - offset_col)
+                end_col = max(start_col, min(end_col, end_col - offset_col))
+
+                # Add the columns entering the window, remove the ones
+                # leaving it
+                for col in range(max(last_col, start_col), end_col):
+                    _glcm_sums_column(&sums, image, col, start_row, end_row,
+                                      offset_row, offset_col, 1, symmetric,
+                                      counts_ptr, levels)
+                for col in range(first_col, min(last_col, start_col)):
+                    _glcm_sums_column(&sums, image, col, start_row, end_row,
+                                      offset_row, offset_col, -1, symmetric,
+                                      counts_ptr, levels)
+                first_col = start_col
+                last_col = max(last_col, end_col)
+
+                for p in range(props.shape[0]):
+                    out[p, r, c] = _glcm_sums_property(&sums, props[p])
+
+            # Empty the counts for the next row
+            for col in range(first_col, last_col):
+                _glcm_sums_column(&sums, image, col, start_row, end_row,
+                                  offset_row, offset_col, -1, symmetric,
+                                  counts_ptr, levels)
+
+
+ctypedef fused lbp_out_t:
+    cnp.uint8_t
+    cnp.uint16_t
+    cnp.uint32_t
+    cnp.uint64_t
+    cnp.float32_t
+    cnp.float64_t
+
+
+# Bilinear interpolation tables of the circular neighbourhood, as built by
+# `_lbp_tables`: for each row (column) and point, the two rows (columns) to
+# interpolate between, -1 outside of the image, and the weight of the second
+# one.
+cdef struct LBPTables:
+    Py_ssize_t P
+    Py_ssize_t* row_low
+    Py_ssize_t* row_high
+    double* row_weight
+    Py_ssize_t* col_low
+    Py_ssize_t* col_high
+    double* col_weight
+    # Codes of the method for each default code, or NULL
+    Py_ssize_t* lut
+
+
+cdef inline double _lbp_pattern_code(signed char* signed_texture, int P,
+                                     char method) nogil:
+    """Compute the code of a thresholded pattern, for all methods but 'V'."""
+    cdef:
+        double lbp = 0
+        Py_ssize_t changes, i, rot_index, n_ones
+        cnp.int8_t first_zero, first_one
+        cnp.uint64_t rotated, min_rotated
+
+    # if method == b'uniform':
+    if method == b'U' or method == b'N':
+        # determine number of 0 - 1 changes
+        changes = 0
+        for i in range(P - 1):
+            changes += (signed_texture[i]
+                        - signed_texture[i + 1]) != 0
+        if method == b'N':
+            # Uniform local binary patterns are defined as patterns
+            # with at most 2 value changes (from 0 to 1 or from 1 to
+            # 0). Uniform patterns can be characterized by their
+            # number `n_ones` of 1.  The possible values for
+            # `n_ones` range from 0 to P.
+            #
+            # Here is an example for P = 4:
+            # n_ones=0: 0000
+            # n_ones=1: 0001, 1000, 0100, 0010
+            # n_ones=2: 0011, 1001, 1100, 0110
+            # n_ones=3: 0111, 1011, 1101, 1110
+            # n_ones=4: 1111
+            #
+            # For a pattern of size P there are 2 constant patterns
+            # corresponding to n_ones=0 and n_ones=P. For each other
+            # value of `n_ones` , i.e n_ones=[1..P-1], there are P
+            # possible patterns which are related to each other
+            # through circular permutations. The total number of
+            # uniform patterns is thus (2 + P * (P - 1)).
+
+            # Given any pattern (uniform or not) we must be able to
+            # associate a unique code:
+            #
+            # 1. Constant patterns patterns (with n_ones=0 and
+            # n_ones=P) and non uniform patterns are given fixed
+            # code values.
+            #
+            # 2. Other uniform patterns are indexed considering the
+            # value of n_ones, and an index called 'rot_index'
+            # reprenting the number of circular right shifts
+            # required to obtain the pattern starting from a
+            # reference position (corresponding to all zeros stacked
+            # on the right). This number of rotations (or circular
+            # right shifts) 'rot_index' is efficiently computed by
+            # considering the positions of the first 1 and the first
+            # 0 found in the pattern.
+
+            if changes <= 2:
+                # We have a uniform pattern
+                n_ones = 0  # determines the number of ones
+                first_one = -1  # position was the first one
+                first_zero = -1  # position of the first zero
+                for i in range(P):
+                    if signed_texture[i]:
+                        n_ones += 1
+                        if first_one == -1:
+                            first_one = i
+                    else:
+                        if first_zero == -1:
+                            first_zero = i
+                if n_ones == 0:
+                    lbp = 0
+                elif n_ones == P:
+                    lbp = P * (P - 1) + 1
+                else:
+                    if first_one == 0:
+                        rot_index = n_ones - first_zero
+                    else:
+                        rot_index = P - first_one
+                    lbp = 1 + (n_ones - 1) * P + rot_index
+            else:  # changes > 2
+                lbp = P * (P - 1) + 2
+        else:  # method != 'N'
+            if changes <= 2:
+                for i in range(P):
+                    lbp += signed_texture[i]
+            else:
+                lbp = P + 1
+    else:
+        # method == b'default'
+        rotated = 0
+        for i in range(P):
+            rotated |= (<cnp.uint64_t>signed_texture[i]) << i
+
+        # method == b'ror'
+        if method == b'R':
+            # shift LBP P times to the right and get minimum value
+            min_rotated = rotated
+            for i in range(1, P):
+                rotated = (rotated >> 1) | ((rotated & 1) << (P - 1))
+                if rotated < min_rotated:
+                    min_rotated = rotated
+            rotated = min_rotated
+        lbp = rotated
+
+    return lbp
+
+
+def _lbp_lut(int P, char method):
+    """Build the table of the codes of a method for each default code.
+
+    Parameters
+    ----------
+    P : int
+        Number of circularly symmetric neighbour set points.
+    method : {'R', 'U', 'N'}
+        Method to determine the pattern, see `_local_binary_pattern`.
 
+    Returns
+    -------
+    lut : (2 ** P,) ndarray
+        The code of the method of each pattern.
+    """
+    cdef:
+        Py_ssize_t[::1] lut = np.empty((<Py_ssize_t>1) << P, dtype=np.intp)
+        signed char[::1] signed_texture = np.zeros(max(P, 1), dtype=np.int8)
+        Py_ssize_t code, i
 
-def _local_binary_pattern(double[:, ::1] image,
-                          int P, float R, char method=b'D'):
+    with nogil:
+        for code in range(lut.shape[0]):
+            for i in range(P):
+                signed_texture[i] = (code >> i) & 1
+            lut[code] = <Py_ssize_t>_lbp_pattern_code(&signed_texture[0], P,
+                                                      method)
+    return np.asarray(lut)
+
+
+cdef inline double _lbp_pixel(double[:, ::1] image, Py_ssize_t r,
+                              Py_ssize_t c, LBPTables* tables, char method,
+                              double* texture,
+                              signed char* signed_texture) nogil:
+    """Compute the LBP code of a pixel."""
+    cdef:
+        Py_ssize_t P = tables.P
+        Py_ssize_t i, k_r, k_c, row_low, row_high, col_low, col_high
+        Py_ssize_t code
+        double top_left, top_right, bottom_left, bottom_right, top, bottom
+        double dr, dc, center = image[r, c]
+        double lbp, sum_, var_, texture_i
+
+    for i in range(P):
+        k_r = r * P + i
+        k_c = c * P + i
+        row_low = tables.row_low[k_r]
+        row_high = tables.row_high[k_r]
+        col_low = tables.col_low[k_c]
+        col_high = tables.col_high[k_c]
+        dr = tables.row_weight[k_r]
+        dc = tables.col_weight[k_c]
+        # Pixels outside of the image are zero
+        top_left = top_right = bottom_left = bottom_right = 0
+        if row_low >= 0:
+            if col_low >= 0:
+                top_left = image[row_low, col_low]
+            if col_high >= 0:
+                top_right = image[row_low, col_high]
+        if row_high >= 0:
+            if col_low >= 0:
+                bottom_left = image[row_high, col_low]
+            if col_high >= 0:
+                bottom_right = image[row_high, col_high]
+        top = (1 - dc) * top_left + dc * top_right
+        bottom = (1 - dc) * bottom_left + dc * bottom_right
+        texture[i] = (1 - dr) * top + dr * bottom
+
+    # if method == b'var':
+    if method == b'V':
+        # Compute the variance without passing from numpy.
+        # Following the LBP paper, we're taking a biased estimate
+        # of the variance (ddof=0)
+        sum_ = 0.0
+        var_ = 0.0
+        for i in range(P):
+            texture_i = texture[i]
+            sum_ += texture_i
+            var_ += texture_i * texture_i
+        var_ = (var_ - (sum_ * sum_) / P) / P
+        if var_ != 0:
+            lbp = var_
+        else:
+            lbp = NAN
+        return lbp
+
+    # signed / thresholded texture
+    for i in range(P):
+        if texture[i] - center >= 0:
+            signed_texture[i] = 1
+        else:
+            signed_texture[i] = 0
+
+    if tables.lut:
+        code = 0
+        for i in range(P):
+            code |= (<Py_ssize_t>signed_texture[i]) << i
+        return tables.lut[code]
+    return _lbp_pattern_code(signed_texture, P, method)
+
+
+cdef LBPTables _lbp_tables_struct(int P, tables, Py_ssize_t[::1] lut):
+    """Point to the interpolation tables, which must outlive the struct."""
+    cdef:
+        LBPTables c_tables
+        Py_ssize_t[:, ::1] row_low, row_high, col_low, col_high
+        double[:, ::1] row_weight, col_weight
+
+    row_low, row_high, row_weight, col_low, col_high, col_weight = tables
+    c_tables.P = P
+    c_tables.row_low = &row_low[0, 0]
+    c_tables.row_high = &row_high[0, 0]
+    c_tables.row_weight = &row_weight[0, 0]
+    c_tables.col_low = &col_low[0, 0]
+    c_tables.col_high = &col_high[0, 0]
+    c_tables.col_weight = &col_weight[0, 0]
+    c_tables.lut = NULL
+    if lut is not None:
+        c_tables.lut = &lut[0]
+    return c_tables
+
+
+def _local_binary_pattern(double[:, ::1] image, int P, char method,
+                          tables, Py_ssize_t[::1] lut,
+                          Py_ssize_t row_start, Py_ssize_t row_stop,
+                          lbp_out_t[:, ::1] output):
     """Gray scale and rotation invariant LBP (Local Binary Patterns).
 
     LBP is an invariant descriptor that can be used for texture classification.
+    The GIL is released, so that several bands of rows can be processed in
+    parallel threads.
 
     Parameters
     ----------
@@ -98,8 +557,6 @@ def _local_binary_pattern(double[:, ::1] image,
     P : int
         Number of circularly symmetric neighbour set points (quantization of
         the angular space).
-    R : float
-        Radius of circle (spatial resolution of the operator).
     method : {'D', 'R', 'U', 'N', 'V'}
         Method to determine the pattern.
 
@@ -108,167 +565,77 @@ def _local_binary_pattern(double[:, ::1] image,
         * 'U': 'uniform'
         * 'N': 'nri_uniform'
         * 'V': 'var'
-
-    Returns
-    -------
+    tables : tuple of ndarray
+        The interpolation tables of the rows and columns of the image, see
+        `skimage.feature.texture._lbp_tables`.
+    lut : ndarray
+        The codes of the method for each default code, see `_lbp_lut`, or
+        None to compute them for each pixel.
+    row_start, row_stop : int
+        The band of rows to process.
     output : (N, M) array
-        LBP image.
+        LBP image, filled for the given rows.
     """
+    cdef:
+        LBPTables c_tables = _lbp_tables_struct(P, tables, lut)
+        # pre-allocate arrays for computation
+        double[::1] texture = np.zeros(max(P, 1), dtype=np.double)
+        signed char[::1] signed_texture = np.zeros(max(P, 1), dtype=np.int8)
+        Py_ssize_t r, c
 
-    # texture weights
-    cdef int[::1] weights = 2 ** np.arange(P, dtype=np.int32)
-    # local position of texture elements
-    rr = - R * np.sin(2 * np.pi * np.arange(P, dtype=np.double) / P)
-    cc = R * np.cos(2 * np.pi * np.arange(P, dtype=np.double) / P)
-    cdef double[::1] rp = np.round(rr, 5)
-    cdef double[::1] cp = np.round(cc, 5)
-
-    # pre-allocate arrays for computation
-    cdef double[::1] texture = np.zeros(P, dtype=np.double)
-    cdef signed char[::1] signed_texture = np.zeros(P, dtype=np.int8)
-    cdef int[::1] rotation_chain = np.zeros(P, dtype=np.int32)
+    with nogil:
+        for r in range(row_start, row_stop):
+            for c in range(image.shape[1]):
+                output[r, c] = <lbp_out_t>_lbp_pixel(
+                    image, r, c, &c_tables, method, &texture[0],
+                    &signed_texture[0])
 
-    output_shape = (image.shape[0], image.shape[1])
-    cdef double[:, ::1] output = np.zeros(output_shape, dtype=np.double)
 
-    cdef Py_ssize_t rows = image.shape[0]
-    cdef Py_ssize_t cols = image.shape[1]
+def _local_binary_pattern_histograms(double[:, ::1] image, int P,
+                                     char method, tables,
+                                     Py_ssize_t[::1] lut,
+                                     Py_ssize_t block_rows,
+                                     Py_ssize_t block_cols,
+                                     Py_ssize_t block_row,
+                                     Py_ssize_t[:, ::1] histograms):
+    """Count the LBP codes of the blocks of a row of blocks.
 
-    cdef double lbp
-    cdef Py_ssize_t r, c, changes, i
-    cdef Py_ssize_t rot_index, n_ones
-    cdef cnp.int8_t first_zero, first_one
+    The GIL is released, so that several rows of blocks can be processed in
+    parallel threads.
 
-    # To compute the variance features
-    cdef double sum_, var_, texture_i
+    Parameters
+    ----------
+    image : (N, M) double array
+        Graylevel image.
+    P : int
+        Number of circularly symmetric neighbour set points.
+    method : {'D', 'R', 'U', 'N'}
+        Method to determine the pattern, see `_local_binary_pattern`.
+    tables : tuple of ndarray
+        The interpolation tables of the rows and columns of the image.
+    lut : ndarray
+        The codes of the method for each default code, or None.
+    block_rows, block_cols : int
+        Shape of the blocks.
+    block_row : int
+        Index of the row of blocks to process.
+    histograms : (n_blocks_col, n_bins) ndarray
+        The histograms of the blocks of the row, which are incremented.
+    """
+    cdef:
+        LBPTables c_tables = _lbp_tables_struct(P, tables, lut)
+        double[::1] texture = np.zeros(max(P, 1), dtype=np.double)
+        signed char[::1] signed_texture = np.zeros(max(P, 1), dtype=np.int8)
+        Py_ssize_t r, c, code
+        Py_ssize_t n_cols = histograms.shape[0] * block_cols
 
     with nogil:
-        for r in range(image.shape[0]):
-            for c in range(image.shape[1]):
-                for i in range(P):
-                    bilinear_interpolation[cnp.float64_t, double, double](
-                            &image[0, 0], rows, cols, r + rp[i], c + cp[i],
-                            b'C', 0, &texture[i])
-                # signed / thresholded texture
-                for i in range(P):
-                    if texture[i] - image[r, c] >= 0:
-                        signed_texture[i] = 1
-                    else:
-                        signed_texture[i] = 0
-
-                lbp = 0
-
-                # if method == b'var':
-                if method == b'V':
-                    # Compute the variance without passing from numpy.
-                    # Following the LBP paper, we're taking a biased estimate
-                    # of the variance (ddof=0)
-                    sum_ = 0.0
-                    var_ = 0.0
-                    for i in range(P):
-                        texture_i = texture[i]
-                        sum_ += texture_i
-                        var_ += texture_i * texture_i
-                    var_ = (var_ - (sum_ * sum_) / P) / P
-                    if var_ != 0:
-                        lbp = var_
-                    else:
-                        lbp = NAN
-                # if method == b'uniform':
-                elif method == b'U' or method == b'N':
-                    # determine number of 0 - 1 changes
-                    changes = 0
-                    for i in range(P - 1):
-                        changes += (signed_texture[i]
-                                    - signed_texture[i + 1]) != 0
-                    if method == b'N':
-                        # Uniform local binary patterns are defined as patterns
-                        # with at most 2 value changes (from 0 to 1 or from 1 to
-                        # 0). Uniform patterns can be characterized by their
-                        # number `n_ones` of 1.  The possible values for
-                        # `n_ones` range from 0 to P.
-                        #
-                        # Here is an example for P = 4:
-                        # n_ones=0: 0000
-                        # n_ones=1: 0001, 1000, 0100, 0010
-                        # n_ones=2: 0011, 1001, 1100, 0110
-                        # n_ones=3: 0111, 1011, 1101, 1110
-                        # n_ones=4: 1111
-                        #
-                        # For a pattern of size P there are 2 constant patterns
-                        # corresponding to n_ones=0 and n_ones=P. For each other
-                        # value of `n_ones` , i.e n_ones=[1..P-1], there are P
-                        # possible patterns which are related to each other
-                        # through circular permutations. The total number of
-                        # uniform patterns is thus (2 + P * (P - 1)).
-
-                        # Given any pattern (uniform or not) we must be able to
-                        # associate a unique code:
-                        #
-                        # 1. Constant patterns patterns (with n_ones=0 and
-                        # n_ones=P) and non uniform patterns are given fixed
-                        # code values.
-                        #
-                        # 2. Other uniform patterns are indexed considering the
-                        # value of n_ones, and an index called 'rot_index'
-                        # reprenting the number of circular right shifts
-                        # required to obtain the pattern starting from a
-                        # reference position (corresponding to all zeros stacked
-                        # on the right). This number of rotations (or circular
-                        # right shifts) 'rot_index' is efficiently computed by
-                        # considering the positions of the first 1 and the first
-                        # 0 found in the pattern.
-
-                        if changes <= 2:
-                            # We have a uniform pattern
-                            n_ones = 0  # determines the number of ones
-                            first_one = -1  # position was the first one
-                            first_zero = -1  # position of the first zero
-                            for i in range(P):
-                                if signed_texture[i]:
-                                    n_ones += 1
-                                    if first_one == -1:
-                                        first_one = i
-                                else:
-                                    if first_zero == -1:
-                                        first_zero = i
-                            if n_ones == 0:
-                                lbp = 0
-                            elif n_ones == P:
-                                lbp = P * (P - 1) + 1
-                            else:
-                                if first_one == 0:
-                                    rot_index = n_ones - first_zero
-                                else:
-                                    rot_index = P - first_one
-                                lbp = 1 + (n_ones - 1) * P + rot_index
-                        else:  # changes > 2
-                            lbp = P * (P - 1) + 2
-                    else:  # method != 'N'
-                        if changes <= 2:
-                            for i in range(P):
-                                lbp += signed_texture[i]
-                        else:
-                            lbp = P + 1
-                else:
-                    # method == b'default'
-                    for i in range(P):
-                        lbp += signed_texture[i] * weights[i]
-
-                    # method == b'ror'
-                    if method == b'R':
-                        # shift LBP P times to the right and get minimum value
-                        rotation_chain[0] = <int>lbp
-                        for i in range(1, P):
-                            rotation_chain[i] = \
-                                _bit_rotate_right(rotation_chain[i - 1], P)
-                        lbp = rotation_chain[0]
-                        for i in range(1, P):
-                            lbp = min(lbp, rotation_chain[i])
-
-                output[r, c] = lbp
-
-    return np.asarray(output)
+        for r in range(block_row * block_rows, (block_row + 1) * block_rows):
+            for c in range(n_cols):
+                code = <Py_ssize_t>_lbp_pixel(
+                    image, r, c, &c_tables, method, &texture[0],
+                    &signed_texture[0])
+                histograms[c // block_cols, code] += 1
 
 
 # Constant values that are used by `_multiblock_lbp` function.
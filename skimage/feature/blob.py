@@ -4,10 +4,10 @@ import math
 from math import sqrt, log
 from scipy import spatial
 from ..util import img_as_float
-from .peak import peak_local_max
+from .peak import _scale_space_peaks
 from ._hessian_det_appx import _hessian_matrix_det
 from ..transform import integral_image
-from .._shared.utils import check_nD
+from .._shared.utils import check_nD, _map_in_threads
 
 
 # This basic blob detection algorithm is based on:
@@ -22,34 +22,34 @@ def _compute_disk_overlap(d, r1, r2):
 
     Parameters
     ----------
-    d : float
+    d : float or ndarray
         Distance between centers.
-    r1 : float
+    r1 : float or ndarray
         Radius of the first disk.
-    r2 : float
+    r2 : float or ndarray
         Radius of the second disk.
 
     Returns
     -------
-    fraction: float
+    fraction: float or ndarray
         Fraction of area of the overlap between the two disks.
     """
 
     ratio1 = (d ** 2 + r1 ** 2 - r2 ** 2) / (2 * d * r1)
     ratio1 = np.clip(ratio1, -1, 1)
-    acos1 = math.acos(ratio1)
+    acos1 = np.arccos(ratio1)
 
     ratio2 = (d ** 2 + r2 ** 2 - r1 ** 2) / (2 * d * r2)
     ratio2 = np.clip(ratio2, -1, 1)
-    acos2 = math.acos(ratio2)
+    acos2 = np.arccos(ratio2)
 
     a = -d + r2 + r1
     b = d - r2 + r1
     c = d + r2 - r1
     d = d + r2 + r1
     area = (r1 ** 2 * acos1 + r2 ** 2 * acos2 -
-            0.5 * sqrt(abs(a * b * c * d)))
-    return area / (math.pi * (min(r1, r2) ** 2))
+            0.5 * np.sqrt(np.abs(a * b * c * d)))
+    return area / (math.pi * (np.minimum(r1, r2) ** 2))
 
 
 def _compute_sphere_overlap(d, r1, r2):
@@ -59,16 +59,16 @@ def _compute_sphere_overlap(d, r1, r2):
 
     Parameters
     ----------
-    d : float
+    d : float or ndarray
         Distance between centers.
-    r1 : float
+    r1 : float or ndarray
         Radius of the first sphere.
-    r2 : float
+    r2 : float or ndarray
         Radius of the second sphere.
 
     Returns
     -------
-    fraction: float
+    fraction: float or ndarray
         Fraction of volume of the overlap between the two spheres.
 
     Notes
@@ -78,7 +78,7 @@ def _compute_sphere_overlap(d, r1, r2):
     """
     vol = (math.pi / (12 * d) * (r1 + r2 - d)**2 *
            (d**2 + 2 * d * (r1 + r2) - 3 * (r1**2 + r2**2) + 6 * r1 * r2))
-    return vol / (4./3 * math.pi * min(r1, r2) ** 3)
+    return vol / (4./3 * math.pi * np.minimum(r1, r2) ** 3)
 
 
 def _blob_overlap(blob1, blob2, *, sigma_dim=1):
@@ -108,39 +108,62 @@ def _blob_overlap(blob1, blob2, *, sigma_dim=1):
     f : float
         Fraction of overlapped area (or volume in 3D).
     """
-    ndim = len(blob1) - sigma_dim
+    blob1 = np.asarray(blob1, dtype=float)[np.newaxis]
+    blob2 = np.asarray(blob2, dtype=float)[np.newaxis]
+    return float(_blob_overlaps(blob1, blob2, sigma_dim=sigma_dim)[0])
+
+
+def _blob_overlaps(blobs1, blobs2, *, sigma_dim=1):
+    """Finds the overlapping area fractions between pairs of blobs.
+
+    Parameters
+    ----------
+    blobs1, blobs2 : (n, ndim + sigma_dim) ndarray
+        The first and second blob of each pair, as rows of
+        ``(row, col, sigma)`` or ``(pln, row, col, sigma)`` values.
+    sigma_dim : int, optional
+        The dimensionality of the sigma value. Can be 1 or the same as the
+        dimensionality of the blob space (2 or 3).
+
+    Returns
+    -------
+    f : (n,) ndarray
+        Fraction of overlapped area (or volume in 3D) of each pair. It is
+        always 0 for dimension greater than 3.
+    """
+    ndim = blobs1.shape[1] - sigma_dim
+    overlaps = np.zeros(len(blobs1))
     if ndim > 3:
-        return 0.0
+        return overlaps
     root_ndim = sqrt(ndim)
 
     # we divide coordinates by sigma * sqrt(ndim) to rescale space to isotropy,
     # giving spheres of radius = 1 or < 1.
-    if blob1[-1] == blob2[-1] == 0:
-        return 0.0
-    elif blob1[-1] > blob2[-1]:
-        max_sigma = blob1[-sigma_dim:]
-        r1 = 1
-        r2 = blob2[-1] / blob1[-1]
-    else:
-        max_sigma = blob2[-sigma_dim:]
-        r2 = 1
-        r1 = blob1[-1] / blob2[-1]
-    pos1 = blob1[:ndim] / (max_sigma * root_ndim)
-    pos2 = blob2[:ndim] / (max_sigma * root_ndim)
-
-    d = np.sqrt(np.sum((pos2 - pos1)**2))
-    if d > r1 + r2:  # centers farther than sum of radii, so no overlap
-        return 0.0
-
-    # one blob is inside the other
-    if d <= abs(r1 - r2):
-        return 1.0
-
+    sigma1 = blobs1[:, -1]
+    sigma2 = blobs2[:, -1]
+    first_larger = sigma1 > sigma2
+    max_sigma = np.where(first_larger[:, np.newaxis],
+                         blobs1[:, -sigma_dim:], blobs2[:, -sigma_dim:])
+    # pairs of blobs of sigma 0 give nan, and are dealt with below
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r1 = np.where(first_larger, 1, sigma1 / sigma2)
+        r2 = np.where(first_larger, sigma2 / sigma1, 1)
+        pos1 = blobs1[:, :ndim] / (max_sigma * root_ndim)
+        pos2 = blobs2[:, :ndim] / (max_sigma * root_ndim)
+        d = np.sqrt(np.sum((pos2 - pos1)**2, axis=1))
+
+    # centers farther than sum of radii have no overlap, and one blob inside
+    # the other overlaps fully
+    inside = d <= np.abs(r1 - r2)
+    overlaps[inside] = 1
+    partial = ~inside & (d <= r1 + r2)
+
+    d, r1, r2 = d[partial], r1[partial], r2[partial]
     if ndim == 2:
-        return _compute_disk_overlap(d, r1, r2)
-
+        overlaps[partial] = _compute_disk_overlap(d, r1, r2)
     else:  # ndim=3 http://mathworld.wolfram.com/Sphere-SphereIntersection.html
-        return _compute_sphere_overlap(d, r1, r2)
+        overlaps[partial] = _compute_sphere_overlap(d, r1, r2)
+    return overlaps
 
 
 def _prune_blobs(blobs_array, overlap, *, sigma_dim=1):
@@ -166,25 +189,48 @@ def _prune_blobs(blobs_array, overlap, *, sigma_dim=1):
     -------
     A : ndarray
         `array` with overlapping blobs removed.
+
+    Notes
+    -----
+    Blobs are considered by decreasing sigma, the last of two blobs with the
+    same sigma first. A blob is eliminated if it overlaps a larger blob which
+    was not eliminated itself.
     """
     sigma = blobs_array[:, -sigma_dim:].max()
     distance = 2 * sigma * sqrt(blobs_array.shape[1] - sigma_dim)
     tree = spatial.cKDTree(blobs_array[:, :-sigma_dim])
-    pairs = np.array(list(tree.query_pairs(distance)))
+    pairs = tree.query_pairs(distance, output_type='ndarray')
     if len(pairs) == 0:
         return blobs_array
-    else:
-        for (i, j) in pairs:
-            blob1, blob2 = blobs_array[i], blobs_array[j]
-            if _blob_overlap(blob1, blob2, sigma_dim=sigma_dim) > overlap:
-                # note: this test works even in the anisotropic case because
-                # all sigmas increase together.
-                if blob1[-1] > blob2[-1]:
-                    blob2[-1] = 0
-                else:
-                    blob1[-1] = 0
 
-    return np.stack([b for b in blobs_array if b[-1] > 0])
+    overlaps = _blob_overlaps(blobs_array[pairs[:, 0]],
+                              blobs_array[pairs[:, 1]], sigma_dim=sigma_dim)
+    pairs = pairs[overlaps > overlap]
+    # note: comparing the last sigma works even in the anisotropic case
+    # because all sigmas increase together.
+    first_larger = blobs_array[pairs[:, 0], -1] > blobs_array[pairs[:, 1], -1]
+    larger = np.where(first_larger, pairs[:, 0], pairs[:, 1])
+    smaller = np.where(first_larger, pairs[:, 1], pairs[:, 0])
+
+    # Resolve the eliminations down the chains of overlapping blobs: a blob
+    # is kept once all the larger blobs it overlaps are eliminated, and
+    # eliminated as soon as one of them is kept.
+    UNKNOWN, KEPT, ELIMINATED = 0, 1, 2
+    state = np.full(len(blobs_array), KEPT, dtype=np.uint8)
+    state[smaller] = UNKNOWN
+    undecided = np.zeros(len(blobs_array), dtype=bool)
+    while len(smaller):
+        state[smaller[state[larger] == KEPT]] = ELIMINATED
+        undecided[smaller[state[larger] != ELIMINATED]] = True
+        # the blobs still unknown are all in smaller
+        decided = (state[smaller] == UNKNOWN) & ~undecided[smaller]
+        state[smaller[decided]] = KEPT
+        undecided[smaller] = False
+        # only the pairs of undecided blobs are needed further
+        remaining = state[smaller] == UNKNOWN
+        larger, smaller = larger[remaining], smaller[remaining]
+
+    return blobs_array[state == KEPT]
 
 
 def _format_exclude_border(img_ndim, exclude_border):
@@ -215,7 +261,7 @@ def _format_exclude_border(img_ndim, exclude_border):
 
 
 def blob_dog(image, min_sigma=1, max_sigma=50, sigma_ratio=1.6, threshold=2.0,
-             overlap=.5, *, exclude_border=False):
+             overlap=.5, *, exclude_border=False, num_workers=None):
     r"""Finds blobs in the given grayscale image.
 
     Blobs are found using the Difference of Gaussian (DoG) method [1]_.
@@ -256,6 +302,10 @@ def blob_dog(image, min_sigma=1, max_sigma=50, sigma_ratio=1.6, threshold=2.0,
         `exclude_border`-pixels of the border of the image.
         If zero or False, peaks are identified regardless of their
         distance from the border.
+    num_workers : int, optional
+        The number of parallel threads used to filter the image at the
+        different scales. If set to ``None``, ``os.cpu_count()`` threads are
+        used.
 
     Returns
     -------
@@ -334,23 +384,24 @@ def blob_dog(image, min_sigma=1, max_sigma=50, sigma_ratio=1.6, threshold=2.0,
     sigma_list = np.array([min_sigma * (sigma_ratio ** i)
                            for i in range(k + 1)])
 
-    gaussian_images = [gaussian_filter(image, s) for s in sigma_list]
-
-    # computing difference between two successive Gaussian blurred images
-    # multiplying with average standard deviation provides scale invariance
-    dog_images = [(gaussian_images[i] - gaussian_images[i + 1])
-                  * np.mean(sigma_list[i]) for i in range(k)]
-
-    image_cube = np.stack(dog_images, axis=-1)
+    def dog_images():
+        # The gaussian filters are computed in parallel; only the few ahead of
+        # the difference being computed are held in memory
+        gaussian_images = _map_in_threads(
+            lambda s: gaussian_filter(image, s), sigma_list, num_workers)
+        previous = next(gaussian_images)
+        for i, current in enumerate(gaussian_images):
+            # computing difference between two successive Gaussian blurred
+            # images multiplying with average standard deviation provides
+            # scale invariance
+            yield (previous - current) * np.mean(sigma_list[i])
+            previous = current
 
     exclude_border = _format_exclude_border(image.ndim, exclude_border)
-    local_maxima = peak_local_max(
-        image_cube,
-        threshold_abs=threshold,
-        footprint=np.ones((3,) * (image.ndim + 1)),
-        threshold_rel=0.0,
-        exclude_border=exclude_border,
-    )
+    # local maxima of the scale space of the DoG images, found without
+    # stacking them into a cube
+    local_maxima = _scale_space_peaks(dog_images(), threshold,
+                                      exclude_border[:image.ndim])
 
     # Catch no peaks
     if local_maxima.size == 0:
@@ -376,7 +427,8 @@ def blob_dog(image, min_sigma=1, max_sigma=50, sigma_ratio=1.6, threshold=2.0,
 
 
 def blob_log(image, min_sigma=1, max_sigma=50, num_sigma=10, threshold=.2,
-             overlap=.5, log_scale=False, *, exclude_border=False):
+             overlap=.5, log_scale=False, *, exclude_border=False,
+             num_workers=None):
     r"""Finds blobs in the given grayscale image.
 
     Blobs are found using the Laplacian of Gaussian (LoG) method [1]_.
@@ -421,6 +473,10 @@ def blob_log(image, min_sigma=1, max_sigma=50, num_sigma=10, threshold=.2,
         `exclude_border`-pixels of the border of the image.
         If zero or False, peaks are identified regardless of their
         distance from the border.
+    num_workers : int, optional
+        The number of parallel threads used to filter the image at the
+        different scales. If set to ``None``, ``os.cpu_count()`` threads are
+        used.
 
     Returns
     -------
@@ -498,19 +554,13 @@ def blob_log(image, min_sigma=1, max_sigma=50, num_sigma=10, threshold=.2,
 
     # computing gaussian laplace
     # average s**2 provides scale invariance
-    gl_images = [-gaussian_laplace(image, s) * np.mean(s) ** 2
-                 for s in sigma_list]
-
-    image_cube = np.stack(gl_images, axis=-1)
+    gl_images = _map_in_threads(
+        lambda s: -gaussian_laplace(image, s) * np.mean(s) ** 2,
+        sigma_list, num_workers)
 
     exclude_border = _format_exclude_border(image.ndim, exclude_border)
-    local_maxima = peak_local_max(
-        image_cube,
-        threshold_abs=threshold,
-        footprint=np.ones((3,) * (image.ndim + 1)),
-        threshold_rel=0.0,
-        exclude_border=exclude_border,
-    )
+    local_maxima = _scale_space_peaks(gl_images, threshold,
+                                      exclude_border[:image.ndim])
 
     # Catch no peaks
     if local_maxima.size == 0:
@@ -536,7 +586,7 @@ def blob_log(image, min_sigma=1, max_sigma=50, num_sigma=10, threshold=.2,
 
 
 def blob_doh(image, min_sigma=1, max_sigma=30, num_sigma=10, threshold=0.01,
-             overlap=.5, log_scale=False):
+             overlap=.5, log_scale=False, *, num_workers=None):
     """Finds blobs in the given grayscale image.
 
     Blobs are found using the Determinant of Hessian method [1]_. For each blob
@@ -567,6 +617,10 @@ def blob_doh(image, min_sigma=1, max_sigma=30, num_sigma=10, threshold=0.01,
         If set intermediate values of standard deviations are interpolated
         using a logarithmic scale to the base `10`. If not, linear
         interpolation is used.
+    num_workers : int, optional
+        The number of parallel threads used to filter the image at the
+        different scales. If set to ``None``, ``os.cpu_count()`` threads are
+        used.
 
     Returns
     -------
@@ -628,13 +682,11 @@ def blob_doh(image, min_sigma=1, max_sigma=30, num_sigma=10, threshold=0.01,
     else:
         sigma_list = np.linspace(min_sigma, max_sigma, num_sigma)
 
-    hessian_images = [_hessian_matrix_det(image, s) for s in sigma_list]
-    image_cube = np.dstack(hessian_images)
-
-    local_maxima = peak_local_max(image_cube, threshold_abs=threshold,
-                                  footprint=np.ones((3,) * image_cube.ndim),
-                                  threshold_rel=0.0,
-                                  exclude_border=False)
+    hessian_images = _map_in_threads(
+        lambda s: np.asarray(_hessian_matrix_det(image, s)), sigma_list,
+        num_workers)
+    local_maxima = _scale_space_peaks(hessian_images, threshold,
+                                      (0,) * image.ndim)
 
     # Catch no peaks
     if local_maxima.size == 0:
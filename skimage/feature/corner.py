@@ -1,9 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from itertools import combinations_with_replacement
 
 import numpy as np
 from scipy import ndimage as ndi
 from scipy import stats
-from scipy import spatial
 
 from ..util import img_as_float
 from .peak import peak_local_max
@@ -11,11 +12,84 @@ from .util import _prepare_grayscale_input_2D, _prepare_grayscale_input_nD
 from .corner_cy import _corner_fast
 from ._hessian_det_appx import _hessian_matrix_det
 from ..transform import integral_image
-from .._shared.utils import safe_as_int
-from .corner_cy import _corner_moravec, _corner_orientations
+from .._shared.utils import safe_as_int, check_nD
+from .._shared.coord import _ensure_spacing
+from .corner_cy import (_corner_moravec, _corner_orientations,
+                        _symmetric_eigvals_2x2, _symmetric_eigvals_3x3)
 from warnings import warn
 
 
+# Number of rows of the bands in which the response images are computed
+_CORNER_ROWS = 256
+# Number of matrices processed at once by the closed-form eigenvalue kernels
+_EIGVALS_CHUNK = 65536
+
+
+def _gaussian_halo(sigma):
+    """Radius of the kernel of `scipy.ndimage.gaussian_filter`."""
+    return int(4.0 * float(np.max(sigma)) + 0.5)
+
+
+def _apply_by_bands(func, image, halo, num_workers=None):
+    """Apply a local operation to overlapping bands of rows of an image.
+
+    Parameters
+    ----------
+    func : callable
+        Function mapping an array to a tuple of arrays of the same shape.
+    image : ndarray
+        Input image.
+    halo : int or None
+        Number of rows of `image` that the value of the outputs of `func` at
+        a given row depends on, on each side. If None, `func` is applied to
+        the whole image.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
+
+    Returns
+    -------
+    out : tuple of ndarray
+        The outputs of ``func(image)``.
+
+    Notes
+    -----
+    Each band is extended by `halo` rows on both sides, so that its rows get
+    exactly the same values as when `func` is applied to the whole image,
+    while the temporary arrays of `func` only have the size of a band.
+    """
+    n_rows = image.shape[0]
+    if halo is None or n_rows <= _CORNER_ROWS:
+        return tuple(func(image))
+
+    def process_band(start):
+        stop = min(start + _CORNER_ROWS, n_rows)
+        band_start = max(start - halo, 0)
+        band_stop = min(stop + halo, n_rows)
+        results = func(image[band_start:band_stop])
+        return [result[start - band_start:stop - band_start]
+                for result in results]
+
+    # The first band sets the dtypes of the outputs
+    first = process_band(0)
+    out = tuple(np.empty((n_rows,) + result.shape[1:], dtype=result.dtype)
+                for result in first)
+    for o, result in zip(out, first):
+        o[:_CORNER_ROWS] = result
+
+    def fill_band(start):
+        for o, result in zip(out, process_band(start)):
+            o[start:start + _CORNER_ROWS] = result
+
+    with ThreadPoolExecutor(max_workers=num_workers) as ex:
+        # Iterate over the results, to raise the exceptions of the threads
+        for _ in ex.map(fill_band, range(_CORNER_ROWS, n_rows,
+                                         _CORNER_ROWS)):
+            pass
+
+    return out
+
+
 def _compute_derivatives(image, mode='constant', cval=0):
     """Compute derivatives in axis directions using the Sobel operator.
 
@@ -118,6 +192,12 @@ def structure_tensor(image, sigma=1, mode='constant', cval=0, order=None):
 
     image = _prepare_grayscale_input_nD(image)
 
+    return _structure_tensor(image, sigma, mode, cval, order)
+
+
+def _structure_tensor(image, sigma=1, mode='constant', cval=0, order='rc'):
+    """Compute the structure tensor of a float image, see `structure_tensor`.
+    """
     derivatives = _compute_derivatives(image, mode=mode, cval=cval)
 
     if order == 'xy':
@@ -130,6 +210,25 @@ def structure_tensor(image, sigma=1, mode='constant', cval=0, order=None):
     return A_elems
 
 
+def _structure_tensor_halo(sigma):
+    """Halo of the bands for `_structure_tensor`, see `_apply_by_bands`."""
+    # The Sobel operator, and then the Gaussian kernel
+    return 1 + _gaussian_halo(sigma)
+
+
+def _prepare_structure_tensor_input(image):
+    """Check the shape of an image, whose bands are converted to float by
+    `_structure_tensor_2D`."""
+    image = np.squeeze(image)
+    check_nD(image, 2)
+    return image
+
+
+def _structure_tensor_2D(image, sigma):
+    """Structure tensor of a band of an image, for the corner measures."""
+    return _structure_tensor(img_as_float(image), sigma, order='rc')
+
+
 def hessian_matrix(image, sigma=1, mode='constant', cval=0, order='rc'):
     """Compute Hessian matrix.
 
@@ -199,7 +298,13 @@ def hessian_matrix(image, sigma=1, mode='constant', cval=0, order='rc'):
     return H_elems
 
 
-def hessian_matrix_det(image, sigma=1, approximate=True):
+def _hessian_matrix_det_band(image, sigma):
+    """Determinant of the Hessian matrix of a band of a float image."""
+    return np.linalg.det(_symmetric_image(hessian_matrix(image, sigma))),
+
+
+def hessian_matrix_det(image, sigma=1, approximate=True, *,
+                       num_workers=None):
     """Compute the approximate Hessian Determinant over an image.
 
     The 2D approximate method uses box filters over integral images to
@@ -215,6 +320,9 @@ def hessian_matrix_det(image, sigma=1, approximate=True):
     approximate : bool, optional
         If ``True`` and the image is 2D, use a much faster approximate
         computation. This argument has no effect on 3D and higher images.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
@@ -237,11 +345,27 @@ def hessian_matrix_det(image, sigma=1, approximate=True):
     """
     image = img_as_float(image)
     if image.ndim == 2 and approximate:
-        integral = integral_image(image)
-        return np.array(_hessian_matrix_det(integral, sigma))
+        # The box filters are always summed in double precision
+        integral = integral_image(image.astype(np.double, copy=False))
+        out = np.empty(image.shape)
+
+        def process_band(start):
+            stop = min(start + _CORNER_ROWS, image.shape[0])
+            _hessian_matrix_det(integral, sigma, out, start, stop)
+
+        with ThreadPoolExecutor(max_workers=num_workers) as ex:
+            # Iterate over the results, to raise the exceptions of the threads
+            for _ in ex.map(process_band, range(0, image.shape[0],
+                                                _CORNER_ROWS)):
+                pass
+
+        return out
     else:  # slower brute-force implementation for nD images
-        hessian_mat_array = _symmetric_image(hessian_matrix(image, sigma))
-        return np.linalg.det(hessian_mat_array)
+        # The Gaussian kernel, and then two finite differences
+        halo = _gaussian_halo(sigma) + 2
+        out, = _apply_by_bands(partial(_hessian_matrix_det_band, sigma=sigma),
+                               image, halo, num_workers)
+        return out
 
 
 def _image_orthogonal_matrix22_eigvals(M00, M01, M11):
@@ -250,7 +374,43 @@ def _image_orthogonal_matrix22_eigvals(M00, M01, M11):
     return l1, l2
 
 
-def _symmetric_compute_eigenvalues(S_elems):
+def _symmetric_closed_form_eigenvalues(S_elems, num_workers=None):
+    """Compute the eigenvalues of symmetric 2x2 or 3x3 matrices in closed
+    form, see `_symmetric_compute_eigenvalues`.
+
+    The eigenvalues are computed in double precision, and stored with the
+    precision of the elements: float32 elements give float32 eigenvalues.
+    """
+    ndim = 2 if len(S_elems) == 3 else 3
+    kernel = _symmetric_eigvals_2x2 if ndim == 2 else _symmetric_eigvals_3x3
+
+    S_elems = [np.asarray(elem) for elem in S_elems]
+    if all(elem.dtype == np.float32 for elem in S_elems):
+        dtype = np.float32
+    else:
+        dtype = np.float64
+    shape = S_elems[0].shape
+    S_elems = [np.ascontiguousarray(elem, dtype=dtype).ravel()
+               for elem in S_elems]
+    size = S_elems[0].size
+    eigs = np.empty((ndim, size), dtype=dtype)
+
+    def process_chunk(start):
+        stop = min(start + _EIGVALS_CHUNK, size)
+        kernel(*S_elems, eigs, start, stop)
+
+    if size <= _EIGVALS_CHUNK:
+        process_chunk(0)
+    else:
+        with ThreadPoolExecutor(max_workers=num_workers) as ex:
+            # Iterate over the results, to raise the exceptions of the threads
+            for _ in ex.map(process_chunk, range(0, size, _EIGVALS_CHUNK)):
+                pass
+
+    return eigs.reshape((ndim,) + shape)
+
+
+def _symmetric_compute_eigenvalues(S_elems, num_workers=None):
     """Compute eigenvalues from the upperdiagonal entries of a symmetric matrix
 
     Parameters
@@ -258,6 +418,10 @@ def _symmetric_compute_eigenvalues(S_elems):
     S_elems : list of ndarray
         The upper-diagonal elements of the matrix, as returned by
         `hessian_matrix` or `structure_tensor`.
+    num_workers : int, optional
+        The number of parallel threads to use for 2D and 3D matrices. If set to
+        ``None``, the default number of threads of
+        `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
@@ -267,8 +431,8 @@ def _symmetric_compute_eigenvalues(S_elems):
         ith-largest eigenvalue at position (j, k).
     """
 
-    if len(S_elems) == 3:  # Use fast Cython code for 2D
-        eigs = np.stack(_image_orthogonal_matrix22_eigvals(*S_elems))
+    if len(S_elems) in (3, 6):  # Use fast Cython code for 2D and 3D
+        eigs = _symmetric_closed_form_eigenvalues(S_elems, num_workers)
     else:
         matrices = _symmetric_image(S_elems)
         # eigvalsh returns eigenvalues in increasing order. We want decreasing
@@ -303,7 +467,7 @@ def _symmetric_image(S_elems):
     return symmetric_image
 
 
-def structure_tensor_eigenvalues(A_elems):
+def structure_tensor_eigenvalues(A_elems, *, num_workers=None):
     """Compute eigenvalues of structure tensor.
 
     Parameters
@@ -311,6 +475,10 @@ def structure_tensor_eigenvalues(A_elems):
     A_elems : list of ndarray
         The upper-diagonal elements of the structure tensor, as returned
         by `structure_tensor`.
+    num_workers : int, optional
+        The number of parallel threads to use for 2D and 3D images. If set to
+        ``None``, the default number of threads of
+        `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
@@ -337,7 +505,7 @@ def structure_tensor_eigenvalues(A_elems):
     --------
     structure_tensor
     """
-    return _symmetric_compute_eigenvalues(A_elems)
+    return _symmetric_compute_eigenvalues(A_elems, num_workers)
 
 
 def structure_tensor_eigvals(Axx, Axy, Ayy):
@@ -381,7 +549,7 @@ def structure_tensor_eigvals(Axx, Axy, Ayy):
     return _image_orthogonal_matrix22_eigvals(Axx, Axy, Ayy)
 
 
-def hessian_matrix_eigvals(H_elems):
+def hessian_matrix_eigvals(H_elems, *, num_workers=None):
     """Compute eigenvalues of Hessian matrix.
 
     Parameters
@@ -389,6 +557,10 @@ def hessian_matrix_eigvals(H_elems):
     H_elems : list of ndarray
         The upper-diagonal elements of the Hessian matrix, as returned
         by `hessian_matrix`.
+    num_workers : int, optional
+        The number of parallel threads to use for 2D and 3D images. If set to
+        ``None``, the default number of threads of
+        `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
@@ -410,7 +582,7 @@ def hessian_matrix_eigvals(H_elems):
            [ 0.,  1.,  0.,  1.,  0.],
            [ 0.,  0.,  2.,  0.,  0.]])
     """
-    return _symmetric_compute_eigenvalues(H_elems)
+    return _symmetric_compute_eigenvalues(H_elems, num_workers)
 
 
 def shape_index(image, sigma=1, mode='constant', cval=0):
@@ -485,7 +657,25 @@ def shape_index(image, sigma=1, mode='constant', cval=0):
     return (2.0 / np.pi) * np.arctan((l2 + l1) / (l2 - l1))
 
 
-def corner_kitchen_rosenfeld(image, mode='constant', cval=0):
+def _kitchen_rosenfeld_band(image, mode, cval):
+    """Kitchen and Rosenfeld corner measure of a band of an image."""
+    imy, imx = _compute_derivatives(image, mode=mode, cval=cval)
+    imxy, imxx = _compute_derivatives(imx, mode=mode, cval=cval)
+    imyy, imyx = _compute_derivatives(imy, mode=mode, cval=cval)
+
+    numerator = (imxx * imy ** 2 + imyy * imx ** 2 - 2 * imxy * imx * imy)
+    denominator = (imx ** 2 + imy ** 2)
+
+    response = np.zeros_like(image, dtype=np.double)
+
+    mask = denominator != 0
+    response[mask] = numerator[mask] / denominator[mask]
+
+    return response,
+
+
+def corner_kitchen_rosenfeld(image, mode='constant', cval=0, *,
+                             num_workers=None):
     """Compute Kitchen and Rosenfeld corner measure response image.
 
     The corner measure is calculated as follows::
@@ -505,6 +695,9 @@ def corner_kitchen_rosenfeld(image, mode='constant', cval=0):
     cval : float, optional
         Used in conjunction with mode 'constant', the value outside
         the image boundaries.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
@@ -517,23 +710,35 @@ def corner_kitchen_rosenfeld(image, mode='constant', cval=0):
            Pattern recognition letters, 1(2), 95-102.
            :DOI:`10.1016/0167-8655(82)90020-4`
     """
+    image = np.asarray(image)
+    # Two Sobel operators, the wrap mode relates the first and last rows
+    halo = None if mode == 'wrap' else 2
+    response, = _apply_by_bands(
+        partial(_kitchen_rosenfeld_band, mode=mode, cval=cval), image, halo,
+        num_workers)
 
-    imy, imx = _compute_derivatives(image, mode=mode, cval=cval)
-    imxy, imxx = _compute_derivatives(imx, mode=mode, cval=cval)
-    imyy, imyx = _compute_derivatives(imy, mode=mode, cval=cval)
+    return response
 
-    numerator = (imxx * imy ** 2 + imyy * imx ** 2 - 2 * imxy * imx * imy)
-    denominator = (imx ** 2 + imy ** 2)
 
-    response = np.zeros_like(image, dtype=np.double)
+def _harris_band(image, method, k, eps, sigma):
+    """Harris corner measure of a band of an image."""
+    Arr, Arc, Acc = _structure_tensor_2D(image, sigma)
 
-    mask = denominator != 0
-    response[mask] = numerator[mask] / denominator[mask]
+    # determinant
+    detA = Arr * Acc - Arc ** 2
+    # trace
+    traceA = Arr + Acc
 
-    return response
+    if method == 'k':
+        response = detA - k * traceA ** 2
+    else:
+        response = 2 * detA / (traceA + eps)
+
+    return response,
 
 
-def corner_harris(image, method='k', k=0.05, eps=1e-6, sigma=1):
+def corner_harris(image, method='k', k=0.05, eps=1e-6, sigma=1, *,
+                  num_workers=None):
     """Compute Harris corner measure response image.
 
     This corner detector uses information from the auto-correlation matrix A::
@@ -564,12 +769,21 @@ def corner_harris(image, method='k', k=0.05, eps=1e-6, sigma=1):
     sigma : float, optional
         Standard deviation used for the Gaussian kernel, which is used as
         weighting function for the auto-correlation matrix.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
     response : ndarray
         Harris response image.
 
+    Notes
+    -----
+    The response image is computed by bands of rows, so that the temporary
+    arrays only have the size of a band. A float32 image gives a float32
+    response image.
+
     References
     ----------
     .. [1] https://en.wikipedia.org/wiki/Corner_detection
@@ -597,23 +811,25 @@ def corner_harris(image, method='k', k=0.05, eps=1e-6, sigma=1):
            [7, 7]])
 
     """
+    image = _prepare_structure_tensor_input(image)
+    response, = _apply_by_bands(
+        partial(_harris_band, method=method, k=k, eps=eps, sigma=sigma),
+        image, _structure_tensor_halo(sigma), num_workers)
 
-    Arr, Arc, Acc = structure_tensor(image, sigma, order='rc')
+    return response
 
-    # determinant
-    detA = Arr * Acc - Arc ** 2
-    # trace
-    traceA = Arr + Acc
 
-    if method == 'k':
-        response = detA - k * traceA ** 2
-    else:
-        response = 2 * detA / (traceA + eps)
+def _shi_tomasi_band(image, sigma):
+    """Shi-Tomasi corner measure of a band of an image."""
+    Arr, Arc, Acc = _structure_tensor_2D(image, sigma)
 
-    return response
+    # minimum eigenvalue of A
+    response = ((Arr + Acc) - np.sqrt((Arr - Acc) ** 2 + 4 * Arc ** 2)) / 2
+
+    return response,
 
 
-def corner_shi_tomasi(image, sigma=1):
+def corner_shi_tomasi(image, sigma=1, *, num_workers=None):
     """Compute Shi-Tomasi (Kanade-Tomasi) corner measure response image.
 
     This corner detector uses information from the auto-correlation matrix A::
@@ -633,6 +849,9 @@ def corner_shi_tomasi(image, sigma=1):
     sigma : float, optional
         Standard deviation used for the Gaussian kernel, which is used as
         weighting function for the auto-correlation matrix.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
@@ -666,16 +885,35 @@ def corner_shi_tomasi(image, sigma=1):
            [7, 7]])
 
     """
+    image = _prepare_structure_tensor_input(image)
+    response, = _apply_by_bands(partial(_shi_tomasi_band, sigma=sigma),
+                                image, _structure_tensor_halo(sigma),
+                                num_workers)
 
-    Arr, Arc, Acc = structure_tensor(image, sigma, order='rc')
+    return response
 
-    # minimum eigenvalue of A
-    response = ((Arr + Acc) - np.sqrt((Arr - Acc) ** 2 + 4 * Arc ** 2)) / 2
 
-    return response
+def _foerstner_band(image, sigma):
+    """Foerstner corner measure of a band of an image."""
+    Arr, Arc, Acc = _structure_tensor_2D(image, sigma)
+
+    # determinant
+    detA = Arr * Acc - Arc ** 2
+    # trace
+    traceA = Arr + Acc
+
+    w = np.zeros_like(image, dtype=np.double)
+    q = np.zeros_like(image, dtype=np.double)
+
+    mask = traceA != 0
+
+    w[mask] = detA[mask] / traceA[mask]
+    q[mask] = 4 * detA[mask] / traceA[mask] ** 2
+
+    return w, q
 
 
-def corner_foerstner(image, sigma=1):
+def corner_foerstner(image, sigma=1, *, num_workers=None):
     """Compute Foerstner corner measure response image.
 
     This corner detector uses information from the auto-correlation matrix A::
@@ -696,6 +934,9 @@ def corner_foerstner(image, sigma=1):
     sigma : float, optional
         Standard deviation used for the Gaussian kernel, which is used as
         weighting function for the auto-correlation matrix.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
@@ -740,21 +981,9 @@ def corner_foerstner(image, sigma=1):
            [7, 7]])
 
     """
-
-    Arr, Arc, Acc = structure_tensor(image, sigma, order='rc')
-
-    # determinant
-    detA = Arr * Acc - Arc ** 2
-    # trace
-    traceA = Arr + Acc
-
-    w = np.zeros_like(image, dtype=np.double)
-    q = np.zeros_like(image, dtype=np.double)
-
-    mask = traceA != 0
-
-    w[mask] = detA[mask] / traceA[mask]
-    q[mask] = 4 * detA[mask] / traceA[mask] ** 2
+    image = _prepare_structure_tensor_input(image)
+    w, q = _apply_by_bands(partial(_foerstner_band, sigma=sigma), image,
+                           _structure_tensor_halo(sigma), num_workers)
 
     return w, q
 
@@ -1081,20 +1310,10 @@ def corner_peaks(image, min_distance=1, threshold_abs=None, threshold_rel=None,
                             num_peaks_per_label=num_peaks_per_label)
 
     if len(coords):
-        # Use KDtree to find the peaks that are too close to each other
-        tree = spatial.cKDTree(coords)
-
-        rejected_peaks_indices = set()
-        for idx, point in enumerate(coords):
-            if idx not in rejected_peaks_indices:
-                candidates = tree.query_ball_point(point, r=min_distance,
-                                                   p=p_norm)
-                candidates.remove(idx)
-                rejected_peaks_indices.update(candidates)
-
-        # Remove the peaks that are too close to each other
-        coords = np.delete(coords, tuple(rejected_peaks_indices),
-                           axis=0)[:num_peaks]
+        # Remove the peaks that are too close to each other, the peaks at
+        # exactly min_distance included
+        coords = coords[_ensure_spacing(coords, min_distance, p_norm,
+                                        inclusive=True)][:num_peaks]
 
     if indices:
         return coords
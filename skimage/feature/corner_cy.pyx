@@ -5,7 +5,7 @@
 import numpy as np
 cimport numpy as cnp
 from libc.float cimport DBL_MAX
-from libc.math cimport atan2, fabs
+from libc.math cimport atan2, fabs, sqrt, acos, cos, M_PI
 
 from .._shared.fused_numerics cimport np_floats
 from ..util import img_as_float64
@@ -289,3 +289,190 @@ def _corner_orientations(np_floats[:, ::1] image, Py_ssize_t[:, :] corners,
             orientations[i] = atan2(m01, m10)
 
     return np.asarray(orientations)
+
+
+def _symmetric_eigvals_2x2(np_floats[::1] m00, np_floats[::1] m01,
+                           np_floats[::1] m11, np_floats[:, ::1] out,
+                           Py_ssize_t start, Py_ssize_t stop):
+    """Compute the eigenvalues of symmetric 2x2 matrices in closed form.
+
+    Parameters
+    ----------
+    m00, m01, m11 : (N,) array
+        Upper-diagonal elements of the matrices.
+    out : (2, N) array
+        Output array for the eigenvalues, in decreasing order.
+    start, stop : int
+        Range of the matrices to process.
+    """
+    cdef Py_ssize_t i
+    cdef double a, b, c, mean, radius
+
+    with nogil:
+        for i in range(start, stop):
+            a = m00[i]
+            b = m01[i]
+            c = m11[i]
+            mean = (a + c) / 2
+            radius = sqrt(4 * (b * b) + (a - c) * (a - c)) / 2
+            out[0, i] = <np_floats>(mean + radius)
+            out[1, i] = <np_floats>(mean - radius)
+
+
+def _symmetric_eigvals_3x3(np_floats[::1] m00, np_floats[::1] m01,
+                           np_floats[::1] m02, np_floats[::1] m11,
+                           np_floats[::1] m12, np_floats[::1] m22,
+                           np_floats[:, ::1] out,
+                           Py_ssize_t start, Py_ssize_t stop):
+    """Compute the eigenvalues of symmetric 3x3 matrices in closed form.
+
+    The trigonometric solution of the characteristic equation [1]_ is
+    computed in double precision for each matrix. It is only accurate for the
+    eigenvalue that is the farthest from the two others: these are computed
+    again as the eigenvalues of the matrix restricted to the plane orthogonal
+    to its eigenvector [2]_.
+
+    Parameters
+    ----------
+    m00, m01, m02, m11, m12, m22 : (N,) array
+        Upper-diagonal elements of the matrices.
+    out : (3, N) array
+        Output array for the eigenvalues, in decreasing order.
+    start, stop : int
+        Range of the matrices to process.
+
+    References
+    ----------
+    .. [1] Oliver K. Smith, "Eigenvalues of a symmetric 3 x 3 matrix",
+           Communications of the ACM 4(4), 1961.
+           :DOI:`10.1145/355578.366316`
+    .. [2] Joachim Kopp, "Efficient numerical diagonalization of hermitian
+           3x3 matrices", International Journal of Modern Physics C 19(3),
+           2008. :DOI:`10.1142/S0129183108012303`
+    """
+    cdef Py_ssize_t i
+    cdef double a00, a01, a02, a11, a12, a22
+    cdef double off_diagonal, q, p, b00, b01, b02, b11, b12, b22, r, phi
+    cdef double e0, e1, e2, tmp, isolated, mean, radius
+    cdef double v0, v1, v2, u0, u1, u2, w0, w1, w2, x0, x1, x2, norm, x_norm
+    cdef double uau, uaw, waw
+
+    with nogil:
+        for i in range(start, stop):
+            a00 = m00[i]
+            a01 = m01[i]
+            a02 = m02[i]
+            a11 = m11[i]
+            a12 = m12[i]
+            a22 = m22[i]
+
+            off_diagonal = a01 * a01 + a02 * a02 + a12 * a12
+            q = (a00 + a11 + a22) / 3
+            if off_diagonal == 0:
+                # Diagonal matrix
+                e0 = a00
+                e1 = a11
+                e2 = a22
+            else:
+                b00 = a00 - q
+                b11 = a11 - q
+                b22 = a22 - q
+                p = sqrt((b00 * b00 + b11 * b11 + b22 * b22
+                          + 2 * off_diagonal) / 6)
+                # B = (A - q * I) / p, whose eigenvalues are 2 * cos(phi)
+                b00 /= p
+                b11 /= p
+                b22 /= p
+                b01 = a01 / p
+                b02 = a02 / p
+                b12 = a12 / p
+                r = (b00 * (b11 * b22 - b12 * b12)
+                     - b01 * (b01 * b22 - b12 * b02)
+                     + b02 * (b01 * b12 - b11 * b02)) / 2
+                if r <= -1:
+                    phi = M_PI / 3
+                elif r >= 1:
+                    phi = 0
+                else:
+                    phi = acos(r) / 3
+                e0 = q + 2 * p * cos(phi)
+                e2 = q + 2 * p * cos(phi + 2 * M_PI / 3)
+                e1 = 3 * q - e0 - e2
+
+                isolated = e0 if r >= 0 else e2
+                # Eigenvector of the isolated eigenvalue, as the largest cross
+                # product of the rows of A - isolated * I
+                b00 = a00 - isolated
+                b11 = a11 - isolated
+                b22 = a22 - isolated
+                v0 = a01 * a12 - a02 * b11
+                v1 = a02 * a01 - b00 * a12
+                v2 = b00 * b11 - a01 * a01
+                norm = v0 * v0 + v1 * v1 + v2 * v2
+                x0 = a01 * b22 - a02 * a12
+                x1 = a02 * a02 - b00 * b22
+                x2 = b00 * a12 - a01 * a02
+                x_norm = x0 * x0 + x1 * x1 + x2 * x2
+                if x_norm > norm:
+                    v0, v1, v2, norm = x0, x1, x2, x_norm
+                x0 = b11 * b22 - a12 * a12
+                x1 = a12 * a02 - a01 * b22
+                x2 = a01 * a12 - b11 * a02
+                x_norm = x0 * x0 + x1 * x1 + x2 * x2
+                if x_norm > norm:
+                    v0, v1, v2, norm = x0, x1, x2, x_norm
+
+                if norm > 0:
+                    norm = sqrt(norm)
+                    v0 /= norm
+                    v1 /= norm
+                    v2 /= norm
+                    # Orthonormal basis (u, w) of the orthogonal plane
+                    if fabs(v0) > fabs(v1):
+                        norm = sqrt(v0 * v0 + v2 * v2)
+                        u0 = -v2 / norm
+                        u1 = 0
+                        u2 = v0 / norm
+                    else:
+                        norm = sqrt(v1 * v1 + v2 * v2)
+                        u0 = 0
+                        u1 = v2 / norm
+                        u2 = -v1 / norm
+                    w0 = v1 * u2 - v2 * u1
+                    w1 = v2 * u0 - v0 * u2
+                    w2 = v0 * u1 - v1 * u0
+                    uau = (u0 * (a00 * u0 + a01 * u1 + a02 * u2)
+                           + u1 * (a01 * u0 + a11 * u1 + a12 * u2)
+                           + u2 * (a02 * u0 + a12 * u1 + a22 * u2))
+                    uaw = (u0 * (a00 * w0 + a01 * w1 + a02 * w2)
+                           + u1 * (a01 * w0 + a11 * w1 + a12 * w2)
+                           + u2 * (a02 * w0 + a12 * w1 + a22 * w2))
+                    waw = (w0 * (a00 * w0 + a01 * w1 + a02 * w2)
+                           + w1 * (a01 * w0 + a11 * w1 + a12 * w2)
+                           + w2 * (a02 * w0 + a12 * w1 + a22 * w2))
+                    mean = (uau + waw) / 2
+                    radius = sqrt((uau - waw) * (uau - waw) / 4 + uaw * uaw)
+                    if r >= 0:
+                        e1 = mean + radius
+                        e2 = mean - radius
+                    else:
+                        e0 = mean + radius
+                        e1 = mean - radius
+
+            # Sort in decreasing order, against rounding errors as well
+            if e0 < e1:
+                tmp = e0
+                e0 = e1
+                e1 = tmp
+            if e1 < e2:
+                tmp = e1
+                e1 = e2
+                e2 = tmp
+            if e0 < e1:
+                tmp = e0
+                e0 = e1
+                e1 = tmp
+
+            out[0, i] = <np_floats>e0
+            out[1, i] = <np_floats>e1
+            out[2, i] = <np_floats>e2
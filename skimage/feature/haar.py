@@ -1,4 +1,5 @@
 
+from concurrent.futures import ThreadPoolExecutor
 from itertools import chain
 from operator import add
 
@@ -6,6 +7,7 @@ import numpy as np
 
 from ._haar import haar_like_feature_coord_wrapper
 from ._haar import haar_like_feature_wrapper
+from ._haar import _haar_like_feature_batch, _haar_like_feature_rectangles
 from ..color import gray2rgb
 from ..draw import rectangle
 from .._shared.utils import check_random_state
@@ -15,6 +17,13 @@ FEATURE_TYPE = ('type-2-x', 'type-2-y',
                 'type-3-x', 'type-3-y',
                 'type-4')
 
+N_RECTANGLE = {'type-2-x': 2, 'type-2-y': 2,
+               'type-3-x': 3, 'type-3-y': 3,
+               'type-4': 4}
+
+# Number of ROIs processed at a time by a thread in `haar_like_feature_batch`
+_HAAR_ROIS = 1024
+
 
 def _validate_feature_type(feature_type):
     """Transform feature type to an iterable and check that it exists."""
@@ -219,6 +228,193 @@ def haar_like_feature(int_image, r, c, width, height, feature_type=None,
         return haar_feature
 
 
+def _haar_like_feature_rectangle_array(width, height, feature_type,
+                                       feature_coord):
+    """Gather the rectangles of a set of Haar-like features into arrays.
+
+    Parameters
+    ----------
+    width : int
+        Width of the detection window.
+    height : int
+        Height of the detection window.
+    feature_type : str or list of str or None
+        The type of feature to consider, see `haar_like_feature`.
+    feature_coord : ndarray of list of tuples or None
+        The coordinates of the features to consider, see `haar_like_feature`.
+
+    Returns
+    -------
+    rectangles : (n_features, 4, 4) ndarray of intp
+        Top left row and column, and bottom right row and column of the
+        rectangles of each feature.
+    n_rectangles : (n_features,) ndarray of intp
+        Number of rectangles of each feature.
+    """
+    if feature_coord is None:
+        feature_type_ = _validate_feature_type(feature_type)
+        rectangles = [_haar_like_feature_rectangles(width, height, feat_t)
+                      for feat_t in feature_type_]
+        n_rectangles = [np.full(len(rect), N_RECTANGLE[feat_t], dtype=np.intp)
+                        for rect, feat_t in zip(rectangles, feature_type_)]
+        return np.concatenate(rectangles), np.concatenate(n_rectangles)
+
+    if len(feature_coord) != len(feature_type):
+        raise ValueError("Inconsistent size between feature coordinates"
+                         "and feature types.")
+    _validate_feature_type(np.unique(feature_type))
+
+    rectangles = np.zeros((len(feature_coord), 4, 4), dtype=np.intp)
+    n_rectangles = np.array([N_RECTANGLE[feat_t] for feat_t in feature_type],
+                            dtype=np.intp)
+    for rect, coord in zip(rectangles, feature_coord):
+        rect[:len(coord)] = np.reshape(coord, (len(coord), 4))
+    rect_rows = rectangles[..., ::2]
+    rect_cols = rectangles[..., 1::2]
+    if (np.any(rectangles < 0) or np.any(rect_rows >= height)
+            or np.any(rect_cols >= width)):
+        raise ValueError("The feature coordinates are outside of the "
+                         "detection window.")
+    return rectangles, n_rectangles
+
+
+def haar_like_feature_batch(int_image, rois, width, height,
+                            feature_type=None, feature_coord=None, *,
+                            dtype=None, num_workers=None):
+    """Compute the Haar-like features for many regions of interest (ROIs).
+
+    This is equivalent to calling :func:`haar_like_feature` for each ROI,
+    but the set of features is only gathered once, and the features of all
+    the ROIs are computed in compiled code, in parallel threads.
+
+    Parameters
+    ----------
+    int_image : (M, N) or (K, M, N) ndarray
+        Integral image, or stack of integral images, for which the features
+        need to be computed.
+    rois : (n_rois, 2) or (n_rois, 3) array of int or None
+        Row and column coordinates of the top left corners of the detection
+        windows, preceded by the index of the integral image in the stack
+        when `int_image` is a stack. If None, the features are computed for
+        the window at the top left corner of each integral image.
+    width : int
+        Width of the detection windows.
+    height : int
+        Height of the detection windows.
+    feature_type : str or list of str or None, optional
+        The type of feature to consider:
+
+        - 'type-2-x': 2 rectangles varying along the x axis;
+        - 'type-2-y': 2 rectangles varying along the y axis;
+        - 'type-3-x': 3 rectangles varying along the x axis;
+        - 'type-3-y': 3 rectangles varying along the y axis;
+        - 'type-4': 4 rectangles varying along x and y axis.
+
+        By default all features are extracted.
+
+        If using with `feature_coord`, it should correspond to the feature
+        type of each associated coordinate feature.
+    feature_coord : ndarray of list of tuples or None, optional
+        The array of coordinates to be extracted, as returned by
+        :func:`haar_like_feature_coord`. In this case `feature_type` needs to
+        be an array containing the type of each feature. By default, all
+        coordinates are computed.
+    dtype : dtype, optional
+        Data type of the output. By default, it is the data type of the
+        output of :func:`haar_like_feature`: `int` when the data type of
+        `int_image` is `uint` or `int` and `float` when the data type of
+        `int_image` is `float`. Use ``np.float32`` to halve the memory of
+        the features of a large number of ROIs.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
+
+    Returns
+    -------
+    haar_features : (n_rois, n_features) ndarray
+        Resulting Haar-like features of each ROI. Each value is equal to the
+        subtraction of sums of the positive and negative rectangles.
+
+    See also
+    --------
+    haar_like_feature
+
+    Notes
+    -----
+    Integer integral images are processed with 64-bit integers.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from skimage.transform import integral_image
+    >>> from skimage.feature import haar_like_feature_batch
+    >>> img = np.ones((2, 5, 5), dtype=np.uint8)
+    >>> img[1] = 2
+    >>> img_ii = np.stack([integral_image(i) for i in img])
+    >>> haar_like_feature_batch(img_ii, None, 3, 3, 'type-3-x')
+    array([[-1, -2, -1, -2, -1],
+           [-2, -4, -2, -4, -2]])
+
+    """
+    int_image = np.asarray(int_image)
+    if int_image.ndim not in (2, 3):
+        raise ValueError("The integral image should be 2D, or a 3D stack of "
+                         "2D integral images.")
+    int_images = int_image if int_image.ndim == 3 else int_image[np.newaxis]
+
+    if rois is None:
+        rois = np.zeros((len(int_images), 3), dtype=np.intp)
+        rois[:, 0] = np.arange(len(int_images))
+    else:
+        rois = np.asarray(rois, dtype=np.intp).reshape(-1, int_image.ndim)
+        if int_image.ndim == 2:
+            rois = np.pad(rois, ((0, 0), (1, 0)), mode='constant')
+    n_images, n_rows, n_cols = int_images.shape
+    if (np.any(rois < 0) or np.any(rois[:, 0] >= n_images)
+            or np.any(rois[:, 1] + height > n_rows)
+            or np.any(rois[:, 2] + width > n_cols)):
+        raise ValueError("The regions of interest are outside of the "
+                         "integral image.")
+    rois = np.ascontiguousarray(rois)
+
+    rectangles, n_rectangles = _haar_like_feature_rectangle_array(
+        width, height, feature_type, feature_coord)
+
+    # The features are computed in the data type of the integral image
+    if int_images.dtype.kind in 'iu' and int_images.itemsize < 8:
+        int_images = int_images.astype(np.int64)
+    int_images = np.require(int_images, requirements=['C', 'W'])
+    work_dtype = int_images.dtype
+    # Unsigned integers wrap around like signed ones
+    if work_dtype.kind == 'u':
+        default_dtype = np.dtype(work_dtype.name.replace('u', ''))
+    else:
+        default_dtype = work_dtype
+    dtype = default_dtype if dtype is None else np.dtype(dtype)
+
+    out = np.empty((len(rois), len(rectangles)), dtype=dtype)
+
+    def compute_chunk(start):
+        stop = min(start + _HAAR_ROIS, len(rois))
+        if dtype == default_dtype:
+            _haar_like_feature_batch(int_images, rois[start:stop], rectangles,
+                                     n_rectangles,
+                                     out[start:stop].view(work_dtype))
+        else:
+            features = np.empty((stop - start, len(rectangles)),
+                                dtype=work_dtype)
+            _haar_like_feature_batch(int_images, rois[start:stop], rectangles,
+                                     n_rectangles, features)
+            out[start:stop] = features.view(default_dtype)
+
+    with ThreadPoolExecutor(max_workers=num_workers) as ex:
+        # Iterate over the results, to raise the exceptions of the threads
+        for _ in ex.map(compute_chunk, range(0, len(rois), _HAAR_ROIS)):
+            pass
+
+    return out
+
+
 def draw_haar_like_feature(image, r, c, width, height,
                            feature_coord,
                            color_positive_block=(1., 0., 0.),
@@ -1,4 +1,8 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
+from scipy import ndimage as ndi
 
 from ..feature.util import (FeatureDetector, DescriptorExtractor,
                             _mask_border_keypoints,
@@ -6,7 +10,7 @@ from ..feature.util import (FeatureDetector, DescriptorExtractor,
 
 from ..feature import (corner_fast, corner_orientations, corner_peaks,
                        corner_harris)
-from ..transform import pyramid_gaussian
+from ..transform._warps import _resize_2d_transform
 from .._shared.utils import check_nD
 
 from .orb_cy import _orb_loop
@@ -19,6 +23,115 @@ for i in range(-15, 16):
         OFAST_MASK[15 + j, 15 + i] = 1
 
 
+def _reflect_indices(indices, size):
+    """Map indices outside of ``[0, size)`` back into the image, like the
+    'reflect' mode of `skimage.transform.warp`."""
+    if size == 1:
+        return np.zeros_like(indices)
+    last = size - 1
+    n_wraps, remainder = np.divmod(np.abs(indices), last)
+    return np.where(n_wraps % 2, last - remainder, remainder)
+
+
+def _bilinear_table(scale, offset, size, input_size, dtype):
+    """Sample positions and weights of the bilinear interpolation along an
+    axis, as computed by `skimage.transform.warp` for a metric transform."""
+    coords = dtype(scale) * np.arange(size, dtype=dtype) + dtype(offset)
+    low = np.floor(coords)
+    weight = coords - low
+    high = np.ceil(coords).astype(np.intp)
+    # `1 - weight` is computed in double precision by the compiled code
+    return (_reflect_indices(low.astype(np.intp), input_size),
+            _reflect_indices(high, input_size),
+            1.0 - weight.astype(np.float64), weight)
+
+
+def _pyramid_buffers(shape, dtype, max_layer, downscale):
+    """Allocate the layers of the Gaussian pyramid of images of a given shape
+    and dtype, along with their sampling tables and work arrays.
+
+    The layers have the same shapes and, once filled by `_pyramid_reduce`,
+    the same values as the ones of ``pyramid_gaussian(image, max_layer,
+    downscale)``.
+    """
+    dtype = np.dtype(dtype).type
+    layers = []
+    layer = 0
+    while layer != max_layer:
+        layer += 1
+        out_shape = tuple(math.ceil(d / float(downscale)) for d in shape)
+        # no change to previous pyramid layer
+        if out_shape == shape:
+            break
+
+        params = _resize_2d_transform(shape, out_shape).params.astype(dtype)
+        rows = _bilinear_table(params[1, 1], params[1, 2], out_shape[0],
+                               shape[0], dtype)
+        cols = _bilinear_table(params[0, 0], params[0, 2], out_shape[1],
+                               shape[1], dtype)
+        horizontal_shape = (shape[0], out_shape[1])
+        vertical = np.empty(out_shape)
+        if dtype is np.float64:
+            out = vertical
+        else:
+            out = np.empty(out_shape, dtype=dtype)
+        layers.append({
+            'rows': rows, 'cols': cols,
+            'smoothed': np.empty(shape, dtype=dtype),
+            'horizontal': np.empty(horizontal_shape),
+            'horizontal_tmp': np.empty(horizontal_shape, dtype=dtype),
+            'gathered': np.empty(out_shape),
+            'vertical': vertical,
+            'vertical_tmp': np.empty(out_shape),
+            'out': out,
+        })
+        shape = out_shape
+    return layers
+
+
+def _pyramid_reduce(image, downscale, buffers):
+    """Smooth and downsample `image` into the preallocated ``buffers['out']``.
+
+    This reproduces ``pyramid_reduce(image, downscale)`` exactly: the bilinear
+    interpolation of `warp` is separable for the scaling of `resize`, so it is
+    computed along the columns, and then along the rows, with the same
+    floating point operations.
+    """
+    smoothed = buffers['smoothed']
+    # automatically determine sigma which covers > 99% of distribution
+    sigma = 2 * downscale / 6.0
+    ndi.gaussian_filter(image, sigma, output=smoothed, mode='reflect',
+                        cval=0)
+
+    # Interpolate along the columns, with the mixed precision of
+    # `bilinear_interpolation` for float32 images
+    low, high, weight_low, weight_high = buffers['cols']
+    horizontal = buffers['horizontal']
+    tmp = buffers['horizontal_tmp']
+    np.take(smoothed, low, axis=1, out=tmp)
+    np.multiply(tmp, weight_low, out=horizontal)
+    np.take(smoothed, high, axis=1, out=tmp)
+    tmp *= weight_high
+    horizontal += tmp
+
+    # and then along the rows
+    low, high, weight_low, weight_high = buffers['rows']
+    gathered = buffers['gathered']
+    vertical = buffers['vertical']
+    tmp = buffers['vertical_tmp']
+    np.take(horizontal, low, axis=0, out=gathered)
+    np.multiply(gathered, weight_low[:, np.newaxis], out=vertical)
+    np.take(horizontal, high, axis=0, out=gathered)
+    np.multiply(gathered, weight_high[:, np.newaxis], out=tmp)
+    vertical += tmp
+
+    out = buffers['out']
+    if out is not vertical:
+        out[...] = vertical
+    np.clip(out, smoothed.min(), smoothed.max(), out=out)
+    return out
+
+
 class ORB(FeatureDetector, DescriptorExtractor):
 
     """Oriented FAST and rotated BRIEF feature detector and binary descriptor
@@ -54,6 +167,10 @@ class ORB(FeatureDetector, DescriptorExtractor):
     n_scales : int, optional
         Maximum number of scales from the bottom of the image pyramid to
         extract the features from.
+    num_workers : int, optional
+        The number of parallel threads to use for the scales of the image
+        pyramid. If set to ``None``, the default number of threads of
+        `concurrent.futures.ThreadPoolExecutor` is used.
 
     Attributes
     ----------
@@ -72,6 +189,13 @@ class ORB(FeatureDetector, DescriptorExtractor):
         the outcome of the intensity comparison for i-th keypoint on j-th
         decision pixel-pair. It is ``Q == np.sum(mask)``.
 
+    Notes
+    -----
+    The image pyramid is kept in buffers that are allocated for the first
+    image and reused for all the following images of the same shape and
+    dtype, for example the frames of a video. An `ORB` instance must thus not
+    be used from several threads at the same time.
+
     References
     ----------
     .. [1] Ethan Rublee, Vincent Rabaud, Kurt Konolige and Gary Bradski
@@ -116,13 +240,14 @@ class ORB(FeatureDetector, DescriptorExtractor):
 
     def __init__(self, downscale=1.2, n_scales=8,
                  n_keypoints=500, fast_n=9, fast_threshold=0.08,
-                 harris_k=0.04):
+                 harris_k=0.04, *, num_workers=None):
         self.downscale = downscale
         self.n_scales = n_scales
         self.n_keypoints = n_keypoints
         self.fast_n = fast_n
         self.fast_threshold = fast_threshold
         self.harris_k = harris_k
+        self.num_workers = num_workers
 
         self.keypoints = None
         self.scales = None
@@ -130,10 +255,29 @@ class ORB(FeatureDetector, DescriptorExtractor):
         self.orientations = None
         self.descriptors = None
 
+        self._pyramid_key = None
+        self._pyramid = None
+
     def _build_pyramid(self, image):
-        image = _prepare_grayscale_input_2D(image)
-        return list(pyramid_gaussian(image, self.n_scales - 1,
-                                     self.downscale, multichannel=False))
+        """Yield the layers of the Gaussian pyramid of `image`.
+
+        The layers are computed in buffers that are reused for the following
+        images of the same shape and dtype. They have the same values as the
+        ones of `skimage.transform.pyramid_gaussian`.
+        """
+        image = np.ascontiguousarray(_prepare_grayscale_input_2D(image))
+
+        key = (image.shape, image.dtype, self.n_scales, self.downscale)
+        if key != self._pyramid_key:
+            self._pyramid = _pyramid_buffers(image.shape, image.dtype,
+                                             self.n_scales - 1,
+                                             self.downscale)
+            self._pyramid_key = key
+
+        yield image
+        for buffers in self._pyramid:
+            image = _pyramid_reduce(image, self.downscale, buffers)
+            yield image
 
     def _detect_octave(self, octave_image):
         dtype = octave_image.dtype
@@ -154,8 +298,9 @@ class ORB(FeatureDetector, DescriptorExtractor):
         orientations = corner_orientations(octave_image, keypoints,
                                            OFAST_MASK)
 
+        # The octaves are already processed in parallel threads
         harris_response = corner_harris(octave_image, method='k',
-                                        k=self.harris_k)
+                                        k=self.harris_k, num_workers=1)
         responses = harris_response[keypoints[:, 0], keypoints[:, 1]]
 
         return keypoints, orientations, responses
@@ -171,25 +316,27 @@ class ORB(FeatureDetector, DescriptorExtractor):
         """
         check_nD(image, 2)
 
-        pyramid = self._build_pyramid(image)
+        # Each octave is processed as soon as its pyramid layer is built
+        with ThreadPoolExecutor(max_workers=self.num_workers) as ex:
+            futures = []
+            for octave_image in self._build_pyramid(image):
+                futures.append(ex.submit(self._detect_octave, octave_image))
+            octave_results = [future.result() for future in futures]
+        dtype = octave_image.dtype
 
         keypoints_list = []
         orientations_list = []
         scales_list = []
         responses_list = []
 
-        for octave in range(len(pyramid)):
-
-            octave_image = np.ascontiguousarray(pyramid[octave])
-
-            keypoints, orientations, responses = self._detect_octave(
-                octave_image)
+        for octave, (keypoints, orientations, responses) in enumerate(
+                octave_results):
 
             keypoints_list.append(keypoints * self.downscale ** octave)
             orientations_list.append(orientations)
             scales_list.append(np.full(
                 keypoints.shape[0], self.downscale ** octave,
-                dtype=octave_image.dtype))
+                dtype=dtype))
             responses_list.append(responses)
 
         keypoints = np.vstack(keypoints_list)
@@ -222,6 +369,18 @@ class ORB(FeatureDetector, DescriptorExtractor):
 
         return descriptors, mask
 
+    def _detect_and_extract_octave(self, octave_image):
+        keypoints, orientations, responses = self._detect_octave(
+            octave_image)
+
+        if len(keypoints) == 0:
+            return keypoints, orientations, responses, None, None
+
+        descriptors, mask = self._extract_octave(octave_image, keypoints,
+                                                 orientations)
+
+        return keypoints, orientations, responses, descriptors, mask
+
     def extract(self, image, keypoints, scales, orientations):
         """Extract rBRIEF binary descriptors for given keypoints in image.
 
@@ -244,33 +403,29 @@ class ORB(FeatureDetector, DescriptorExtractor):
         """
         check_nD(image, 2)
 
-        pyramid = self._build_pyramid(image)
-
-        descriptors_list = []
-        mask_list = []
-
         # Determine octaves from scales
         octaves = (np.log(scales) / np.log(self.downscale)).astype(np.intp)
 
-        for octave in range(len(pyramid)):
-
-            # Mask for all keypoints in current octave
-            octave_mask = octaves == octave
+        with ThreadPoolExecutor(max_workers=self.num_workers) as ex:
+            futures = []
+            for octave, octave_image in enumerate(self._build_pyramid(image)):
 
-            if np.sum(octave_mask) > 0:
+                # Mask for all keypoints in current octave
+                octave_mask = octaves == octave
 
-                octave_image = np.ascontiguousarray(pyramid[octave])
+                if np.sum(octave_mask) > 0:
 
-                octave_keypoints = keypoints[octave_mask]
-                octave_keypoints /= self.downscale ** octave
-                octave_orientations = orientations[octave_mask]
+                    octave_keypoints = keypoints[octave_mask]
+                    octave_keypoints /= self.downscale ** octave
+                    octave_orientations = orientations[octave_mask]
 
-                descriptors, mask = self._extract_octave(octave_image,
-                                                         octave_keypoints,
-                                                         octave_orientations)
+                    futures.append(ex.submit(self._extract_octave,
+                                             octave_image, octave_keypoints,
+                                             octave_orientations))
+            octave_results = [future.result() for future in futures]
 
-                descriptors_list.append(descriptors)
-                mask_list.append(mask)
+        descriptors_list = [descriptors for descriptors, _ in octave_results]
+        mask_list = [mask for _, mask in octave_results]
 
         self.descriptors = np.vstack(descriptors_list).view(bool)
         self.mask_ = np.hstack(mask_list)
@@ -289,7 +444,13 @@ class ORB(FeatureDetector, DescriptorExtractor):
         """
         check_nD(image, 2)
 
-        pyramid = self._build_pyramid(image)
+        # Each octave is processed as soon as its pyramid layer is built
+        with ThreadPoolExecutor(max_workers=self.num_workers) as ex:
+            futures = []
+            for octave_image in self._build_pyramid(image):
+                futures.append(ex.submit(self._detect_and_extract_octave,
+                                         octave_image))
+            octave_results = [future.result() for future in futures]
 
         keypoints_list = []
         responses_list = []
@@ -297,12 +458,8 @@ class ORB(FeatureDetector, DescriptorExtractor):
         orientations_list = []
         descriptors_list = []
 
-        for octave in range(len(pyramid)):
-
-            octave_image = np.ascontiguousarray(pyramid[octave])
-
-            keypoints, orientations, responses = self._detect_octave(
-                octave_image)
+        for octave, (keypoints, orientations, responses, descriptors,
+                     mask) in enumerate(octave_results):
 
             if len(keypoints) == 0:
                 keypoints_list.append(keypoints)
@@ -310,9 +467,6 @@ class ORB(FeatureDetector, DescriptorExtractor):
                 descriptors_list.append(np.zeros((0, 256), dtype=bool))
                 continue
 
-            descriptors, mask = self._extract_octave(octave_image, keypoints,
-                                                     orientations)
-
             scaled_keypoints = keypoints[mask] * self.downscale ** octave
             keypoints_list.append(scaled_keypoints)
             responses_list.append(responses[mask])
@@ -346,3 +500,43 @@ class ORB(FeatureDetector, DescriptorExtractor):
             self.orientations = orientations[best_indices]
             self.responses = responses[best_indices]
             self.descriptors = descriptors[best_indices]
+
+    def detect_and_extract_frames(self, frames):
+        """Detect oriented FAST keypoints and extract rBRIEF descriptors in
+        each image of a sequence, for example the frames of a video.
+
+        The buffers of the image pyramid are allocated once, and reused for
+        all the frames of the same shape.
+
+        Parameters
+        ----------
+        frames : iterable of 2D arrays
+            Input images, for example a (K, M, N) array or a generator that
+            reads the frames of a video.
+
+        Yields
+        ------
+        keypoints, scales, orientations, responses, descriptors : arrays
+            The features of each frame, as the attributes of the same name
+            set by `detect_and_extract`.
+
+        Examples
+        --------
+        >>> from skimage.feature import ORB
+        >>> np.random.seed(1)
+        >>> frames = np.zeros((3, 100, 100))
+        >>> square = np.random.rand(20, 20)
+        >>> for i, frame in enumerate(frames):
+        ...     frame[40 + i:60 + i, 40 + 2 * i:60 + 2 * i] = square
+        >>> orb = ORB(n_keypoints=5)
+        >>> for keypoints, *_ in orb.detect_and_extract_frames(frames):
+        ...     print(keypoints[0])
+        [42. 40.]
+        [43. 42.]
+        [44. 44.]
+
+        """
+        for frame in frames:
+            self.detect_and_extract(frame)
+            yield (self.keypoints, self.scales, self.orientations,
+                   self.responses, self.descriptors)
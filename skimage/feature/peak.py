@@ -1,9 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
 from warnings import warn
 import numpy as np
 import scipy.ndimage as ndi
 from .. import measure
 from .._shared.utils import remove_arg
-from .._shared.coord import ensure_spacing
+from .._shared.coord import ensure_spacing, _ensure_spacing
+from ._peak import _label_maxima
+
+
+# Number of rows of the image that the maximum filter of `peak_local_max`
+# processes at a time in each thread
+_PEAK_ROWS = 128
 
 
 def _get_high_intensity_peaks(image, mask, num_peaks, min_distance, p_norm):
@@ -25,15 +32,46 @@ def _get_high_intensity_peaks(image, mask, num_peaks, min_distance, p_norm):
     return coord
 
 
-def _get_peak_mask(image, footprint, threshold, mask=None):
+def _maximum_filter(image, footprint, num_workers=None):
+    """Maximum filter of an image with zero padding, by bands of rows.
+
+    Each band is extended on both sides by half the footprint, so that its
+    rows get exactly the same values as when the whole image is filtered.
+    The bands are filtered in parallel threads.
+    """
+    n_rows = image.shape[0]
+    if n_rows <= _PEAK_ROWS or num_workers == 1:
+        return ndi.maximum_filter(image, footprint=footprint,
+                                  mode='constant')
+
+    halo = footprint.shape[0] // 2
+    image_max = np.empty_like(image)
+
+    def filter_band(start):
+        stop = min(start + _PEAK_ROWS, n_rows)
+        band_start = max(start - halo, 0)
+        band_stop = min(stop + halo, n_rows)
+        band_max = ndi.maximum_filter(image[band_start:band_stop],
+                                      footprint=footprint, mode='constant')
+        image_max[start:stop] = band_max[start - band_start:
+                                         stop - band_start]
+
+    with ThreadPoolExecutor(max_workers=num_workers) as ex:
+        # Iterate over the results, to raise the exceptions of the threads
+        for _ in ex.map(filter_band, range(0, n_rows, _PEAK_ROWS)):
+            pass
+
+    return image_max
+
+
+def _get_peak_mask(image, footprint, threshold, mask=None, num_workers=None):
     """
     Return the mask containing all peak candidates above thresholds.
     """
     if footprint.size == 1 or image.size == 1:
         return image > threshold
 
-    image_max = ndi.maximum_filter(image, footprint=footprint,
-                                   mode='constant')
+    image_max = _maximum_filter(image, footprint, num_workers)
 
     out = image == image_max
 
@@ -50,6 +88,111 @@ def _get_peak_mask(image, footprint, threshold, mask=None):
     return out
 
 
+def _isolated_label_pixels(label_index):
+    """Return the mask of the pixels of each label removed by its binary
+    opening.
+
+    This is ``np.logical_xor(mask, ndi.binary_opening(mask))`` for the mask
+    of each label, for all the labels at once.
+    """
+    in_label = label_index >= 0
+    eroded = in_label.copy()
+    same_label = []
+    for axis in range(label_index.ndim):
+        before = (slice(None),) * axis + (slice(None, -1),)
+        after = (slice(None),) * axis + (slice(1, None),)
+        same = label_index[before] == label_index[after]
+        same_label.append((before, after, same))
+        eroded[before] &= same
+        eroded[after] &= same
+        # The pixels at the border of the image miss a neighbor
+        eroded[(slice(None),) * axis + (0,)] = False
+        eroded[(slice(None),) * axis + (-1,)] = False
+
+    opened = eroded.copy()
+    for before, after, same in same_label:
+        opened[before] |= eroded[after] & same
+        opened[after] |= eroded[before] & same
+
+    return in_label & ~opened
+
+
+def _get_labels_peak_mask(image, labels, footprint, threshold,
+                          num_workers=None):
+    """
+    Return the mask containing the peak candidates of all labels above
+    thresholds, and the index of the label of each pixel (-1 for the
+    background).
+
+    This is the same as `_get_peak_mask` applied to the bounding box of each
+    label, with the pixels of other labels set to the minimum value of the
+    image dtype, but with a single maximum filter of the whole image.
+    """
+    in_label = labels > 0
+    max_label = labels.max(initial=0)
+    if max_label <= labels.size:
+        # Index the labels with a lookup table
+        is_label = np.zeros(max_label + 1, dtype=bool)
+        is_label[labels[in_label]] = True
+        lut = np.cumsum(is_label, dtype=np.intp) - 1
+        lut[~is_label] = -1
+        label_index = lut[np.maximum(labels, 0)]
+        n_labels = lut[-1] + 1
+    else:
+        label_values = np.unique(labels[in_label])
+        label_index = np.searchsorted(label_values, labels)
+        label_index[~in_label] = -1
+        n_labels = len(label_values)
+
+    if footprint.size == 1 or image.size == 1:
+        return in_label & (image > threshold), label_index
+
+    if np.issubdtype(image.dtype, np.floating):
+        bg_val = np.finfo(image.dtype).min
+    else:
+        bg_val = np.iinfo(image.dtype).min
+
+    objects = ndi.find_objects(label_index + 1)
+    bbox_start = np.array([[s.start for s in obj] for obj in objects],
+                          dtype=np.intp).reshape(n_labels, image.ndim)
+    bbox_stop = np.array([[s.stop for s in obj] for obj in objects],
+                         dtype=np.intp).reshape(n_labels, image.ndim)
+
+    # The neighbors of a pixel, the nearest first
+    center = np.array(footprint.shape) // 2
+    offsets = np.transpose(np.nonzero(footprint)) - center
+    offsets = offsets[np.argsort(np.abs(offsets).sum(axis=1), kind='stable')]
+    strides = np.cumprod((1,) + image.shape[:0:-1])[::-1]
+
+    image = np.ascontiguousarray(image)
+    image_max = _maximum_filter(image, footprint, num_workers)
+    is_max = _label_maxima(image.ravel(), image_max.ravel(),
+                           label_index.ravel(),
+                           np.array(image.shape, dtype=np.intp),
+                           bbox_start, bbox_stop,
+                           np.ascontiguousarray(offsets, dtype=np.intp),
+                           np.ascontiguousarray(offsets @ strides,
+                                                dtype=np.intp),
+                           bg_val, bool(footprint[tuple(center)]))
+    is_max = is_max.reshape(image.shape)
+
+    # No peak for a label whose pixels are all equal to their maximum,
+    # except its isolated pixels
+    label_size = np.bincount(label_index[in_label], minlength=n_labels)
+    n_maxima = np.bincount(label_index[is_max], minlength=n_labels)
+    is_trivial = np.zeros(n_labels + 1, dtype=bool)
+    is_trivial[:-1] = (n_maxima == label_size)
+    # A single pixel is isolated, whatever its value
+    is_trivial[:-1] |= label_size == 1
+    trivial_pixels = is_trivial[label_index]
+    if np.any(trivial_pixels):
+        is_max[trivial_pixels] = _isolated_label_pixels(
+            label_index)[trivial_pixels]
+
+    is_max &= image > threshold
+    return is_max, label_index
+
+
 def _exclude_border(label, border_width):
     """Set label border values to 0.
 
@@ -110,11 +253,106 @@ def _get_excluded_border_width(image, min_distance, exclude_border):
     return border_width
 
 
+def _scale_space_peaks(scale_images, threshold, border_width):
+    """Return the local maxima of a scale space, computed scale by scale.
+
+    This is equivalent to ``peak_local_max(np.stack(scale_images, axis=-1),
+    threshold_abs=threshold, threshold_rel=0.0, exclude_border=border_width +
+    (0,), footprint=np.ones((3,) * (ndim + 1)))``, with the same coordinates
+    in the same order, but only three scales are held in memory at any time.
+
+    Parameters
+    ----------
+    scale_images : iterable of ndarray
+        The images of the scale space, from the finest to the coarsest scale.
+        They are only iterated over once.
+    threshold : float
+        Minimum intensity of peaks.
+    border_width : tuple of ints
+        The width of the border along each axis of the images in which peaks
+        are excluded.
+
+    Returns
+    -------
+    coordinates : (n, ndim + 1) ndarray
+        The coordinates of the peaks, the index of their scale last, sorted
+        by decreasing intensity.
+    """
+    if any(width < 0 for width in border_width):
+        raise ValueError("`exclude_border` can not be a negative value")
+    # With threshold_rel=0, peak_local_max doesn't use a threshold below
+    # 0 * image.max()
+    threshold = max(threshold, 0)
+
+    peak_coords = []
+    peak_scales = []
+    peak_intensities = []
+    # peak_local_max returns no peak if all pixels are equal to the maximum
+    # of their neighborhood
+    is_trivial = True
+
+    def add_peaks(scale, image, image_max, neighbor_maxima):
+        nonlocal is_trivial
+        # The maximum filter of peak_local_max pads with zeros, along the
+        # scale axis too
+        scale_max = np.maximum(image_max, 0)
+        for neighbor_max in neighbor_maxima:
+            if neighbor_max is not None:
+                np.maximum(scale_max, neighbor_max, out=scale_max)
+        mask = image == scale_max
+        is_trivial = is_trivial and bool(np.all(mask))
+        mask &= image > threshold
+        mask = _exclude_border(mask, border_width)
+        coords = np.nonzero(mask)
+        peak_coords.append(np.transpose(coords))
+        peak_scales.append(np.full(len(coords[0]), scale, dtype=np.intp))
+        peak_intensities.append(image[coords])
+
+    previous_max = current = current_max = None
+    n_scales = 0
+    for image in scale_images:
+        image_max = ndi.maximum_filter(image, size=3, mode='constant')
+        if current is not None:
+            add_peaks(n_scales - 1, current, current_max,
+                      (previous_max, image_max))
+        previous_max, current, current_max = current_max, image, image_max
+        n_scales += 1
+    if current is None:
+        raise ValueError("the scale space must have at least one scale")
+    if n_scales == 1 and current.size == 1:
+        # Single pixel: peak_local_max only applies the threshold
+        mask = _exclude_border(current > threshold, border_width)
+        coords = np.nonzero(mask)
+        return np.transpose(coords + (np.zeros_like(coords[0]),))
+    add_peaks(n_scales - 1, current, current_max, (previous_max, None))
+
+    ndim = current.ndim
+    if is_trivial:
+        return np.empty((0, ndim + 1), dtype=np.intp)
+    coord = np.concatenate(
+        [np.concatenate(peak_coords).reshape(-1, ndim),
+         np.concatenate(peak_scales)[:, np.newaxis]], axis=1)
+    intensities = np.concatenate(peak_intensities)
+
+    # Restore the order in which np.nonzero finds the peaks in the stacked
+    # scale space, before sorting them like _get_high_intensity_peaks does
+    stacked_order = np.argsort(
+        np.ravel_multi_index(tuple(coord.T), current.shape + (n_scales,)),
+        kind='stable')
+    coord = coord[stacked_order]
+    intensities = intensities[stacked_order]
+    # Highest peak first. Peaks are at least 1 pixel apart, so that there is
+    # nothing to remove with ensure_spacing
+    idx_maxsort = np.argsort(-intensities)
+    return coord[idx_maxsort]
+
+
 @remove_arg("indices", changed_version="0.20")
 def peak_local_max(image, min_distance=1, threshold_abs=None,
                    threshold_rel=None, exclude_border=True, indices=True,
                    num_peaks=np.inf, footprint=None, labels=None,
-                   num_peaks_per_label=np.inf, p_norm=np.inf):
+                   num_peaks_per_label=np.inf, p_norm=np.inf, *,
+                   num_workers=None):
     """Find peaks in an image as coordinate list or boolean mask.
 
     Peaks are the local maxima in a region of `2 * min_distance + 1`
@@ -176,6 +414,10 @@ def peak_local_max(image, min_distance=1, threshold_abs=None,
         A finite large p may cause a ValueError if overflow can occur.
         ``inf`` corresponds to the Chebyshev distance and 2 to the
         Euclidean distance.
+    num_workers : int, optional
+        The number of parallel threads to use for the maximum filter. If set to
+        ``None``, the default number of threads of
+        `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
@@ -251,7 +493,8 @@ def peak_local_max(image, min_distance=1, threshold_abs=None,
 
     if labels is None:
         # Non maximum filter
-        mask = _get_peak_mask(image, footprint, threshold)
+        mask = _get_peak_mask(image, footprint, threshold,
+                              num_workers=num_workers)
 
         mask = _exclude_border(mask, border_width)
 
@@ -264,44 +507,20 @@ def peak_local_max(image, min_distance=1, threshold_abs=None,
         _labels = _exclude_border(labels.astype(int, casting="safe"),
                                   border_width)
 
-        if np.issubdtype(image.dtype, np.floating):
-            bg_val = np.finfo(image.dtype).min
-        else:
-            bg_val = np.iinfo(image.dtype).min
-
-        # For each label, extract a smaller image enclosing the object of
-        # interest, identify num_peaks_per_label peaks
-        labels_peak_coord = []
-
-        for label_idx, roi in enumerate(ndi.find_objects(_labels)):
-
-            if roi is None:
-                continue
-
-            # Get roi mask
-            label_mask = labels[roi] == label_idx + 1
-            # Extract image roi
-            img_object = image[roi]
-            # Ensure masked values don't affect roi's local peaks
-            img_object[np.logical_not(label_mask)] = bg_val
-
-            mask = _get_peak_mask(img_object, footprint, threshold, label_mask)
-
-            coordinates = _get_high_intensity_peaks(img_object, mask,
-                                                    num_peaks_per_label,
-                                                    min_distance,
-                                                    p_norm)
-
-            # transform coordinates in global image indices space
-            for idx, s in enumerate(roi):
-                coordinates[:, idx] += s.start
+        mask, label_index = _get_labels_peak_mask(image, _labels, footprint,
+                                                  threshold, num_workers)
 
-            labels_peak_coord.append(coordinates)
+        # Sort the peaks by label, and then by decreasing intensity
+        coord = np.nonzero(mask)
+        peak_labels = label_index[coord]
+        peak_order = np.lexsort((-image[coord], peak_labels))
+        coordinates = np.transpose(coord)[peak_order]
 
-        if labels_peak_coord:
-            coordinates = np.vstack(labels_peak_coord)
-        else:
-            coordinates = np.empty((0, 2), dtype=int)
+        # Select num_peaks_per_label peaks in each label
+        kept = _ensure_spacing(coordinates, min_distance, p_norm,
+                               groups=peak_labels[peak_order],
+                               max_per_group=num_peaks_per_label)
+        coordinates = coordinates[kept]
 
         if len(coordinates) > num_peaks:
             out = np.zeros_like(image, dtype=bool)
@@ -4,7 +4,7 @@ import numpy as np
 from skimage.draw import disk
 from skimage.draw.draw3d import ellipsoid
 from skimage.feature import blob_dog, blob_log, blob_doh
-from skimage.feature.blob import _blob_overlap
+from skimage.feature.blob import _blob_overlap, _blob_overlaps, _prune_blobs
 import math
 from numpy.testing import assert_almost_equal
 
@@ -459,3 +459,89 @@ def test_no_blob():
     im = np.zeros((10, 10))
     blobs = blob_log(im,  min_sigma=2, max_sigma=5, num_sigma=4)
     assert len(blobs) == 0
+
+
+@pytest.mark.parametrize("num_workers", [1, 3])
+def test_num_workers(num_workers):
+    img = np.ones((64, 64))
+    xs, ys = disk((20, 30), 6)
+    img[xs, ys] = 255
+    xs, ys = disk((45, 20), 3)
+    img[xs, ys] = 128
+    for blob_func in (blob_dog, blob_log, blob_doh):
+        blobs = blob_func(img, min_sigma=2, max_sigma=10,
+                          num_workers=num_workers)
+        assert_almost_equal(blobs, blob_func(img, min_sigma=2, max_sigma=10))
+        assert len(blobs) > 0
+
+
+def test_blob_overlaps_vectorized():
+    r2, r3 = math.sqrt(2), math.sqrt(3)
+    # Disjoint, contained, and two circles of the same radius with the
+    # distance between centers equal to the radius
+    blobs1 = np.array([[0, 0, 1],
+                       [0, 0, 5],
+                       [0, 0, 10 / r2]])
+    blobs2 = np.array([[10, 10, 1],
+                       [1, 0, 1],
+                       [0, 10, 10 / r2]])
+    overlaps = _blob_overlaps(blobs1, blobs2)
+    assert_almost_equal(
+        overlaps,
+        [0, 1, 1 / math.pi * (2 * math.acos(1 / 2) - math.sqrt(3) / 2)])
+    # The same in 3D: the lens of two spheres of radius r at distance r has
+    # a volume of 5 * pi * r**3 / 12, 5 / 16 of each sphere
+    blobs1 = np.array([[0, 0, 0, 1],
+                       [0, 0, 0, 5],
+                       [0, 0, 0, 10 / r3]])
+    blobs2 = np.array([[10, 10, 10, 1],
+                       [1, 0, 0, 1],
+                       [0, 0, 10, 10 / r3]])
+    overlaps = _blob_overlaps(blobs1, blobs2)
+    assert_almost_equal(overlaps, [0, 1, 5 / 16])
+    # Anisotropic sigmas, as in test_blob_overlap_3d_anisotropic
+    blobs1 = np.array([[0, 0, 0, 2 / r3, 10 / r3, 10 / r3],
+                       [0, 0, 0, 2 / r3, 10 / r3, 10 / r3]])
+    blobs2 = np.array([[0, 0, 10, 0.2 / r3, 1 / r3, 1 / r3],
+                       [2, 0, 0, 0.2 / r3, 1 / r3, 1 / r3]])
+    overlaps = _blob_overlaps(blobs1, blobs2, sigma_dim=3)
+    assert_almost_equal(overlaps, [0.48125, 0.48125])
+
+
+def test_prune_blobs_chain():
+    # Each blob overlaps the next one only. The largest one eliminates the
+    # second, which then can't eliminate the third.
+    blobs = np.array([[10, 10, 5],
+                      [10, 14, 4],
+                      [10, 18, 3],
+                      [10, 21, 2]], dtype=float)
+    pruned = _prune_blobs(blobs[::-1].copy(), 0.5)
+    assert_almost_equal(pruned, blobs[[2, 0]])
+
+
+def test_prune_blobs_decreasing_sigma():
+    # Blobs are eliminated by decreasing sigma, whatever their order: the
+    # blob of sigma 4 is eliminated by the one of sigma 5, so that the blobs
+    # of sigma 3 it overlaps are kept, and eliminate the ones of sigma 2.
+    blobs = np.array([[10, 10, 5],
+                      [10, 14, 4],
+                      [14, 17, 3],
+                      [6, 17, 3],
+                      [14, 20, 2],
+                      [6, 20, 2],
+                      [40, 40, 2]], dtype=float)
+    rng = np.random.RandomState(0)
+    for _ in range(10):
+        order = rng.permutation(len(blobs))
+        pruned = _prune_blobs(blobs[order], 0.5)
+        assert (sorted(map(tuple, pruned))
+                == sorted(map(tuple, blobs[[0, 2, 3, 6]])))
+
+
+def test_prune_blobs_equal_sigma():
+    # Of two blobs with the same sigma, the first one is eliminated
+    blobs = np.array([[10, 10, 3],
+                      [10, 11, 3],
+                      [40, 40, 3]], dtype=float)
+    pruned = _prune_blobs(blobs.copy(), 0.5)
+    assert_almost_equal(pruned, blobs[1:])
@@ -1,6 +1,8 @@
 import unittest
 import numpy as np
+import pytest
 from skimage._shared.testing import assert_equal
+from scipy import ndimage as ndi
 from scipy.ndimage import binary_dilation, binary_erosion
 from skimage import data, feature
 from skimage.util import img_as_float
@@ -119,3 +121,39 @@ class TestCanny(unittest.TestCase):
         result_float = feature.canny(image_float)
 
         assert_equal(result_uint8, result_float)
+
+
+@pytest.mark.parametrize("use_quantiles", [False, True])
+def test_bands(monkeypatch, use_quantiles):
+    from skimage.feature import _canny
+    image = data.camera()[100:300]
+    mask = np.random.RandomState(0).rand(*image.shape) > 0.02
+    thresholds = (0.5, 0.8) if use_quantiles else (20, 40)
+    expected = feature.canny(image, 2, *thresholds, mask=mask,
+                             use_quantiles=use_quantiles)
+    monkeypatch.setattr(_canny, '_CANNY_ROWS', 3)
+    result = feature.canny(image, 2, *thresholds, mask=mask,
+                           use_quantiles=use_quantiles, num_workers=3)
+    assert_equal(result, expected)
+
+
+def test_float32():
+    image = img_as_float(data.camera())
+    expected = feature.canny(image, 1.5)
+    result = feature.canny(image.astype(np.float32), 1.5)
+    assert result.dtype == bool
+    assert np.mean(result != expected) < 1e-3
+
+
+def test_hysteresis():
+    from skimage.feature._canny_cy import _hysteresis
+    rng = np.random.RandomState(0)
+    edges = rng.choice(3, size=(100, 120), p=[0.5, 0.48, 0.02])
+    edges = edges.astype(np.uint8)
+    labels, count = ndi.label(edges > 0, np.ones((3, 3)))
+    strong = np.zeros(count + 1, dtype=bool)
+    strong[labels[edges == 2]] = True
+    strong[0] = False
+    expected = strong[labels]
+    _hysteresis(edges)
+    assert_equal(edges.view(bool), expected)
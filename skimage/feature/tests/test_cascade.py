@@ -21,3 +21,36 @@ def test_detector_astronaut():
                                            max_size=(123, 123))
 
     assert len(detected) == 1, 'One face should be detected.'
+
+
+def test_detector_bands(monkeypatch):
+    from skimage.feature import _cascade
+
+    detector = Cascade(data.lbp_frontal_face_cascade_filename())
+    img = data.astronaut()[:300, 100:400]
+
+    kwargs = dict(img=img, scale_factor=1.2, step_ratio=1,
+                  min_size=(30, 30), max_size=(150, 150),
+                  min_neighbour_number=1, intersection_score_threshold=0.3)
+    expected = detector.detect_multi_scale(**kwargs)
+    assert len(expected) > 1
+
+    # The detections are grouped in the same order whatever the units of
+    # work of the threads
+    monkeypatch.setattr(_cascade, '_CASCADE_ROWS', 1)
+    assert detector.detect_multi_scale(**kwargs) == expected
+    monkeypatch.setattr(_cascade, '_CASCADE_ROWS', 1000)
+    assert detector.detect_multi_scale(**kwargs) == expected
+
+
+def test_detector_negative_threshold():
+    detector = Cascade(data.lbp_frontal_face_cascade_filename())
+    img = data.astronaut()[:300, 100:400]
+
+    # All the detections intersect with a score above a negative threshold
+    detected = detector.detect_multi_scale(img=img, scale_factor=1.2,
+                                           step_ratio=1, min_size=(30, 30),
+                                           max_size=(150, 150),
+                                           min_neighbour_number=1,
+                                           intersection_score_threshold=-1)
+    assert len(detected) == 1
@@ -204,6 +204,61 @@ def test_hessian_matrix_eigvals_3d(im3d):
     assert np.max(response0) > 0
 
 
+def _eigvalsh_elems(S_elems, ndim):
+    """Reference eigenvalues of symmetric matrices, in decreasing order."""
+    matrices = np.empty(S_elems[0].shape + (ndim, ndim))
+    idx = 0
+    for row in range(ndim):
+        for col in range(row, ndim):
+            matrices[..., row, col] = S_elems[idx]
+            matrices[..., col, row] = S_elems[idx]
+            idx += 1
+    return np.moveaxis(np.linalg.eigvalsh(matrices)[..., ::-1], -1, 0)
+
+
+@pytest.mark.parametrize('ndim', [2, 3])
+def test_symmetric_eigenvalues_closed_form(ndim):
+    rng = np.random.RandomState(0)
+    shape = (20, 30, 40)[:ndim]
+    n_elems = ndim * (ndim + 1) // 2
+    # Random matrices, and matrices with repeated or zero eigenvalues
+    vectors = rng.randn(2, ndim, *shape)
+    cases = [rng.randn(n_elems, *shape) * 1000,
+             [vectors[0, i] * vectors[0, j]
+              for i in range(ndim) for j in range(i, ndim)],
+             [vectors[0, i] * vectors[0, j] - vectors[1, i] * vectors[1, j]
+              for i in range(ndim) for j in range(i, ndim)],
+             [np.full(shape, float(i == j))
+              for i in range(ndim) for j in range(i, ndim)]]
+    for S_elems in cases:
+        S_elems = list(S_elems)
+        expected = _eigvalsh_elems(S_elems, ndim)
+        eigs = hessian_matrix_eigvals(S_elems)
+        assert eigs.shape == (ndim,) + shape
+        scale = max(np.abs(elem).max() for elem in S_elems)
+        np.testing.assert_allclose(eigs, expected, rtol=0,
+                                   atol=1e-13 * scale)
+
+
+def test_symmetric_eigenvalues_float32():
+    rng = np.random.RandomState(0)
+    S_elems = [elem.astype(np.float32) for elem in rng.randn(6, 10, 11, 12)]
+    eigs = structure_tensor_eigenvalues(S_elems)
+    assert eigs.dtype == np.float32
+    np.testing.assert_allclose(eigs, _eigvalsh_elems(S_elems, 3), rtol=0,
+                               atol=1e-5)
+
+
+@pytest.mark.parametrize('num_workers', [1, 3])
+def test_symmetric_eigenvalues_chunks(monkeypatch, im3d, num_workers):
+    from skimage.feature import corner
+    H = hessian_matrix(im3d)
+    expected = hessian_matrix_eigvals(H)
+    monkeypatch.setattr(corner, '_EIGVALS_CHUNK', 1000)
+    assert_array_equal(hessian_matrix_eigvals(H, num_workers=num_workers),
+                       expected)
+
+
 @test_parallel()
 def test_hessian_matrix_det():
     image = np.zeros((5, 5))
@@ -229,6 +284,53 @@ def test_hessian_matrix_det_3d(im3d):
     assert response[highest] > 0
 
 
+def test_hessian_matrix_det_float32():
+    image = data.camera()[:100, :100] / 255
+    expected = hessian_matrix_det(image, 3)
+    det = hessian_matrix_det(image.astype(np.float32), 3)
+    assert_almost_equal(det, expected, decimal=5)
+
+
+@pytest.mark.parametrize(
+    "func",
+    [corner_harris, corner_shi_tomasi, corner_kitchen_rosenfeld,
+     lambda image, num_workers: corner_foerstner(image,
+                                                 num_workers=num_workers),
+     lambda image, num_workers: corner_harris(image, method='eps', sigma=3,
+                                              num_workers=num_workers),
+     lambda image, num_workers: hessian_matrix_det(image, 3,
+                                                   num_workers=num_workers),
+     lambda image, num_workers: hessian_matrix_det(image, 1.5,
+                                                   approximate=False,
+                                                   num_workers=num_workers),
+     lambda image, num_workers: corner_kitchen_rosenfeld(
+         image, mode='wrap', num_workers=num_workers)])
+@pytest.mark.parametrize("num_workers", [1, 3])
+def test_response_bands(monkeypatch, func, num_workers):
+    from skimage.feature import corner
+    image = data.camera()[:120, :90]
+    expected = func(image, num_workers=1)
+    # Bands smaller than their halos, and an incomplete last band
+    monkeypatch.setattr(corner, '_CORNER_ROWS', 7)
+    result = func(image, num_workers=num_workers)
+    assert_array_equal(result, expected)
+
+
+def test_hessian_matrix_det_3d_bands(monkeypatch, im3d):
+    from skimage.feature import corner
+    expected = hessian_matrix_det(im3d)
+    monkeypatch.setattr(corner, '_CORNER_ROWS', 4)
+    assert_array_equal(hessian_matrix_det(im3d), expected)
+
+
+@pytest.mark.parametrize("func", [corner_harris, corner_shi_tomasi])
+def test_response_float32(func):
+    image = data.camera()[:100, :100] / 255
+    response = func(image.astype(np.float32))
+    assert response.dtype == np.float32
+    assert_almost_equal(response, func(image), decimal=5)
+
+
 def test_shape_index():
     # software floating point arm doesn't raise a warning on divide by zero
     # https://github.com/scikit-image/scikit-image/issues/3335
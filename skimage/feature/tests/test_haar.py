@@ -9,6 +9,7 @@ from numpy.testing import assert_array_equal
 
 from skimage.transform import integral_image
 from skimage.feature import haar_like_feature
+from skimage.feature import haar_like_feature_batch
 from skimage.feature import haar_like_feature_coord
 from skimage.feature import draw_haar_like_feature
 
@@ -100,6 +101,76 @@ def test_haar_like_feature_precomputed(feature_type):
     assert_array_equal(haar_feature_precomputed, haar_feature)
 
 
+@pytest.mark.parametrize("dtype", [np.uint8, np.int8,
+                                   np.float32, np.float64])
+def test_haar_like_feature_batch(dtype):
+    rng = np.random.RandomState(0)
+    img = (rng.rand(3, 20, 25) * 100).astype(dtype)
+    img_ii = np.stack([integral_image(i) for i in img])
+    rois = np.stack([rng.randint(0, 3, 20), rng.randint(0, 20 - 6, 20),
+                     rng.randint(0, 25 - 5, 20)], axis=1)
+    expected = np.stack([haar_like_feature(img_ii[k], r, c, 5, 6)
+                         for k, r, c in rois])
+
+    haar_features = haar_like_feature_batch(img_ii, rois, 5, 6)
+    assert haar_features.dtype == expected.dtype
+    assert_array_equal(haar_features, expected)
+
+    # ROIs of a single integral image
+    haar_features = haar_like_feature_batch(img_ii[1], rois[:, 1:], 5, 6)
+    assert_array_equal(haar_features[rois[:, 0] == 1],
+                       expected[rois[:, 0] == 1])
+
+    # Top left ROI of each integral image
+    haar_features = haar_like_feature_batch(img_ii, None, 5, 6)
+    assert_array_equal(haar_features,
+                       [haar_like_feature(ii, 0, 0, 5, 6) for ii in img_ii])
+
+
+def test_haar_like_feature_batch_precomputed(monkeypatch):
+    from skimage.feature import haar
+    monkeypatch.setattr(haar, '_HAAR_ROIS', 3)
+
+    rng = np.random.RandomState(0)
+    img_ii = integral_image(rng.rand(20, 25))
+    rois = np.stack([rng.randint(0, 20 - 6, 10),
+                     rng.randint(0, 25 - 5, 10)], axis=1)
+    feat_coord, feat_type = haar_like_feature_coord(5, 6, ['type-4',
+                                                           'type-3-y'])
+    idx = rng.permutation(len(feat_coord))[:50]
+    expected = np.stack([haar_like_feature(img_ii, r, c, 5, 6,
+                                           feature_type=feat_type[idx],
+                                           feature_coord=feat_coord[idx])
+                         for r, c in rois])
+
+    for num_workers in (1, 2):
+        haar_features = haar_like_feature_batch(
+            img_ii, rois, 5, 6, feature_type=feat_type[idx],
+            feature_coord=feat_coord[idx], dtype=np.float32,
+            num_workers=num_workers)
+        assert haar_features.dtype == np.float32
+        assert_array_equal(haar_features, expected.astype(np.float32))
+
+
+def test_haar_like_feature_batch_error():
+    img_ii = integral_image(np.ones((5, 5)))
+    with pytest.raises(ValueError):
+        haar_like_feature_batch(img_ii, [(1, 0)], 5, 5)
+    with pytest.raises(ValueError):
+        haar_like_feature_batch(img_ii, [(0, 0)], 5, 5,
+                                feature_type='unknown_type')
+
+    feat_coord, feat_type = haar_like_feature_coord(5, 5, 'type-2-x')
+    with pytest.raises(ValueError):
+        haar_like_feature_batch(img_ii, [(0, 0)], 5, 5,
+                                feature_type=feat_type[:3],
+                                feature_coord=feat_coord)
+    with pytest.raises(ValueError):
+        haar_like_feature_batch(img_ii, [(0, 0)], 4, 4,
+                                feature_type=feat_type,
+                                feature_coord=feat_coord)
+
+
 @pytest.mark.parametrize("feature_type,height,width,expected_coord",
                          [('type-2-x', 2, 2,
                            [[[(0, 0), (0, 0)], [(0, 1), (0, 1)]],
@@ -254,3 +254,91 @@ def test_hog_output_equivariance_multichannel():
         hog_fact = feature.hog(np.roll(img, n, axis=2), multichannel=True,
                                block_norm='L1')
         assert_almost_equal(hog_ref, hog_fact)
+
+
+@testing.parametrize("block_norm", ['L1', 'L1-sqrt', 'L2', 'L2-Hys'])
+def test_hog_block_normalization_methods(block_norm):
+    img = color.rgb2gray(data.astronaut())[:64, :96]
+    fd = feature.hog(img, orientations=5, pixels_per_cell=(8, 8),
+                     cells_per_block=(2, 3), block_norm=block_norm,
+                     feature_vector=False)
+    assert fd.shape == (7, 10, 2, 3, 5)
+
+    # Normalize one block by hand
+    eps = 1e-5
+    r, c = 3, 4
+    cells = feature._hog._hog_cell_histograms(
+        img, 5, (8, 8), False, False)[r:r + 2, c:c + 3]
+    if block_norm == 'L1':
+        expected = cells / (np.abs(cells).sum() + eps)
+    elif block_norm == 'L1-sqrt':
+        expected = np.sqrt(cells / (np.abs(cells).sum() + eps))
+    elif block_norm == 'L2':
+        expected = cells / np.sqrt((cells ** 2).sum() + eps ** 2)
+    else:
+        expected = cells / np.sqrt((cells ** 2).sum() + eps ** 2)
+        expected = np.minimum(expected, 0.2)
+        expected = expected / np.sqrt((expected ** 2).sum() + eps ** 2)
+    assert_almost_equal(fd[r, c], expected)
+
+
+@testing.parametrize("multichannel", [False, True])
+def test_hog_dense_matches_hog(multichannel):
+    img = data.astronaut()[:150, :200]
+    if not multichannel:
+        img = color.rgb2gray(img)
+    blocks = feature.hog_dense(img, pixels_per_cell=(7, 9),
+                               cells_per_block=(2, 2), block_norm='L2',
+                               multichannel=multichannel)
+    expected = feature.hog(img, pixels_per_cell=(7, 9),
+                           cells_per_block=(2, 2), block_norm='L2',
+                           feature_vector=False, multichannel=multichannel)
+    assert_almost_equal(blocks, expected)
+
+
+def test_hog_dense_windows():
+    img = color.rgb2gray(data.astronaut())[:200, :150]
+    blocks = feature.hog_dense(img)
+    windows = feature.hog_dense(img, window_shape=(64, 45))
+    # 8 x 5 cells per window, 6 x 3 blocks
+    assert windows.shape == (18, 14, 6, 3, 3, 3, 9)
+    assert not windows.flags.writeable
+    assert np.shares_memory(windows, windows[5, 7])
+
+    for i, j in [(0, 0), (5, 7), (17, 13)]:
+        np.testing.assert_array_equal(windows[i, j],
+                                      blocks[i:i + 6, j:j + 3])
+
+    # The blocks away from the window border are the ones of its crop
+    fd_crop = feature.hog(img[40:104, 56:101], feature_vector=False)
+    assert_almost_equal(windows[5, 7, 1:-1, 1:-1], fd_crop[1:-1, 1:-1])
+
+
+def test_hog_dense_batch():
+    images = np.stack([color.rgb2gray(data.astronaut())[:96, :80],
+                       data.camera()[:96, :80] / 255.])
+    blocks = feature.hog_dense(images, cells_per_block=(2, 2),
+                               block_norm='L1', batch=True)
+    windows = feature.hog_dense(images, cells_per_block=(2, 2),
+                                block_norm='L1', window_shape=(48, 48),
+                                batch=True)
+    assert windows.shape == (2, 7, 5, 5, 5, 2, 2, 9)
+    for k, img in enumerate(images):
+        expected = feature.hog(img, cells_per_block=(2, 2), block_norm='L1',
+                               feature_vector=False)
+        assert_almost_equal(blocks[k], expected)
+        np.testing.assert_array_equal(windows[k, 2, 3],
+                                      blocks[k, 2:7, 3:8])
+
+    rgb = np.stack([data.astronaut()[:64, :64], data.coffee()[:64, :64]])
+    blocks = feature.hog_dense(rgb, batch=True)
+    for k, img in enumerate(rgb):
+        assert_almost_equal(blocks[k], feature.hog(img, feature_vector=False,
+                                                   multichannel=True))
+
+
+@testing.parametrize("window_shape", [(16, 64), (128, 64), (64, 200)])
+def test_hog_dense_incorrect_window(window_shape):
+    img = np.zeros((100, 100))
+    with testing.raises(ValueError):
+        feature.hog_dense(img, window_shape=window_shape)
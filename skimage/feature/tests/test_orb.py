@@ -129,3 +129,70 @@ def test_no_descriptors_extracted_orb():
     detector_extractor = ORB()
     with testing.raises(RuntimeError):
         detector_extractor.detect_and_extract(img)
+
+
+@pytest.mark.parametrize('dtype', ['float32', 'float64'])
+@pytest.mark.parametrize('shape', [(512, 512), (77, 131), (3, 2)])
+def test_pyramid_buffers(dtype, shape):
+    from skimage.transform import pyramid_gaussian
+    image = np.random.RandomState(0).rand(*shape).astype(dtype)
+    detector_extractor = ORB(n_scales=8, downscale=1.2)
+    for _ in range(2):
+        pyramid = [layer.copy() for layer in
+                   detector_extractor._build_pyramid(image)]
+        expected = list(pyramid_gaussian(image, 7, 1.2))
+        assert len(pyramid) == len(expected)
+        for layer, expected_layer in zip(pyramid, expected):
+            assert layer.dtype == expected_layer.dtype
+            if dtype == 'float64':
+                assert_equal(layer, expected_layer)
+            else:
+                assert_almost_equal(layer, expected_layer, decimal=6)
+
+
+def test_pyramid_buffers_reused():
+    detector_extractor = ORB()
+    detector_extractor.detect_and_extract(img)
+    buffers = detector_extractor._pyramid
+    detector_extractor.detect_and_extract(img[::-1])
+    assert detector_extractor._pyramid is buffers
+
+    detector_extractor.detect_and_extract(img[:200])
+    assert detector_extractor._pyramid is not buffers
+
+
+@pytest.mark.parametrize('num_workers', [1, 3])
+def test_num_workers(num_workers):
+    expected = ORB(n_keypoints=50)
+    expected.detect_and_extract(img)
+    detector_extractor = ORB(n_keypoints=50, num_workers=num_workers)
+    detector_extractor.detect_and_extract(img)
+    for attr in ('keypoints', 'scales', 'orientations', 'responses',
+                 'descriptors'):
+        assert_equal(getattr(detector_extractor, attr),
+                     getattr(expected, attr))
+
+    detector_extractor.detect(img)
+    expected.detect(img)
+    assert_equal(detector_extractor.keypoints, expected.keypoints)
+    detector_extractor.extract(img, expected.keypoints, expected.scales,
+                               expected.orientations)
+    expected.extract(img, expected.keypoints, expected.scales,
+                     expected.orientations)
+    assert_equal(detector_extractor.descriptors, expected.descriptors)
+    assert_equal(detector_extractor.mask_, expected.mask_)
+
+
+def test_detect_and_extract_frames():
+    frames = np.stack([img, img[::-1], img[:, ::-1]])
+    detector_extractor = ORB(n_keypoints=20)
+    results = list(detector_extractor.detect_and_extract_frames(frames))
+    assert len(results) == 3
+    for frame, features in zip(frames, results):
+        expected = ORB(n_keypoints=20)
+        expected.detect_and_extract(frame)
+        assert_equal(features[0], expected.keypoints)
+        assert_equal(features[1], expected.scales)
+        assert_equal(features[2], expected.orientations)
+        assert_equal(features[3], expected.responses)
+        assert_equal(features[4], expected.descriptors)
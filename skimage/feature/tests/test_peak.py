@@ -180,6 +180,36 @@ class TestPeakLocalMax():
         result = result[np.argsort(image[tuple(result.T)])[::-1]]
         assert (result == expected).all()
 
+    def test_labels_one_at_a_time(self):
+        # Labels with overlapping bounding boxes, and large label values
+        rng = np.random.RandomState(0)
+        image = rng.rand(30, 40, 20)
+        labels = rng.randint(0, 4, size=image.shape) * 100000
+        labels[image < 0.2] = 0
+        image_copy = image.copy()
+        result = peak.peak_local_max(image, labels=labels, min_distance=2,
+                                     num_peaks_per_label=50)
+        assert_equal(image, image_copy)
+
+        # The peaks of each label, in the bounding box of its pixels away
+        # from the border, with the other pixels masked out
+        inner = (slice(2, -2),) * image.ndim
+        expected = []
+        for label in (100000, 200000, 300000):
+            label_mask = np.zeros(image.shape, dtype=int)
+            label_mask[inner] = labels[inner] == label
+            roi = ndi.find_objects(label_mask)[0]
+            crop = np.where(label_mask[roi], image[roi], -1)
+            coord = peak.peak_local_max(crop, min_distance=2, threshold_abs=0,
+                                        exclude_border=False, num_peaks=50)
+            expected.append(coord + [s.start for s in roi])
+        assert_equal(result, np.concatenate(expected))
+
+        # The same labels, numbered consecutively
+        result = peak.peak_local_max(image, labels=labels // 100000,
+                                     min_distance=2, num_peaks_per_label=50)
+        assert_equal(result, np.concatenate(expected))
+
     def test_ndarray_indices_false(self):
         nd_image = np.zeros((5, 5, 5))
         nd_image[2, 2, 2] = 1
@@ -487,6 +517,40 @@ def test_exclude_border_errors():
         assert peak.peak_local_max(image, exclude_border=-1)
 
 
+@pytest.mark.parametrize("shape", [(1,), (1, 1), (12, 15), (6, 7, 8)])
+@pytest.mark.parametrize("n_scales", [1, 2, 5])
+@pytest.mark.parametrize("threshold", [-1, 0.5])
+def test_scale_space_peaks_matches_stacked(shape, n_scales, threshold):
+    rng = np.random.RandomState(0)
+    # ties between neighbors and a negative background
+    images = [np.round(rng.randn(*shape), 1) for _ in range(n_scales)]
+    border = (1,) * (len(shape) - 1) + (0,)
+    expected = peak.peak_local_max(
+        np.stack(images, axis=-1), threshold_abs=threshold,
+        threshold_rel=0.0, footprint=np.ones((3,) * (len(shape) + 1)),
+        exclude_border=border + (0,))
+    coords = peak._scale_space_peaks(iter(images), threshold, border)
+    assert_equal(coords, expected)
+
+
+@pytest.mark.parametrize("footprint", [np.ones((5, 5)), np.ones((4, 3)),
+                                       np.ones((9, 1, 3))])
+def test_maximum_filter_bands(monkeypatch, footprint):
+    rng = np.random.RandomState(0)
+    image = rng.rand(*(40, 30, 7)[:footprint.ndim])
+    expected = ndi.maximum_filter(image, footprint=footprint,
+                                  mode='constant')
+    monkeypatch.setattr(peak, '_PEAK_ROWS', 6)
+    assert_equal(peak._maximum_filter(image, footprint, num_workers=3),
+                 expected)
+
+
+def test_scale_space_peaks_trivial():
+    images = [np.full((5, 5), 2.)] * 3
+    coords = peak._scale_space_peaks(images, 1, (0, 0))
+    assert coords.shape == (0, 3)
+
+
 class TestProminentPeaks(unittest.TestCase):
     def test_isolated_peaks(self):
         image = np.zeros((15, 15))
@@ -1,7 +1,10 @@
 import numpy as np
+from scipy import sparse
 from skimage.feature import (greycomatrix,
                              greycoprops,
+                             local_greycoprops,
                              local_binary_pattern,
+                             local_binary_pattern_histograms,
                              multiblock_lbp)
 from skimage._shared.testing import test_parallel
 from skimage.transform import integral_image
@@ -199,6 +202,99 @@ class TestGLCM():
                      'energy', 'correlation', 'ASM']:
             greycoprops(result, prop)
 
+    @testing.parametrize('symmetric', [False, True])
+    @testing.parametrize('normed', [False, True])
+    def test_sparse(self, symmetric, normed):
+        im = np.random.RandomState(0).randint(0, 300, (30, 40))
+        distances = [1, 2, 50]
+        angles = [0, np.pi / 4, np.pi / 2, 3 * np.pi / 4, np.pi]
+        dense = greycomatrix(im, distances, angles, levels=300,
+                             symmetric=symmetric, normed=normed)
+        result = greycomatrix(im, distances, angles, levels=300,
+                              symmetric=symmetric, normed=normed,
+                              sparse=True)
+        assert len(result) == 3
+        for d in range(3):
+            assert len(result[d]) == 5
+            for a in range(5):
+                glcm = result[d][a]
+                assert sparse.isspmatrix_coo(glcm)
+                assert glcm.dtype == dense.dtype
+                np.testing.assert_almost_equal(glcm.toarray(),
+                                               dense[:, :, d, a])
+        # The offsets larger than the image have no co-occurrence
+        assert result[2][2].nnz == 0
+
+        for prop in ['contrast', 'dissimilarity', 'homogeneity',
+                     'energy', 'correlation', 'ASM']:
+            np.testing.assert_almost_equal(greycoprops(result, prop),
+                                           greycoprops(dense, prop))
+
+    def test_sparse_duplicates(self):
+        glcm = sparse.coo_matrix(([1, 2, 1], ([0, 1, 1], [0, 1, 1])),
+                                 shape=(2, 2))
+        dense = glcm.toarray()[:, :, np.newaxis, np.newaxis]
+        for prop in ['energy', 'ASM', 'correlation']:
+            np.testing.assert_almost_equal(greycoprops([[glcm]], prop),
+                                           greycoprops(dense, prop))
+
+    @testing.parametrize('num_workers', [1, 3])
+    def test_num_workers(self, num_workers):
+        im = np.random.RandomState(0).randint(0, 8, (20, 20), dtype=np.uint8)
+        angles = [0, np.pi / 4, np.pi / 2, 3 * np.pi / 4]
+        expected = greycomatrix(im, [1, 2, 3], angles, levels=8,
+                                symmetric=True, normed=True)
+        result = greycomatrix(im, [1, 2, 3], angles, levels=8,
+                              symmetric=True, normed=True,
+                              num_workers=num_workers)
+        np.testing.assert_array_equal(result, expected)
+
+    @testing.parametrize('symmetric', [False, True])
+    @testing.parametrize('window_shape', [(3, 3), (4, 5), (1, 7), (30, 2)])
+    def test_local_greycoprops(self, symmetric, window_shape):
+        rng = np.random.RandomState(0)
+        im = rng.randint(0, 6, (12, 15))
+        im[:5, :5] = 2
+        distances = [1, 3]
+        angles = [0, np.pi / 4, np.pi / 2, 3 * np.pi / 4, np.pi]
+        props = ['contrast', 'dissimilarity', 'homogeneity', 'energy',
+                 'correlation', 'ASM']
+        maps = local_greycoprops(im, distances, angles, window_shape,
+                                 levels=6, props=props, symmetric=symmetric)
+        assert sorted(maps) == sorted(props)
+
+        # Each window gives the properties of the GLCM of its crop
+        centre_r, centre_c = window_shape[0] // 2, window_shape[1] // 2
+        for r, c in [(0, 0), (2, 3), (6, 7), (11, 14), (11, 0)]:
+            crop = im[max(0, r - centre_r):r - centre_r + window_shape[0],
+                      max(0, c - centre_c):c - centre_c + window_shape[1]]
+            glcm = greycomatrix(crop, distances, angles, levels=6,
+                                symmetric=symmetric)
+            for prop in props:
+                np.testing.assert_almost_equal(maps[prop][r, c],
+                                               greycoprops(glcm, prop))
+
+    def test_local_greycoprops_num_workers(self, monkeypatch):
+        from skimage.feature import texture
+        monkeypatch.setattr(texture, '_LOCAL_GLCM_ROWS', 3)
+        im = np.random.RandomState(0).randint(0, 300, (20, 10))
+        expected = local_greycoprops(im, [1, 2], [0, np.pi / 2], (5, 5),
+                                     levels=300, props=['energy'],
+                                     num_workers=1)
+        result = local_greycoprops(im, [1, 2], [0, np.pi / 2], (5, 5),
+                                   levels=300, props=['energy'],
+                                   num_workers=4)
+        np.testing.assert_array_equal(result['energy'], expected['energy'])
+
+    def test_local_greycoprops_errors(self):
+        with testing.raises(ValueError):
+            local_greycoprops(self.image, [1], [0], (3, 3), levels=4,
+                              props=['ABC'])
+        with testing.raises(ValueError):
+            local_greycoprops(self.image, [1], [0], (0, 3), levels=4)
+        with testing.raises(ValueError):
+            local_greycoprops(self.image, [1], [0], (3, 3), levels=3)
+
 
 class TestLBP():
 
@@ -274,6 +370,68 @@ class TestLBP():
                         [ 9, 58,  0, 57,  7, 14]])
         np.testing.assert_array_almost_equal(lbp, ref)
 
+    @testing.parametrize('method, dtype',
+                         [('default', np.uint8), ('ror', np.uint16),
+                          ('uniform', np.uint8), ('nri_uniform', np.uint8),
+                          ('var', np.float32)])
+    def test_output_dtype(self, method, dtype):
+        expected = local_binary_pattern(self.image, 8, 1, method)
+        lbp = local_binary_pattern(self.image, 8, 1, method, dtype=dtype)
+        assert lbp.dtype == dtype
+        np.testing.assert_array_almost_equal(lbp, expected, decimal=3)
+
+    def test_output_dtype_errors(self):
+        with testing.raises(ValueError):
+            local_binary_pattern(self.image, 8, 1, 'var', dtype=np.uint8)
+        with testing.raises(ValueError):
+            local_binary_pattern(self.image, 9, 1, 'default', dtype=np.uint8)
+        with testing.raises(ValueError):
+            local_binary_pattern(self.image, 8, 1, 'default', dtype=np.int16)
+
+    @testing.parametrize('method', ['ror', 'uniform', 'nri_uniform'])
+    def test_lookup_table(self, method, monkeypatch):
+        from skimage.feature import texture
+        image = np.random.RandomState(0).rand(20, 30)
+        expected = local_binary_pattern(image, 12, 2, method)
+        monkeypatch.setattr(texture, '_LBP_LUT_MAX_P', 0)
+        texture._lbp_method_lut.cache_clear()
+        try:
+            lbp = local_binary_pattern(image, 12, 2, method)
+        finally:
+            texture._lbp_method_lut.cache_clear()
+        np.testing.assert_array_equal(lbp, expected)
+
+    def test_num_workers(self, monkeypatch):
+        from skimage.feature import texture
+        monkeypatch.setattr(texture, '_LBP_ROWS', 3)
+        image = np.random.RandomState(0).rand(20, 30)
+        expected = local_binary_pattern(image, 8, 1.5, num_workers=1)
+        lbp = local_binary_pattern(image, 8, 1.5, num_workers=4)
+        np.testing.assert_array_equal(lbp, expected)
+
+    @testing.parametrize('method', ['default', 'ror', 'uniform',
+                                    'nri_uniform'])
+    def test_histograms(self, method):
+        image = np.random.RandomState(0).rand(23, 34)
+        lbp = local_binary_pattern(image, 8, 2, method)
+        hist = local_binary_pattern_histograms(image, 8, 2, (5, 8), method,
+                                               num_workers=2)
+        n_bins = {'default': 256, 'ror': 256, 'uniform': 10,
+                  'nri_uniform': 59}[method]
+        assert hist.shape == (4, 4, n_bins)
+        for r in range(4):
+            for c in range(4):
+                block = lbp[r * 5:(r + 1) * 5, c * 8:(c + 1) * 8]
+                np.testing.assert_array_equal(
+                    hist[r, c], np.bincount(block.astype(int).ravel(),
+                                            minlength=n_bins))
+
+    def test_histograms_errors(self):
+        with testing.raises(ValueError):
+            local_binary_pattern_histograms(self.image, 8, 1, (2, 2), 'var')
+        with testing.raises(ValueError):
+            local_binary_pattern_histograms(self.image, 8, 1, (0, 2))
+
 
 class TestMBLBP():
 
@@ -2,18 +2,91 @@
 Methods to characterize image textures.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import itertools
+import threading
+
 import numpy as np
 import warnings
+from scipy import sparse as sp
 from .._shared.utils import check_nD
 from ..util import img_as_float
 from ..color import gray2rgb
-from ._texture import (_glcm_loop,
+from ._texture import (_glcm_offsets,
+                       _glcm_loop,
+                       _glcm_local_rows,
+                       _lbp_lut,
                        _local_binary_pattern,
+                       _local_binary_pattern_histograms,
                        _multiblock_lbp)
 
 
+# The properties of `greycoprops`, in the order of their codes in
+# `_glcm_local_rows`
+_GLCM_PROPS = ('contrast', 'dissimilarity', 'homogeneity', 'ASM', 'energy',
+               'correlation')
+
+
+def _glcm_sparse(image, offset, levels, symmetric, normed):
+    """Compute the co-occurrence matrix of one offset, in COO format."""
+    offset_row, offset_col = offset
+    n_rows = max(0, image.shape[0] - abs(offset_row))
+    n_cols = max(0, image.shape[1] - abs(offset_col))
+    start_row, start_col = max(0, -offset_row), max(0, -offset_col)
+    first = image[start_row:start_row + n_rows, start_col:start_col + n_cols]
+    start_row, start_col = max(0, offset_row), max(0, offset_col)
+    second = image[start_row:start_row + n_rows, start_col:start_col + n_cols]
+    first = first.astype(np.intp).ravel()
+    second = second.astype(np.intp).ravel()
+
+    codes = first * levels + second
+    if symmetric:
+        codes = np.concatenate([codes, second * levels + first])
+    codes, counts = np.unique(codes, return_counts=True)
+
+    if normed:
+        data = counts.astype(np.float64)
+        if codes.size:
+            data /= counts.sum()
+    else:
+        data = counts.astype(np.uint32)
+    return sp.coo_matrix((data, np.divmod(codes, levels)),
+                         shape=(levels, levels))
+
+
+def _glcm_levels(image, levels):
+    """Check the image and number of levels of a GLCM computation.
+
+    Returns the number of levels, which defaults to 256.
+    """
+    image_max = image.max()
+
+    if np.issubdtype(image.dtype, np.floating):
+        raise ValueError("Float images are not supported by greycomatrix. "
+                         "Convert the image to an unsigned integer type.")
+
+    # for image type > 8bit, levels must be set.
+    if image.dtype not in (np.uint8, np.int8) and levels is None:
+        raise ValueError("The levels argument is required for data types "
+                         "other than uint8. The resulting matrix will be at "
+                         "least levels ** 2 in size.")
+
+    if np.issubdtype(image.dtype, np.signedinteger) and np.any(image < 0):
+        raise ValueError("Negative-valued images are not supported.")
+
+    if levels is None:
+        levels = 256
+
+    if image_max >= levels:
+        raise ValueError("The maximum grayscale value in the image should be "
+                         "smaller than the number of levels.")
+
+    return levels
+
+
 def greycomatrix(image, distances, angles, levels=None, symmetric=False,
-                 normed=False):
+                 normed=False, *, sparse=False, num_workers=None):
     """Calculate the grey-level co-occurrence matrix.
 
     A grey level co-occurrence matrix is a histogram of co-occurring
@@ -46,16 +119,32 @@ def greycomatrix(image, distances, angles, levels=None, symmetric=False,
         by the total number of accumulated co-occurrences for the given
         offset. The elements of the resulting matrix sum to 1. The
         default is False.
+    sparse : bool, optional
+        If True, return the matrices in sparse (COO) format, which only
+        stores the co-occurrences found in the image. This saves memory and
+        time for images with a large number of grey levels, such as 12-bit
+        or 16-bit images. The default is False.
+    num_workers : int or None, optional
+        The number of parallel threads to use, each processing a different
+        offset. If set to ``None``, the default number of threads of
+        `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
-    P : 4-D ndarray
+    P : 4-D ndarray, or list of lists of sparse matrices
         The grey-level co-occurrence histogram. The value
         `P[i,j,d,theta]` is the number of times that grey-level `j`
         occurs at a distance `d` and at an angle `theta` from
         grey-level `i`. If `normed` is `False`, the output is of
         type uint32, otherwise it is float64. The dimensions are:
         levels x levels x number of distances x number of angles.
+        If `sparse` is True, `P[d][theta]` is instead the levels x levels
+        `scipy.sparse.coo_matrix` of the distance `d` and the angle `theta`.
+
+    Notes
+    -----
+    The symmetrization and normalization are done in place, without copying
+    the co-occurrence matrices.
 
     References
     ----------
@@ -108,49 +197,47 @@ def greycomatrix(image, distances, angles, levels=None, symmetric=False,
     check_nD(angles, 1, 'angles')
 
     image = np.ascontiguousarray(image)
+    levels = _glcm_levels(image, levels)
 
-    image_max = image.max()
-
-    if np.issubdtype(image.dtype, np.floating):
-        raise ValueError("Float images are not supported by greycomatrix. "
-                         "Convert the image to an unsigned integer type.")
-
-    # for image type > 8bit, levels must be set.
-    if image.dtype not in (np.uint8, np.int8) and levels is None:
-        raise ValueError("The levels argument is required for data types "
-                         "other than uint8. The resulting matrix will be at "
-                         "least levels ** 2 in size.")
+    distances = np.ascontiguousarray(distances, dtype=np.float64)
+    angles = np.ascontiguousarray(angles, dtype=np.float64)
 
-    if np.issubdtype(image.dtype, np.signedinteger) and np.any(image < 0):
-        raise ValueError("Negative-valued images are not supported.")
+    offsets = _glcm_offsets(distances, angles)
 
-    if levels is None:
-        levels = 256
+    if sparse:
+        def _count_offset(idx):
+            return _glcm_sparse(image, offsets[idx], levels, symmetric,
+                                normed)
 
-    if image_max >= levels:
-        raise ValueError("The maximum grayscale value in the image should be "
-                         "smaller than the number of levels.")
-
-    distances = np.ascontiguousarray(distances, dtype=np.float64)
-    angles = np.ascontiguousarray(angles, dtype=np.float64)
+        with ThreadPoolExecutor(max_workers=num_workers) as ex:
+            glcms = list(ex.map(_count_offset, np.ndindex(offsets.shape[:2])))
+        n_angles = len(angles)
+        return [glcms[d * n_angles:(d + 1) * n_angles]
+                for d in range(len(distances))]
 
+    # Count in floating point directly if normalizing, to avoid a copy
     P = np.zeros((levels, levels, len(distances), len(angles)),
-                 dtype=np.uint32, order='C')
+                 dtype=np.float64 if normed else np.uint32, order='C')
 
-    # count co-occurences
-    _glcm_loop(image, distances, angles, levels, P)
+    def _count_offset(idx):
+        glcm = P[(slice(None), slice(None)) + idx]
+        # count co-occurences
+        _glcm_loop(image, offsets[idx][0], offsets[idx][1], levels, glcm)
 
-    # make each GLMC symmetric
-    if symmetric:
-        Pt = np.transpose(P, (1, 0, 2, 3))
-        P = P + Pt
+        # make each GLMC symmetric
+        if symmetric:
+            glcm += glcm.T
 
-    # normalize each GLCM
-    if normed:
-        P = P.astype(np.float64)
-        glcm_sums = np.apply_over_axes(np.sum, P, axes=(0, 1))
-        glcm_sums[glcm_sums == 0] = 1
-        P /= glcm_sums
+        # normalize each GLCM
+        if normed:
+            glcm_sum = glcm.sum()
+            if glcm_sum != 0:
+                glcm /= glcm_sum
+
+    with ThreadPoolExecutor(max_workers=num_workers) as ex:
+        # Iterate over the results, to raise the exceptions of the threads
+        for _ in ex.map(_count_offset, np.ndindex(offsets.shape[:2])):
+            pass
 
     return P
 
@@ -176,12 +263,14 @@ def greycoprops(P, prop='contrast'):
 
     Parameters
     ----------
-    P : ndarray
+    P : ndarray, or list of lists of sparse matrices
         Input array. `P` is the grey-level co-occurrence histogram
         for which to compute the specified property. The value
         `P[i,j,d,theta]` is the number of times that grey-level j
         occurs at a distance d and at an angle theta from
-        grey-level i.
+        grey-level i. The sparse matrices returned by `greycomatrix` with
+        ``sparse=True`` are also accepted, and only their nonzero entries
+        are used.
     prop : {'contrast', 'dissimilarity', 'homogeneity', 'energy', \
             'correlation', 'ASM'}, optional
         The property of the GLCM to compute. The default is 'contrast'.
@@ -214,6 +303,12 @@ def greycoprops(P, prop='contrast'):
            [1.25      , 2.75      ]])
 
     """
+    if prop not in _GLCM_PROPS:
+        raise ValueError('%s is an invalid property' % (prop))
+
+    if isinstance(P, (list, tuple)):
+        return _sparse_greycoprops(P, prop)
+
     check_nD(P, 4, 'P')
 
     (num_level, num_level2, num_dist, num_angle) = P.shape
@@ -230,55 +325,290 @@ def greycoprops(P, prop='contrast'):
     glcm_sums[glcm_sums == 0] = 1
     P /= glcm_sums
 
+    I = np.arange(num_level).reshape((num_level, 1, 1, 1))
+    J = np.arange(num_level).reshape((1, num_level, 1, 1))
+    return _glcm_property(P, I, J, prop, axis=(0, 1))
+
+
+def _sparse_greycoprops(P, prop):
+    """Compute a texture property of sparse GLCMs, see `greycoprops`."""
+    num_dist = len(P)
+    num_angle = len(P[0]) if num_dist else 0
+    if num_dist <= 0:
+        raise ValueError('num_dist must be positive.')
+    if num_angle <= 0:
+        raise ValueError('num_angle must be positive.')
+
+    results = np.empty((num_dist, num_angle), dtype=np.float64)
+    for d, glcms in enumerate(P):
+        if len(glcms) != num_angle:
+            raise ValueError('All distances must have the same number of '
+                             'angles.')
+        for a, glcm in enumerate(glcms):
+            glcm = sp.coo_matrix(glcm, copy=True)
+            if glcm.shape[0] != glcm.shape[1]:
+                raise ValueError('num_level and num_level2 must be equal.')
+            glcm.sum_duplicates()
+
+            # normalize the GLCM
+            p = glcm.data.astype(np.float64)
+            glcm_sum = p.sum()
+            if glcm_sum != 0:
+                p /= glcm_sum
+
+            results[d, a] = _glcm_property(p, glcm.row.astype(np.intp),
+                                           glcm.col.astype(np.intp), prop,
+                                           axis=0)
+    return results
+
+
+def _glcm_property(P, I, J, prop, axis):
+    """Compute a texture property of normalized GLCMs.
+
+    Parameters
+    ----------
+    P : ndarray
+        Normalized GLCM entries.
+    I, J : ndarray
+        Grey levels of the entries, broadcastable against `P`.
+    prop : str
+        The property to compute, see `greycoprops`.
+    axis : int or tuple of ints
+        The axes of `P` over which the entries of a GLCM lie.
+
+    Returns
+    -------
+    results : ndarray
+        The property of each GLCM.
+    """
     # create weights for specified property
-    I, J = np.ogrid[0:num_level, 0:num_level]
     if prop == 'contrast':
         weights = (I - J) ** 2
     elif prop == 'dissimilarity':
         weights = np.abs(I - J)
     elif prop == 'homogeneity':
         weights = 1. / (1. + (I - J) ** 2)
-    elif prop in ['ASM', 'energy', 'correlation']:
-        pass
-    else:
-        raise ValueError('%s is an invalid property' % (prop))
 
     # compute property for each GLCM
     if prop == 'energy':
-        asm = np.apply_over_axes(np.sum, (P ** 2), axes=(0, 1))[0, 0]
+        asm = np.sum(P ** 2, axis=axis)
         results = np.sqrt(asm)
     elif prop == 'ASM':
-        results = np.apply_over_axes(np.sum, (P ** 2), axes=(0, 1))[0, 0]
+        results = np.sum(P ** 2, axis=axis)
     elif prop == 'correlation':
-        results = np.zeros((num_dist, num_angle), dtype=np.float64)
-        I = np.array(range(num_level)).reshape((num_level, 1, 1, 1))
-        J = np.array(range(num_level)).reshape((1, num_level, 1, 1))
-        diff_i = I - np.apply_over_axes(np.sum, (I * P), axes=(0, 1))[0, 0]
-        diff_j = J - np.apply_over_axes(np.sum, (J * P), axes=(0, 1))[0, 0]
-
-        std_i = np.sqrt(np.apply_over_axes(np.sum, (P * (diff_i) ** 2),
-                                           axes=(0, 1))[0, 0])
-        std_j = np.sqrt(np.apply_over_axes(np.sum, (P * (diff_j) ** 2),
-                                           axes=(0, 1))[0, 0])
-        cov = np.apply_over_axes(np.sum, (P * (diff_i * diff_j)),
-                                 axes=(0, 1))[0, 0]
+        diff_i = I - np.sum(I * P, axis=axis)
+        diff_j = J - np.sum(J * P, axis=axis)
+
+        std_i = np.sqrt(np.sum(P * (diff_i) ** 2, axis=axis))
+        std_j = np.sqrt(np.sum(P * (diff_j) ** 2, axis=axis))
+        cov = np.sum(P * (diff_i * diff_j), axis=axis)
 
         # handle the special case of standard deviations near zero
-        mask_0 = std_i < 1e-15
-        mask_0[std_j < 1e-15] = True
-        results[mask_0] = 1
+        mask_0 = (std_i < 1e-15) | (std_j < 1e-15)
 
         # handle the standard case
-        mask_1 = mask_0 == False
-        results[mask_1] = cov[mask_1] / (std_i[mask_1] * std_j[mask_1])
-    elif prop in ['contrast', 'dissimilarity', 'homogeneity']:
-        weights = weights.reshape((num_level, num_level, 1, 1))
-        results = np.apply_over_axes(np.sum, (P * weights), axes=(0, 1))[0, 0]
+        results = np.where(mask_0, 1.,
+                           cov / np.where(mask_0, 1., std_i * std_j))
+    else:
+        results = np.sum(P * weights, axis=axis)
 
     return results
 
 
-def local_binary_pattern(image, P, R, method='default'):
+# Number of rows of the image processed by each thread at a time
+_LOCAL_GLCM_ROWS = 32
+
+
+def local_greycoprops(image, distances, angles, window_shape, levels=None,
+                      props=('contrast',), symmetric=False, *,
+                      num_workers=None):
+    """Compute maps of GLCM texture properties over a sliding window.
+
+    For each pixel, the grey-level co-occurrence matrix of the window
+    centered on it is normalized and summarized by the properties of
+    `greycoprops`. Only the pixel pairs whose two pixels lie in the window
+    are counted, so that the maps are the result of `greycomatrix` and
+    `greycoprops` applied to the crop of each window. The co-occurrences
+    are updated incrementally as the window slides along the rows of the
+    image.
+
+    Parameters
+    ----------
+    image : array_like
+        Integer typed input image. Only positive valued images are supported.
+        If type is other than uint8, the argument `levels` needs to be set.
+    distances : array_like
+        List of pixel pair distance offsets.
+    angles : array_like
+        List of pixel pair angles in radians.
+    window_shape : 2-tuple of int
+        Shape of the window. The window of a pixel is cropped by the image
+        border.
+    levels : int, optional
+        The input image should contain integers in [0, `levels`-1],
+        where levels indicate the number of grey-levels counted
+        (typically 256 for an 8-bit image). This argument is required for
+        16-bit images or higher.
+    props : sequence of str, optional
+        The properties to compute, among {'contrast', 'dissimilarity',
+        'homogeneity', 'energy', 'correlation', 'ASM'}. See `greycoprops`.
+    symmetric : bool, optional
+        If True, both (i, j) and (j, i) are accumulated when (i, j) is
+        encountered, see `greycomatrix`.
+    num_workers : int or None, optional
+        The number of parallel threads to use, each processing a different band
+        of rows and offset. If set to ``None``, the default number of threads
+        of `concurrent.futures.ThreadPoolExecutor` is used.
+
+    Returns
+    -------
+    maps : dict of ndarray
+        For each property in `props`, a (M, N, number of distances, number
+        of angles) array, where ``maps[prop][r, c, d, a]`` is the property
+        of the window centered on pixel ``(r, c)`` for the d'th distance and
+        the a'th angle.
+
+    See Also
+    --------
+    greycomatrix, greycoprops
+
+    Notes
+    -----
+    The computation time scales with the number of pixels and the height
+    of the window, but not with the number of levels. Only 'energy' and
+    'ASM' need the counts of the co-occurrences, which take
+    ``4 * levels ** 2`` bytes per thread.
+
+    Examples
+    --------
+    >>> image = np.array([[0, 0, 1, 1],
+    ...                   [0, 0, 1, 1],
+    ...                   [0, 2, 2, 2],
+    ...                   [2, 2, 3, 3]], dtype=np.uint8)
+    >>> maps = local_greycoprops(image, [1], [0], (3, 3), levels=4,
+    ...                          props=['contrast'])
+    >>> np.round(maps['contrast'][:, :, 0, 0], 2)
+    array([[0.  , 0.5 , 0.5 , 0.  ],
+           [1.33, 1.  , 0.33, 0.  ],
+           [1.33, 1.  , 0.33, 0.  ],
+           [2.  , 1.25, 0.25, 0.  ]])
+    """
+    check_nD(image, 2)
+    check_nD(distances, 1, 'distances')
+    check_nD(angles, 1, 'angles')
+
+    image = np.ascontiguousarray(image)
+    levels = _glcm_levels(image, levels)
+
+    for prop in props:
+        if prop not in _GLCM_PROPS:
+            raise ValueError('%s is an invalid property' % (prop))
+    window_rows, window_cols = window_shape
+    if window_rows < 1 or window_cols < 1:
+        raise ValueError('The window shape must be positive.')
+
+    distances = np.ascontiguousarray(distances, dtype=np.float64)
+    angles = np.ascontiguousarray(angles, dtype=np.float64)
+    offsets = _glcm_offsets(distances, angles)
+
+    prop_codes = np.array([_GLCM_PROPS.index(prop) for prop in props],
+                          dtype=np.intp)
+    need_counts = 'ASM' in props or 'energy' in props
+    maps = np.empty((len(props),) + image.shape + offsets.shape[:2])
+
+    # The counts of the co-occurrences are zeros again after each row, so
+    # that each thread reuses its own buffer
+    buffers = threading.local()
+
+    def _process_rows(task):
+        idx, row_start = task
+        counts = None
+        if need_counts:
+            counts = getattr(buffers, 'counts', None)
+            if counts is None:
+                counts = buffers.counts = np.zeros(levels * levels,
+                                                   dtype=np.uint32)
+        row_stop = min(row_start + _LOCAL_GLCM_ROWS, image.shape[0])
+        _glcm_local_rows(image, offsets[idx][0], offsets[idx][1], levels,
+                         window_rows, window_cols, symmetric, prop_codes,
+                         counts, row_start, row_stop,
+                         maps[(Ellipsis,) + idx])
+
+    tasks = itertools.product(np.ndindex(offsets.shape[:2]),
+                              range(0, image.shape[0], _LOCAL_GLCM_ROWS))
+    with ThreadPoolExecutor(max_workers=num_workers) as ex:
+        # Iterate over the results, to raise the exceptions of the threads
+        for _ in ex.map(_process_rows, tasks):
+            pass
+
+    return dict(zip(props, maps))
+
+
+_LBP_METHODS = {
+    'default': ord('D'),
+    'ror': ord('R'),
+    'uniform': ord('U'),
+    'nri_uniform': ord('N'),
+    'var': ord('V')
+}
+
+# Largest number of points for which the codes of the 'ror', 'uniform' and
+# 'nri_uniform' methods are looked up in a table of 2 ** P entries
+_LBP_LUT_MAX_P = 16
+
+# Number of rows of the image processed by each thread at a time
+_LBP_ROWS = 64
+
+
+def _lbp_tables(shape, P, R):
+    """Build the bilinear interpolation tables of the LBP sampling points.
+
+    For each row (column) of the image and each point of the circle, the
+    two rows (columns) to interpolate between, set to -1 outside of the
+    image, and the interpolation weight of the second one.
+    """
+    # `_local_binary_pattern` used to take the radius as a C float
+    R = float(np.float32(R))
+    # local position of texture elements
+    rr = - R * np.sin(2 * np.pi * np.arange(P, dtype=np.double) / P)
+    cc = R * np.cos(2 * np.pi * np.arange(P, dtype=np.double) / P)
+    rp = np.round(rr, 5)
+    cp = np.round(cc, 5)
+
+    tables = []
+    for size, offsets in zip(shape, (rp, cp)):
+        positions = np.arange(size)[:, np.newaxis] + offsets
+        low = np.floor(positions)
+        weight = positions - low
+        low = low.astype(np.intp)
+        high = np.ceil(positions).astype(np.intp)
+        for index in (low, high):
+            index[(index < 0) | (index >= size)] = -1
+        tables += [low, high, weight]
+    return tuple(tables)
+
+
+@functools.lru_cache(maxsize=None)
+def _lbp_method_lut(P, method):
+    """Return the codes of a method for each default code, or None."""
+    if method not in _LBP_METHODS.values() or P > _LBP_LUT_MAX_P:
+        return None
+    if method in (_LBP_METHODS['default'], _LBP_METHODS['var']):
+        return None
+    return _lbp_lut(P, method)
+
+
+def _lbp_prepare(image, P, R, method):
+    """Check the arguments of the LBP functions, and build their tables."""
+    check_nD(image, 2)
+    image = np.ascontiguousarray(image, dtype=np.double)
+    method = _LBP_METHODS[method.lower()]
+    return image, method, _lbp_tables(image.shape, P, R), \
+        _lbp_method_lut(P, method)
+
+
+def local_binary_pattern(image, P, R, method='default', *, dtype=np.float64,
+                         num_workers=None):
     """Gray scale and rotation invariant LBP (Local Binary Patterns).
 
     LBP is an invariant descriptor that can be used for texture classification.
@@ -306,12 +636,25 @@ def local_binary_pattern(image, P, R, method='default'):
             which is only gray scale invariant [2]_.
         * 'var': rotation invariant variance measures of the contrast of local
             image texture which is rotation but not gray scale invariant.
+    dtype : dtype, optional
+        The data type of the output, float64 by default. The codes of all
+        methods but 'var' can also be stored in an unsigned integer type,
+        large enough to hold them: ``2 ** P - 1`` for 'default' and 'ror',
+        ``P + 1`` for 'uniform' and ``P * (P - 1) + 2`` for 'nri_uniform'.
+    num_workers : int or None, optional
+        The number of parallel threads to use, each processing a different band
+        of rows. If set to ``None``, the default number of threads of
+        `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
     output : (N, M) array
         LBP image.
 
+    See Also
+    --------
+    local_binary_pattern_histograms
+
     References
     ----------
     .. [1] Multiresolution Gray-Scale and Rotation Invariant Texture
@@ -323,20 +666,119 @@ def local_binary_pattern(image, P, R, method='default'):
            http://citeseerx.ist.psu.edu/viewdoc/summary?doi=10.1.1.214.6851,
            2004.
     """
-    check_nD(image, 2)
+    image, method_code, tables, lut = _lbp_prepare(image, P, R, method)
+
+    dtype = np.dtype(dtype)
+    if dtype not in (np.uint8, np.uint16, np.uint32, np.uint64,
+                     np.float32, np.float64):
+        raise ValueError('The output dtype must be a float or unsigned '
+                         'integer type, got %s.' % dtype)
+    if dtype.kind == 'u':
+        if method_code == _LBP_METHODS['var']:
+            raise ValueError("The 'var' method requires a float output "
+                             "dtype.")
+        if _lbp_n_bins(P, method_code) - 1 > np.iinfo(dtype).max:
+            raise ValueError('The codes of the method do not fit in %s.'
+                             % dtype)
+
+    output = np.zeros(image.shape, dtype=dtype)
+
+    def _process_rows(row_start):
+        row_stop = min(row_start + _LBP_ROWS, image.shape[0])
+        _local_binary_pattern(image, P, method_code, tables, lut,
+                              row_start, row_stop, output)
+
+    with ThreadPoolExecutor(max_workers=num_workers) as ex:
+        # Iterate over the results, to raise the exceptions of the threads
+        for _ in ex.map(_process_rows, range(0, image.shape[0], _LBP_ROWS)):
+            pass
 
-    methods = {
-        'default': ord('D'),
-        'ror': ord('R'),
-        'uniform': ord('U'),
-        'nri_uniform': ord('N'),
-        'var': ord('V')
-    }
-    image = np.ascontiguousarray(image, dtype=np.double)
-    output = _local_binary_pattern(image, P, R, methods[method.lower()])
     return output
 
 
+def _lbp_n_bins(P, method_code):
+    """Number of possible codes of an LBP method."""
+    if method_code == _LBP_METHODS['uniform']:
+        return P + 2
+    elif method_code == _LBP_METHODS['nri_uniform']:
+        return P * (P - 1) + 3
+    return 2 ** P
+
+
+def local_binary_pattern_histograms(image, P, R, block_shape,
+                                    method='default', *, num_workers=None):
+    """Compute the histograms of the LBP codes of the blocks of an image.
+
+    The image is divided into non-overlapping blocks, and the codes of
+    `local_binary_pattern` are counted in each of them, without storing the
+    LBP image.
+
+    Parameters
+    ----------
+    image : (N, M) array
+        Graylevel image.
+    P : int
+        Number of circularly symmetric neighbour set points (quantization of
+        the angular space).
+    R : float
+        Radius of circle (spatial resolution of the operator).
+    block_shape : 2-tuple of int
+        Shape (in pixels) of the blocks. The pixels of the incomplete blocks
+        at the bottom and right of the image are left out.
+    method : {'default', 'ror', 'uniform', 'nri_uniform'}
+        Method to determine the pattern, see `local_binary_pattern`.
+    num_workers : int or None, optional
+        The number of parallel threads to use, each processing a different row
+        of blocks. If set to ``None``, the default number of threads of
+        `concurrent.futures.ThreadPoolExecutor` is used.
+
+    Returns
+    -------
+    histograms : (N // block_shape[0], M // block_shape[1], n_bins) ndarray
+        The number of pixels of each code in each block. There are
+        ``2 ** P`` codes for 'default' and 'ror', ``P + 2`` for 'uniform'
+        and ``P * (P - 1) + 3`` for 'nri_uniform'.
+
+    See Also
+    --------
+    local_binary_pattern
+
+    Examples
+    --------
+    >>> from skimage import data
+    >>> image = data.camera()
+    >>> hist = local_binary_pattern_histograms(image, 8, 1, (64, 64),
+    ...                                        method='uniform')
+    >>> hist.shape
+    (8, 8, 10)
+    >>> int(hist[0, 0].sum())
+    4096
+    """
+    image, method_code, tables, lut = _lbp_prepare(image, P, R, method)
+    if method_code == _LBP_METHODS['var']:
+        raise ValueError("The 'var' method does not produce codes to count.")
+
+    block_rows, block_cols = block_shape
+    if block_rows < 1 or block_cols < 1:
+        raise ValueError('The block shape must be positive.')
+
+    histograms = np.zeros((image.shape[0] // block_rows,
+                           image.shape[1] // block_cols,
+                           _lbp_n_bins(P, method_code)), dtype=np.intp)
+
+    def _process_blocks(block_row):
+        _local_binary_pattern_histograms(image, P, method_code, tables, lut,
+                                         block_rows, block_cols, block_row,
+                                         histograms[block_row])
+
+    with ThreadPoolExecutor(max_workers=num_workers) as ex:
+        # Iterate over the results, to raise the exceptions of the threads
+        for _ in ex.map(_process_blocks, range(histograms.shape[0])):
+            pass
+
+    return histograms
+
+
 def multiblock_lbp(int_image, r, c, width, height):
     """Multi-block local binary pattern (MB-LBP).
 
@@ -435,3 +435,112 @@ cdef float _set_thresh_indices(float[::1] zeroth_moment,
             thresh_indices[:] = current_indices[:]
 
     return sigma_max
+
+
+cdef inline float _get_var_btwclas_dp(float [::1] zeroth_moment,
+                                      float [::1] first_moment,
+                                      Py_ssize_t i, Py_ssize_t j) nogil:
+    """Computes the variance between classes of the bins ``i`` to ``j``.
+
+    The value is the one stored in the lookup table of
+    `_set_var_btwcls_lut`, so that the thresholds found with it are the
+    same.
+
+    Parameters
+    ----------
+    zeroth_moment : array
+        First row of the zeroth order moments LUT (referred to as P in
+        [1]_).
+    first_moment : array
+        First row of the first order moments LUT (referred to as S in
+        [1]_).
+    i, j : int
+        The first and last bins of the class.
+
+    Returns
+    -------
+    value : float
+        The variance between classes of the bins ``i`` to ``j``.
+    """
+    cdef float zeroth_moment_ij, first_moment_ij
+
+    if i == 0:
+        if j > 0 and zeroth_moment[j] > 0:
+            return (first_moment[j]**2) / zeroth_moment[j]
+    else:
+        zeroth_moment_ij = zeroth_moment[j] - zeroth_moment[i - 1]
+        if zeroth_moment_ij > 0:
+            first_moment_ij = first_moment[j] - first_moment[i - 1]
+            return (first_moment_ij**2) / zeroth_moment_ij
+    return 0
+
+
+def _get_multiotsu_thresh_indices_dp(float [::1] prob,
+                                     Py_ssize_t thresh_count):
+    """Finds the indices of Otsu thresholds according to the values
+    occurence probabilities, by dynamic programming.
+
+    The maximum variance between classes of the bins ``i`` to
+    ``nbins - 1`` split in ``k + 1`` classes is the maximum over the last
+    bin ``t`` of the first class of the variance of the bins ``i`` to ``t``
+    plus the maximum for the bins ``t + 1`` to ``nbins - 1`` split in ``k``
+    classes. These maxima are computed for increasing ``k``, in
+    O(thresh_count * nbins**2) operations and O(thresh_count * nbins)
+    memory, instead of the O(nbins**thresh_count) operations of the brute
+    force search. The variances are summed in single precision and, among
+    equal maxima, the first thresholds are the smallest ones, as with the
+    brute force search.
+
+    Parameters
+    ----------
+    prob : array
+        Value occurence probabilities.
+    thresh_count : int
+        The desired number of thresholds (classes-1).
+
+    Returns
+    -------
+    py_thresh_indices : ndarray
+        The indices of the desired thresholds.
+    """
+    cdef Py_ssize_t nbins = prob.shape[0]
+    py_thresh_indices = np.empty(thresh_count, dtype=np.intp)
+    cdef Py_ssize_t[::1] thresh_indices = py_thresh_indices
+    cdef float [::1] zeroth_moment = np.empty(nbins, dtype=np.float32)
+    cdef float [::1] first_moment = np.empty(nbins, dtype=np.float32)
+    # The maximum variance between classes of the bins i to nbins - 1, split
+    # in k + 1 classes, and the last bin of the first class for this maximum
+    cdef float[::1] sigma_max = np.empty(nbins, dtype=np.float32)
+    cdef Py_ssize_t[:, ::1] first_class_stop = np.empty(
+        (thresh_count, nbins), dtype=np.intp)
+    cdef Py_ssize_t i, k, t, i_stop
+    cdef float sigma, sigma_max_i
+
+    with nogil:
+        _set_moments_lut_first_row(prob, nbins, zeroth_moment, first_moment)
+        for i in range(nbins):
+            sigma_max[i] = _get_var_btwclas_dp(zeroth_moment, first_moment,
+                                               i, nbins - 1)
+
+        for k in range(1, thresh_count + 1):
+            # Only the split of all the bins is needed for the last k. The
+            # maxima for k - 1 of the bins after i are not overwritten yet.
+            i_stop = 1 if k == thresh_count else nbins - k
+            for i in range(i_stop):
+                sigma_max_i = -1
+                for t in range(i, nbins - k):
+                    sigma = (_get_var_btwclas_dp(zeroth_moment, first_moment,
+                                                 i, t)
+                             + sigma_max[t + 1])
+                    if sigma > sigma_max_i:
+                        sigma_max_i = sigma
+                        first_class_stop[k - 1, i] = t
+                sigma_max[i] = sigma_max_i
+
+        i = 0
+        for k in range(thresh_count, 0, -1):
+            t = first_class_stop[k - 1, i]
+            thresh_indices[thresh_count - k] = t
+            i = t + 1
+
+    return py_thresh_indices
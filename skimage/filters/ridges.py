@@ -14,7 +14,7 @@ from warnings import warn
 import numpy as np
 
 from ..util import img_as_float, invert
-from .._shared.utils import check_nD
+from .._shared.utils import check_nD, _map_in_threads
 from ..feature.corner import hessian_matrix, hessian_matrix_eigvals
 
 
@@ -107,12 +107,12 @@ def _check_sigmas(sigmas):
 
 
 def compute_hessian_eigenvalues(image, sigma, sorting='none',
-                                mode='constant', cval=0):
+                                mode='constant', cval=0, *, num_workers=None):
     """
     Compute Hessian eigenvalues of nD images.
 
-    For 2D images, the computation uses a more efficient, skimage-based
-    algorithm.
+    For 2D and 3D images, the computation uses more efficient, closed-form
+    expressions of the eigenvalues.
 
     Parameters
     ----------
@@ -129,6 +129,9 @@ def compute_hessian_eigenvalues(image, sigma, sorting='none',
     cval : float, optional
         Used in conjunction with mode 'constant', the value outside
         the image boundaries.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
@@ -145,10 +148,12 @@ def compute_hessian_eigenvalues(image, sigma, sorting='none',
                                       mode=mode, cval=cval)
 
     # Correct for scale
-    hessian_elements = [(sigma ** 2) * e for e in hessian_elements]
+    for e in hessian_elements:
+        e *= sigma ** 2
 
-    # Compute Hessian eigenvalues
-    hessian_eigenvalues = hessian_matrix_eigvals(hessian_elements)
+    # Compute Hessian eigenvalues, in closed form for 2D and 3D images
+    hessian_eigenvalues = hessian_matrix_eigvals(hessian_elements,
+                                                 num_workers=num_workers)
 
     if sorting == 'abs':
 
@@ -164,8 +169,63 @@ def compute_hessian_eigenvalues(image, sigma, sorting='none',
     return hessian_eigenvalues
 
 
+def _multiscale_maximum(image, sigmas, response, sorting, mode, cval,
+                        num_workers):
+    """Compute the maximum over scales of a response to Hessian eigenvalues.
+
+    Parameters
+    ----------
+    image : (N, ..., M) ndarray
+        Array with input image data.
+    sigmas : (S,) ndarray
+        Sigmas used as scales of filter.
+    response : callable
+        Function mapping the (sorted) Hessian eigenvalues at one scale to
+        the filtered image at that scale.
+    sorting : {'val', 'abs', 'none'}
+        Sorting of the eigenvalues passed to `response`.
+    mode : {'constant', 'reflect', 'wrap', 'nearest', 'mirror'}
+        How to handle values outside the image borders.
+    cval : float
+        Used in conjunction with mode 'constant', the value outside
+        the image boundaries.
+    num_workers : int or None
+        The number of parallel threads to use. If set to ``None``,
+        ``os.cpu_count()`` threads are used.
+
+    Returns
+    -------
+    out : (N, ..., M) ndarray
+        Maximum of the filtered images over all scales, of the floating
+        point type of the image.
+
+    Notes
+    -----
+    The scales are filtered in parallel threads, and folded into a running
+    maximum as they come. Only the scales being filtered are held in memory,
+    instead of a stack of the filtered images at all scales.
+    """
+    # Convert the image once, rather than at every scale
+    image = img_as_float(image)
+
+    def filter_scale(sigma):
+        eigenvalues = compute_hessian_eigenvalues(image, sigma,
+                                                  sorting=sorting,
+                                                  mode=mode, cval=cval,
+                                                  num_workers=1)
+        return response(eigenvalues)
+
+    out = None
+    for filtered in _map_in_threads(filter_scale, sigmas, num_workers):
+        if out is None:
+            out = filtered
+        else:
+            np.maximum(out, filtered, out=out)
+    return out
+
+
 def meijering(image, sigmas=range(1, 10, 2), alpha=None,
-              black_ridges=True, mode='reflect', cval=0):
+              black_ridges=True, mode='reflect', cval=0, *, num_workers=None):
     """
     Filter an image with the Meijering neuriteness filter.
 
@@ -193,6 +253,9 @@ def meijering(image, sigmas=range(1, 10, 2), alpha=None,
     cval : float, optional
         Used in conjunction with mode 'constant', the value outside
         the image boundaries.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``,
+        ``os.cpu_count()`` threads are used.
 
     Returns
     -------
@@ -228,45 +291,32 @@ def meijering(image, sigmas=range(1, 10, 2), alpha=None,
     if black_ridges:
         image = invert(image)
 
-    # Generate empty (n+1)D arrays for storing auxiliary images filtered at
-    # different (sigma) scales
-    filtered_array = np.zeros(sigmas.shape + image.shape)
-
-    # Filtering for all (sigma) scales
-    for i, sigma in enumerate(sigmas):
-
-        # Calculate (sorted) eigenvalues
-        eigenvalues = compute_hessian_eigenvalues(image, sigma, sorting='abs',
-                                                  mode=mode, cval=cval)
-
-        if ndim > 1:
+    def response(eigenvalues):
+        if ndim == 1:
+            return np.zeros_like(eigenvalues[0])
 
-            # Set coefficients for scaling eigenvalues
-            coefficients = [alpha] * ndim
-            coefficients[0] = 1
+        # Set coefficients for scaling eigenvalues
+        coefficients = [alpha] * ndim
+        coefficients[0] = 1
 
-            # Compute normalized eigenvalues l_i = e_i + sum_{j!=i} alpha * e_j
-            auxiliary = [np.sum([eigenvalues[i] * np.roll(coefficients, j)[i]
-                         for j in range(ndim)], axis=0) for i in range(ndim)]
+        # Compute normalized eigenvalues l_i = e_i + sum_{j!=i} alpha * e_j,
+        # only for the maximum eigenvalues by magnitude
+        auxiliary = np.sum([eigenvalues[-1] * np.roll(coefficients, j)[-1]
+                            for j in range(ndim)], axis=0)
 
-            # Get maximum eigenvalues by magnitude
-            auxiliary = auxiliary[-1]
+        # Rescale image intensity and avoid ZeroDivisionError
+        filtered = _divide_nonzero(auxiliary, np.min(auxiliary))
 
-            # Rescale image intensity and avoid ZeroDivisionError
-            filtered = _divide_nonzero(auxiliary, np.min(auxiliary))
-
-            # Remove background
-            filtered = np.where(auxiliary < 0, filtered, 0)
-
-            # Store results in (n+1)D matrices
-            filtered_array[i] = filtered
+        # Remove background
+        return np.where(auxiliary < 0, filtered, 0)
 
     # Return for every pixel the maximum value over all (sigma) scales
-    return np.max(filtered_array, axis=0)
+    return _multiscale_maximum(image, sigmas, response, 'abs', mode, cval,
+                               num_workers)
 
 
 def sato(image, sigmas=range(1, 10, 2), black_ridges=True,
-         mode=None, cval=0):
+         mode=None, cval=0, *, num_workers=None):
     """
     Filter an image with the Sato tubeness filter.
 
@@ -292,6 +342,9 @@ def sato(image, sigmas=range(1, 10, 2), black_ridges=True,
     cval : float, optional
         Used in conjunction with mode 'constant', the value outside
         the image boundaries.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``,
+        ``os.cpu_count()`` threads are used.
 
     Returns
     -------
@@ -331,32 +384,24 @@ def sato(image, sigmas=range(1, 10, 2), black_ridges=True,
     if not black_ridges:
         image = invert(image)
 
-    # Generate empty (n+1)D arrays for storing auxiliary images filtered
-    # at different (sigma) scales
-    filtered_array = np.zeros(sigmas.shape + image.shape)
-
-    # Filtering for all (sigma) scales
-    for i, sigma in enumerate(sigmas):
-
-        # Calculate (sorted) eigenvalues
-        lamba1, *lambdas = compute_hessian_eigenvalues(image, sigma,
-                                                       sorting='val',
-                                                       mode=mode, cval=cval)
+    def response(eigenvalues):
+        lamba1, *lambdas = eigenvalues
 
         # Compute tubeness, see  equation (9) in reference [1]_.
         # np.abs(lambda2) in 2D, np.sqrt(np.abs(lambda2 * lambda3)) in 3D
         filtered = np.abs(np.multiply.reduce(lambdas)) ** (1/len(lambdas))
 
-        # Remove background and store results in (n+1)D matrices
-        filtered_array[i] = np.where(lambdas[-1] > 0, filtered, 0)
+        # Remove background
+        return np.where(lambdas[-1] > 0, filtered, 0)
 
     # Return for every pixel the maximum value over all (sigma) scales
-    return np.max(filtered_array, axis=0)
+    return _multiscale_maximum(image, sigmas, response, 'val', mode, cval,
+                               num_workers)
 
 
 def frangi(image, sigmas=range(1, 10, 2), scale_range=None,
            scale_step=None, alpha=0.5, beta=0.5, gamma=15,
-           black_ridges=True, mode='reflect', cval=0):
+           black_ridges=True, mode='reflect', cval=0, *, num_workers=None):
     """
     Filter an image with the Frangi vesselness filter.
 
@@ -396,6 +441,9 @@ def frangi(image, sigmas=range(1, 10, 2), scale_range=None,
     cval : float, optional
         Used in conjunction with mode 'constant', the value outside
         the image boundaries.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``,
+        ``os.cpu_count()`` threads are used.
 
     Returns
     -------
@@ -448,18 +496,8 @@ def frangi(image, sigmas=range(1, 10, 2), scale_range=None,
     if black_ridges:
         image = invert(image)
 
-    # Generate empty (n+1)D arrays for storing auxiliary images filtered
-    # at different (sigma) scales
-    filtered_array = np.zeros(sigmas.shape + image.shape)
-    lambdas_array = np.zeros_like(filtered_array)
-
-    # Filtering for all (sigma) scales
-    for i, sigma in enumerate(sigmas):
-
-        # Calculate (abs sorted) eigenvalues
-        lambda1, *lambdas = compute_hessian_eigenvalues(image, sigma,
-                                                        sorting='abs',
-                                                        mode=mode, cval=cval)
+    def response(eigenvalues):
+        lambda1, *lambdas = eigenvalues
 
         # Compute sensitivity to deviation from a plate-like
         # structure see equations (11) and (15) in reference [1]_
@@ -475,24 +513,24 @@ def frangi(image, sigmas=range(1, 10, 2), scale_range=None,
         # see equation (12)in reference [1]_
         r_g = sum([lambda1 ** 2] + [lambdai ** 2 for lambdai in lambdas])
 
-        # Compute output image for given (sigma) scale and store results in
-        # (n+1)D matrices, see equations (13) and (15) in reference [1]_
-        filtered_array[i] = ((1 - np.exp(-r_a / alpha_sq))
-                             * np.exp(-r_b / beta_sq)
-                             * (1 - np.exp(-r_g / gamma_sq)))
-
-        lambdas_array[i] = np.max(lambdas, axis=0)
+        # Compute output image for given (sigma) scale, see equations (13)
+        # and (15) in reference [1]_
+        filtered = ((1 - np.exp(-r_a / alpha_sq))
+                    * np.exp(-r_b / beta_sq)
+                    * (1 - np.exp(-r_g / gamma_sq)))
 
-    # Remove background
-    filtered_array[lambdas_array > 0] = 0
+        # Remove background
+        filtered[np.max(lambdas, axis=0) > 0] = 0
+        return filtered
 
     # Return for every pixel the maximum value over all (sigma) scales
-    return np.max(filtered_array, axis=0)
+    return _multiscale_maximum(image, sigmas, response, 'abs', mode, cval,
+                               num_workers)
 
 
 def hessian(image, sigmas=range(1, 10, 2), scale_range=None, scale_step=None,
             alpha=0.5, beta=0.5, gamma=15, black_ridges=True, mode=None,
-            cval=0):
+            cval=0, *, num_workers=None):
     """Filter an image with the Hybrid Hessian filter.
 
     This filter can be used to detect continuous edges, e.g. vessels,
@@ -528,6 +566,9 @@ def hessian(image, sigmas=range(1, 10, 2), scale_range=None, scale_step=None,
     cval : float, optional
         Used in conjunction with mode 'constant', the value outside
         the image boundaries.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``,
+        ``os.cpu_count()`` threads are used.
 
     Returns
     -------
@@ -565,7 +606,7 @@ def hessian(image, sigmas=range(1, 10, 2), scale_range=None, scale_step=None,
     filtered = frangi(image, sigmas=sigmas, scale_range=scale_range,
                       scale_step=scale_step, alpha=alpha, beta=beta,
                       gamma=gamma, black_ridges=black_ridges, mode=mode,
-                      cval=cval)
+                      cval=cval, num_workers=num_workers)
 
     filtered[filtered <= 0] = 1
     return filtered
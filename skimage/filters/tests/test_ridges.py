@@ -244,6 +244,24 @@ def test_border_warning(func):
         func(img, sigmas=[1])
 
 
+@pytest.mark.parametrize('func', [meijering, sato, frangi, hessian])
+def test_num_workers(func):
+    img = rgb2gray(retina()[300:400, 700:800])
+    expected = func(img, sigmas=[3, 1, 2], mode='reflect', num_workers=1)
+    for num_workers in (2, None):
+        assert_equal(func(img, sigmas=[3, 1, 2], mode='reflect',
+                          num_workers=num_workers), expected)
+
+
+@pytest.mark.parametrize('func', [meijering, sato, frangi])
+def test_float32(func):
+    img = rgb2gray(retina()[300:400, 700:800])
+    out = func(img.astype(np.float32), sigmas=[1, 2], mode='reflect')
+    assert out.dtype == np.float32
+    assert_allclose(out, func(img, sigmas=[1, 2], mode='reflect'),
+                    atol=1e-4)
+
+
 if __name__ == "__main__":
     from numpy import testing
     testing.run_module_suite()
@@ -8,6 +8,7 @@ from skimage.color import rgb2gray
 from skimage.draw import disk
 from skimage._shared._warnings import expected_warnings
 from skimage.exposure import histogram
+from skimage.filters import thresholding
 from skimage.filters.thresholding import (threshold_local,
                                           threshold_otsu,
                                           threshold_li,
@@ -23,7 +24,8 @@ from skimage.filters.thresholding import (threshold_local,
                                           _mean_std,
                                           _cross_entropy)
 from skimage.filters._multiotsu import (_get_multiotsu_thresh_indices_lut,
-                                        _get_multiotsu_thresh_indices)
+                                        _get_multiotsu_thresh_indices,
+                                        _get_multiotsu_thresh_indices_dp)
 from skimage._shared import testing
 from skimage._shared.testing import assert_equal, assert_almost_equal
 from skimage._shared.testing import assert_array_equal
@@ -333,6 +335,39 @@ def test_li_negative_inital_guess():
         result = threshold_li(coins, initial_guess=-5)
 
 
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.int16])
+def test_li_histogram(dtype):
+    coins = data.coins().astype(dtype) - 30
+    expected = threshold_li(coins.astype(np.float64))
+    hist = histogram(coins.ravel(), source_range='image')
+    assert threshold_li(coins) == expected
+    assert threshold_li(hist=hist) == expected
+    assert threshold_li(hist=hist, initial_guess=100) == \
+        threshold_li(coins.astype(np.float64), initial_guess=100)
+    with testing.raises(ValueError):
+        threshold_li(hist=hist, initial_guess=np.mean)
+
+
+def test_li_histogram_counts():
+    counts = np.zeros(10)
+    assert np.isnan(threshold_li(hist=counts))
+    counts[4] = 3
+    assert threshold_li(hist=counts) == 4
+    counts[[1, 8]] = 5
+    assert 1 < threshold_li(hist=counts) < 8
+
+
+def test_li_wide_range():
+    # The range of the values is too large for a histogram
+    image = np.random.RandomState(0).randint(-2 ** 40, 2 ** 40, size=(40, 50),
+                                             dtype=np.int64)
+    image[:20] += 2 ** 41
+    expected = threshold_li(image.astype(np.float64))
+    assert threshold_li(image) == expected
+    with testing.raises(ValueError):
+        threshold_li()
+
+
 def test_li_pathological_arrays():
     # See https://github.com/scikit-image/scikit-image/issues/4140
     a = np.array([0, 0, 1, 0, 0, 1, 0, 1])
@@ -379,6 +414,89 @@ def test_local_even_block_size_error():
         threshold_local(img, block_size=4)
 
 
+@pytest.mark.parametrize("method, param, block_size", [
+    ('gaussian', None, 15),
+    ('gaussian', 4, 9),
+    ('mean', None, 11),
+    ('median', None, 5),
+    ('generic', np.std, 5),
+])
+@pytest.mark.parametrize("mode", ['reflect', 'constant', 'nearest',
+                                  'mirror', 'wrap'])
+def test_local_bands(monkeypatch, method, param, block_size, mode):
+    image = data.camera()[100:140, 100:130]
+    expected = threshold_local(image, block_size, method, offset=1.5,
+                               mode=mode, param=param, cval=10.5)
+    # Bands of rows smaller than the neighbourhoods
+    monkeypatch.setattr(thresholding, '_THRESHOLD_LOCAL_ROWS', 3)
+    out = threshold_local(image, block_size, method, offset=1.5,
+                          mode=mode, param=param, cval=10.5, num_workers=2)
+    assert_array_equal(out, expected)
+
+
+@pytest.mark.parametrize("mode", ['reflect', 'constant', 'nearest',
+                                  'mirror', 'wrap'])
+def test_local_generic_batch(monkeypatch, mode):
+    image = data.camera()[:60, :50]
+    expected = threshold_local(image, 7, 'generic', mode=mode, cval=0.5,
+                               param=lambda x: x[10] - x.mean())
+
+    def func(neighbourhoods):
+        assert neighbourhoods.ndim == 2
+        assert neighbourhoods.shape[1] == 7 ** 2
+        return neighbourhoods[:, 10] - neighbourhoods.mean(axis=1)
+
+    # Several batches in each row
+    monkeypatch.setattr(thresholding, '_GENERIC_BATCH_SIZE', 500)
+    out = threshold_local(image, 7, 'generic', mode=mode, cval=0.5,
+                          param=func, batch=True)
+    assert_almost_equal(out, expected)
+
+
+@pytest.mark.parametrize("mode", ['reflect', 'constant', 'nearest',
+                                  'mirror', 'wrap'])
+@pytest.mark.parametrize("shape", [(5, 150), (150, 5)])
+def test_local_block_larger_than_image(mode, shape):
+    # The neighbourhoods extend past the other edge of the image
+    image = data.camera()[100:100 + shape[0], 100:100 + shape[1]]
+    kwargs = dict(output=np.float64, mode=mode, cval=10.5)
+    mask = np.ones(41) / 41
+    mean = ndi.convolve1d(ndi.convolve1d(image, mask, axis=0, **kwargs),
+                          mask, axis=1, **kwargs)
+    expected = {
+        'median': ndi.median_filter(image, 41, **kwargs),
+        'generic': ndi.generic_filter(image, np.median, 41, **kwargs),
+        'gaussian': ndi.gaussian_filter(image, 40 / 6, **kwargs),
+        'mean': mean,
+    }
+    for method in expected:
+        param = np.median if method == 'generic' else None
+        out = threshold_local(image, 41, method, offset=1.5, mode=mode,
+                              param=param, cval=10.5)
+        assert_array_equal(out, expected[method] - 1.5)
+
+    out = threshold_local(image, 41, 'generic', offset=1.5, mode=mode,
+                          param=lambda x: np.median(x, axis=1), cval=10.5,
+                          batch=True)
+    assert_array_equal(out, expected['generic'] - 1.5)
+
+
+def test_local_float32_out():
+    image = util.img_as_float32(data.camera()[:100, :100])
+    threshold = threshold_local(image, 15, 'mean')
+    assert threshold.dtype == np.float32
+    expected = threshold_local(image.astype(np.float64), 15, 'mean')
+    np.testing.assert_allclose(threshold, expected, atol=1e-6)
+
+    out = np.zeros(image.shape)
+    assert threshold_local(image, 15, 'mean', out=out) is out
+    assert_array_equal(out, threshold)
+    with testing.raises(ValueError):
+        threshold_local(image, 15, 'mean', out=np.zeros((100, 99)))
+    with testing.raises(ValueError):
+        threshold_local(image, 15, 'mean', out=image)
+
+
 def test_isodata_camera_image():
     camera = util.img_as_ubyte(data.camera())
 
@@ -540,6 +658,13 @@ def test_triangle_flip():
     assert(len(unequal_pos[0]) / t_img.size < 1e-2)
 
 
+def test_triangle_histogram():
+    camera = data.camera()
+    hist = histogram(camera.ravel(), 256, source_range='image')
+    assert threshold_triangle(hist=hist) == threshold_triangle(camera)
+    assert threshold_triangle(hist=hist[0]) == threshold_triangle(camera)
+
+
 @pytest.mark.parametrize(
     "window_size, mean_kernel",
     [(11, np.full((11,) * 2,  1 / 11 ** 2)),
@@ -586,6 +711,38 @@ def test_niblack_sauvola_pathological_image():
     assert not np.any(np.isnan(threshold_niblack(src_img)))
 
 
+@pytest.mark.parametrize("window_size", [5, (9, 3), (25, 1)])
+def test_mean_std_bands(monkeypatch, window_size):
+    image = np.random.RandomState(0).rand(57, 40)
+    # The 'reflect' padding of numpy is the 'mirror' mode of ndimage
+    expected_m = ndi.uniform_filter(image, window_size, mode='mirror')
+    expected_s = np.sqrt(ndi.uniform_filter(image ** 2, window_size,
+                                            mode='mirror') - expected_m ** 2)
+    m, s = _mean_std(image, w=window_size)
+    np.testing.assert_allclose(m, expected_m)
+    np.testing.assert_allclose(s, expected_s)
+    # Bands of rows smaller than the window
+    monkeypatch.setattr(thresholding, '_MEAN_STD_ROWS', 4)
+    m_bands, s_bands = _mean_std(image, w=window_size, num_workers=2)
+    np.testing.assert_allclose(m_bands, expected_m)
+    np.testing.assert_allclose(s_bands, expected_s)
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.float32])
+@pytest.mark.parametrize("threshold_func", [threshold_niblack,
+                                            threshold_sauvola])
+def test_niblack_sauvola_binary(threshold_func, dtype):
+    image = data.page().astype(dtype)
+    if dtype == np.float32:
+        image /= 255
+    threshold = threshold_func(image, window_size=(15, 21), k=0.1)
+    expected_dtype = np.float32 if dtype == np.float32 else np.float64
+    assert threshold.dtype == expected_dtype
+    binary = threshold_func(image, window_size=(15, 21), k=0.1, binary=True)
+    assert binary.dtype == bool
+    assert_array_equal(binary, image > threshold)
+
+
 def test_bimodal_multiotsu_hist():
     for name in ['camera', 'moon', 'coins', 'text', 'clock', 'page']:
         img = getattr(data, name)()
@@ -666,3 +823,41 @@ def test_multiotsu_lut():
             result = _get_multiotsu_thresh_indices(prob, classes - 1)
 
             assert np.array_equal(result_lut, result)
+
+
+def test_multiotsu_dp():
+    for classes in [2, 3, 4, 5]:
+        for name in ['camera', 'moon', 'coins', 'text', 'clock', 'page']:
+            img = getattr(data, name)()
+            # Fewer bins for the brute force search of 5 classes
+            nbins = 256 if classes < 5 else 64
+            prob, bin_centers = histogram(util.img_as_float(img).ravel(),
+                                          nbins=nbins,
+                                          source_range='image',
+                                          normalize=True)
+            prob = prob.astype('float32')
+
+            result_lut = _get_multiotsu_thresh_indices_lut(prob, classes - 1)
+            result_dp = _get_multiotsu_thresh_indices_dp(prob, classes - 1)
+
+            assert_array_equal(result_dp, result_lut)
+
+
+def test_multiotsu_many_classes():
+    image = data.camera()
+    thresholds = threshold_multiotsu(image, classes=10)
+    assert thresholds.shape == (9,)
+    assert np.all(np.diff(thresholds) > 0)
+    # The thresholds don't depend on the empty bins
+    thresholds_uint16 = threshold_multiotsu(image.astype(np.uint16) * 4,
+                                            classes=6)
+    assert_array_equal(thresholds_uint16,
+                       4 * threshold_multiotsu(image, classes=6))
+
+
+@pytest.mark.parametrize("classes", [2, 3, 4])
+def test_multiotsu_histogram(classes):
+    image = util.img_as_float(data.coins())
+    hist = histogram(image.ravel(), 256, source_range='image')
+    assert_array_equal(threshold_multiotsu(hist=hist, classes=classes),
+                       threshold_multiotsu(image, classes=classes))
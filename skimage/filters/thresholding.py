@@ -1,17 +1,18 @@
-import itertools
 import math
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from scipy import ndimage as ndi
 from collections import OrderedDict
 from collections.abc import Iterable
 from ..exposure import histogram
 from .._shared.utils import check_nD, warn
-from ..transform import integral_image
-from ..util import dtype_limits
+from ..util import dtype_limits, view_as_windows
 from ..filters._multiotsu import (_get_multiotsu_thresh_indices_lut,
-                                  _get_multiotsu_thresh_indices)
+                                  _get_multiotsu_thresh_indices,
+                                  _get_multiotsu_thresh_indices_dp)
 
-from ._sparse import correlate_sparse, _validate_window_size
+from ._sparse import _to_np_mode, _validate_window_size
 
 
 __all__ = ['try_all_threshold',
@@ -29,6 +30,19 @@ __all__ = ['try_all_threshold',
            'threshold_multiotsu']
 
 
+# Number of rows of the image for which the local mean and standard
+# deviation are computed at a time, in each thread
+_MEAN_STD_ROWS = 128
+
+# Number of rows of the image for which threshold_local computes the
+# threshold at a time, in each thread
+_THRESHOLD_LOCAL_ROWS = 256
+
+# Number of values in the batches of neighbourhoods of the 'generic' method
+# of threshold_local
+_GENERIC_BATCH_SIZE = 2 ** 20
+
+
 def _try_all(image, methods=None, figsize=None, num_cols=2, verbose=True):
     """Returns a figure comparing the outputs of different methods.
 
@@ -117,33 +131,44 @@ def try_all_threshold(image, figsize=(8, 5), verbose=True):
     >>> from skimage.data import text
     >>> fig, ax = try_all_threshold(text(), figsize=(10, 6), verbose=False)
     """
-    def thresh(func):
+    def thresh(func, **kwargs):
         """
         A wrapper function to return a thresholded image.
         """
         def wrapper(im):
-            return im > func(im)
+            return im > func(im, **kwargs)
         try:
             wrapper.__orifunc__ = func.__orifunc__
         except AttributeError:
             wrapper.__orifunc__ = func.__module__ + '.' + func.__name__
         return wrapper
 
+    # The histogram of the image is computed once, for all the methods
+    # using it. threshold_li uses the exact values of float images.
+    hist = _validate_image_histogram(image, None, nbins=256)
+    li_hist = hist if np.issubdtype(image.dtype, np.integer) else None
+
     # Global algorithms.
-    methods = OrderedDict({'Isodata': thresh(threshold_isodata),
-                           'Li': thresh(threshold_li),
+    methods = OrderedDict({'Isodata': thresh(threshold_isodata, hist=hist),
+                           'Li': thresh(threshold_li, hist=li_hist),
                            'Mean': thresh(threshold_mean),
-                           'Minimum': thresh(threshold_minimum),
-                           'Otsu': thresh(threshold_otsu),
-                           'Triangle': thresh(threshold_triangle),
-                           'Yen': thresh(threshold_yen)})
+                           'Minimum': thresh(threshold_minimum, hist=hist),
+                           'Otsu': thresh(threshold_otsu, hist=hist),
+                           'Triangle': thresh(threshold_triangle, hist=hist),
+                           'Yen': thresh(threshold_yen, hist=hist)})
 
     return _try_all(image, figsize=figsize,
                     methods=methods, verbose=verbose)
 
 
+def _local_float_dtype(dtype):
+    """Return the float dtype of the local thresholds of an image."""
+    return np.float32 if dtype == np.float32 else np.float64
+
+
 def threshold_local(image, block_size, method='gaussian', offset=0,
-                    mode='reflect', param=None, cval=0):
+                    mode='reflect', param=None, cval=0, *, out=None,
+                    batch=False, num_workers=None):
     """Compute a threshold mask image based on local pixel neighborhood.
 
     Also known as adaptive or dynamic thresholding. The threshold value is
@@ -183,12 +208,32 @@ def threshold_local(image, block_size, method='gaussian', offset=0,
         threshold for the centre pixel.
     cval : float, optional
         Value to fill past edges of input if mode is 'constant'.
+    out : (N, M) ndarray of float, optional
+        Array in which to store the threshold image. It must not share
+        memory with ``image``.
+    batch : bool, optional
+        If True, the function of the 'generic' method is called with a
+        batch of neighbourhoods, as a ``(n_windows, block_size ** 2)``
+        array with a flat neighbourhood on each row, and returns the
+        ``n_windows`` thresholds, instead of being called for each pixel.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
     threshold : (N, M) ndarray
         Threshold image. All pixels in the input image higher than the
         corresponding pixel in the threshold image are considered foreground.
+        It is ``out`` if given, and otherwise float32 for float32 images,
+        and float64 for the other images.
+
+    Notes
+    -----
+    The threshold is computed by bands of rows of the image, in parallel,
+    each band being extended by the neighbourhood of its pixels, so that
+    the result is the same as for the whole image. Images smaller than the
+    neighbourhoods along an axis are filtered at once.
 
     References
     ----------
@@ -202,38 +247,153 @@ def threshold_local(image, block_size, method='gaussian', offset=0,
     >>> func = lambda arr: arr.mean()
     >>> binary_image2 = image > threshold_local(image, 15, 'generic',
     ...                                         param=func)
+    >>> func = lambda arr: arr.mean(axis=1)
+    >>> binary_image3 = image > threshold_local(image, 15, 'generic',
+    ...                                         param=func, batch=True)
     """
     if block_size % 2 == 0:
         raise ValueError("The kwarg ``block_size`` must be odd! Given "
                          "``block_size`` {0} is even.".format(block_size))
     check_nD(image, 2)
-    thresh_image = np.zeros(image.shape, 'double')
+    float_dtype = _local_float_dtype(image.dtype)
+    if out is None:
+        out = np.empty(image.shape, dtype=float_dtype)
+    elif out.shape != image.shape:
+        raise ValueError("The shape of ``out`` {} must be the shape of the "
+                         "image {}.".format(out.shape, image.shape))
+    elif np.shares_memory(out, image):
+        raise ValueError("``out`` must not share memory with the image.")
+
+    halo = block_size // 2
     if method == 'generic':
-        ndi.generic_filter(image, param, block_size,
-                           output=thresh_image, mode=mode, cval=cval)
+        # The batches are only used on bands of rows, see below
+        if batch and halo < min(image.shape):
+            def local_filter(band):
+                return _generic_filter_batch(band, param, block_size, halo,
+                                             mode, cval)
+        else:
+            def single_window(values):
+                return param(values[np.newaxis])[0]
+
+            function = single_window if batch else param
+
+            def local_filter(band):
+                return ndi.generic_filter(band, function, block_size,
+                                          output=float_dtype, mode=mode,
+                                          cval=cval)
     elif method == 'gaussian':
         if param is None:
             # automatically determine sigma which covers > 99% of distribution
             sigma = (block_size - 1) / 6.0
         else:
             sigma = param
-        ndi.gaussian_filter(image, sigma, output=thresh_image, mode=mode,
-                            cval=cval)
+        # The radius of the kernels of ndi.gaussian_filter
+        halo = int(4.0 * np.max(sigma) + 0.5)
+
+        def local_filter(band):
+            return ndi.gaussian_filter(band, sigma, output=float_dtype,
+                                       mode=mode, cval=cval)
     elif method == 'mean':
         mask = 1. / block_size * np.ones((block_size,))
-        # separation of filters to speedup convolution
-        ndi.convolve1d(image, mask, axis=0, output=thresh_image, mode=mode,
-                       cval=cval)
-        ndi.convolve1d(thresh_image, mask, axis=1, output=thresh_image,
-                       mode=mode, cval=cval)
+
+        def local_filter(band):
+            # separation of filters to speedup convolution
+            thresh_band = ndi.convolve1d(band, mask, axis=0,
+                                         output=float_dtype, mode=mode,
+                                         cval=cval)
+            ndi.convolve1d(thresh_band, mask, axis=1, output=thresh_band,
+                           mode=mode, cval=cval)
+            return thresh_band
     elif method == 'median':
-        ndi.median_filter(image, block_size, output=thresh_image, mode=mode,
-                          cval=cval)
+        def local_filter(band):
+            return ndi.median_filter(band, block_size, output=float_dtype,
+                                     mode=mode, cval=cval)
     else:
         raise ValueError("Invalid method specified. Please use `generic`, "
                          "`gaussian`, `mean`, or `median`.")
 
-    return thresh_image - offset
+    n_rows = image.shape[0]
+    if halo >= min(image.shape):
+        # Past the other edge of the image, ndi extends it in ways that
+        # bands extended with np.pad don't reproduce: the whole image is
+        # filtered at once
+        np.subtract(local_filter(image), offset, out=out)
+        return out
+
+    # The rows of the image extended by the halo, following `mode`, or -1
+    # for the rows equal to `cval`
+    np_mode = _to_np_mode(mode)
+    pad_kwargs = {'constant_values': -1} if np_mode == 'constant' else {}
+    extended_rows = np.pad(np.arange(n_rows), halo, mode=np_mode,
+                           **pad_kwargs)
+    # ndi uses cval as a double, except in its rank filters, where it is
+    # converted to the type of the image
+    cval_dtype = image.dtype if method == 'median' else np.float64
+
+    def process_band(start):
+        stop = min(start + _THRESHOLD_LOCAL_ROWS, n_rows)
+        if start >= halo and stop + halo <= n_rows:
+            band = image[start - halo:stop + halo]
+        else:
+            band_rows = extended_rows[start:stop + 2 * halo]
+            band = image[np.maximum(band_rows, 0)]
+            if mode == 'constant':
+                band = band.astype(cval_dtype, copy=False)
+                band[band_rows < 0] = cval
+        thresh_band = local_filter(band)
+        np.subtract(thresh_band[halo:halo + stop - start], offset,
+                    out=out[start:stop])
+
+    with ThreadPoolExecutor(max_workers=num_workers) as ex:
+        # Iterate over the results, to raise the exceptions of the threads
+        for _ in ex.map(process_band, range(0, n_rows, _THRESHOLD_LOCAL_ROWS)):
+            pass
+
+    return out
+
+
+def _generic_filter_batch(band, function, block_size, halo, mode, cval):
+    """Apply a function to batches of the neighbourhoods of the pixels of a
+    band of rows.
+
+    Parameters
+    ----------
+    band : (N + 2 * halo, M) ndarray
+        Band of rows of the image, extended by ``halo`` rows on both sides.
+    function : callable
+        Function of a ``(n_windows, block_size ** 2)`` array returning the
+        ``n_windows`` thresholds.
+    block_size : int
+        Size of the neighbourhoods.
+    halo : int
+        Number of rows the band is extended by.
+    mode : str
+        The mode of `threshold_local` used to extend the columns.
+    cval : float
+        Value past the edges, for the 'constant' mode.
+
+    Returns
+    -------
+    thresh_band : (N + 2 * halo, M) ndarray of float64
+        The thresholds, only defined outside of the rows of the halo.
+    """
+    np_mode = _to_np_mode(mode)
+    pad_kwargs = {'constant_values': cval} if np_mode == 'constant' else {}
+    # The neighbourhoods are passed as float64, like ndi.generic_filter
+    padded = np.pad(band.astype(np.float64), ((0, 0), (halo, halo)),
+                    mode=np_mode, **pad_kwargs)
+    windows = view_as_windows(padded, (block_size, block_size))
+    n_cols = band.shape[1]
+    batch_cols = max(_GENERIC_BATCH_SIZE // block_size ** 2, 1)
+    thresh_band = np.zeros(band.shape)
+    for row in range(windows.shape[0]):
+        for col in range(0, n_cols, batch_cols):
+            neighbourhoods = windows[row, col:col + batch_cols]
+            neighbourhoods = neighbourhoods.reshape(
+                neighbourhoods.shape[0], -1)
+            thresh_band[row + halo, col:col + batch_cols] = function(
+                neighbourhoods)
+    return thresh_band
 
 
 def _validate_image_histogram(image, hist, nbins=None):
@@ -583,13 +743,16 @@ def _cross_entropy(image, threshold, bins=_DEFAULT_ENTROPY_BINS):
     return nu
 
 
-def threshold_li(image, *, tolerance=None, initial_guess=None,
-                 iter_callback=None):
+def threshold_li(image=None, *, tolerance=None, initial_guess=None,
+                 iter_callback=None, hist=None):
     """Compute threshold value by Li's iterative Minimum Cross Entropy method.
 
+    Either image or hist must be provided. In case hist is given, the actual
+    histogram of the image is ignored.
+
     Parameters
     ----------
-    image : ndarray
+    image : ndarray, optional
         Input image.
 
     tolerance : float, optional
@@ -612,6 +775,12 @@ def threshold_li(image, *, tolerance=None, initial_guess=None,
         A function that will be called on the threshold at every iteration of
         the algorithm.
 
+    hist : array, or 2-tuple of arrays, optional
+        Histogram to determine the threshold from and a corresponding array
+        of bin center intensities. Alternatively, only the histogram can be
+        passed. A callable ``initial_guess`` cannot be used with ``hist``
+        alone.
+
     Returns
     -------
     threshold : float
@@ -632,6 +801,12 @@ def threshold_li(image, *, tolerance=None, initial_guess=None,
            :DOI:`10.1117/1.1631315`
     .. [4] ImageJ AutoThresholder code, http://fiji.sc/wiki/index.php/Auto_Threshold
 
+    Notes
+    -----
+    For integer images whose range of values is not larger than their
+    size, and when ``hist`` is given, the means of the iterations are
+    computed from the histogram of the image, instead of the image itself.
+
     Examples
     --------
     >>> from skimage.data import camera
@@ -639,38 +814,91 @@ def threshold_li(image, *, tolerance=None, initial_guess=None,
     >>> thresh = threshold_li(image)
     >>> binary = image > thresh
     """
-    # Remove nan:
-    image = image[~np.isnan(image)]
-    if image.size == 0:
-        return np.nan
-
-    # Make sure image has more than one value; otherwise, return that value
-    # This works even for np.inf
-    if np.all(image == image.flat[0]):
-        return image.flat[0]
-
-    # At this point, the image only contains np.inf, -np.inf, or valid numbers
-    image = image[np.isfinite(image)]
-    # if there are no finite values in the image, return 0. This is because
-    # at this point we *know* that there are *both* inf and -inf values,
-    # because inf == inf evaluates to True. We might as well separate them.
-    if image.size == 0:
-        return 0.
-
-    # Li's algorithm requires positive image (because of log(mean))
-    image_min = np.min(image)
-    image -= image_min
-    tolerance = tolerance or np.min(np.diff(np.unique(image))) / 2
+    if image is None and hist is None:
+        raise ValueError("Either image or hist must be provided.")
+    use_hist = hist is not None
+    if not use_hist and np.issubdtype(image.dtype, np.integer) and image.size:
+        # Unless the range of the values is much larger than the image, for
+        # which its histogram would be too large
+        use_hist = int(image.max()) - int(image.min()) <= image.size
+    if use_hist:
+        # The class means are computed from the counts of the values, which
+        # are exact for integer images
+        counts, values = _validate_image_histogram(image, hist)
+        present = counts > 0
+        counts = counts[present]
+        values = values[present]
+        if values.size == 0:
+            return np.nan
+        if values.size == 1:
+            return values[0] if image is None else image.flat[0]
+
+        # Li's algorithm requires positive image (because of log(mean))
+        image_min = values[0]
+        values = values - image_min
+        weighted_values = counts * values
+        tolerance = tolerance or np.min(np.diff(values)) / 2
+        image_mean = np.sum(weighted_values) / np.sum(counts)
+        shifted_max = values[-1]
+
+        def class_means(threshold):
+            foreground = values > threshold
+            mean_fore = (np.sum(weighted_values[foreground])
+                         / np.sum(counts[foreground]))
+            mean_back = (np.sum(weighted_values[~foreground])
+                         / np.sum(counts[~foreground]))
+            return mean_fore, mean_back
+
+        def shifted_image():
+            if image is None:
+                raise ValueError('A callable `initial_guess` requires the '
+                                 'image, it cannot be used with `hist` '
+                                 'only.')
+            return image.ravel() - image_min
+    else:
+        # Remove nan:
+        image = image[~np.isnan(image)]
+        if image.size == 0:
+            return np.nan
+
+        # Make sure image has more than one value; otherwise, return that
+        # value. This works even for np.inf
+        if np.all(image == image.flat[0]):
+            return image.flat[0]
+
+        # At this point, the image only contains np.inf, -np.inf, or valid
+        # numbers
+        image = image[np.isfinite(image)]
+        # if there are no finite values in the image, return 0. This is
+        # because at this point we *know* that there are *both* inf and -inf
+        # values, because inf == inf evaluates to True. We might as well
+        # separate them.
+        if image.size == 0:
+            return 0.
+
+        # Li's algorithm requires positive image (because of log(mean))
+        image_min = np.min(image)
+        image -= image_min
+        tolerance = tolerance or np.min(np.diff(np.unique(image))) / 2
+        image_mean = np.mean(image)
+        shifted_max = np.max(image)
+
+        def class_means(threshold):
+            foreground = (image > threshold)
+            return np.mean(image[foreground]), np.mean(image[~foreground])
+
+        def shifted_image():
+            return image
 
     # Initial estimate for iteration. See "initial_guess" in the parameter list
     if initial_guess is None:
-        t_next = np.mean(image)
+        t_next = image_mean
     elif callable(initial_guess):
-        t_next = initial_guess(image)
+        t_next = initial_guess(shifted_image())
     elif np.isscalar(initial_guess):  # convert to new, positive image range
         t_next = initial_guess - image_min
-        image_max = np.max(image) + image_min
-        if not 0 < t_next < np.max(image):
+        image_max = shifted_max + image_min
+        if not 0 < t_next < shifted_max:
             msg = ('The initial guess for threshold_li must be within the '
                    'range of the image. Got {} for image min {} and max {} '
                    .format(initial_guess, image_min, image_max))
@@ -693,9 +921,7 @@ def threshold_li(image, *, tolerance=None, initial_guess=None,
     # new and old threshold values is less than the tolerance
     while abs(t_next - t_curr) > tolerance:
         t_curr = t_next
-        foreground = (image > t_curr)
-        mean_fore = np.mean(image[foreground])
-        mean_back = np.mean(image[~foreground])
+        mean_fore, mean_back = class_means(t_curr)
 
         t_next = ((mean_back - mean_fore) /
                   (np.log(mean_back) - np.log(mean_fore)))
@@ -830,16 +1056,23 @@ def threshold_mean(image):
     return np.mean(image)
 
 
-def threshold_triangle(image, nbins=256):
+def threshold_triangle(image=None, nbins=256, *, hist=None):
     """Return threshold value based on the triangle algorithm.
 
+    Either image or hist must be provided. In case hist is given, the actual
+    histogram of the image is ignored.
+
     Parameters
     ----------
-    image : (N, M[, ..., P]) ndarray
+    image : (N, M[, ..., P]) ndarray, optional
         Grayscale input image.
     nbins : int, optional
         Number of bins used to calculate histogram. This value is ignored for
         integer arrays.
+    hist : array, or 2-tuple of arrays, optional
+        Histogram to determine the threshold from and a corresponding array
+        of bin center intensities. Alternatively, only the histogram can be
+        passed.
 
     Returns
     -------
@@ -865,7 +1098,7 @@ def threshold_triangle(image, nbins=256):
     """
     # nbins is ignored for integer arrays
     # so, we recalculate the effective nbins.
-    hist, bin_centers = histogram(image.ravel(), nbins, source_range='image')
+    hist, bin_centers = _validate_image_histogram(image, hist, nbins)
     nbins = len(hist)
 
     # Find peak, lowest and highest gray levels.
@@ -907,11 +1140,104 @@ def threshold_triangle(image, nbins=256):
     return bin_centers[arg_level]
 
 
-def _mean_std(image, w):
+def _window_sum(padded, w):
+    """Sum the values of a padded array in a sliding window.
+
+    The sums are computed along each axis in turn, as the differences of
+    cumulative sums, which are exact for integer values.
+
+    Parameters
+    ----------
+    padded : ndarray
+        Array padded by ``(k // 2 + 1, k // 2)`` along each axis, with ``k``
+        the size of the window along this axis.
+    w : tuple of int
+        Window size.
+
+    Returns
+    -------
+    sums : ndarray
+        The sums of the values in the window centered on each element of the
+        array before padding.
+    """
+    sums = padded
+    for axis, k in enumerate(w):
+        # The cumulative sums are computed in place, except in `padded`
+        total = np.cumsum(sums, axis=axis, out=None if axis == 0 else sums)
+        start = [slice(None)] * padded.ndim
+        stop = [slice(None)] * padded.ndim
+        start[axis] = slice(None, -k)
+        stop[axis] = slice(k, None)
+        sums = total[tuple(stop)] - total[tuple(start)]
+    return sums
+
+
+def _mean_std_bands(image, w, func, num_workers=None):
+    """Compute the local mean and standard deviation of an image by bands of
+    rows, and pass them to ``func(rows, m, s)``.
+
+    Each band is extended by half the window on both sides before the
+    running sums of the window are computed on it, so that only a few bands
+    at a time are converted to float64, and the results are the same as for
+    the whole image.
+
+    Parameters
+    ----------
+    image : ndarray
+        Input image.
+    w : int, or iterable of int
+        Window size specified as a single odd integer (3, 5, 7, …),
+        or an iterable of length ``image.ndim`` containing only odd
+        integers (e.g. ``(1, 5, 5)``).
+    func : callable
+        Function called with the slice of the rows of a band, and the local
+        mean and standard deviation of these rows, as float64 arrays.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
+    """
+    if not isinstance(w, Iterable):
+        w = (w,) * image.ndim
+    _validate_window_size(w)
+
+    n_rows = image.shape[0]
+    halo = w[0] // 2
+    pad_width = tuple((k // 2 + 1, k // 2) for k in w)
+    total_window_size = np.prod(w)
+
+    def process_band(start):
+        stop = min(start + _MEAN_STD_ROWS, n_rows)
+        band_start = max(start - halo, 0)
+        band_stop = min(stop + halo, n_rows)
+        # Inside the image, the padding of the band only changes the sums of
+        # the rows of the halo, which are discarded
+        band = np.pad(image[band_start:band_stop].astype(np.float64),
+                      pad_width, mode='reflect')
+        m = _window_sum(band, w) / total_window_size
+        np.multiply(band, band, out=band)
+        g2 = _window_sum(band, w) / total_window_size
+        del band
+        rows = slice(start - band_start, stop - band_start)
+        m = m[rows]
+        g2 = g2[rows]
+        # Note: we use np.clip because g2 is not guaranteed to be greater than
+        # m*m when floating point error is considered
+        g2 -= m * m
+        s = np.sqrt(np.clip(g2, 0, None, out=g2), out=g2)
+        func(slice(start, stop), m, s)
+
+    with ThreadPoolExecutor(max_workers=num_workers) as ex:
+        # Iterate over the results, to raise the exceptions of the threads
+        for _ in ex.map(process_band, range(0, n_rows, _MEAN_STD_ROWS)):
+            pass
+
+
+def _mean_std(image, w, *, num_workers=None):
     """Return local mean and standard deviation of each pixel using a
     neighborhood defined by a rectangular window size ``w``.
-    The algorithm uses integral images to speedup computation. This is
-    used by :func:`threshold_niblack` and :func:`threshold_sauvola`.
+    The algorithm uses running sums, by bands of rows of the image, to
+    speedup computation and limit the memory used. This is used by
+    :func:`threshold_niblack` and :func:`threshold_sauvola`.
 
     Parameters
     ----------
@@ -921,11 +1247,15 @@ def _mean_std(image, w):
         Window size specified as a single odd integer (3, 5, 7, …),
         or an iterable of length ``image.ndim`` containing only odd
         integers (e.g. ``(1, 5, 5)``).
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
     m : ndarray of float, same shape as ``image``
-        Local mean of the image.
+        Local mean of the image. It is float32 for float32 images, and
+        float64 otherwise.
     s : ndarray of float, same shape as ``image``
         Local standard deviation of the image.
 
@@ -937,34 +1267,52 @@ def _mean_std(image, w):
            Retrieval XV, (San Jose, USA), Jan. 2008.
            :DOI:`10.1117/12.767755`
     """
-    if not isinstance(w, Iterable):
-        w = (w,) * image.ndim
-    _validate_window_size(w)
+    float_dtype = _local_float_dtype(image.dtype)
+    m = np.empty(image.shape, dtype=float_dtype)
+    s = np.empty(image.shape, dtype=float_dtype)
 
-    pad_width = tuple((k // 2 + 1, k // 2) for k in w)
-    padded = np.pad(image.astype('float'), pad_width,
-                    mode='reflect')
-    padded_sq = padded * padded
+    def store(rows, band_m, band_s):
+        m[rows] = band_m
+        s[rows] = band_s
 
-    integral = integral_image(padded)
-    integral_sq = integral_image(padded_sq)
+    _mean_std_bands(image, w, store, num_workers)
+    return m, s
 
-    kern = np.zeros(tuple(k + 1 for k in w))
-    for indices in itertools.product(*([[0, -1]] * image.ndim)):
-        kern[indices] = (-1) ** (image.ndim % 2 != np.sum(indices) % 2)
 
-    total_window_size = np.prod(w)
-    sum_full = correlate_sparse(integral, kern, mode='valid')
-    m = sum_full / total_window_size
-    sum_sq_full = correlate_sparse(integral_sq, kern, mode='valid')
-    g2 = sum_sq_full / total_window_size
-    # Note: we use np.clip because g2 is not guaranteed to be greater than
-    # m*m when floating point error is considered
-    s = np.sqrt(np.clip(g2 - m * m, 0, None))
-    return m, s
+def _local_threshold(image, window_size, formula, binary, num_workers):
+    """Compute a threshold from the local mean and standard deviation,
+    by bands of rows, or directly the binary image above it.
 
+    Parameters
+    ----------
+    image : ndarray
+        Input image.
+    window_size : int, or iterable of int
+        Window size, see `_mean_std`.
+    formula : callable
+        Function of the local mean and standard deviation returning the
+        threshold.
+    binary : bool
+        Whether to return ``image > threshold`` instead of the threshold.
+    num_workers : int or None
+        The number of parallel threads to use.
+    """
+    float_dtype = _local_float_dtype(image.dtype)
+    out = np.empty(image.shape, dtype=bool if binary else float_dtype)
+
+    def threshold(rows, m, s):
+        band_threshold = formula(m, s).astype(float_dtype, copy=False)
+        if binary:
+            np.greater(image[rows], band_threshold, out=out[rows])
+        else:
+            out[rows] = band_threshold
 
-def threshold_niblack(image, window_size=15, k=0.2):
+    _mean_std_bands(image, window_size, threshold, num_workers)
+    return out
+
+
+def threshold_niblack(image, window_size=15, k=0.2, *, binary=False,
+                      num_workers=None):
     """Applies Niblack local threshold to an array.
 
     A threshold T is calculated for every pixel in the image using the
@@ -987,12 +1335,20 @@ def threshold_niblack(image, window_size=15, k=0.2):
         integers (e.g. ``(1, 5, 5)``).
     k : float, optional
         Value of parameter k in threshold formula.
+    binary : bool, optional
+        If True, return the binary image ``image > threshold`` instead of
+        the threshold, without storing the threshold of the whole image.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
     threshold : (N, M) ndarray
         Threshold mask. All pixels with an intensity higher than
-        this value are assumed to be foreground.
+        this value are assumed to be foreground. It is float32 for float32
+        images, and float64 otherwise. If `binary` is True, the boolean
+        foreground mask is returned instead.
 
     Notes
     -----
@@ -1008,6 +1364,9 @@ def threshold_niblack(image, window_size=15, k=0.2):
 
     for some value ``q``. By default, Bradley and Roth use ``q=1``.
 
+    The local mean and standard deviation are computed by bands of rows,
+    in parallel, so that the memory used in addition to the output is
+    proportional to the size of a band.
 
     References
     ----------
@@ -1022,12 +1381,17 @@ def threshold_niblack(image, window_size=15, k=0.2):
     >>> from skimage import data
     >>> image = data.page()
     >>> threshold_image = threshold_niblack(image, window_size=7, k=0.1)
+    >>> binary_image = threshold_niblack(image, window_size=7, k=0.1,
+    ...                                  binary=True)
     """
-    m, s = _mean_std(image, window_size)
-    return m - k * s
+    def formula(m, s):
+        return m - k * s
 
+    return _local_threshold(image, window_size, formula, binary, num_workers)
 
-def threshold_sauvola(image, window_size=15, k=0.2, r=None):
+
+def threshold_sauvola(image, window_size=15, k=0.2, r=None, *, binary=False,
+                      num_workers=None):
     """Applies Sauvola local threshold to an array. Sauvola is a
     modification of Niblack technique.
 
@@ -1055,12 +1419,20 @@ def threshold_sauvola(image, window_size=15, k=0.2, r=None):
     r : float, optional
         Value of R, the dynamic range of standard deviation.
         If None, set to the half of the image dtype range.
+    binary : bool, optional
+        If True, return the binary image ``image > threshold`` instead of
+        the threshold, without storing the threshold of the whole image.
+    num_workers : int, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
 
     Returns
     -------
     threshold : (N, M) ndarray
         Threshold mask. All pixels with an intensity higher than
-        this value are assumed to be foreground.
+        this value are assumed to be foreground. It is float32 for float32
+        images, and float64 otherwise. If `binary` is True, the boolean
+        foreground mask is returned instead.
 
     Notes
     -----
@@ -1079,12 +1451,17 @@ def threshold_sauvola(image, window_size=15, k=0.2, r=None):
     >>> image = data.page()
     >>> t_sauvola = threshold_sauvola(image, window_size=15, k=0.2)
     >>> binary_image = image > t_sauvola
+    >>> binary_image = threshold_sauvola(image, window_size=15, k=0.2,
+    ...                                  binary=True)
     """
     if r is None:
         imin, imax = dtype_limits(image, clip_negative=False)
         r = 0.5 * (imax - imin)
-    m, s = _mean_std(image, window_size)
-    return m * (1 + k * ((s / r) - 1))
+
+    def formula(m, s):
+        return m * (1 + k * ((s / r) - 1))
+
+    return _local_threshold(image, window_size, formula, binary, num_workers)
 
 
 def apply_hysteresis_threshold(image, low, high):
@@ -1134,16 +1511,19 @@ def apply_hysteresis_threshold(image, low, high):
     return thresholded
 
 
-def threshold_multiotsu(image, classes=3, nbins=256):
+def threshold_multiotsu(image=None, classes=3, nbins=256, *, hist=None):
     r"""Generate `classes`-1 threshold values to divide gray levels in `image`.
 
     The threshold values are chosen to maximize the total sum of pairwise
     variances between the thresholded graylevel classes. See Notes and [1]_
     for more details.
 
+    Either image or hist must be provided. In case hist is given, the actual
+    histogram of the image is ignored.
+
     Parameters
     ----------
-    image : (N, M) ndarray
+    image : (N, M) ndarray, optional
         Grayscale input image.
     classes : int, optional
         Number of classes to be thresholded, i.e. the number of resulting
@@ -1151,6 +1531,10 @@ def threshold_multiotsu(image, classes=3, nbins=256):
     nbins : int, optional
         Number of bins used to calculate the histogram. This value is ignored
         for integer arrays.
+    hist : array, or 2-tuple of arrays, optional
+        Histogram to determine the thresholds from and a corresponding array
+        of bin center intensities. Alternatively, only the histogram can be
+        passed.
 
     Returns
     -------
@@ -1165,10 +1549,11 @@ def threshold_multiotsu(image, classes=3, nbins=256):
 
     Notes
     -----
-    This implementation relies on a Cython function whose complexity
-    is :math:`O\left(\frac{Ch^{C-1}}{(C-1)!}\right)`, where :math:`h`
-    is the number of histogram bins and :math:`C` is the number of
-    classes desired.
+    Up to 3 classes, this implementation relies on a Cython function whose
+    complexity is :math:`O\left(\frac{Ch^{C-1}}{(C-1)!}\right)`, where
+    :math:`h` is the number of histogram bins and :math:`C` is the number of
+    classes desired. For more classes, the thresholds are found by dynamic
+    programming, with a complexity of :math:`O\left(Ch^2\right)`.
 
     The input image must be grayscale.
 
@@ -1194,17 +1579,15 @@ def threshold_multiotsu(image, classes=3, nbins=256):
 
     """
 
-    if len(image.shape) > 2 and image.shape[-1] in (3, 4):
+    if image is not None and len(image.shape) > 2 and \
+            image.shape[-1] in (3, 4):
         msg = ("threshold_multiotsu is expected to work correctly only for "
                "grayscale images; image shape {0} looks like an RGB image")
         warn(msg.format(image.shape))
 
     # calculating the histogram and the probability of each gray level.
-    prob, bin_centers = histogram(image.ravel(),
-                                  nbins=nbins,
-                                  source_range='image',
-                                  normalize=True)
-    prob = prob.astype('float32')
+    counts, bin_centers = _validate_image_histogram(image, hist, nbins)
+    prob = (counts / counts.sum()).astype('float32')
 
     nvalues = np.count_nonzero(prob)
     if nvalues < classes:
@@ -1213,6 +1596,9 @@ def threshold_multiotsu(image, classes=3, nbins=256):
         raise ValueError(msg.format(nvalues, classes))
     elif nvalues == classes:
         thresh_idx = np.where(prob > 0)[0][:-1]
+    elif classes > 3:
+        # The brute force search is exponential in the number of classes
+        thresh_idx = _get_multiotsu_thresh_indices_dp(prob, classes - 1)
     else:
         # Get threshold indices
         try:
@@ -1,5 +1,8 @@
 from .binary import (binary_erosion, binary_dilation, binary_opening,
                      binary_closing)
+from ._binary_packed import (pack_binary, unpack_binary, packed_binary_erosion,
+                             packed_binary_dilation, packed_binary_opening,
+                             packed_binary_closing)
 from .grey import (erosion, dilation, opening, closing, white_tophat,
                    black_tophat)
 from .selem import (square, rectangle, diamond, disk, cube, octahedron, ball,
@@ -20,6 +23,12 @@ __all__ = ['binary_erosion',
            'binary_dilation',
            'binary_opening',
            'binary_closing',
+           'pack_binary',
+           'unpack_binary',
+           'packed_binary_erosion',
+           'packed_binary_dilation',
+           'packed_binary_opening',
+           'packed_binary_closing',
            'erosion',
            'dilation',
            'opening',
@@ -0,0 +1,447 @@
+"""
+Binary morphological operations on bit-packed images.
+
+A packed image stores 64 pixels per ``uint64`` word along its last axis, the
+first pixel of each word in its most significant bit. Erosion and dilation
+are then computed with whole-word shifts, ANDs and ORs, using an eighth of the
+memory of a boolean image.
+"""
+import numpy as np
+
+from .misc import default_selem
+
+
+_WORD_BITS = 64
+_ALL_SET = np.uint64(0xFFFFFFFFFFFFFFFF)
+# Target size of the blocks of rows processed at once, in words
+_BLOCK_WORDS = 2 ** 18
+
+
+def pack_binary(image):
+    """Pack a binary image into 64-bit words along its last axis.
+
+    Parameters
+    ----------
+    image : ndarray
+        Binary input image. Nonzero values are considered True.
+
+    Returns
+    -------
+    packed : ndarray of uint64
+        The packed image, of shape ``image.shape[:-1] + (n_words,)`` with
+        ``n_words = ceil(image.shape[-1] / 64)``. Pixel ``j`` of a row is bit
+        ``63 - j % 64`` of word ``j // 64``. Unused bits of the last word are
+        zero.
+
+    See Also
+    --------
+    unpack_binary
+
+    Examples
+    --------
+    >>> image = np.zeros((2, 70), dtype=bool)
+    >>> image[0, :3] = True
+    >>> packed = pack_binary(image)
+    >>> packed.shape
+    (2, 2)
+    >>> hex(packed[0, 0])
+    '0xe000000000000000'
+    """
+    image = np.asarray(image)
+    if image.ndim == 0:
+        raise ValueError("`image` must have at least one dimension")
+    width = image.shape[-1]
+    n_words = -(-width // _WORD_BITS)
+    bytes_ = np.zeros(image.shape[:-1] + (n_words * 8,), dtype=np.uint8)
+    bytes_[..., :-(-width // 8)] = np.packbits(image.astype(bool, copy=False),
+                                               axis=-1)
+    # Bytes were packed most significant bit first, which matches the order
+    # of big-endian words
+    return bytes_.view('>u8').astype(np.uint64)
+
+
+def unpack_binary(packed, width):
+    """Unpack an image packed by `pack_binary` into a boolean array.
+
+    Parameters
+    ----------
+    packed : ndarray of uint64
+        The packed image.
+    width : int
+        The length of the last axis of the unpacked image.
+
+    Returns
+    -------
+    image : ndarray of bool
+        The unpacked image, of shape ``packed.shape[:-1] + (width,)``.
+
+    See Also
+    --------
+    pack_binary
+
+    Examples
+    --------
+    >>> image = np.eye(3, 70, dtype=bool)
+    >>> np.array_equal(unpack_binary(pack_binary(image), 70), image)
+    True
+    """
+    packed = np.asarray(packed, dtype=np.uint64)
+    _check_width(packed, width)
+    bytes_ = packed.astype('>u8').view(np.uint8)
+    return np.unpackbits(bytes_, axis=-1)[..., :width].view(bool)
+
+
+@default_selem
+def packed_binary_erosion(packed, selem=None, out=None, *, width):
+    """Return binary morphological erosion of a packed image.
+
+    This function returns the same result as `binary_erosion` on the
+    unpacked image.
+
+    Parameters
+    ----------
+    packed : ndarray of uint64
+        Packed binary image, as returned by `pack_binary`.
+    selem : ndarray, optional
+        The neighborhood expressed as an array of 1's and 0's, with the same
+        number of dimensions as the image. If None, use a cross-shaped
+        structuring element (connectivity=1).
+    out : ndarray of uint64, optional
+        The array to store the packed result of the morphology. If None is
+        passed, a new array will be allocated.
+    width : int
+        The length of the last axis of the unpacked image.
+
+    Returns
+    -------
+    eroded : ndarray of uint64
+        The packed result of the morphological erosion.
+
+    See Also
+    --------
+    pack_binary, unpack_binary, binary_erosion
+
+    Notes
+    -----
+    Rows of the structuring element are grouped by their pattern along the
+    last axis, so that rectangles, crosses and disks of radius ``r`` only
+    need ``O(r log(r))`` passes over the words of the image.
+
+    Examples
+    --------
+    >>> from skimage.morphology import square
+    >>> image = np.zeros((5, 100), dtype=bool)
+    >>> image[1:4, 60:70] = True
+    >>> eroded = packed_binary_erosion(pack_binary(image), square(3),
+    ...                                width=100)
+    >>> np.nonzero(unpack_binary(eroded, 100)[2])[0]
+    array([61, 62, 63, 64, 65, 66, 67, 68])
+    """
+    packed = np.asarray(packed, dtype=np.uint64)
+    selem = np.asarray(selem, dtype=bool)
+    offsets = np.argwhere(selem) - np.array(selem.shape) // 2
+    return _packed_reduce(packed, width, offsets, np.bitwise_and,
+                          border=True, out=out)
+
+
+@default_selem
+def packed_binary_dilation(packed, selem=None, out=None, *, width):
+    """Return binary morphological dilation of a packed image.
+
+    This function returns the same result as `binary_dilation` on the
+    unpacked image.
+
+    Parameters
+    ----------
+    packed : ndarray of uint64
+        Packed binary image, as returned by `pack_binary`.
+    selem : ndarray, optional
+        The neighborhood expressed as an array of 1's and 0's, with the same
+        number of dimensions as the image. If None, use a cross-shaped
+        structuring element (connectivity=1).
+    out : ndarray of uint64, optional
+        The array to store the packed result of the morphology. If None is
+        passed, a new array will be allocated.
+    width : int
+        The length of the last axis of the unpacked image.
+
+    Returns
+    -------
+    dilated : ndarray of uint64
+        The packed result of the morphological dilation.
+
+    See Also
+    --------
+    pack_binary, unpack_binary, binary_dilation
+    """
+    packed = np.asarray(packed, dtype=np.uint64)
+    selem = np.asarray(selem, dtype=bool)
+    offsets = np.array(selem.shape) // 2 - np.argwhere(selem)
+    return _packed_reduce(packed, width, offsets, np.bitwise_or,
+                          border=False, out=out)
+
+
+@default_selem
+def packed_binary_opening(packed, selem=None, out=None, *, width):
+    """Return binary morphological opening of a packed image.
+
+    This function returns the same result as `binary_opening` on the
+    unpacked image.
+
+    Parameters
+    ----------
+    packed : ndarray of uint64
+        Packed binary image, as returned by `pack_binary`.
+    selem : ndarray, optional
+        The neighborhood expressed as an array of 1's and 0's, with the same
+        number of dimensions as the image. If None, use a cross-shaped
+        structuring element (connectivity=1).
+    out : ndarray of uint64, optional
+        The array to store the packed result of the morphology. If None is
+        passed, a new array will be allocated.
+    width : int
+        The length of the last axis of the unpacked image.
+
+    Returns
+    -------
+    opening : ndarray of uint64
+        The packed result of the morphological opening.
+
+    See Also
+    --------
+    pack_binary, unpack_binary, binary_opening
+    """
+    eroded = packed_binary_erosion(packed, selem, width=width)
+    return packed_binary_dilation(eroded, selem, out=out, width=width)
+
+
+@default_selem
+def packed_binary_closing(packed, selem=None, out=None, *, width):
+    """Return binary morphological closing of a packed image.
+
+    This function returns the same result as `binary_closing` on the
+    unpacked image.
+
+    Parameters
+    ----------
+    packed : ndarray of uint64
+        Packed binary image, as returned by `pack_binary`.
+    selem : ndarray, optional
+        The neighborhood expressed as an array of 1's and 0's, with the same
+        number of dimensions as the image. If None, use a cross-shaped
+        structuring element (connectivity=1).
+    out : ndarray of uint64, optional
+        The array to store the packed result of the morphology. If None is
+        passed, a new array will be allocated.
+    width : int
+        The length of the last axis of the unpacked image.
+
+    Returns
+    -------
+    closing : ndarray of uint64
+        The packed result of the morphological closing.
+
+    See Also
+    --------
+    pack_binary, unpack_binary, binary_closing
+    """
+    dilated = packed_binary_dilation(packed, selem, width=width)
+    return packed_binary_erosion(dilated, selem, out=out, width=width)
+
+
+def _check_width(packed, width):
+    if packed.ndim == 0 or packed.shape[-1] != -(-width // _WORD_BITS):
+        raise ValueError("`width` does not match the number of words along "
+                         "the last axis of the packed image")
+
+
+def _padding_mask(width):
+    """Return the word with the unused bits of the last word of a row set."""
+    n_unused = -width % _WORD_BITS
+    return np.uint64((1 << n_unused) - 1)
+
+
+def _shift_columns(words, shift, border, out):
+    """Shift packed rows so that ``out`` pixel ``j`` is ``words`` pixel
+    ``j + shift``, filling the pixels shifted in with `border`.
+    """
+    n_words = words.shape[-1]
+    fill = _ALL_SET if border else np.uint64(0)
+    q, r = divmod(abs(shift), _WORD_BITS)
+    r, rc = np.uint64(r), np.uint64(_WORD_BITS - r)
+    if q >= n_words:
+        out[...] = fill
+    elif shift >= 0:
+        np.left_shift(words[..., q:], r, out=out[..., :n_words - q])
+        out[..., n_words - q:] = fill
+        if r:
+            out[..., :n_words - q - 1] |= words[..., q + 1:] >> rc
+            out[..., n_words - q - 1] |= fill >> rc
+    else:
+        np.right_shift(words[..., :n_words - q], r, out=out[..., q:])
+        out[..., :q] = fill
+        if r:
+            out[..., q + 1:] |= words[..., :n_words - q - 1] << rc
+            out[..., q] |= fill << rc
+    return out
+
+
+def _reduce_columns(words, columns, op, border):
+    """Combine the shifts of `words` by each of `columns` with `op`.
+
+    Runs of consecutive shifts are combined by doubling, in a number of
+    passes logarithmic in the length of the run. The rows of `words` must
+    start with enough words set to `border` to hold the pixels shifted in by
+    the most negative of `columns`.
+    """
+    result = None
+    buffer = np.empty_like(words)
+    # Split the sorted shifts into runs of consecutive values
+    breaks = np.nonzero(np.diff(columns) != 1)[0] + 1
+    for run in np.split(columns, breaks):
+        length = len(run)
+        run_result = words.copy()
+        covered = 1
+        while covered < length:
+            step = min(covered, length - covered)
+            _shift_columns(run_result, step, border, buffer)
+            op(run_result, buffer, out=run_result)
+            covered += step
+        if run[0] != 0:
+            _shift_columns(run_result, int(run[0]), border, buffer)
+            run_result, buffer = buffer, run_result
+        if result is None:
+            result = run_result
+        else:
+            op(result, run_result, out=result)
+    return result
+
+
+def _packed_reduce(packed, width, offsets, op, border, out=None):
+    """Combine shifted copies of a packed image with `op`.
+
+    Parameters
+    ----------
+    packed : ndarray of uint64
+        Packed binary image.
+    width : int
+        The length of the last axis of the unpacked image.
+    offsets : ndarray of int, shape (n, ndim)
+        Pixel ``x`` of the result combines the pixels ``x + offset`` of
+        `packed`.
+    op : ufunc
+        ``np.bitwise_and`` for erosion, ``np.bitwise_or`` for dilation.
+    border : bool
+        The value of pixels outside of the image.
+    out : ndarray of uint64, optional
+        The array to store the result.
+
+    Returns
+    -------
+    out : ndarray of uint64
+        The packed result.
+    """
+    _check_width(packed, width)
+    if offsets.shape[1] != packed.ndim:
+        raise ValueError("`selem` must have the same number of dimensions as "
+                         "the image")
+    if out is None:
+        out = np.empty(packed.shape, dtype=np.uint64)
+    elif out.shape != packed.shape or out.dtype != np.uint64:
+        raise ValueError("`out` must be an array of uint64 with the shape of "
+                         "the packed image")
+    elif np.may_share_memory(out, packed):
+        packed = packed.copy()
+
+    identity = _ALL_SET if op is np.bitwise_and else np.uint64(0)
+    padding_mask = _padding_mask(width)
+
+    # Group the offsets by their leading axes, and those by the pattern of
+    # shifts along the last axis they apply
+    leading = {}
+    for offset in offsets:
+        leading.setdefault(tuple(offset[:-1]), []).append(offset[-1])
+    patterns = {}
+    for lead, columns in leading.items():
+        columns = tuple(sorted(columns))
+        patterns.setdefault(columns, []).append(lead)
+
+    if packed.ndim == 1 or packed.shape[0] == 0 or len(offsets) == 0:
+        block_rows = max(packed.shape[0], 1)
+        halo = (0, 0)
+    else:
+        row_words = max(packed[0].size, 1)
+        block_rows = max(_BLOCK_WORDS // row_words, 1)
+        halo = (min(0, offsets[:, 0].min()), max(0, offsets[:, 0].max()))
+
+    # Runs of shifts are combined from their start towards the end of the
+    # rows, so that runs starting before the beginning of the rows need
+    # pixels outside of the image there
+    n_margin = -(-max(0, -offsets[:, -1].min(initial=0)) // _WORD_BITS)
+    fill = _ALL_SET if border else np.uint64(0)
+
+    n_rows = packed.shape[0] if packed.ndim > 1 else 1
+    for start in range(0, n_rows, block_rows):
+        stop = min(start + block_rows, n_rows)
+        if packed.ndim == 1:
+            in_start, in_stop = 0, 1
+            rows = packed[np.newaxis]
+            out_block = out[np.newaxis]
+        else:
+            in_start = max(start + halo[0], 0)
+            in_stop = min(stop + halo[1], n_rows)
+            rows = packed[in_start:in_stop]
+            out_block = out[start:stop]
+        block = np.empty(rows.shape[:-1] + (n_margin + rows.shape[-1],),
+                         dtype=np.uint64)
+        block[..., :n_margin] = fill
+        block[..., n_margin:] = rows
+        # Unused bits of a row are outside of the image
+        if border:
+            block[..., -1] |= padding_mask
+        else:
+            block[..., -1] &= ~padding_mask
+        out_block[...] = identity
+        for columns, leads in patterns.items():
+            reduced = _reduce_columns(block, np.array(columns), op, border)
+            reduced = reduced[..., n_margin:]
+            for lead in leads:
+                if packed.ndim == 1:
+                    lead = (0,)
+                out_slices, in_slices = _lead_slices(
+                    lead, (start, stop), (in_start, in_stop),
+                    out_block.shape[1:-1])
+                if out_slices is None:
+                    continue
+                op(out_block[out_slices], reduced[in_slices],
+                   out=out_block[out_slices])
+        out_block[..., -1] &= ~padding_mask
+    return out
+
+
+def _lead_slices(lead, out_rows, in_rows, shape):
+    """Slices of the output and input blocks that a shift along the leading
+    axes maps onto each other, or ``(None, None)`` if they don't overlap.
+
+    Pixels shifted in from outside of the image are ignored: they are the
+    identity of the operation, as erosion uses a True border and dilation a
+    False one.
+    """
+    out_slices = []
+    in_slices = []
+    # First axis: the blocks hold rows out_rows and in_rows of the image
+    start = max(out_rows[0], in_rows[0] - lead[0])
+    stop = min(out_rows[1], in_rows[1] - lead[0])
+    if start >= stop:
+        return None, None
+    out_slices.append(slice(start - out_rows[0], stop - out_rows[0]))
+    in_slices.append(slice(start + lead[0] - in_rows[0],
+                           stop + lead[0] - in_rows[0]))
+    for shift, size in zip(lead[1:], shape):
+        start = max(0, -shift)
+        stop = min(size, size - shift)
+        if start >= stop:
+            return None, None
+        out_slices.append(slice(start, stop))
+        in_slices.append(slice(start + shift, stop + shift))
+    return tuple(out_slices), tuple(in_slices)
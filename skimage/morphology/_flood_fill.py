@@ -7,8 +7,7 @@ connected to a given seed point with a different value.
 import numpy as np
 from warnings import warn
 
-from ._util import (_resolve_neighborhood, _set_border_values,
-                    _fast_pad, _offsets_to_raveled_neighbors)
+from ._util import _resolve_neighborhood, _set_border_values
 from ._flood_fill_cy import _flood_fill_equal, _flood_fill_tolerance
 
 
@@ -23,9 +22,11 @@ def flood_fill(image, seed_point, new_value, *, selem=None, connectivity=None,
     ----------
     image : ndarray
         An n-dimensional array.
-    seed_point : tuple or int
+    seed_point : tuple or int or array of int, shape (n_seeds, image.ndim)
         The point in `image` used as the starting point for the flood fill.  If
-        the image is 1D, this point may be given as an integer.
+        the image is 1D, this point may be given as an integer.  Several
+        points may be given as rows of an array; the fills of all of them
+        are then found in a single pass.
     new_value : `image` type
         New value to set the entire fill.  This must be chosen in agreement
         with the dtype of `image`.
@@ -59,7 +60,8 @@ def flood_fill(image, seed_point, new_value, *, selem=None, connectivity=None,
     filled : ndarray
         An array with the same shape as `image` is returned, with values in
         areas connected to and equal (or within tolerance of) the seed point
-        replaced with `new_value`.
+        replaced with `new_value`.  With several seed points, the union of
+        their fills is replaced.
 
     Notes
     -----
@@ -131,9 +133,11 @@ def flood(image, seed_point, *, selem=None, connectivity=None, tolerance=None):
     ----------
     image : ndarray
         An n-dimensional array.
-    seed_point : tuple or int
+    seed_point : tuple or int or array of int, shape (n_seeds, image.ndim)
         The point in `image` used as the starting point for the flood fill.  If
-        the image is 1D, this point may be given as an integer.
+        the image is 1D, this point may be given as an integer.  Several
+        points may be given as rows of an array; the fills of all of them
+        are then found in a single pass.
     selem : ndarray, optional
         A structuring element used to determine the neighborhood of each
         evaluated pixel. It must contain only 1's and 0's, have the same number
@@ -155,7 +159,9 @@ def flood(image, seed_point, *, selem=None, connectivity=None, tolerance=None):
     mask : ndarray
         A Boolean array with the same shape as `image` is returned, with True
         values for areas connected to and equal (or within tolerance of) the
-        seed point.  All other values are False.
+        seed point.  All other values are False.  With several seed points,
+        this is the union of their fills, each compared to its own seed
+        value.
 
     Notes
     -----
@@ -167,6 +173,10 @@ def flood(image, seed_point, *, selem=None, connectivity=None, tolerance=None):
     simply run `numpy.nonzero` on the result, save the indices, and discard
     this mask.
 
+    The image is not copied unless it is neither C- nor Fortran-contiguous,
+    and the memory used to keep track of the pixels still to be visited is
+    bounded by the size of the fill front rather than the size of the fill.
+
     Examples
     --------
     >>> from skimage.morphology import flood
@@ -213,6 +223,15 @@ def flood(image, seed_point, *, selem=None, connectivity=None, tolerance=None):
            [5, 5, 5, 5, 2, 2, 5],
            [5, 5, 5, 5, 2, 2, 5],
            [5, 5, 5, 5, 5, 5, 3]])
+
+    Fill from several seed points at once:
+
+    >>> mask = flood(image, [(1, 1), (1, 4)], connectivity=1)
+    >>> mask.astype(int)
+    array([[0, 0, 0, 0, 0, 0, 0],
+           [0, 1, 1, 0, 1, 1, 0],
+           [0, 1, 1, 0, 1, 1, 0],
+           [0, 0, 0, 0, 0, 0, 0]])
     """
     # Correct start point in ravelled image - only copy if non-contiguous
     image = np.asarray(image)
@@ -234,52 +253,70 @@ def flood(image, seed_point, *, selem=None, connectivity=None, tolerance=None):
     except TypeError:
         seed_point = (seed_point,)
 
-    seed_value = image[seed_point]
-    seed_point = tuple(np.asarray(seed_point) % image.shape)
+    # A single seed point is handled as a batch of one
+    seed_points = np.asarray(seed_point, dtype=np.intp)
+    if seed_points.ndim == 1:
+        seed_points = seed_points[np.newaxis]
+    if seed_points.ndim != 2 or seed_points.shape[1] != image.ndim:
+        raise ValueError("`seed_point` must be a point of `image` or an "
+                         "array of shape (n_seeds, image.ndim)")
+
+    seed_values = image[tuple(seed_points.T)]
+    seed_points = seed_points % image.shape
 
     selem = _resolve_neighborhood(selem, connectivity, image.ndim)
 
-    # Must annotate borders
-    working_image = _fast_pad(image, image.min(), order=order)
+    # Use a set of flags; see _flood_fill_cy.pyx for meanings. Only the flags
+    # need a border, the image itself is not padded.
+    flags = np.zeros([s + 2 for s in image.shape], dtype=np.uint8,
+                     order=order)
+    _set_border_values(flags, value=2)
 
     # Stride-aware neighbors - works for both C- and Fortran-contiguity
-    ravelled_seed_idx = np.ravel_multi_index([i + 1 for i in seed_point],
-                                             working_image.shape, order=order)
-    neighbor_offsets = _offsets_to_raveled_neighbors(
-        working_image.shape, selem, center=((1,) * image.ndim), order=order)
-
-    # Use a set of flags; see _flood_fill_cy.pyx for meanings
-    flags = np.zeros(working_image.shape, dtype=np.uint8, order=order)
-    _set_border_values(flags, value=2)
+    ravelled_seed_idx = np.ravel_multi_index(
+        tuple(seed_points.T + 1), flags.shape, order=order)
+    image_seed_idx = np.ravel_multi_index(
+        tuple(seed_points.T), image.shape, order=order)
+    selem_offsets = np.stack(np.nonzero(selem), axis=-1) - 1
+    selem_offsets = selem_offsets[np.any(selem_offsets, axis=1)]
+    neighbor_offsets = _raveled_offsets(selem_offsets, flags.shape, order)
+    image_neighbor_offsets = _raveled_offsets(selem_offsets, image.shape,
+                                              order)
 
     try:
         if tolerance is not None:
             # Check if tolerance could create overflow problems
             try:
-                max_value = np.finfo(working_image.dtype).max
-                min_value = np.finfo(working_image.dtype).min
+                max_value = np.finfo(image.dtype).max
+                min_value = np.finfo(image.dtype).min
             except ValueError:
-                max_value = np.iinfo(working_image.dtype).max
-                min_value = np.iinfo(working_image.dtype).min
+                max_value = np.iinfo(image.dtype).max
+                min_value = np.iinfo(image.dtype).min
 
-            high_tol = min(max_value, seed_value + tolerance)
-            low_tol = max(min_value, seed_value - tolerance)
+            high_tols = np.array(
+                [min(max_value, seed_value + tolerance)
+                 for seed_value in seed_values], dtype=image.dtype)
+            low_tols = np.array(
+                [max(min_value, seed_value - tolerance)
+                 for seed_value in seed_values], dtype=image.dtype)
 
-            _flood_fill_tolerance(working_image.ravel(order),
+            _flood_fill_tolerance(image.ravel(order),
                                   flags.ravel(order),
                                   neighbor_offsets,
+                                  image_neighbor_offsets,
                                   ravelled_seed_idx,
-                                  seed_value,
-                                  low_tol,
-                                  high_tol)
+                                  image_seed_idx,
+                                  low_tols,
+                                  high_tols)
         else:
-            _flood_fill_equal(working_image.ravel(order),
+            _flood_fill_equal(image.ravel(order),
                               flags.ravel(order),
                               neighbor_offsets,
+                              image_neighbor_offsets,
                               ravelled_seed_idx,
-                              seed_value)
+                              image_seed_idx)
     except TypeError:
-        if working_image.dtype == np.float16:
+        if image.dtype == np.float16:
             # Provide the user with clearer error message
             raise TypeError("dtype of `image` is float16 which is not "
                             "supported, try upcasting to float32")
@@ -288,3 +325,31 @@ def flood(image, seed_point, *, selem=None, connectivity=None, tolerance=None):
 
     # Output what the user requested; view does not create a new copy.
     return flags[(slice(1, -1),) * image.ndim].view(bool)
+
+
+def _raveled_offsets(offsets, shape, order):
+    """Convert offsets to neighbors into offsets in the raveled array.
+
+    Unlike `_offsets_to_raveled_neighbors`, offsets that point to the same
+    raveled position in arrays with small dimensions are not merged, so that
+    the result is aligned with `offsets` for any `shape`.
+
+    Parameters
+    ----------
+    offsets : ndarray of int, shape (n, ndim)
+        The offsets to the neighbors along each axis.
+    shape : tuple of int
+        The shape of the array the offsets apply to.
+    order : {"C", "F"}
+        Whether the array is raveled in row-major or column-major order.
+
+    Returns
+    -------
+    raveled_offsets : ndarray of intp, shape (n,)
+        The offsets in the raveled array.
+    """
+    if order == 'F':
+        factors = np.cumprod((1,) + tuple(shape[:-1]))
+    else:
+        factors = np.cumprod((1,) + tuple(shape[:0:-1]))[::-1]
+    return np.ascontiguousarray(offsets @ factors, dtype=np.intp)
@@ -8,8 +8,15 @@
 cimport numpy as cnp
 cnp.import_array()
 
+
+# The image is not padded, unlike `flags`: each queued position holds its
+# index in both arrays.
+cdef struct FloodPosition:
+    Py_ssize_t flags_index
+    Py_ssize_t image_index
+
 # Must be defined to use QueueWithHistory
-ctypedef Py_ssize_t QueueItem
+ctypedef FloodPosition QueueItem
 
 include "../morphology/_queue_with_history.pxi"
 
@@ -35,13 +42,18 @@ cdef:
     unsigned char FILL = 1
     # Not checked yet
     unsigned char UNKNOWN = 0
+    # Part of the fill of the seed point being processed, when several seed
+    # points are filled with a tolerance. The tags cycle through the values
+    # FIRST_TAG to 255.
+    unsigned char FIRST_TAG = 3
 
 
 cpdef inline void _flood_fill_equal(dtype_t[::1] image,
                                     unsigned char[::1] flags,
                                     Py_ssize_t[::1] neighbor_offsets,
-                                    Py_ssize_t start_index,
-                                    dtype_t seed_value):
+                                    Py_ssize_t[::1] image_neighbor_offsets,
+                                    Py_ssize_t[::1] start_indices,
+                                    Py_ssize_t[::1] image_start_indices):
     """Find connected areas to fill, requiring strict equality.
 
     Parameters
@@ -50,37 +62,55 @@ cpdef inline void _flood_fill_equal(dtype_t[::1] image,
         The raveled view of a n-dimensional array.
     flags : ndarray, one-dimensional
         An array of flags that is used to store the state of each pixel during
-        evaluation.
+        evaluation. It is the raveled view of an array with the shape of
+        `image` padded by one on all axes, with the border set to ``BORDER``.
     neighbor_offsets : ndarray
         A one-dimensional array that contains the offsets to find the
-        connected neighbors for any index in `image`.
-    start_index : int
-        Start position for the flood-fill.
-    seed_value :
-        Value of ``image[start_index]``.
+        connected neighbors for any index in `flags`.
+    image_neighbor_offsets : ndarray
+        The same offsets as `neighbor_offsets`, for indices in `image`.
+    start_indices : ndarray
+        Start positions for the flood-fill, as indices in `flags`.
+    image_start_indices : ndarray
+        Start positions for the flood-fill, as indices in `image`.
     """
     cdef:
         QueueWithHistory queue
-        QueueItem current_index, neighbor
+        QueueItem current, neighbor
+        Py_ssize_t i, k
+        dtype_t seed_value
 
     with nogil:
         # Initialize the queue
         queue_init(&queue, 64)
         try:
-            queue_push(&queue, &start_index)
-            flags[start_index] = FILL
-            # Break loop if all queued positions were evaluated
-            while queue_pop(&queue, &current_index):
-                # Look at all neighboring samples
-                for i in range(neighbor_offsets.shape[0]):
-                    neighbor = current_index + neighbor_offsets[i]
-
-                    # Shortcut if neighbor is already part of fill
-                    if flags[neighbor] == UNKNOWN:
-                        if image[neighbor] == seed_value:
-                            # Neighbor is in fill; check its neighbors too.
-                            flags[neighbor] = FILL
-                            queue_push(&queue, &neighbor)
+            for k in range(start_indices.shape[0]):
+                # A seed point in the fill of an earlier one has the same
+                # value, and thus the same fill
+                if flags[start_indices[k]] == FILL:
+                    continue
+                current.flags_index = start_indices[k]
+                current.image_index = image_start_indices[k]
+                seed_value = image[current.image_index]
+                queue_push(&queue, &current)
+                flags[current.flags_index] = FILL
+                # Break loop if all queued positions were evaluated
+                while queue_pop(&queue, &current):
+                    queue_discard_consumed(&queue)
+                    # Look at all neighboring samples
+                    for i in range(neighbor_offsets.shape[0]):
+                        neighbor.flags_index = (current.flags_index
+                                                + neighbor_offsets[i])
+
+                        # Shortcut if neighbor is already part of fill
+                        if flags[neighbor.flags_index] == UNKNOWN:
+                            neighbor.image_index = (current.image_index
+                                                    + image_neighbor_offsets[i])
+                            if image[neighbor.image_index] == seed_value:
+                                # Neighbor is in fill; check its neighbors too.
+                                flags[neighbor.flags_index] = FILL
+                                queue_push(&queue, &neighbor)
+                queue_clear(&queue)
         finally:
             # Ensure memory released
             queue_exit(&queue)
@@ -89,10 +119,11 @@ cpdef inline void _flood_fill_equal(dtype_t[::1] image,
 cpdef inline void _flood_fill_tolerance(dtype_t[::1] image,
                                         unsigned char[::1] flags,
                                         Py_ssize_t[::1] neighbor_offsets,
-                                        Py_ssize_t start_index,
-                                        dtype_t seed_value,
-                                        dtype_t low_tol,
-                                        dtype_t high_tol):
+                                        Py_ssize_t[::1] image_neighbor_offsets,
+                                        Py_ssize_t[::1] start_indices,
+                                        Py_ssize_t[::1] image_start_indices,
+                                        dtype_t[::1] low_tols,
+                                        dtype_t[::1] high_tols):
     """Find connected areas to fill, within a tolerance.
 
     Parameters
@@ -101,41 +132,81 @@ cpdef inline void _flood_fill_tolerance(dtype_t[::1] image,
         The raveled view of a n-dimensional array.
     flags : ndarray, one-dimensional
         An array of flags that is used to store the state of each pixel during
-        evaluation.
+        evaluation. It is the raveled view of an array with the shape of
+        `image` padded by one on all axes, with the border set to ``BORDER``.
     neighbor_offsets : ndarray
         A one-dimensional array that contains the offsets to find the
-        connected neighbors for any index in `image`.
-    start_index : int
-        Start position for the flood-fill.
-    seed_value :
-        Value of ``image[start_index]``.
-    low_tol :
-        Lower limit for tolerance comparison.
-    high_tol :
-        Upper limit for tolerance comparison.
+        connected neighbors for any index in `flags`.
+    image_neighbor_offsets : ndarray
+        The same offsets as `neighbor_offsets`, for indices in `image`.
+    start_indices : ndarray
+        Start positions for the flood-fill, as indices in `flags`.
+    image_start_indices : ndarray
+        Start positions for the flood-fill, as indices in `image`.
+    low_tols : ndarray
+        Lower limit for tolerance comparison, for each start position.
+    high_tols : ndarray
+        Upper limit for tolerance comparison, for each start position.
     """
     cdef:
         QueueWithHistory queue
-        QueueItem current_index, neighbor
+        QueueItem current, neighbor
+        Py_ssize_t i, k
+        Py_ssize_t n_seeds = start_indices.shape[0]
+        unsigned char tag = FILL
+        dtype_t low_tol, high_tol
 
     with nogil:
-        # Initialize the queue and push start position
+        # Initialize the queue
         queue_init(&queue, 64)
         try:
-            queue_push(&queue, &start_index)
-            flags[start_index] = FILL
-            # Break loop if all queued positions were evaluated
-            while queue_pop(&queue, &current_index):
-                # Look at all neighboring samples
-                for i in range(neighbor_offsets.shape[0]):
-                    neighbor = current_index + neighbor_offsets[i]
-
-                    # Only do comparisons on points not (yet) part of fill
-                    if flags[neighbor] == UNKNOWN:
-                        if low_tol <= image[neighbor] <= high_tol:
-                            # Neighbor is in fill; check its neighbors too.
-                            flags[neighbor] = FILL
-                            queue_push(&queue, &neighbor)
+            for k in range(n_seeds):
+                if n_seeds > 1:
+                    # The fills of different seed points may overlap without
+                    # being equal: the fill of the current seed point may
+                    # cross the fills of the previous ones, but not itself.
+                    if tag == 255:
+                        _untag_flags(flags)
+                        tag = FIRST_TAG
+                    elif tag < FIRST_TAG:
+                        tag = FIRST_TAG
+                    else:
+                        tag += 1
+
+                current.flags_index = start_indices[k]
+                current.image_index = image_start_indices[k]
+                low_tol = low_tols[k]
+                high_tol = high_tols[k]
+                queue_push(&queue, &current)
+                flags[current.flags_index] = tag
+                # Break loop if all queued positions were evaluated
+                while queue_pop(&queue, &current):
+                    queue_discard_consumed(&queue)
+                    # Look at all neighboring samples
+                    for i in range(neighbor_offsets.shape[0]):
+                        neighbor.flags_index = (current.flags_index
+                                                + neighbor_offsets[i])
+
+                        # Only do comparisons on points not (yet) part of fill
+                        if (flags[neighbor.flags_index] != tag and
+                                flags[neighbor.flags_index] != BORDER):
+                            neighbor.image_index = (current.image_index
+                                                    + image_neighbor_offsets[i])
+                            if low_tol <= image[neighbor.image_index] <= high_tol:
+                                # Neighbor is in fill; check its neighbors too.
+                                flags[neighbor.flags_index] = tag
+                                queue_push(&queue, &neighbor)
+                queue_clear(&queue)
+            if tag != FILL:
+                _untag_flags(flags)
         finally:
             # Ensure memory released
             queue_exit(&queue)
+
+
+cdef inline void _untag_flags(unsigned char[::1] flags) nogil:
+    """Replace the tags of individual seed points by ``FILL``."""
+    cdef Py_ssize_t i
+    for i in range(flags.shape[0]):
+        if flags[i] >= FIRST_TAG:
+            flags[i] = FILL
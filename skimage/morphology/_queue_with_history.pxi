@@ -40,6 +40,7 @@ Example
 """
 
 from libc.stdlib cimport malloc, realloc, free
+from libc.string cimport memmove
 
 
 # Store state of queue
@@ -107,6 +108,24 @@ cdef inline void queue_clear(QueueWithHistory* self) nogil:#
     self._index_valid = -1
 
 
+cdef inline Py_ssize_t queue_discard_consumed(QueueWithHistory* self) nogil:
+    """Drop the consumed items once they take up half of the buffer.
+
+    Calling this after each `queue_pop` bounds the buffer to a few times the
+    largest number of items waiting in the queue, instead of the total number
+    of items ever pushed. The dropped items can't be restored with
+    `queue_restore` afterwards. Returns the number of dropped items.
+    """
+    cdef Py_ssize_t n_consumed = self._index_consumed + 1
+    if 2 * n_consumed < self._buffer_size:
+        return 0
+    memmove(self._buffer_ptr, self._buffer_ptr + n_consumed,
+            (self._index_valid + 1 - n_consumed) * sizeof(QueueItem))
+    self._index_consumed = -1
+    self._index_valid -= n_consumed
+    return n_consumed
+
+
 cdef inline void queue_exit(QueueWithHistory* self) nogil:
     """Free the buffer of the queue.
     
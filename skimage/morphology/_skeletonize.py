@@ -4,7 +4,7 @@ Algorithms for computing the skeleton of a binary image
 
 
 import numpy as np
-from ..util import img_as_ubyte, crop
+from ..util import img_as_ubyte
 from scipy import ndimage as ndi
 
 from .._shared.utils import check_nD, warn
@@ -334,6 +334,10 @@ def thin(image, max_iter=None):
                      [16,  0,   1],
                      [32, 64, 128]], dtype=np.uint8)
 
+    # work buffers, reused across the subiterations
+    N = np.empty_like(skel)
+    D = np.empty(skel.shape, dtype=bool)
+
     # iterate until convergence, up to the iteration limit
     max_iter = max_iter or np.inf
     n_iter = 0
@@ -344,9 +348,9 @@ def thin(image, max_iter=None):
         # perform the two "subiterations" described in the paper
         for lut in [G123_LUT, G123P_LUT]:
             # correlate image with neighborhood mask
-            N = ndi.correlate(skel, mask, mode='constant')
+            ndi.correlate(skel, mask, output=N, mode='constant')
             # take deletion decision from this subiteration's LUT
-            D = np.take(lut, N)
+            np.take(lut, N, out=D)
             # perform deletion
             skel[D] = 0
 
@@ -462,8 +466,6 @@ def medial_axis(image, mask=None, return_distance=False):
 
     # Build distance transform
     distance = ndi.distance_transform_edt(masked_image)
-    if return_distance:
-        store_distance = distance.copy()
 
     # Corners
     # The processing order along the edge is critical to the shape of the
@@ -474,16 +476,27 @@ def medial_axis(image, mask=None, return_distance=False):
     # configuration is the number of background (0-value) pixels in the
     # 3x3 neighbourhood
     cornerness_table = np.array([9 - np.sum(_pattern_of(index))
-                                 for index in range(512)])
+                                 for index in range(512)], dtype=np.uint8)
     corner_score = _table_lookup(masked_image, cornerness_table)
 
-    # Define arrays for inner loop
-    i, j = np.mgrid[0:image.shape[0], 0:image.shape[1]]
-    result = masked_image.copy()
-    distance = distance[result]
-    i = np.ascontiguousarray(i[result], dtype=np.intp)
-    j = np.ascontiguousarray(j[result], dtype=np.intp)
-    result = np.ascontiguousarray(result, np.uint8)
+    # Define arrays for inner loop. Only the foreground pixels are needed
+    # from here on.
+    i, j = np.nonzero(masked_image)
+    i = np.ascontiguousarray(i, dtype=np.intp)
+    j = np.ascontiguousarray(j, dtype=np.intp)
+
+    # The distance transform is the square root of an integer, so sorting
+    # on the (exact) squared distance gives the same order. The squared
+    # distance and the cornerness (at most 9) are combined in a single key.
+    key = distance[i, j]
+    if not return_distance:
+        del distance
+    np.square(key, out=key)
+    np.rint(key, out=key)
+    key = key.astype(np.int64)
+    key *= 10
+    key += corner_score[i, j]
+    del corner_score
 
     # Determine the order in which pixels are processed.
     # We use a random # for tiebreaking. Assign each pixel in the image a
@@ -492,20 +505,25 @@ def medial_axis(image, mask=None, return_distance=False):
     #
     generator = np.random.RandomState(0)
     tiebreaker = generator.permutation(np.arange(masked_image.sum()))
-    order = np.lexsort((tiebreaker,
-                        corner_score[masked_image],
-                        distance))
-    order = np.ascontiguousarray(order, dtype=np.int32)
-
+    # Visit the pixels by increasing tiebreaker, so that a stable sort of the
+    # keys breaks the ties in the same way as sorting on the tiebreaker
+    by_tiebreaker = np.empty_like(tiebreaker)
+    by_tiebreaker[tiebreaker] = np.arange(tiebreaker.size)
+    order = by_tiebreaker[np.argsort(key[by_tiebreaker], kind='stable')]
+    del key, tiebreaker, by_tiebreaker
+    order = np.ascontiguousarray(order, dtype=np.intp)
+
+    # the image is skeletonized in place: masked_image is a private copy
+    result = np.ascontiguousarray(masked_image).view(np.uint8)
     table = np.ascontiguousarray(table, dtype=np.uint8)
     # Remove pixels not belonging to the medial axis
     _skeletonize_loop(result, i, j, order, table)
 
-    result = result.astype(bool)
+    result = result.view(bool)
     if mask is not None:
         result[~mask] = image[~mask]
     if return_distance:
-        return result, store_distance
+        return result, distance
     else:
         return result
 
@@ -576,7 +594,7 @@ def _table_lookup(image, table):
     return image
 
 
-def skeletonize_3d(image):
+def skeletonize_3d(image, *, num_threads=None):
     """Compute the skeleton of a binary image.
 
     Thinning is used to reduce each connected component in a binary image
@@ -587,6 +605,10 @@ def skeletonize_3d(image):
     image : ndarray, 2D or 3D
         A binary image containing the objects to be skeletonized. Zeros
         represent background, nonzero values are foreground.
+    num_threads : int, optional
+        The maximum number of threads to use. If ``None`` use the OpenMP
+        default value; typically equal to the maximum number of virtual cores.
+        The result does not depend on the number of threads.
 
     Returns
     -------
@@ -606,6 +628,10 @@ def skeletonize_3d(image):
     candidates for removal is assembled; then pixels from this list are
     rechecked sequentially, to better preserve connectivity of the image.
 
+    The candidates are assembled in parallel, one plane of the image at a
+    time. Only one binary copy of the image is made: it is not padded, and
+    the input (which can be e.g. a memory-mapped array) is left untouched.
+
     The algorithm this function implements is different from the algorithms
     used by either `skeletonize` or `medial_axis`, thus for 2D images the
     results produced by this function are generally different.
@@ -621,25 +647,23 @@ def skeletonize_3d(image):
     if image.ndim < 2 or image.ndim > 3:
         raise ValueError("skeletonize_3d can only handle 2D or 3D images; "
                          "got image.ndim = %s instead." % image.ndim)
-    image = np.ascontiguousarray(image)
+    if num_threads is None:
+        num_threads = 0
+
     image = img_as_ubyte(image, force_copy=False)
+    maxval = image.max() if image.size else 0
 
-    # make an in image 3D and pad it w/ zeros to simplify dealing w/ boundaries
-    # NB: careful here to not clobber the original *and* minimize copying
-    image_o = image
+    # normalize to binary. This is the only copy of the image: the borders
+    # are handled by the thinning routine, so no padding is needed.
+    # NB: careful here to not clobber the original
+    image_o = np.ascontiguousarray((image != 0).view(np.uint8))
     if image.ndim == 2:
-        image_o = image[np.newaxis, ...]
-    image_o = np.pad(image_o, pad_width=1, mode='constant')
-
-    # normalize to binary
-    maxval = image_o.max()
-    image_o[image_o != 0] = 1
+        image_o = image_o[np.newaxis, ...]
 
     # do the computation
-    image_o = np.asarray(_compute_thin_image(image_o))
+    image_o = np.asarray(_compute_thin_image(image_o, num_threads))
 
-    # crop it back and restore the original intensity range
-    image_o = crop(image_o, crop_width=1)
+    # restore the original intensity range
     if image.ndim == 2:
         image_o = image_o[0]
     image_o *= maxval
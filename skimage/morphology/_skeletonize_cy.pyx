@@ -130,7 +130,7 @@ Original author: Lee Kamentsky
 
 def _skeletonize_loop(cnp.uint8_t[:, ::1] result,
                       Py_ssize_t[::1] i, Py_ssize_t[::1] j,
-                      cnp.int32_t[::1] order, cnp.uint8_t[::1] table):
+                      Py_ssize_t[::1] order, cnp.uint8_t[::1] table):
     """
     Inner loop of skeletonize function
 
@@ -224,8 +224,8 @@ def _table_lookup_index(cnp.uint8_t[:, ::1] image):
     hardwired kernel.
     """
     cdef:
-        Py_ssize_t[:, ::1] indexer
-        Py_ssize_t *p_indexer
+        cnp.uint16_t[:, ::1] indexer
+        cnp.uint16_t *p_indexer
         cnp.uint8_t *p_image
         Py_ssize_t i_stride
         Py_ssize_t i_shape
@@ -236,7 +236,7 @@ def _table_lookup_index(cnp.uint8_t[:, ::1] image):
 
     i_shape   = image.shape[0]
     j_shape   = image.shape[1]
-    indexer = np.zeros((i_shape, j_shape), dtype=np.intp)
+    indexer = np.zeros((i_shape, j_shape), dtype=np.uint16)
     p_indexer = &indexer[0, 0]
     p_image   = &image[0, 0]
     i_stride  = image.strides[0]
@@ -1,6 +1,8 @@
 """Convex Hull."""
+from concurrent.futures import ThreadPoolExecutor
 from itertools import product
 import numpy as np
+from scipy import ndimage as ndi
 from scipy.spatial import ConvexHull
 from ..measure.pnpoly import grid_points_in_poly
 from ._convex_hull import possible_hull
@@ -131,21 +133,29 @@ def convex_hull_image(image, offset_coordinates=True, tolerance=1e-10):
     hull = ConvexHull(coords)
     vertices = hull.points[hull.vertices]
 
+    # Only the pixels within the bounding box of the hull vertices need to
+    # be checked
+    lower = np.maximum(np.floor(vertices.min(axis=0)), 0).astype(np.intp)
+    upper = np.minimum(np.ceil(vertices.max(axis=0)) + 1,
+                       image.shape).astype(np.intp)
+    bbox = tuple(slice(start, stop) for start, stop in zip(lower, upper))
+    bbox_shape = tuple(upper - lower)
+
+    mask = np.zeros(image.shape, dtype=bool)
     # If 2D, use fast Cython function to locate convex hull pixels
     if ndim == 2:
-        mask = grid_points_in_poly(image.shape, vertices)
+        mask[bbox] = grid_points_in_poly(bbox_shape, vertices - lower)
     else:
-        gridcoords = np.reshape(np.mgrid[tuple(map(slice, image.shape))],
-                                (ndim, -1))
+        gridcoords = np.reshape(np.mgrid[bbox], (ndim, -1))
 
         coords_in_hull = _check_coords_in_hull(gridcoords,
                                                hull.equations, tolerance)
-        mask = np.reshape(coords_in_hull, image.shape)
+        mask[bbox] = np.reshape(coords_in_hull, bbox_shape)
 
     return mask
 
 
-def convex_hull_object(image, *, connectivity=2):
+def convex_hull_object(image, *, connectivity=2, num_workers=None):
     r"""Compute the convex hull image of individual objects in a binary image.
 
     The convex hull is the set of pixels included in the smallest convex
@@ -167,6 +177,10 @@ def convex_hull_object(image, *, connectivity=2):
                    |               /  |  \
                   [ ]           [ ]  [ ]  [ ]
 
+    num_workers : int or None, optional
+        The number of parallel threads to use. If set to ``None``, the default
+        number of threads of `concurrent.futures.ThreadPoolExecutor` is used.
+
     Returns
     -------
     hull : ndarray of bool
@@ -175,8 +189,9 @@ def convex_hull_object(image, *, connectivity=2):
     Notes
     -----
     This function uses ``skimage.morphology.label`` to define unique objects,
-    finds the convex hull of each using ``convex_hull_image``, and combines
-    these regions with logical OR. Be aware the convex hulls of unconnected
+    finds the convex hull of each using ``convex_hull_image`` on the bounding
+    box of the object, and combines these regions with logical OR. The
+    objects are processed in parallel. Be aware the convex hulls of unconnected
     objects may overlap in the result. If this is suspected, consider using
     convex_hull_image separately on each object or adjust ``connectivity``.
     """
@@ -187,11 +202,16 @@ def convex_hull_object(image, *, connectivity=2):
         raise ValueError('`connectivity` must be either 1 or 2.')
 
     labeled_im = label(image, connectivity=connectivity, background=0)
-    convex_obj = np.zeros(image.shape, dtype=bool)
     convex_img = np.zeros(image.shape, dtype=bool)
 
-    for i in range(1, labeled_im.max() + 1):
-        convex_obj = convex_hull_image(labeled_im == i)
-        convex_img = np.logical_or(convex_img, convex_obj)
+    def _object_hull(i, bbox):
+        # the hull of an object lies within its bounding box
+        return bbox, convex_hull_image(labeled_im[bbox] == i)
+
+    objects = ndi.find_objects(labeled_im)
+    with ThreadPoolExecutor(max_workers=num_workers) as ex:
+        hulls = ex.map(_object_hull, range(1, len(objects) + 1), objects)
+        for bbox, convex_obj in hulls:
+            convex_img[bbox] |= convex_obj
 
     return convex_img
@@ -0,0 +1,106 @@
+import numpy as np
+from numpy import testing
+
+import pytest
+
+from skimage.morphology import (binary_erosion, binary_dilation,
+                                binary_opening, binary_closing, selem,
+                                pack_binary, unpack_binary,
+                                packed_binary_erosion, packed_binary_dilation,
+                                packed_binary_opening, packed_binary_closing)
+
+
+rng = np.random.RandomState(0)
+image = rng.rand(60, 200) > 0.3
+# Shifts across the padding bits of the last word and over whole words
+image_wide = rng.rand(20, 333) > 0.2
+# No padding bits in the last word
+image_full_words = rng.rand(20, 128) > 0.2
+
+
+@pytest.mark.parametrize("width", [0, 1, 63, 64, 65, 200])
+def test_pack_roundtrip(width):
+    img = rng.rand(3, 4, width) > 0.5
+    packed = pack_binary(img)
+    assert packed.dtype == np.uint64
+    assert packed.shape == (3, 4, -(-width // 64))
+    testing.assert_array_equal(unpack_binary(packed, width), img)
+
+
+def test_pack_bit_order():
+    img = np.zeros(70, dtype=bool)
+    img[[0, 63, 64]] = True
+    packed = pack_binary(img)
+    testing.assert_array_equal(packed, np.array([2 ** 63 + 1, 2 ** 63],
+                                                dtype=np.uint64))
+
+
+def test_unpack_wrong_width():
+    with pytest.raises(ValueError):
+        unpack_binary(pack_binary(image), 100)
+
+
+@pytest.mark.parametrize(
+    "func, packed_func",
+    [(binary_erosion, packed_binary_erosion),
+     (binary_dilation, packed_binary_dilation),
+     (binary_opening, packed_binary_opening),
+     (binary_closing, packed_binary_closing)])
+@pytest.mark.parametrize(
+    "strel",
+    [None, selem.square(3), selem.rectangle(3, 70), selem.rectangle(4, 6),
+     selem.rectangle(1, 151), selem.disk(5), selem.diamond(3),
+     selem.star(2),
+     np.array([[1, 0, 0, 1, 1]], dtype=np.uint8)])
+@pytest.mark.parametrize("img", [image, image_wide, image_full_words])
+def test_matches_unpacked(func, packed_func, strel, img):
+    expected = func(img, strel)
+    result = packed_func(pack_binary(img), strel, width=img.shape[-1])
+    testing.assert_array_equal(unpack_binary(result, img.shape[-1]),
+                               expected)
+
+
+@pytest.mark.parametrize("packed_func, func",
+                         [(packed_binary_erosion, binary_erosion),
+                          (packed_binary_dilation, binary_dilation)])
+def test_nd(packed_func, func):
+    img = rng.rand(9, 10, 130) > 0.3
+    for strel in (None, selem.ball(2), selem.cube(3)):
+        result = packed_func(pack_binary(img), strel, width=130)
+        testing.assert_array_equal(unpack_binary(result, 130),
+                                   func(img, strel))
+
+    img = rng.rand(150) > 0.3
+    strel = np.ones(7, dtype=bool)
+    result = packed_func(pack_binary(img), strel, width=150)
+    testing.assert_array_equal(unpack_binary(result, 150), func(img, strel))
+
+
+def test_blocks_of_rows(monkeypatch):
+    from skimage.morphology import _binary_packed
+    monkeypatch.setattr(_binary_packed, '_BLOCK_WORDS', 7)
+    strel = selem.disk(4)
+    result = packed_binary_erosion(pack_binary(image), strel, width=200)
+    testing.assert_array_equal(unpack_binary(result, 200),
+                               binary_erosion(image, strel))
+
+
+def test_out_argument():
+    packed = pack_binary(image)
+    out = np.empty_like(packed)
+    result = packed_binary_dilation(packed, selem.disk(2), out=out,
+                                    width=200)
+    assert result is out
+    testing.assert_array_equal(unpack_binary(out, 200),
+                               binary_dilation(image, selem.disk(2)))
+
+    # In place
+    expected = packed_binary_erosion(packed, width=200)
+    packed_binary_erosion(packed, out=packed, width=200)
+    testing.assert_array_equal(packed, expected)
+
+
+def test_unused_bits_stay_zero():
+    img = np.ones((5, 70), dtype=bool)
+    eroded = packed_binary_erosion(pack_binary(img), width=70)
+    assert eroded[0, -1] == np.uint64(0xFC00000000000000)
@@ -1,5 +1,6 @@
 import numpy as np
-from skimage.morphology import convex_hull_image, convex_hull_object
+from skimage.morphology import (convex_hull_image, convex_hull_object,
+                                label)
 from skimage.morphology._convex_hull import possible_hull
 
 from skimage._shared import testing
@@ -143,6 +144,23 @@ def test_object():
     assert_array_equal(out, expected_conn_1)
 
 
+@testing.parametrize("num_workers", [1, 4])
+def test_object_matches_per_label_hulls(num_workers):
+    image = np.zeros((64, 64), dtype=bool)
+    rng = np.random.RandomState(0)
+    for r, c in rng.randint(0, 60, size=(20, 2)):
+        image[r:r + rng.randint(1, 5), c:c + rng.randint(1, 5)] = True
+    image[::7, 0] = True  # objects touching the image border
+
+    labels = label(image)
+    expected = np.zeros_like(image)
+    for i in range(1, labels.max() + 1):
+        expected |= convex_hull_image(labels == i)
+
+    assert_array_equal(convex_hull_object(image, num_workers=num_workers),
+                       expected)
+
+
 def test_non_c_contiguous():
     # 2D Fortran-contiguous
     image = np.ones((2, 2), order='F', dtype=bool)
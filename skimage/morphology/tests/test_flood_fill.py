@@ -293,5 +293,49 @@ def test_negative_indexing_seed_point():
     np.testing.assert_allclose(image, expected)
 
 
+@pytest.mark.parametrize("tolerance", [None, 0, 2])
+@pytest.mark.parametrize("connectivity", [1, 2])
+def test_multiple_seed_points(tolerance, connectivity):
+    rng = np.random.RandomState(0)
+    image = rng.randint(0, 6, size=(30, 40)).astype(np.int16)
+    # Enough seed points for the tags used with a tolerance to wrap around
+    seed_points = np.stack([rng.randint(0, 30, size=300),
+                            rng.randint(-40, 40, size=300)], axis=-1)
+
+    expected = np.zeros(image.shape, dtype=bool)
+    for seed_point in seed_points:
+        expected |= flood(image, tuple(seed_point), tolerance=tolerance,
+                          connectivity=connectivity)
+
+    mask = flood(image, seed_points, tolerance=tolerance,
+                 connectivity=connectivity)
+    np.testing.assert_array_equal(mask, expected)
+
+    filled = flood_fill(image, seed_points, 9, tolerance=tolerance,
+                        connectivity=connectivity)
+    np.testing.assert_array_equal(filled == 9, expected | (image == 9))
+
+
+def test_seed_points_wrong_shape():
+    with raises(ValueError):
+        flood(np.zeros((5, 5)), [(1, 2, 3)])
+    with raises(ValueError):
+        flood(np.zeros((5, 5)), np.zeros((2, 2, 2), dtype=int))
+
+
+@pytest.mark.parametrize("tolerance", [None, 1])
+def test_large_fill_thin_axes(tolerance):
+    # Axes of length one and two, where neighbors in the unpadded image can
+    # share raveled offsets
+    image = np.zeros((1, 2, 3000), dtype=np.uint8)
+    image[0, 1, ::7] = 5
+    expected = image == 0
+    expected[0, 1, ::7] = False
+    for order in "CF":
+        mask = flood(np.asarray(image, order=order), (0, 0, 0),
+                     tolerance=tolerance)
+        np.testing.assert_array_equal(mask, expected)
+
+
 if __name__ == "__main__":
     np.testing.run_module_suite()
@@ -240,3 +240,12 @@ class TestMedialAxis():
         image[:, 1:-1] = True
         result = medial_axis(image)
         assert np.all(result == image)
+
+    def test_fortran_order(self):
+        '''Test that the memory layout of the input does not matter'''
+        image = data.binary_blobs(64, 0.3, seed=3)
+        result, distance = medial_axis(image, return_distance=True)
+        result_f, distance_f = medial_axis(np.asfortranarray(image),
+                                           return_distance=True)
+        assert_array_equal(result_f, result)
+        assert_array_equal(distance_f, distance)
@@ -183,3 +183,23 @@ def test_3d_vs_fiji():
     img_s = skeletonize(img)
     img_f = io.imread(fetch("data/_blobs_3d_fiji_skeleton.tif"))
     assert_equal(img_s, img_f)
+
+
+@parametrize("num_threads", [1, 2, 4])
+def test_num_threads(num_threads):
+    img = binary_blobs(32, 0.05, n_dim=3, seed=1234)
+    img = img.astype(np.uint8) * 255
+
+    reference = skeletonize_3d(img, num_threads=1)
+    assert_equal(skeletonize_3d(img, num_threads=num_threads), reference)
+
+
+@parametrize("ndim", [2, 3])
+def test_foreground_touching_border(ndim):
+    # borders are handled without padding: the result must be the same
+    # as if the image were padded with background
+    img = binary_blobs(32, 0.3, n_dim=ndim, seed=5)
+    padded = np.pad(img, 1, mode='constant')
+
+    expected = skeletonize_3d(padded)[(slice(1, -1),) * ndim]
+    assert_equal(skeletonize_3d(img), expected)
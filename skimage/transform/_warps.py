@@ -16,6 +16,49 @@ HOMOGRAPHY_TRANSFORMS = (
 )
 
 
+def _resize_2d_transform(input_shape, output_shape):
+    """Return the metric transform used by `resize` to sample a 2D image.
+
+    Parameters
+    ----------
+    input_shape : tuple of int
+        Shape of the input image, the first two axes are resized.
+    output_shape : tuple of int
+        Shape of the output image.
+
+    Returns
+    -------
+    tform : AffineTransform
+        Transform mapping the output coordinates to the input coordinates.
+    """
+    factors = (np.asarray(input_shape[:2], dtype=float) /
+               np.asarray(output_shape[:2], dtype=float))
+    rows = output_shape[0]
+    cols = output_shape[1]
+    input_rows = input_shape[0]
+    input_cols = input_shape[1]
+    if rows == 1 and cols == 1:
+        tform = AffineTransform(translation=(input_cols / 2.0 - 0.5,
+                                             input_rows / 2.0 - 0.5))
+    else:
+        # 3 control points necessary to estimate exact AffineTransform
+        src_corners = np.array([[1, 1], [1, rows], [cols, rows]]) - 1
+        dst_corners = np.zeros(src_corners.shape, dtype=np.double)
+        # take into account that 0th pixel is at position (0.5, 0.5)
+        dst_corners[:, 0] = factors[1] * (src_corners[:, 0] + 0.5) - 0.5
+        dst_corners[:, 1] = factors[0] * (src_corners[:, 1] + 0.5) - 0.5
+
+        tform = AffineTransform()
+        tform.estimate(src_corners, dst_corners)
+
+    # Make sure the transform is exactly metric, to ensure fast warping.
+    tform.params[2] = (0, 0, 1)
+    tform.params[0, 1] = 0
+    tform.params[1, 0] = 0
+
+    return tform
+
+
 def resize(image, output_shape, order=None, mode='reflect', cval=0, clip=True,
            preserve_range=False, anti_aliasing=None, anti_aliasing_sigma=None):
     """Resize image to match a certain size.
@@ -150,29 +193,7 @@ def resize(image, output_shape, order=None, mode='reflect', cval=0, clip=True,
     # 2-dimensional interpolation
     if len(output_shape) == 2 or (len(output_shape) == 3 and
                                   output_shape[2] == input_shape[2]):
-        rows = output_shape[0]
-        cols = output_shape[1]
-        input_rows = input_shape[0]
-        input_cols = input_shape[1]
-        if rows == 1 and cols == 1:
-            tform = AffineTransform(translation=(input_cols / 2.0 - 0.5,
-                                                 input_rows / 2.0 - 0.5))
-        else:
-            # 3 control points necessary to estimate exact AffineTransform
-            src_corners = np.array([[1, 1], [1, rows], [cols, rows]]) - 1
-            dst_corners = np.zeros(src_corners.shape, dtype=np.double)
-            # take into account that 0th pixel is at position (0.5, 0.5)
-            dst_corners[:, 0] = factors[1] * (src_corners[:, 0] + 0.5) - 0.5
-            dst_corners[:, 1] = factors[0] * (src_corners[:, 1] + 0.5) - 0.5
-
-            tform = AffineTransform()
-            tform.estimate(src_corners, dst_corners)
-
-        # Make sure the transform is exactly metric, to ensure fast warping.
-        tform.params[2] = (0, 0, 1)
-        tform.params[0, 1] = 0
-        tform.params[1, 0] = 0
-
+        tform = _resize_2d_transform(input_shape, output_shape)
         out = warp(image, tform, output_shape=output_shape, order=order,
                    mode=mode, cval=cval, clip=clip,
                    preserve_range=preserve_range)